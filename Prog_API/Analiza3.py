@@ -1,8 +1,11 @@
 import os
 import json
 import uuid
+import argparse
 from datetime import datetime
 import requests
+from analysis_cache import AnalysisCache, make_key
+import analiza_wstepna
 
 # ==========================
 # KONFIGURACJA API
@@ -42,11 +45,8 @@ def save_json_report(data: dict, timestamp: str):
 # ANALIZA TEKSTU
 # ==========================
 
-def analyze_text(text: str) -> dict:
-    """
-    Wysyła tekst do modelu LLM i pobiera analizę w formacie JSON
-    """
-    prompt = f"""
+# Szablon promptu ({text} - analizowany tekst); jest częścią klucza cache
+PROMPT_TEMPLATE = """
     Analizuj poniższy tekst w języku polskim pod kątem (lista kategorii analizy):
     - spójności logicznej między zdaniami i akapitami
     - jasności argumentacji i uzasadnienia stwierdzeń
@@ -84,6 +84,21 @@ def analyze_text(text: str) -> dict:
     \"\"\"{text}\"\"\"
     """
 
+
+def analyze_text(text: str, cache: AnalysisCache = None) -> dict:
+    """
+    Wysyła tekst do modelu LLM i pobiera analizę w formacie JSON.
+    Z cache wynik dla tego samego tekstu, szablonu i modelu jest zwracany bez zapytania do API.
+    """
+    prompt = PROMPT_TEMPLATE.format(text=text)
+
+    key = None
+    if cache is not None:
+        key = make_key(text, PROMPT_TEMPLATE, MODEL_NAME)
+        cached = cache.get(key, len(prompt.encode("utf-8")))
+        if cached is not None:
+            return json.loads(cached)
+
     payload = {
         "model": MODEL_NAME,
         "input": prompt
@@ -101,6 +116,8 @@ def analyze_text(text: str) -> dict:
     except Exception as e:
         raise ValueError(f"Błąd parsowania odpowiedzi modelu: {e}\nOdpowiedź: {result}")
 
+    if key is not None:
+        cache.set(key, model_output)
     return analysis_json
 
 # ==========================
@@ -108,6 +125,14 @@ def analyze_text(text: str) -> dict:
 # ==========================
 
 def main():
+    parser = argparse.ArgumentParser(description="Analiza tekstu przez model LLM z raportem JSON.")
+    parser.add_argument("--no-cache", action="store_true", help="Analiza bez cache wyników (ani odczytu, ani zapisu)")
+    parser.add_argument("--refresh", action="store_true", help="Ponowna analiza z pominięciem cache; nowy wynik jest zapisywany")
+    parser.add_argument("--triage", action="store_true",
+                        help="Wysyła tekst do modelu tylko, gdy wstępna analiza heurystyczna uzna go za podejrzany")
+    args = parser.parse_args()
+    cache = None if args.no_cache else AnalysisCache(refresh=args.refresh)
+
     # Przykładowy tekst do analizy
     text_to_analyze = """
     Twoja treść tekstu do analizy wstaw tutaj. Może to być artykuł, e-mail lub inny dokument.
@@ -116,8 +141,21 @@ def main():
     text_id = generate_text_id()
     timestamp = get_timestamp()
 
+    # Wstępna analiza heurystyczna (offline) - przy --triage decyduje o zapytaniu do modelu
+    initial_analysis = analiza_wstepna.analyze(text_to_analyze)
+    suspicious = analiza_wstepna.is_suspicious(initial_analysis)
+
     # Analiza tekstu
-    analysis_result = analyze_text(text_to_analyze)
+    analysis_result = {}
+    try:
+        if suspicious or not args.triage:
+            analysis_result = analyze_text(text_to_analyze, cache)
+        else:
+            print("Wstępna analiza nie wykazała problemów - pominięto analizę modelem.")
+    finally:
+        if cache is not None:
+            print(cache.format_stats())
+            cache.close()
 
     # Tworzenie pełnej struktury JSON
     full_report = {
@@ -131,6 +169,7 @@ def main():
             "text_id": text_id,
             "text": text_to_analyze
         },
+        "initial_analysis": dict(initial_analysis, suspicious=suspicious),
         **analysis_result
     }
 
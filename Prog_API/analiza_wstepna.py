@@ -0,0 +1,342 @@
+"""
+Wstępna, heurystyczna analiza tekstu bez modelu LLM (działa offline).
+
+Wylicza te same wymiary co sekcja "initial_analysis" raportu
+(report_<id>.json): poprawność językową, spójność, logiczną konsekwencję,
+wiarygodność faktów, manipulację emocjonalną i czytelność - każdy jako
+score 0.0-1.0 z wyjaśnieniem - oraz listę problemów ze spanami
+[początek, koniec) w oryginalnym tekście.
+
+Tekst jest dzielony na zdania jednym przebiegiem wyrażenia regularnego,
+słowa są przypisywane do zdań przez np.searchsorted, a spójność to średnie
+podobieństwo cosinusowe TF-IDF sąsiednich zdań liczone na rzadkiej
+reprezentacji w NumPy - strona tekstu zajmuje milisekundy. Wynik służy do
+taniej selekcji: do modelu LLM (Analiza3.analyze_text) trafiają tylko
+teksty, które is_suspicious uzna za podejrzane.
+"""
+
+import re
+import sys
+import json
+import time
+import numpy as np
+
+# ==========================
+# KONFIGURACJA HEURYSTYK
+# ==========================
+
+STEM_LENGTH = 5                 # Rdzeń słowa: pierwsze litery (przybliżenie odmiany)
+LOW_SIMILARITY = 0.05           # Przejście między zdaniami uznawane za słabo powiązane
+COHESION_TARGET = 0.15          # Średnie podobieństwo sąsiednich zdań dające score 1.0
+CONTRADICTION_SIMILARITY = 0.5  # Minimalne podobieństwo zdań podejrzanych o sprzeczność
+LONG_SENTENCE_WORDS = 40        # Zdanie dłuższe jest zgłaszane jako zbyt długie
+EMOTIVE_DENSITY_LIMIT = 0.1     # Gęstość słów nacechowanych dająca score 0.0
+SUSPICIOUS_THRESHOLD = 0.5      # Score poniżej progu kwalifikuje tekst do analizy LLM
+# Progi wymiarów, których skala dla polszczyzny jest przesunięta (wzór Flescha
+# zakłada angielską liczbę sylab, więc typowy polski tekst ma ok. 0.4-0.5)
+SUSPICIOUS_THRESHOLDS = {"czytelność": 0.3}
+# Problemy, z których każdy sam kwalifikuje tekst do analizy LLM
+SUSPICIOUS_ISSUES = frozenset({"possible_contradiction"})
+
+# Skróty poprzedzające kolejne słowo (jednostki, np. "zł." lub "r.", często kończą zdanie)
+ABBREVIATIONS = frozenset({
+    "np", "tzw", "in", "ok", "prof", "dr", "mgr", "inż", "gen", "tj", "ul", "al",
+    "godz", "wg", "pkt", "nr", "ds", "św", "ww", "jw",
+})
+
+STOPWORDS = frozenset({
+    "a", "aby", "ale", "bo", "by", "być", "był", "była", "było", "były", "co", "czy",
+    "dla", "do", "go", "i", "ich", "im", "in", "jak", "jako", "je", "jego", "jej", "jest",
+    "już", "ja", "jeszcze", "kiedy", "która", "które", "który", "ktoś", "lub", "ma", "mi",
+    "mnie", "my", "na", "nad", "nam", "nas", "nie", "o", "od", "oraz", "po", "pod", "przez",
+    "przy", "są", "się", "so", "ta", "tak", "te", "tego", "tej", "ten", "to", "tu", "tym",
+    "tylko", "w", "we", "wy", "z", "za", "ze", "że", "żeby",
+})
+
+NEGATIONS = frozenset({"nie", "nigdy", "żaden", "żadna", "żadne", "nikt", "nic", "bynajmniej"})
+
+SENTENCE_END = re.compile(r'[.!?…]+["»”)\]]*(?=\s|$)')
+WORD = re.compile(r"\w+", re.UNICODE)
+VOWEL_GROUP = re.compile(r"[aeiouyąęó]+", re.IGNORECASE)
+NUMERIC_CLAIM = re.compile(
+    r"\b\d{1,2}[./-]\d{1,2}[./-]\d{2,4}\b"          # daty 12.05.2024
+    r"|\b\d+(?:[  ]\d{3})*(?:[.,]\d+)?\s?%"    # odsetki 12,5 %
+    r"|\b\d+(?:[  ]\d{3})*(?:[.,]\d+)?\b"      # liczby i lata
+)
+SOURCE_MARKER = re.compile(
+    r"\b(?:według|wg|źródł\w*|badani\w*|raport\w*|dan(?:e|ych)|statystyk\w*|gus|eurostat|podaj\w*|cytując)\b",
+    re.IGNORECASE
+)
+EMOTIVE = re.compile(
+    r"\b(?:dramat|katastrof|skandal|tragedi|tragiczn|haniebn|hańb|szok|oburz|przeraż|straszn|"
+    r"okropn|kompromitac|żałosn|nienawi|furi|histeri|panik|zdrad|kłam|wróg|wrog|konflikt|"
+    r"absurd|niewiarygodn|niesamowit|genialn|fantastyczn|cudown|wspaniał)\w*",
+    re.IGNORECASE
+)
+REPEATED_WORD = re.compile(r"\b(\w+)\s+\1\b", re.IGNORECASE)
+SPACE_BEFORE_PUNCTUATION = re.compile(r"\s+[,.;:!?]")
+
+
+# ==========================
+# ZDANIA I SŁOWA
+# ==========================
+
+def split_sentences(text: str) -> np.ndarray:
+    """
+    Zwraca spany zdań jako tablicę (n, 2) [początek, koniec).
+
+    Kropka po skrócie (np., tzw.) lub przed małą literą nie kończy zdania.
+    """
+    ends = []
+    for match in SENTENCE_END.finditer(text):
+        end = match.end()
+        rest = text[end:end + 3].lstrip()
+        if rest and rest[0].islower():
+            continue
+        if match.group() == ".":
+            word = WORD.findall(text[max(0, match.start() - 12):match.start()])
+            if word and word[-1].lower() in ABBREVIATIONS:
+                continue
+        ends.append(end)
+    if not ends or ends[-1] < len(text.rstrip()):
+        ends.append(len(text.rstrip()))
+
+    spans = []
+    start = 0
+    for end in ends:
+        segment = text[start:end]
+        stripped = len(segment) - len(segment.lstrip())
+        if end > start + stripped:
+            spans.append((start + stripped, end))
+        start = end
+    return np.array(spans, dtype=np.int64).reshape(-1, 2)
+
+
+def tokenize(text: str, spans: np.ndarray):
+    """
+    Słowa tekstu z numerem zdania (przypisanie przez np.searchsorted).
+
+    Returns:
+        (words, word_starts, sentence_ids) - lista słów małymi literami
+        i tablice pozycji oraz numerów zdań
+    """
+    matches = list(WORD.finditer(text))
+    words = [match.group().lower() for match in matches]
+    starts = np.fromiter((match.start() for match in matches), dtype=np.int64, count=len(matches))
+    if not len(spans):
+        return words, starts, np.zeros(len(words), dtype=np.int64)
+    sentence_ids = np.searchsorted(spans[:, 1], starts, side="right")
+    return words, starts, np.minimum(sentence_ids, len(spans) - 1)
+
+
+# ==========================
+# TF-IDF I PODOBIEŃSTWO SĄSIEDNICH ZDAŃ
+# ==========================
+
+def adjacent_similarity(words: list, sentence_ids: np.ndarray, n_sentences: int) -> np.ndarray:
+    """
+    Podobieństwo cosinusowe TF-IDF (rdzenie słów, bez słów funkcyjnych)
+    każdej pary sąsiednich zdań; tablica długości n_sentences - 1.
+
+    Macierz zdania × termy jest rzadka (klucz zdanie * V + term), więc
+    iloczyny skalarne sąsiadów to przecięcie kluczy zdania i i i+1.
+    """
+    if n_sentences < 2:
+        return np.zeros(0)
+    keep = np.fromiter((word not in STOPWORDS and not word.isdigit() for word in words), dtype=bool, count=len(words))
+    stems = [word[:STEM_LENGTH] for word, kept in zip(words, keep) if kept]
+    if not stems:
+        return np.zeros(n_sentences - 1)
+    vocabulary, term_ids = np.unique(np.array(stems), return_inverse=True)
+    n_terms = len(vocabulary)
+    sentences = sentence_ids[keep]
+
+    # Liczności (zdanie, term) i IDF z wygładzaniem
+    keys, counts = np.unique(sentences * n_terms + term_ids, return_counts=True)
+    key_sentences, key_terms = np.divmod(keys, n_terms)
+    document_frequency = np.bincount(key_terms, minlength=n_terms)
+    idf = np.log((1 + n_sentences) / (1 + document_frequency)) + 1
+    weights = (1 + np.log(counts)) * idf[key_terms]
+    norms = np.sqrt(np.bincount(key_sentences, weights=weights ** 2, minlength=n_sentences))
+    weights = weights / norms[key_sentences]
+
+    # Wpis (i+1, t) przesunięty do klucza (i, t) trafia na wspólny term zdania i
+    shifted = keys - n_terms
+    _, left, right = np.intersect1d(keys, shifted, assume_unique=True, return_indices=True)
+    dots = np.bincount(
+        key_sentences[left], weights=weights[left] * weights[right], minlength=n_sentences
+    )
+    return dots[:n_sentences - 1]
+
+
+def count_syllables(words: list) -> np.ndarray:
+    """Przybliżona liczba sylab każdego słowa (grupy samogłosek, co najmniej 1)."""
+    return np.fromiter((max(1, len(VOWEL_GROUP.findall(word))) for word in words), dtype=np.int64, count=len(words))
+
+
+# ==========================
+# ANALIZA
+# ==========================
+
+def _issue(issues: list, kind: str, start: int, end: int, text: str) -> None:
+    issues.append({"type": kind, "span": [int(start), int(end)], "text": text[start:end]})
+
+
+def analyze(text: str) -> dict:
+    """
+    Heurystyczna analiza tekstu w formacie sekcji "initial_analysis".
+
+    Returns:
+        {"scores": {wymiar: {"score", "explanation"}}, "issues": [...],
+         "confidence": float} - confidence rośnie z długością tekstu,
+        ale nie przekracza 0.5 (to wyłącznie heurystyki)
+    """
+    spans = split_sentences(text)
+    n_sentences = len(spans)
+    words, word_starts, sentence_ids = tokenize(text, spans)
+    n_words = len(words)
+    words_per_sentence = np.bincount(sentence_ids, minlength=n_sentences) if n_words else np.zeros(n_sentences)
+    avg_sentence = float(words_per_sentence.mean()) if n_sentences else 0.0
+    issues = []
+
+    # --- Poprawność językowa: długie zdania, powtórzenia, interpunkcja, wielka litera ---
+    language_issues = 0
+    for index in np.flatnonzero(words_per_sentence > LONG_SENTENCE_WORDS):
+        _issue(issues, "long_sentence", spans[index, 0], spans[index, 1], text)
+        language_issues += 1
+    for match in REPEATED_WORD.finditer(text):
+        if not match.group(1).isdigit():
+            _issue(issues, "repeated_word", match.start(), match.end(), text)
+            language_issues += 1
+    for match in SPACE_BEFORE_PUNCTUATION.finditer(text):
+        _issue(issues, "space_before_punctuation", match.start(), match.end(), text)
+        language_issues += 1
+    for start, end in spans:
+        first = text[start]
+        if first.isalpha() and first.islower():
+            _issue(issues, "lowercase_sentence_start", start, min(end, start + 20), text)
+            language_issues += 1
+    language_score = max(0.0, 1.0 - language_issues / max(1, n_sentences))
+
+    # --- Spójność: podobieństwo TF-IDF sąsiednich zdań ---
+    similarity = adjacent_similarity(words, sentence_ids, n_sentences)
+    mean_similarity = float(similarity.mean()) if len(similarity) else 1.0
+    weak = np.flatnonzero(similarity < LOW_SIMILARITY)
+    for index in weak:
+        # Zgłaszane jest zdanie słabo powiązane z poprzednim
+        _issue(issues, "low_transition_similarity", spans[index + 1, 0], spans[index + 1, 1], text)
+    cohesion_score = min(1.0, mean_similarity / COHESION_TARGET)
+
+    # --- Logiczna konsekwencja: podobne sąsiednie zdania, z których tylko jedno zaprzecza ---
+    negated = np.zeros(n_sentences, dtype=bool)
+    if n_words:
+        is_negation = np.fromiter((word in NEGATIONS for word in words), dtype=bool, count=n_words)
+        negated[np.unique(sentence_ids[is_negation])] = True
+    contradictions = np.flatnonzero((similarity >= CONTRADICTION_SIMILARITY) & (negated[:-1] != negated[1:]))
+    for index in contradictions:
+        _issue(issues, "possible_contradiction", spans[index, 0], spans[index + 1, 1], text)
+    logic_score = max(0.0, 1.0 - 2 * len(contradictions) / max(1, n_sentences - 1))
+
+    # --- Wiarygodność faktów: liczby i daty bez wskazania źródła w zdaniu ---
+    claims = list(NUMERIC_CLAIM.finditer(text))
+    sourced_sentences = np.zeros(n_sentences, dtype=bool)
+    if n_sentences:
+        marker_starts = np.array([match.start() for match in SOURCE_MARKER.finditer(text)], dtype=np.int64)
+        if len(marker_starts):
+            sourced_sentences[np.minimum(np.searchsorted(spans[:, 1], marker_starts, side="right"), n_sentences - 1)] = True
+    unsourced = 0
+    for match in claims:
+        sentence = min(int(np.searchsorted(spans[:, 1], match.start(), side="right")), n_sentences - 1)
+        if not sourced_sentences[sentence]:
+            _issue(issues, "numeric_claim_no_source", match.start(), match.end(), text)
+            unsourced += 1
+    facts_score = 1.0 - 0.5 * unsourced / len(claims) if claims else 1.0
+
+    # --- Manipulacja emocjonalna: gęstość słów nacechowanych i wykrzyknień ---
+    emotive = list(EMOTIVE.finditer(text))
+    for match in emotive:
+        _issue(issues, "emotive_word", match.start(), match.end(), text)
+    exclamations = text.count("!")
+    density = (len(emotive) + exclamations) / max(1, n_words)
+    emotion_score = max(0.0, 1.0 - density / EMOTIVE_DENSITY_LIMIT)
+
+    # --- Czytelność: wzór Flescha z przybliżonym licznikiem sylab ---
+    syllables_per_word = float(count_syllables(words).mean()) if n_words else 0.0
+    flesch = 206.835 - 1.015 * avg_sentence - 84.6 * syllables_per_word if n_words else 100.0
+    readability_score = min(1.0, max(0.0, flesch / 100))
+
+    issues.sort(key=lambda issue: (issue["span"][0], issue["span"][1]))
+    scores = {
+        "poprawność_językowa": {
+            "score": language_score,
+            "explanation": f"Heurystyczna ocena poprawności językowej; wykryto {language_issues} problem(y). "
+                           f"Średnia długość zdania: {avg_sentence:.1f}.",
+        },
+        "spójność": {
+            "score": cohesion_score,
+            "explanation": f"Średnie podobieństwo sąsiednich zdań: {mean_similarity:.3f}. "
+                           f"Liczba słabo powiązanych przejść: {len(weak)}.",
+        },
+        "logiczna_konsekwencja": {
+            "score": logic_score,
+            "explanation": f"Heurystyka wykrywania sprzeczności (podobne zdania o przeciwnej polaryzacji); "
+                           f"wykryto {len(contradictions)} potencjalnych sprzeczności.",
+        },
+        "wiarygodność_faktów": {
+            "score": facts_score,
+            "explanation": f"Twierdzenia liczbowe i daty: {len(claims)}, bez wskazania źródła w zdaniu: {unsourced}. "
+                           f"Bez weryfikacji w zewnętrznej bazie faktów.",
+        },
+        "manipulacja_emocjonalna": {
+            "score": emotion_score,
+            "explanation": f"Heurystyka retoryczna: znaleziono {len(emotive)} emo-słów i {exclamations} wykrzyknień; "
+                           f"gęstość {density:.4f}.",
+        },
+        "czytelność": {
+            "score": readability_score,
+            "explanation": f"Przybliżona miara czytelności (Flesch, z przybliżonym licznikiem sylab): "
+                           f"{readability_score:.3f} (0=trudne,1=łatwe). Średnia długość zdań: {avg_sentence:.1f}.",
+        },
+    }
+    return {
+        "scores": scores,
+        "issues": issues,
+        "confidence": min(0.5, 0.05 + n_sentences / 200),
+    }
+
+
+def is_suspicious(analysis: dict, threshold: float = SUSPICIOUS_THRESHOLD) -> bool:
+    """
+    Czy tekst warto wysłać do LLM: któryś wymiar ma score poniżej progu
+    (wymiary z SUSPICIOUS_THRESHOLDS mają własne progi) lub wykryto problem
+    z SUSPICIOUS_ISSUES.
+    """
+    if any(issue["type"] in SUSPICIOUS_ISSUES for issue in analysis["issues"]):
+        return True
+    return any(
+        entry["score"] < SUSPICIOUS_THRESHOLDS.get(name, threshold)
+        for name, entry in analysis["scores"].items()
+    )
+
+
+# ==========================
+# URUCHOMIENIE
+# ==========================
+
+def main():
+    """Analiza plików podanych w argumentach (lub stdin); wynik JSON na stdout."""
+    paths = sys.argv[1:]
+    sources = [(path, open(path, encoding="utf-8").read()) for path in paths] or [("stdin", sys.stdin.read())]
+    results = {}
+    for name, text in sources:
+        started = time.perf_counter()
+        analysis = analyze(text)
+        analysis["suspicious"] = is_suspicious(analysis)
+        analysis["runtime_seconds"] = time.perf_counter() - started
+        results[name] = analysis
+    json.dump(results if len(results) > 1 else next(iter(results.values())), sys.stdout, ensure_ascii=False, indent=2)
+    print()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,6 @@
+import os
+import sys
+
+# Analiza3 wymaga klucza już przy imporcie; testy nie wysyłają zapytań do API
+os.environ.setdefault("OPENAI_API_KEY", "test")
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
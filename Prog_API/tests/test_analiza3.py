@@ -0,0 +1,64 @@
+import json
+import os
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+import Analiza3
+import analysis_cache
+from analysis_cache import AnalysisCache, make_key
+
+ANALYSIS = {"analysis": {"issues": [], "confidence": "0.9"}, "report": {"summary": "Tekst poprawny."}}
+
+
+def _api_response(result: dict = ANALYSIS) -> MagicMock:
+    response = MagicMock()
+    response.json.return_value = {"output_text": json.dumps(result)}
+    return response
+
+
+@pytest.fixture
+def cache(tmp_path):
+    cache = AnalysisCache(path=str(tmp_path / "cache.sqlite"))
+    yield cache
+    cache.close()
+
+
+def test_cache_hit_does_not_call_api(cache):
+    key = make_key("Krótki tekst.", Analiza3.PROMPT_TEMPLATE, Analiza3.MODEL_NAME)
+    cache.set(key, json.dumps(ANALYSIS))
+
+    with patch("Analiza3.requests.post") as mock_post:
+        result = Analiza3.analyze_text("Krótki tekst.\n", cache)
+
+    assert result == ANALYSIS
+    mock_post.assert_not_called()
+    assert cache.hits == 1
+
+
+def test_cache_miss_stores_result(cache):
+    with patch("Analiza3.requests.post", return_value=_api_response()) as mock_post:
+        first = Analiza3.analyze_text("Krótki tekst.", cache)
+        second = Analiza3.analyze_text("Krótki tekst.", cache)
+
+    assert first == second == ANALYSIS
+    assert mock_post.call_count == 1
+    assert (cache.hits, cache.misses) == (1, 1)
+
+
+def test_without_cache_every_call_reaches_api():
+    with patch("Analiza3.requests.post", return_value=_api_response()) as mock_post:
+        Analiza3.analyze_text("Krótki tekst.")
+        Analiza3.analyze_text("Krótki tekst.")
+
+    assert mock_post.call_count == 2
+
+
+def test_cache_module_matches_prog_analizer_copy():
+    """Prog_API ma własną kopię analysis_cache.py - musi być zgodna z Prog_Analizer"""
+    repo = os.path.dirname(os.path.dirname(os.path.abspath(analysis_cache.__file__)))
+    original = os.path.join(repo, "Prog_Analizer", "analysis_cache.py")
+    if not os.path.exists(original):
+        pytest.skip("Brak Prog_Analizer obok Prog_API")
+    with open(original, encoding="utf-8") as source, open(analysis_cache.__file__, encoding="utf-8") as copy:
+        assert copy.read() == source.read()
@@ -0,0 +1,163 @@
+import math
+import sys
+from unittest.mock import patch
+
+import pytest
+
+import analiza_wstepna
+
+
+def _sentences(text: str) -> list:
+    return [text[start:end] for start, end in analiza_wstepna.split_sentences(text)]
+
+
+def _issues(text: str, kind: str) -> list:
+    return [
+        (issue["span"], issue["text"])
+        for issue in analiza_wstepna.analyze(text)["issues"] if issue["type"] == kind
+    ]
+
+
+def _similarity(text: str):
+    spans = analiza_wstepna.split_sentences(text)
+    words, _, sentence_ids = analiza_wstepna.tokenize(text, spans)
+    return analiza_wstepna.adjacent_similarity(words, sentence_ids, len(spans))
+
+
+# ===== ZDANIA =====
+
+def test_split_sentences_on_terminal_punctuation():
+    assert _sentences("Pierwsze zdanie. Drugie zdanie! Czy trzecie? Tak…") == [
+        "Pierwsze zdanie.", "Drugie zdanie!", "Czy trzecie?", "Tak…"
+    ]
+
+
+def test_split_sentences_skips_abbreviations_and_lowercase_continuation():
+    assert _sentences("Mamy np. kota w domu. Dr. Nowak przyszedł.") == ["Mamy np. kota w domu.", "Dr. Nowak przyszedł."]
+    # Kropka po jednostce przed małą literą nie kończy zdania
+    assert _sentences("Bilet kosztuje 5 zł. za osobę. Nowe zdanie.") == ["Bilet kosztuje 5 zł. za osobę.", "Nowe zdanie."]
+
+
+def test_split_sentences_keeps_unterminated_tail():
+    assert _sentences("Zdanie. Bez kropki na końcu  ") == ["Zdanie.", "Bez kropki na końcu"]
+
+
+@pytest.mark.parametrize("text", ["", "   \n\t"])
+def test_empty_text(text):
+    assert analiza_wstepna.split_sentences(text).shape == (0, 2)
+
+    analysis = analiza_wstepna.analyze(text)
+
+    assert analysis["issues"] == []
+    assert all(entry["score"] == 1.0 for entry in analysis["scores"].values())
+    assert analysis["confidence"] == 0.05
+    assert not analiza_wstepna.is_suspicious(analysis)
+
+
+# ===== PODOBIEŃSTWO SĄSIEDNICH ZDAŃ =====
+
+def test_adjacent_similarity_matches_hand_computed_cosine():
+    # "kot" i "mleko" występują w 2 z 3 zdań, pozostałe termy w jednym:
+    # idf = ln((1 + 3) / (1 + df)) + 1, wektory zdań 1 i 2 to (a, b, a) i (a, b', a)
+    shared = math.log(4 / 3) + 1
+    single = math.log(2) + 1
+    expected = 2 * shared ** 2 / (2 * shared ** 2 + single ** 2)
+
+    similarity = _similarity("Kot lubi mleko. Kot pije mleko. Pies biega.")
+
+    assert similarity == pytest.approx([expected, 0.0])
+
+
+def test_adjacent_similarity_weights_repeated_terms():
+    # "kot" jest w obu zdaniach (idf = ln(3/3) + 1 = 1), "goni", "łapie", "mysz" w jednym
+    # (idf = ln(3/2) + 1); w zdaniu 1 "kot" występuje dwukrotnie (tf = 1 + ln 2)
+    rare = math.log(3 / 2) + 1
+    kot = 1 + math.log(2)
+    expected = kot / (math.hypot(kot, rare) * math.sqrt(1 + 2 * rare ** 2))
+
+    assert _similarity("Kot goni kot. Kot łapie mysz.") == pytest.approx([expected])
+
+
+def test_adjacent_similarity_without_content_words():
+    assert analiza_wstepna.adjacent_similarity([], analiza_wstepna.np.zeros(0, dtype=int), 1).size == 0
+    assert _similarity("To jest. I to. Tak.").tolist() == [0.0, 0.0]
+
+
+# ===== PROBLEMY ZE SPANAMI =====
+
+def test_language_issue_spans():
+    assert _issues("To jest jest dobre.", "repeated_word") == [([3, 12], "jest jest")]
+    assert _issues("Ala ma kota , psa.", "space_before_punctuation") == [([11, 13], " ,")]
+    assert _issues("ala ma kota.", "lowercase_sentence_start") == [([0, 12], "ala ma kota.")]
+
+
+def test_long_sentence_span():
+    sentence = "Zdanie " + " ".join(f"słowo{i}" for i in range(40)) + "."
+    text = "Krótkie zdanie. " + sentence
+
+    assert _issues(text, "long_sentence") == [([16, len(text)], sentence)]
+
+
+def test_low_transition_and_contradiction_spans():
+    assert _issues("Kot lubi mleko. Kot pije mleko. Pies biega.", "low_transition_similarity") == [
+        ([32, 43], "Pies biega.")
+    ]
+    text = "Kot lubi mleko. Kot nie lubi mleko."
+    assert _issues(text, "possible_contradiction") == [([0, 35], text)]
+
+
+def test_numeric_claims_without_source_and_emotive_words():
+    text = "Sprzedano 120 sztuk, czyli 12,5 % rynku. Według GUS było 300 sztuk 12.05.2024 roku."
+    assert _issues(text, "numeric_claim_no_source") == [([10, 13], "120"), ([27, 33], "12,5 %")]
+    assert analiza_wstepna.analyze(text)["scores"]["wiarygodność_faktów"]["score"] == pytest.approx(1 - 0.5 * 2 / 4)
+
+    assert _issues("To skandal i katastrofa!", "emotive_word") == [([3, 10], "skandal"), ([13, 23], "katastrofa")]
+
+
+# ===== SELEKCJA DO ANALIZY LLM =====
+
+def _analysis(scores: dict = None, issues: tuple = ()) -> dict:
+    names = ["poprawność_językowa", "spójność", "logiczna_konsekwencja",
+             "wiarygodność_faktów", "manipulacja_emocjonalna", "czytelność"]
+    scores = {name: 1.0 for name in names} | (scores or {})
+    return {
+        "scores": {name: {"score": score, "explanation": ""} for name, score in scores.items()},
+        "issues": [{"type": kind, "span": [0, 1], "text": ""} for kind in issues],
+    }
+
+
+def test_is_suspicious_uses_default_threshold():
+    threshold = analiza_wstepna.SUSPICIOUS_THRESHOLD
+    assert not analiza_wstepna.is_suspicious(_analysis({"spójność": threshold}))
+    assert analiza_wstepna.is_suspicious(_analysis({"spójność": threshold - 0.01}))
+    assert not analiza_wstepna.is_suspicious(_analysis({"spójność": 0.2}), threshold=0.1)
+
+
+@pytest.mark.parametrize("name,threshold", sorted(analiza_wstepna.SUSPICIOUS_THRESHOLDS.items()))
+def test_is_suspicious_uses_dimension_thresholds(name, threshold):
+    assert threshold < analiza_wstepna.SUSPICIOUS_THRESHOLD
+    assert not analiza_wstepna.is_suspicious(_analysis({name: threshold}))
+    assert analiza_wstepna.is_suspicious(_analysis({name: threshold - 0.01}))
+
+
+def test_is_suspicious_on_listed_issues_only():
+    for kind in analiza_wstepna.SUSPICIOUS_ISSUES:
+        assert analiza_wstepna.is_suspicious(_analysis(issues=(kind,)))
+    assert not analiza_wstepna.is_suspicious(_analysis(issues=("emotive_word", "repeated_word")))
+
+
+# ===== TRYB --triage W Analiza3 =====
+
+@pytest.mark.parametrize("suspicious", [False, True])
+def test_triage_sends_only_suspicious_texts(tmp_path, monkeypatch, suspicious):
+    import Analiza3
+
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(sys, "argv", ["Analiza3.py", "--triage", "--no-cache"])
+    with patch("Analiza3.analiza_wstepna.is_suspicious", return_value=suspicious), \
+            patch("Analiza3.analyze_text", return_value={"analysis": {}}) as mock_analyze:
+        Analiza3.main()
+
+    assert mock_analyze.call_count == int(suspicious)
+    report = (tmp_path / next(p.name for p in tmp_path.iterdir())).read_text(encoding="utf-8")
+    assert f'"suspicious": {str(suspicious).lower()}' in report
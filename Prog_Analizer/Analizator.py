@@ -1,9 +1,16 @@
 import os
 import re
+import sys
+import glob
 import json
+import time
 import argparse
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
 import requests
 
+from analysis_cache import AnalysisCache, make_key
+
 
 class ConfigError(Exception):
     pass
@@ -22,10 +29,21 @@ HEADERS = {
     "Content-Type": "application/json"
 }
 
+# Tryb wsadowy: liczba równoległych analiz, limit zapytań na minutę i timeout zapytania (s)
+BATCH_WORKERS = 4
+BATCH_REQUESTS_PER_MINUTE = 60
+REQUEST_TIMEOUT = 120
+INPUT_EXTENSIONS = (".txt",)
+
+# Długie dokumenty: maksymalna długość fragmentu (znaki), zakładka z końca
+# poprzedniego fragmentu (znaki, pełne zdania) i liczba równoległych analiz fragmentów
+CHUNK_MAX_CHARS = 8000
+CHUNK_OVERLAP_CHARS = 600
+CHUNK_WORKERS = 4
 
 
-def analiza_tekstu(text: str) -> dict:
-    prompt = f"""
+# Instrukcja dla modelu; analizowany tekst jest doklejany na końcu
+PROMPT = f"""
        Jesteś asystentem analizy tekstu. Na wstępie określ język wypowiedzi i dopasuj kryteria oceny do wykrytego języka, gwary lub slangu.
        Twoim zadaniem jest przeprowadzenie obiektywnej analizy podanego tekstu według poniższych wytycznych:
         - logiki wypowiedzi - nie tylko w obrębie zdania, lecz również zależności między zdaniami lub akapitami.
@@ -105,13 +123,53 @@ def analiza_tekstu(text: str) -> dict:
 
     """
 
+FRAGMENT_NOTE = """
+    (Analizowany tekst to fragment {0} z {1} dłuższego dokumentu. Pierwsze {2} znaków fragmentu powtarza
+    koniec poprzedniego fragmentu - użyj ich do oceny spójności logicznej na granicy fragmentów,
+    ale nie zgłaszaj błędów gramatycznych występujących wyłącznie w tej części.)
+
+    """
+
+
+def analiza_tekstu(text: str, fragment: tuple = None, cache: AnalysisCache = None, limiter=None) -> dict:
+    """
+    Analizuje tekst jednym zapytaniem do modelu i zwraca treść odpowiedzi (JSON).
+
+    fragment: (numer, liczba fragmentów, długość zakładki) - tekst jest częścią
+    dłuższego dokumentu, a jego początek powtarza koniec poprzedniej części
+    cache: wynik dla tego samego tekstu, promptu i modelu jest odczytywany
+    z cache bez zapytania do API
+    limiter: opcjonalny RateLimiter - trafienie w cache nie zużywa limitu
+    """
+    prompt = PROMPT
+    if fragment is not None:
+        prompt = PROMPT.rstrip() + FRAGMENT_NOTE.format(*fragment)
+
+    key = None
+    if cache is not None:
+        key = make_key(text, prompt, MODEL_NAME)
+        cached = cache.get(key, len((prompt + text).encode("utf-8")))
+        if cached is not None:
+            return cached
+
+    if limiter is not None:
+        limiter.acquire()
     payload = {
         "model": MODEL_NAME,
         "input": prompt + text
     }
     
-    response = requests.post(OPENAI_API_URL, headers=HEADERS, json=payload)
-    return response.json()['output'][0]['content'][0]['text']
+    response = requests.post(OPENAI_API_URL, headers=HEADERS, json=payload, timeout=REQUEST_TIMEOUT)
+    response.raise_for_status()
+    result = response.json()['output'][0]['content'][0]['text']
+    if key is not None:
+        # Zapisujemy tylko odpowiedzi, które da się sparsować
+        try:
+            json.loads(result)
+            cache.set(key, result)
+        except ValueError:
+            pass
+    return result
    
 
 def get_next_number():      # Brak param - Założenie analizy plików z bieżącego katalogu. Wzór ustalony na sztywno w funkcji
@@ -126,11 +184,381 @@ def get_next_number():      # Brak param - Założenie analizy plików z bieżą
     return max + 1
 
 
+def format_report(dane: dict) -> str:
+    """Buduje treść raportu z odpowiedzi modelu (JSON z kluczami kategorie i uwagi)."""
+    rows = []
+    rows.append("Wynik analizy:\n")
+    
+    for kategoria in dane["kategorie"]:
+        rows.append(f"{kategoria['kategoria']}:")
+        rows.append(f"  Poziom: {kategoria['poziom']}")
+        rows.append(f"  Etykiety: {','.join(kategoria['etykiety'])}")
+        if kategoria.get("błędy"):
+            rows.append("  Błędy:")
+            for blad in kategoria["błędy"]:
+                rows.append(f"    - {blad}")
+        rows.append("")  # odstęp między kategoriami
+    rows.append(f"Uwagi: {dane['uwagi']}\n")
+        
+    return "\n".join(rows)
+
+
+def save_report(text: str, base_name: str, out_dir: str = "") -> str:
+    """Zapisuje raport jako Analiza_(<base_name>).txt i zwraca ścieżkę pliku."""
+    fname = os.path.join(out_dir, f"Analiza_({base_name}).txt")
+    with open(fname, 'w', encoding='utf-8') as out_f:
+        out_f.write(text)
+    return fname
+
+
+# ==========================
+# DŁUGIE DOKUMENTY (MAP-REDUCE)
+# ==========================
+
+PARAGRAPH_SPLIT = re.compile(r"\n\s*\n")
+SENTENCE_SPLIT = re.compile(r"(?<=[.!?…])\s+")
+
+
+def split_units(text: str, max_chars: int) -> list:
+    """
+    Dzieli tekst na jednostki nie dłuższe niż max_chars: całe akapity,
+    a zbyt długie akapity na zdania (zbyt długie zdania - na słowa).
+    Każda jednostka kończy się separatorem, więc ich sklejenie odtwarza tekst.
+    """
+    units = []
+    for paragraph in PARAGRAPH_SPLIT.split(text.strip()):
+        paragraph = paragraph.strip()
+        if not paragraph:
+            continue
+        if len(paragraph) <= max_chars:
+            units.append((paragraph + "\n\n", True))
+            continue
+        for sentence in SENTENCE_SPLIT.split(paragraph):
+            while len(sentence) > max_chars:
+                cut = sentence.rfind(" ", 0, max_chars)
+                cut = cut if cut > 0 else max_chars
+                units.append((sentence[:cut] + " ", False))
+                sentence = sentence[cut:].lstrip()
+            units.append((sentence + " ", False))
+        units[-1] = (units[-1][0].rstrip() + "\n\n", True)
+    return [unit for unit, _ in units]
+
+
+def overlap_tail(units: list, overlap: int) -> list:
+    """Końcowe pełne zdania jednostek (łącznie najwyżej overlap znaków)."""
+    sentences = SENTENCE_SPLIT.split("".join(units).strip())
+    tail = []
+    size = 0
+    for sentence in reversed(sentences):
+        if size + len(sentence) + 1 > overlap:
+            break
+        tail.insert(0, sentence)
+        size += len(sentence) + 1
+    return [" ".join(tail) + "\n\n"] if tail else []
+
+
+def split_text(text: str, max_chars: int = CHUNK_MAX_CHARS, overlap: int = CHUNK_OVERLAP_CHARS) -> list:
+    """
+    Dzieli długi tekst na fragmenty na granicach akapitów i zdań.
+
+    Każdy fragment poza pierwszym zaczyna się zakładką - ostatnimi zdaniami
+    poprzedniego fragmentu - dzięki czemu model ocenia spójność logiczną
+    również na granicach fragmentów.
+
+    Returns:
+        Lista par (treść fragmentu, długość zakładki na jego początku)
+    """
+    if max_chars < 1 or overlap < 0 or overlap >= max_chars:
+        raise ValueError("Długość fragmentu musi być dodatnia i większa niż zakładka")
+    if len(text.strip()) <= max_chars:
+        return [(text.strip(), 0)] if text.strip() else []
+    chunks = []
+    current = []
+    size = prefix = 0
+    # Jednostki są krótsze o zakładkę, więc zwykle mieści się ona we fragmencie w całości
+    for unit in split_units(text, max_chars - overlap):
+        if size + len(unit) > max_chars and size > prefix:
+            chunks.append(("".join(current).strip(), prefix))
+            # Zakładka razem z separatorem "\n\n" i bieżącą jednostką mieści się w max_chars
+            budget = min(overlap, max_chars - len(unit.rstrip()) - 1)
+            current = overlap_tail(current, budget) if budget > 0 else []
+            size = sum(len(part) for part in current)
+            prefix = len("".join(current).rstrip())
+        current.append(unit)
+        size += len(unit)
+    if size > prefix:
+        chunks.append(("".join(current).strip(), prefix))
+    return chunks
+
+
+def _normalize_entry(entry) -> str:
+    return " ".join(str(entry).lower().split())
+
+
+def merge_analyses(results: list, weights: list) -> dict:
+    """
+    Scala analizy fragmentów w jeden wynik w formacie analiza_tekstu.
+
+    Dla każdej kategorii: poziom - średnia ważona długością fragmentów
+    (bez zakładek), etykiety - suma zbiorów, błędy - bez powtórzeń (błędy
+    z zakładek zgłoszone przez oba sąsiednie fragmenty występują raz).
+    """
+    categories = {}
+    for dane, weight in zip(results, weights):
+        for kategoria in dane.get("kategorie", []):
+            name = kategoria["kategoria"]
+            merged = categories.setdefault(name, {"sum": 0.0, "weight": 0, "etykiety": {}, "błędy": {}})
+            try:
+                merged["sum"] += float(kategoria["poziom"]) * weight
+                merged["weight"] += weight
+            except (KeyError, TypeError, ValueError):
+                pass
+            for label in kategoria.get("etykiety", []):
+                merged["etykiety"].setdefault(_normalize_entry(label), label)
+            for blad in kategoria.get("błędy") or []:
+                merged["błędy"].setdefault(_normalize_entry(blad), blad)
+
+    kategorie = []
+    for name, merged in categories.items():
+        poziom = round(merged["sum"] / merged["weight"], 1) if merged["weight"] else 5
+        kategoria = {"kategoria": name, "poziom": poziom, "etykiety": list(merged["etykiety"].values())}
+        if merged["błędy"]:
+            kategoria["błędy"] = list(merged["błędy"].values())
+        kategorie.append(kategoria)
+
+    uwagi = [dane.get("uwagi", "") for dane in results]
+    return {
+        "kategorie": kategorie,
+        "uwagi": " ".join(f"[{index}/{len(uwagi)}] {uwaga}" for index, uwaga in enumerate(uwagi, 1) if uwaga),
+    }
+
+
+def analiza_dokumentu(text: str, max_chars: int = CHUNK_MAX_CHARS, overlap: int = CHUNK_OVERLAP_CHARS,
+                      workers: int = CHUNK_WORKERS, limiter=None, cache: AnalysisCache = None) -> dict:
+    """
+    Analizuje dokument dowolnej długości i zwraca sparsowany wynik.
+
+    Tekst mieszczący się w max_chars trafia do modelu jednym zapytaniem.
+    Dłuższy jest dzielony na fragmenty (split_text) analizowane równolegle
+    (najwyżej workers naraz), a wyniki scalane przez merge_analyses - czas
+    analizy rośnie z liczbą fragmentów podzieloną przez workers.
+
+    limiter: opcjonalny RateLimiter wspólny dla wszystkich zapytań do API
+    cache: opcjonalny AnalysisCache (każdy fragment ma własny wpis, więc
+    zmiana jednego akapitu unieważnia tylko jego fragmenty)
+    """
+    chunks = split_text(text, max_chars, overlap)
+    if len(chunks) <= 1:
+        return json.loads(analiza_tekstu(text, cache=cache, limiter=limiter))
+
+    def analyze_chunk(index: int) -> dict:
+        chunk, prefix = chunks[index]
+        return json.loads(analiza_tekstu(chunk, (index + 1, len(chunks), prefix), cache, limiter))
+
+    with ThreadPoolExecutor(max_workers=max(1, min(workers, len(chunks)))) as executor:
+        results = list(executor.map(analyze_chunk, range(len(chunks))))
+    weights = [max(1, len(chunk) - prefix) for chunk, prefix in chunks]
+    return merge_analyses(results, weights)
+
+
+# ==========================
+# TRYB WSADOWY
+# ==========================
+
+class RateLimiter:
+    """
+    Rozkłada zapytania równomiernie w czasie: najwyżej per_minute zapytań
+    na minutę, niezależnie od liczby wątków.
+    """
+
+    def __init__(self, per_minute: float, clock=time.monotonic, sleep=time.sleep):
+        if per_minute <= 0:
+            raise ValueError("Limit zapytań na minutę musi być liczbą dodatnią")
+        self.interval = 60.0 / per_minute
+        self._clock = clock
+        self._sleep = sleep
+        self._next = 0.0
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        with self._lock:
+            now = self._clock()
+            start = max(now, self._next)
+            self._next = start + self.interval
+        if start > now:
+            self._sleep(start - now)
+
+
+def collect_inputs(patterns: list, manifest: str = None) -> list:
+    """
+    Zbiera pliki do analizy: katalogi (pliki .txt, bez wcześniejszych raportów
+    Analiza_(...)), wzorce glob i ścieżki z pliku manifestu (jedna na linię,
+    # rozpoczyna komentarz). Kolejność zachowana, bez powtórzeń.
+    """
+    entries = list(patterns)
+    if manifest:
+        base_dir = os.path.dirname(os.path.abspath(manifest))
+        with open(manifest, 'r', encoding='utf-8') as m_f:
+            for line in m_f:
+                line = line.split('#', 1)[0].strip()
+                if line:
+                    entries.append(line if os.path.isabs(line) else os.path.join(base_dir, line))
+
+    files = []
+    for entry in entries:
+        if os.path.isdir(entry):
+            found = sorted(
+                os.path.join(entry, name) for name in os.listdir(entry)
+                if name.lower().endswith(INPUT_EXTENSIONS) and not name.startswith("Analiza_(")
+            )
+        elif glob.has_magic(entry):
+            found = sorted(glob.glob(entry, recursive=True))
+        else:
+            found = [entry]
+        files.extend(path for path in found if os.path.isfile(path) or path == entry)
+
+    unique = {}
+    for path in files:
+        unique.setdefault(os.path.normpath(path), None)
+    return list(unique)
+
+
+def unique_base_names(files: list) -> dict:
+    """Nazwa raportu dla każdego pliku; powtórzone nazwy dostają przyrostek _2, _3, ..."""
+    names = {}
+    used = {}
+    for path in files:
+        base = os.path.splitext(os.path.basename(path))[0]
+        used[base] = used.get(base, 0) + 1
+        names[path] = base if used[base] == 1 else f"{base}_{used[base]}"
+    return names
+
+
+def analyze_file(path: str, base_name: str, out_dir: str, limiter: RateLimiter,
+                 chunk_chars: int = CHUNK_MAX_CHARS, chunk_workers: int = CHUNK_WORKERS,
+                 cache: AnalysisCache = None) -> dict:
+    """Analizuje jeden plik i od razu zapisuje raport; zwraca wynik z czasem trwania."""
+    started = time.perf_counter()
+    try:
+        with open(path, 'r', encoding='utf-8') as in_f:
+            input_txt = in_f.read()
+        request_started = time.perf_counter()
+        dane = analiza_dokumentu(input_txt, chunk_chars, min(CHUNK_OVERLAP_CHARS, chunk_chars // 4),
+                                 chunk_workers, limiter, cache)
+        latency = time.perf_counter() - request_started
+        fname = save_report(format_report(dane), base_name, out_dir)
+        return {"path": path, "output": fname, "error": None, "latency": latency,
+                "duration": time.perf_counter() - started}
+    except Exception as e:
+        return {"path": path, "output": None, "error": f"{type(e).__name__}: {e}", "latency": None,
+                "duration": time.perf_counter() - started}
+
+
+def percentile(values: list, point: float) -> float:
+    """Percentyl metodą najbliższej rangi (0 dla pustej listy)."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(1, -(-point * len(ordered) // 100))
+    return ordered[int(rank) - 1]
+
+
+def run_batch(files: list, workers: int = BATCH_WORKERS, per_minute: float = BATCH_REQUESTS_PER_MINUTE,
+              out_dir: str = ".", chunk_chars: int = CHUNK_MAX_CHARS, chunk_workers: int = CHUNK_WORKERS,
+              cache: AnalysisCache = None) -> dict:
+    """
+    Analizuje pliki równolegle (najwyżej workers naraz, najwyżej per_minute
+    zapytań na minutę, wliczając zapytania o fragmenty długich dokumentów).
+    Każdy raport jest zapisywany zaraz po zakończeniu
+    analizy dokumentu; błąd jednego dokumentu nie przerywa pozostałych.
+
+    Returns:
+        Podsumowanie: liczba dokumentów, udane, nieudane, czas, przepustowość,
+        opóźnienia zapytań (średnia, p50, p95, max) i lista wyników
+    """
+    if workers < 1:
+        raise ValueError("Liczba wątków musi być liczbą dodatnią")
+    if out_dir:
+        os.makedirs(out_dir, exist_ok=True)
+    limiter = RateLimiter(per_minute)
+    names = unique_base_names(files)
+    results = []
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        futures = [
+            executor.submit(analyze_file, path, names[path], out_dir, limiter, chunk_chars, chunk_workers, cache)
+            for path in files
+        ]
+        for done, future in enumerate(as_completed(futures), start=1):
+            result = future.result()
+            results.append(result)
+            if result["error"] is None:
+                print(f'[{done}/{len(files)}] {result["path"]} -> {result["output"]} ({result["latency"]:.1f} s)')
+            else:
+                print(f'[{done}/{len(files)}] {result["path"]} - błąd: {result["error"]}')
+    elapsed = time.perf_counter() - started
+
+    latencies = [r["latency"] for r in results if r["error"] is None]
+    return {
+        "documents": len(results),
+        "succeeded": len(latencies),
+        "failed": len(results) - len(latencies),
+        "elapsed_s": elapsed,
+        "documents_per_minute": len(results) / elapsed * 60 if elapsed > 0 else 0.0,
+        "latency_mean_s": sum(latencies) / len(latencies) if latencies else 0.0,
+        "latency_p50_s": percentile(latencies, 50),
+        "latency_p95_s": percentile(latencies, 95),
+        "latency_max_s": max(latencies, default=0.0),
+        "results": results,
+    }
+
+
+def format_summary(summary: dict) -> str:
+    rows = [
+        "Podsumowanie analizy wsadowej:",
+        f"  Dokumenty: {summary['documents']} (udane: {summary['succeeded']}, błędy: {summary['failed']})",
+        f"  Czas: {summary['elapsed_s']:.1f} s, przepustowość: {summary['documents_per_minute']:.1f} dok./min",
+        f"  Opóźnienie analizy: średnio {summary['latency_mean_s']:.2f} s, p50 {summary['latency_p50_s']:.2f} s, "
+        f"p95 {summary['latency_p95_s']:.2f} s, max {summary['latency_max_s']:.2f} s",
+    ]
+    failed = [r for r in summary["results"] if r["error"] is not None]
+    if failed:
+        rows.append("  Nieudane:")
+        rows.extend(f"    - {r['path']}: {r['error']}" for r in failed)
+    return "\n".join(rows)
+
+
 def main():
     parser = argparse.ArgumentParser(description='Analiza jakości i spójności tekstu przy użyciu modelu OpenAI - gpt-4o-mini.')
     parser.add_argument('-i', type=str, help='Input file path')
+    parser.add_argument('inputs', nargs='*', help='Tryb wsadowy: katalogi, pliki lub wzorce glob (np. "teksty/**/*.txt")')
+    parser.add_argument('-m', '--manifest', type=str, help='Tryb wsadowy: plik z listą ścieżek (jedna na linię)')
+    parser.add_argument('-w', '--workers', type=int, default=BATCH_WORKERS, help='Liczba równoległych analiz')
+    parser.add_argument('--rpm', type=float, default=BATCH_REQUESTS_PER_MINUTE, help='Limit zapytań do API na minutę')
+    parser.add_argument('-o', '--output-dir', type=str, default='.', help='Katalog raportów trybu wsadowego')
+    parser.add_argument('--summary-json', type=str, help='Zapis podsumowania trybu wsadowego do pliku JSON')
+    parser.add_argument('--chunk-size', type=int, default=CHUNK_MAX_CHARS,
+                        help='Maksymalna długość fragmentu (znaki); dłuższe teksty są analizowane we fragmentach')
+    parser.add_argument('--chunk-workers', type=int, default=CHUNK_WORKERS, help='Liczba równoległych analiz fragmentów')
+    parser.add_argument('--no-cache', action='store_true', help='Analiza bez cache wyników (ani odczytu, ani zapisu)')
+    parser.add_argument('--refresh', action='store_true', help='Ponowna analiza z pominięciem cache; nowe wyniki są zapisywane')
     args = parser.parse_args()
 
+    cache = None if args.no_cache else AnalysisCache(refresh=args.refresh)
+    try:
+        run(args, cache)
+    finally:
+        if cache is not None:
+            print(cache.format_stats())
+            cache.close()
+
+
+def run(args, cache: AnalysisCache = None):
+    """Analiza pojedynczego tekstu (CLI lub -i) albo tryb wsadowy."""
+    if args.inputs or args.manifest:
+        main_batch(args, cache)
+        return
+
     if args.i:
         try:
             if not os.path.exists(args.i):
@@ -145,28 +573,13 @@ def main():
         input_txt = input('Podaj tekst do analizy: ')
 
     try:
-        result = analiza_tekstu(input_txt)
+        dane = analiza_dokumentu(input_txt, args.chunk_size, min(CHUNK_OVERLAP_CHARS, args.chunk_size // 4),
+                                 args.chunk_workers, cache=cache)
     except Exception as e:
         print(f'Błąd podczas analizy: {e}')
         return    
 
-    dane = json.loads(result)
-  
-    rows = []
-    rows.append("Wynik analizy:\n")
-    
-    for kategoria in dane["kategorie"]:
-        rows.append(f"{kategoria['kategoria']}:")
-        rows.append(f"  Poziom: {kategoria['poziom']}")
-        rows.append(f"  Etykiety: {','.join(kategoria['etykiety'])}")
-        if kategoria.get("błędy"):
-            rows.append("  Błędy:")
-            for blad in kategoria["błędy"]:
-                rows.append(f"    - {blad}")
-        rows.append("")  # odstęp między kategoriami
-    rows.append(f"Uwagi: {dane['uwagi']}\n")
-        
-    text = "\n".join(rows)
+    text = format_report(dane)
 
     try:
         # Ustalanie nazwy pliku
@@ -174,15 +587,35 @@ def main():
             base_name = os.path.splitext(os.path.basename(args.i))[0]
         else:
             base_name = f"cli_{get_next_number():03d}"
-        fname = f"Analiza_({base_name}).txt"
-        
-        with open(fname, 'w', encoding='utf-8') as out_f:
-            out_f.write(text)
+        fname = save_report(text, base_name)
         print(f'Analiza zakończona. Wynik zapisano do: {fname}')
     except Exception as e:
         print(f'Błąd zapisu wyniku: {e}')
         return
+
+
+def main_batch(args, cache: AnalysisCache = None):
+    try:
+        files = collect_inputs(args.inputs + ([args.i] if args.i else []), args.manifest)
+    except OSError as e:
+        print(f'Błąd odczytu manifestu: {e}')
+        sys.exit(1)
+    if not files:
+        print('Nie znaleziono plików do analizy.')
+        sys.exit(1)
+
+    print(f'Analiza wsadowa: {len(files)} plików, wątki: {args.workers}, limit: {args.rpm:g} zapytań/min')
+    summary = run_batch(files, args.workers, args.rpm, args.output_dir, args.chunk_size, args.chunk_workers, cache)
+    print()
+    print(format_summary(summary))
+    if cache is not None:
+        summary["cache"] = cache.get_stats()
+    if args.summary_json:
+        with open(args.summary_json, 'w', encoding='utf-8') as s_f:
+            json.dump(summary, s_f, ensure_ascii=False, indent=2)
+    if summary["failed"]:
+        sys.exit(1)
     
 
 if __name__ == "__main__":
-    main() 
\ No newline at end of file
+    main() 
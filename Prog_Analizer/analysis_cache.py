@@ -0,0 +1,139 @@
+"""
+Trwały cache wyników analiz tekstu (SQLite).
+
+Klucz to skrót SHA-256 znormalizowanego tekstu, szablonu promptu i nazwy
+modelu - ponowna analiza niezmienionego tekstu tym samym promptem i modelem
+nie wysyła zapytania do API. Rozmiar bazy jest ograniczony: po przekroczeniu
+limitu usuwane są najdawniej używane wpisy.
+"""
+
+import os
+import time
+import sqlite3
+import hashlib
+import threading
+import unicodedata
+
+# Plik cache i limit rozmiaru zapisanych odpowiedzi (bajty)
+CACHE_PATH = os.getenv("ANALYSIS_CACHE_PATH", ".analiza_cache.sqlite")
+CACHE_MAX_BYTES = int(os.getenv("ANALYSIS_CACHE_MAX_BYTES", str(50 * 1024 * 1024)))
+
+
+def normalize_text(text: str) -> str:
+    """Postać NFC, jednolite końce linii i bez białych znaków na brzegach."""
+    text = unicodedata.normalize("NFC", text)
+    return text.replace("\r\n", "\n").replace("\r", "\n").strip()
+
+
+def make_key(text: str, prompt: str, model: str) -> str:
+    """Skrót znormalizowanego tekstu, szablonu promptu i modelu."""
+    digest = hashlib.sha256()
+    for part in (normalize_text(text), prompt, model):
+        digest.update(part.encode("utf-8"))
+        digest.update(b"\0")
+    return digest.hexdigest()
+
+
+class AnalysisCache:
+    """
+    Cache odpowiedzi modelu z usuwaniem najdawniej używanych wpisów.
+
+    Metody są bezpieczne wątkowo (analizy wsadowe i fragmenty działają
+    równolegle). refresh=True pomija odczyt, ale zapisuje nowe wyniki.
+    """
+
+    def __init__(self, path: str = CACHE_PATH, max_bytes: int = CACHE_MAX_BYTES, refresh: bool = False):
+        if max_bytes < 1:
+            raise ValueError("Limit rozmiaru cache musi być liczbą dodatnią")
+        self.path = path
+        self.max_bytes = max_bytes
+        self.refresh = refresh
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS analyses ("
+            " key TEXT PRIMARY KEY,"
+            " value TEXT NOT NULL,"
+            " size INTEGER NOT NULL,"
+            " accessed_at REAL NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS analyses_accessed ON analyses (accessed_at)")
+        self._conn.commit()
+        self.hits = 0
+        self.misses = 0
+        self.bytes_saved = 0
+        self.evicted = 0
+
+    def get(self, key: str, request_bytes: int = 0):
+        """
+        Zwraca zapisaną odpowiedź lub None.
+
+        request_bytes: rozmiar zapytania, które nie zostanie wysłane
+        (doliczany do bytes_saved razem z rozmiarem odpowiedzi)
+        """
+        with self._lock:
+            row = None
+            if not self.refresh:
+                row = self._conn.execute("SELECT value, size FROM analyses WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            self._conn.execute("UPDATE analyses SET accessed_at = ? WHERE key = ?", (time.time(), key))
+            self._conn.commit()
+            self.hits += 1
+            self.bytes_saved += request_bytes + row[1]
+            return row[0]
+
+    def set(self, key: str, value: str) -> None:
+        """Zapisuje odpowiedź i usuwa najdawniej używane wpisy ponad limit rozmiaru."""
+        size = len(value.encode("utf-8"))
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO analyses (key, value, size, accessed_at) VALUES (?, ?, ?, ?)",
+                (key, value, size, time.time())
+            )
+            total = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM analyses").fetchone()[0]
+            if total > self.max_bytes:
+                for old_key, old_size in self._conn.execute(
+                    "SELECT key, size FROM analyses ORDER BY accessed_at"
+                ).fetchall():
+                    if total <= self.max_bytes:
+                        break
+                    self._conn.execute("DELETE FROM analyses WHERE key = ?", (old_key,))
+                    total -= old_size
+                    self.evicted += 1
+            self._conn.commit()
+
+    @property
+    def hit_rate(self) -> float:
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    def get_stats(self) -> dict:
+        with self._lock:
+            entries, size = self._conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM analyses"
+            ).fetchone()
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hit_rate,
+            "bytes_saved": self.bytes_saved,
+            "evicted": self.evicted,
+            "entries": entries,
+            "size_bytes": size,
+        }
+
+    def format_stats(self) -> str:
+        stats = self.get_stats()
+        return (
+            f"Cache analiz: trafienia {stats['hits']}/{stats['hits'] + stats['misses']} "
+            f"({stats['hit_rate']:.0%}), zaoszczędzono {stats['bytes_saved']} B, "
+            f"wpisy: {stats['entries']} ({stats['size_bytes']} B), usunięte: {stats['evicted']}"
+        )
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
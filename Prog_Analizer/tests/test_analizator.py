@@ -0,0 +1,271 @@
+import json
+import random
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+import Analizator
+from analysis_cache import AnalysisCache
+
+ANALYSIS = {
+    "kategorie": [{"kategoria": "Spójność logiczna", "poziom": 8, "etykiety": ["spójny"], "błędy": []}],
+    "uwagi": "Tekst spójny.",
+}
+
+
+def _api_response(result: dict = ANALYSIS) -> MagicMock:
+    response = MagicMock()
+    response.json.return_value = {"output": [{"content": [{"text": json.dumps(result)}]}]}
+    return response
+
+
+@pytest.fixture
+def cache(tmp_path):
+    cache = AnalysisCache(path=str(tmp_path / "cache.sqlite"))
+    yield cache
+    cache.close()
+
+
+# ===== CACHE WYNIKÓW =====
+
+def test_cached_text_is_not_sent_again(cache):
+    with patch("Analizator.requests.post", return_value=_api_response()) as mock_post:
+        first = Analizator.analiza_dokumentu("Krótki tekst.", cache=cache)
+        second = Analizator.analiza_dokumentu("Krótki tekst.\n", cache=cache)
+
+    assert first == second == ANALYSIS
+    assert mock_post.call_count == 1
+    assert cache.hits == 1
+
+
+def test_without_cache_every_call_reaches_api():
+    with patch("Analizator.requests.post", return_value=_api_response()) as mock_post:
+        Analizator.analiza_dokumentu("Krótki tekst.")
+        Analizator.analiza_dokumentu("Krótki tekst.")
+    assert mock_post.call_count == 2
+
+
+def test_unparseable_response_is_not_cached(cache):
+    response = MagicMock()
+    response.json.return_value = {"output": [{"content": [{"text": "to nie JSON"}]}]}
+    with patch("Analizator.requests.post", return_value=response):
+        assert Analizator.analiza_tekstu("Tekst.", cache=cache) == "to nie JSON"
+    assert cache.get_stats()["entries"] == 0
+
+
+def test_cache_hit_does_not_use_rate_limit(cache):
+    limiter = MagicMock()
+    with patch("Analizator.requests.post", return_value=_api_response()):
+        Analizator.analiza_dokumentu("Krótki tekst.", limiter=limiter, cache=cache)
+        Analizator.analiza_dokumentu("Krótki tekst.", limiter=limiter, cache=cache)
+    assert limiter.acquire.call_count == 1
+
+
+# ===== TRYB WSADOWY =====
+
+class FakeClock:
+    def __init__(self):
+        self.now = 100.0
+        self.sleeps = []
+
+    def __call__(self) -> float:
+        return self.now
+
+    def sleep(self, seconds: float) -> None:
+        self.sleeps.append(seconds)
+
+
+def test_rate_limiter_spaces_requests_evenly():
+    clock = FakeClock()
+    limiter = Analizator.RateLimiter(per_minute=120, clock=clock, sleep=clock.sleep)
+
+    for _ in range(3):
+        limiter.acquire()
+    # Pierwsze zapytanie od razu, kolejne co 0.5 s od poprzedniego slotu
+    assert clock.sleeps == [pytest.approx(0.5), pytest.approx(1.0)]
+
+    clock.now += 5
+    limiter.acquire()
+    assert len(clock.sleeps) == 2
+
+
+def test_rate_limiter_rejects_invalid_limit():
+    with pytest.raises(ValueError):
+        Analizator.RateLimiter(per_minute=0)
+
+
+def test_collect_inputs_from_directory_glob_and_manifest(tmp_path):
+    docs = tmp_path / "docs"
+    (docs / "sub").mkdir(parents=True)
+    for name in ("b.txt", "a.txt", "Analiza_(a).txt", "notatki.md"):
+        (docs / name).write_text("tekst", encoding="utf-8")
+    (docs / "sub" / "c.txt").write_text("tekst", encoding="utf-8")
+    manifest = tmp_path / "lista.txt"
+    manifest.write_text("# komentarz\ndocs/a.txt\n\ndocs/sub/c.txt  # ten sam plik co we wzorcu\n", encoding="utf-8")
+
+    files = Analizator.collect_inputs([str(docs), str(docs / "**" / "c.txt")], str(manifest))
+
+    # Katalog: pliki .txt bez raportów, posortowane; bez powtórzeń w kolejności pierwszego wystąpienia
+    assert files == [str(docs / "a.txt"), str(docs / "b.txt"), str(docs / "sub" / "c.txt")]
+
+
+def test_collect_inputs_keeps_missing_explicit_path(tmp_path):
+    missing = str(tmp_path / "brak.txt")
+    assert Analizator.collect_inputs([missing, str(tmp_path / "*.txt")]) == [missing]
+
+
+def test_unique_base_names_suffixes_repeated_names():
+    names = Analizator.unique_base_names(["x/tekst.txt", "y/tekst.txt", "z/inny.txt", "w/tekst.txt"])
+    assert list(names.values()) == ["tekst", "tekst_2", "inny", "tekst_3"]
+
+
+def test_run_batch_isolates_failures_and_writes_reports(tmp_path, capsys):
+    files = []
+    for name, content in (("ok1", "Dobry tekst."), ("zly", "BŁĄD"), ("ok2", "Inny dobry tekst.")):
+        path = tmp_path / f"{name}.txt"
+        path.write_text(content, encoding="utf-8")
+        files.append(str(path))
+    files.append(str(tmp_path / "brak.txt"))
+
+    def post(url, headers, json, timeout):
+        if json["input"].endswith("BŁĄD"):
+            raise Analizator.requests.exceptions.ConnectionError("reset")
+        return _api_response()
+
+    out_dir = tmp_path / "raporty"
+    with patch("Analizator.requests.post", side_effect=post):
+        summary = Analizator.run_batch(files, workers=3, per_minute=6000, out_dir=str(out_dir))
+
+    assert (summary["documents"], summary["succeeded"], summary["failed"]) == (4, 2, 2)
+    errors = {result["path"]: result["error"] for result in summary["results"]}
+    assert errors[files[0]] is None and errors[files[2]] is None
+    assert errors[files[1]].startswith("ConnectionError")
+    assert errors[files[3]].startswith("FileNotFoundError")
+    assert sorted(p.name for p in out_dir.iterdir()) == ["Analiza_(ok1).txt", "Analiza_(ok2).txt"]
+    assert "błędy: 2" in Analizator.format_summary(summary)
+    assert "[4/4]" in capsys.readouterr().out
+
+
+def test_percentile_nearest_rank():
+    values = [5, 1, 4, 2, 3]
+    assert Analizator.percentile(values, 50) == 3
+    assert Analizator.percentile(values, 95) == 5
+    assert Analizator.percentile([], 50) == 0.0
+
+
+# ===== PODZIAŁ I SCALANIE FRAGMENTÓW =====
+
+def test_split_text_shorter_than_chunk_is_single_chunk():
+    assert Analizator.split_text("  Krótki tekst.\n\nDrugi akapit.  ", max_chars=300, overlap=80) == [
+        ("Krótki tekst.\n\nDrugi akapit.", 0)
+    ]
+    assert Analizator.split_text("   \n", max_chars=300, overlap=80) == []
+
+
+@pytest.mark.parametrize("text", [
+    ("Ala ma kota. " * 30)[:299] + ".",
+    "Pierwszy akapit.\n\n" + "b" * 282,
+])
+def test_split_text_exact_boundary_is_single_chunk(text):
+    assert len(text) == 300
+    assert Analizator.split_text(text, max_chars=300, overlap=80) == [(text, 0)]
+    assert len(Analizator.split_text(text + " Dalej.", max_chars=300, overlap=80)) == 2
+
+
+def test_split_text_single_long_paragraph_overlaps_sentences():
+    text = " ".join(f"Zdanie numer {i} opisuje kolejny temat." for i in range(40))
+
+    chunks = Analizator.split_text(text, max_chars=300, overlap=80)
+
+    assert len(chunks) > 2
+    assert chunks[0][1] == 0
+    for (previous, _), (chunk, prefix) in zip(chunks, chunks[1:]):
+        assert len(chunk) <= 300
+        # Zakładka to pełne końcowe zdania poprzedniego fragmentu
+        assert 0 < prefix <= 80
+        assert previous.endswith(chunk[:prefix])
+        assert chunk[:prefix].endswith(".")
+    # Po odcięciu zakładek żadne zdanie nie ginie ani się nie powtarza
+    body = " ".join(chunk[prefix:].strip() for chunk, prefix in chunks)
+    assert body == text
+
+
+def test_split_text_long_sentence_without_punctuation_is_cut_on_words():
+    text = " ".join(["słowo"] * 200)
+
+    chunks = Analizator.split_text(text, max_chars=300, overlap=80)
+
+    assert all(len(chunk) <= 300 for chunk, _ in chunks)
+    assert " ".join(chunk for chunk, _ in chunks).split() == text.split()
+
+
+def test_split_text_counts_overlap_separator_in_budget():
+    text = "A" * 60 + ". Krótkie zdanie tak.\n\n" + "c" * 79 + "."
+
+    chunks = Analizator.split_text(text, max_chars=100, overlap=20)
+
+    assert max(len(chunk) for chunk, _ in chunks) <= 100
+    assert chunks[-1][0].endswith("c" * 79 + ".")
+
+
+def test_split_text_chunks_never_exceed_max_chars():
+    rng = random.Random(1)
+    pieces = ["a", "bb", "ccc", "Zdanie", "słowo" * 5]
+    separators = ["", " ", ". ", ".\n\n", "! ", "? "]
+    for _ in range(500):
+        text = "".join(rng.choice(pieces) + rng.choice(separators) for _ in range(rng.randint(1, 80)))
+        max_chars = rng.randint(20, 120)
+        overlap = rng.randint(0, max_chars - 1)
+
+        chunks = Analizator.split_text(text, max_chars=max_chars, overlap=overlap)
+
+        for chunk, prefix in chunks:
+            assert len(chunk) <= max_chars, (text, max_chars, overlap)
+            assert prefix <= overlap
+
+
+def test_split_text_rejects_overlap_not_smaller_than_chunk():
+    with pytest.raises(ValueError):
+        Analizator.split_text("Tekst.", max_chars=100, overlap=100)
+
+
+def test_merge_analyses_deduplicates_findings_across_chunks():
+    first = {
+        "kategorie": [{"kategoria": "Spójność logiczna", "poziom": 8, "etykiety": ["spójny"],
+                       "błędy": ["Sprzeczność w zdaniu 5."]}],
+        "uwagi": "Początek dobry.",
+    }
+    second = {
+        "kategorie": [
+            {"kategoria": "Spójność logiczna", "poziom": 5, "etykiety": ["Spójny", "chaotyczny"],
+             "błędy": ["  sprzeczność w zdaniu   5. ", "Brak wniosku."]},
+            {"kategoria": "Styl", "poziom": "brak"},
+        ],
+        "uwagi": "",
+    }
+
+    merged = Analizator.merge_analyses([first, second], weights=[100, 300])
+
+    spojnosc, styl = merged["kategorie"]
+    assert spojnosc == {
+        "kategoria": "Spójność logiczna",
+        "poziom": 5.8,
+        "etykiety": ["spójny", "chaotyczny"],
+        "błędy": ["Sprzeczność w zdaniu 5.", "Brak wniosku."],
+    }
+    assert styl == {"kategoria": "Styl", "poziom": 5, "etykiety": []}
+    assert merged["uwagi"] == "[1/2] Początek dobry."
+
+
+def test_long_document_is_analyzed_in_chunks_and_merged():
+    text = " ".join(f"Zdanie numer {i} opisuje kolejny temat." for i in range(40))
+    chunks = Analizator.split_text(text, max_chars=300, overlap=80)
+
+    with patch("Analizator.requests.post", return_value=_api_response()) as mock_post:
+        result = Analizator.analiza_dokumentu(text, max_chars=300, overlap=80, workers=2)
+
+    assert mock_post.call_count == len(chunks)
+    assert result["kategorie"] == [
+        {"kategoria": "Spójność logiczna", "poziom": 8.0, "etykiety": ["spójny"]}
+    ]
+    assert result["uwagi"].startswith(f"[1/{len(chunks)}] Tekst spójny.")
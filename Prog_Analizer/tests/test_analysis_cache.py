@@ -0,0 +1,97 @@
+import pytest
+
+from analysis_cache import AnalysisCache, make_key, normalize_text
+
+
+@pytest.fixture
+def cache(tmp_path):
+    cache = AnalysisCache(path=str(tmp_path / "cache.sqlite"))
+    yield cache
+    cache.close()
+
+
+def test_normalize_text_unifies_line_endings_and_unicode_form():
+    assert normalize_text("  Zdanie.\r\nDrugie\r") == "Zdanie.\nDrugie"
+    # "ó" złożone z litery i znaku diakrytycznego ma postać NFC
+    assert normalize_text("go\u0301ra") == "g\u00f3ra"
+
+
+def test_make_key_ignores_formatting_but_not_prompt_or_model():
+    key = make_key("Tekst do analizy.", "prompt", "model")
+    assert make_key("  Tekst do analizy.\r\n", "prompt", "model") == key
+    assert make_key("Tekst do analizy!", "prompt", "model") != key
+    assert make_key("Tekst do analizy.", "inny prompt", "model") != key
+    assert make_key("Tekst do analizy.", "prompt", "inny model") != key
+
+
+def test_make_key_separates_parts():
+    assert make_key("ab", "c", "m") != make_key("a", "bc", "m")
+
+
+def test_miss_then_hit(cache):
+    assert cache.get("klucz", request_bytes=100) is None
+    cache.set("klucz", '{"wynik": 1}')
+
+    assert cache.get("klucz", request_bytes=100) == '{"wynik": 1}'
+    stats = cache.get_stats()
+    assert (stats["hits"], stats["misses"], stats["entries"]) == (1, 1, 1)
+    assert stats["bytes_saved"] == 100 + len('{"wynik": 1}')
+    assert "trafienia 1/2 (50%)" in cache.format_stats()
+
+
+def test_entries_survive_reopening(tmp_path):
+    path = str(tmp_path / "cache.sqlite")
+    cache = AnalysisCache(path=path)
+    cache.set("klucz", "wynik")
+    cache.close()
+
+    reopened = AnalysisCache(path=path)
+    assert reopened.get("klucz") == "wynik"
+    reopened.close()
+
+
+def test_refresh_skips_reads_but_stores_results(tmp_path):
+    path = str(tmp_path / "cache.sqlite")
+    cache = AnalysisCache(path=path)
+    cache.set("klucz", "stary")
+    cache.close()
+
+    refreshing = AnalysisCache(path=path, refresh=True)
+    assert refreshing.get("klucz") is None
+    refreshing.set("klucz", "nowy")
+    refreshing.close()
+
+    cache = AnalysisCache(path=path)
+    assert cache.get("klucz") == "nowy"
+    cache.close()
+
+
+def test_least_recently_used_entries_are_evicted(tmp_path, monkeypatch):
+    now = [0.0]
+    monkeypatch.setattr("analysis_cache.time.time", lambda: now[0])
+    cache = AnalysisCache(path=str(tmp_path / "cache.sqlite"), max_bytes=10)
+    for key in ("a", "b"):
+        now[0] += 1
+        cache.set(key, "xxxx")
+    now[0] += 1
+    cache.get("a")
+    now[0] += 1
+    cache.set("c", "xxxx")
+
+    assert cache.get("b") is None
+    assert cache.get("a") == "xxxx"
+    assert cache.get("c") == "xxxx"
+    assert cache.get_stats()["evicted"] == 1
+    cache.close()
+
+
+def test_value_larger_than_limit_is_not_stored(tmp_path):
+    cache = AnalysisCache(path=str(tmp_path / "cache.sqlite"), max_bytes=3)
+    cache.set("klucz", "zbyt długi")
+    assert cache.get_stats()["entries"] == 0
+    cache.close()
+
+
+def test_invalid_limit_raises(tmp_path):
+    with pytest.raises(ValueError):
+        AnalysisCache(path=str(tmp_path / "cache.sqlite"), max_bytes=0)
@@ -1,12 +1,29 @@
-from typing import List, TypedDict, Literal
+from __future__ import annotations
+
+from typing import Any, Awaitable, Deque, Iterable, Iterator, List, Optional, Tuple, TypedDict, Literal
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+import atexit
 import json
-import requests
-from config import MIN_QUESTIONS, MAX_QUESTIONS, AI_API_URL, AI_API_KEY, OPENAI_MODEL
-from dotenv import load_dotenv
-import os
+import threading
+import time
+from lazy_import import LazyModule
+from quiz_cache import QuizCache, make_cache_key, normalize_topic
+from json_stream import IncrementalArrayParser
+from resilience import Resilience, ResilienceError, estimate_tokens
+from providers import Provider, ProviderRouter
+from dedup_index import DedupIndex
+from config import (
+    MIN_QUESTIONS, MAX_QUESTIONS, AI_API_URL, AI_API_KEY, OPENAI_MODEL,
+    QUIZ_CHUNK_SIZE, QUIZ_MAX_WORKERS, AI_HTTP_POOL_SIZE, AI_HTTP_TIMEOUT,
+    AI_ASYNC_MAX_CONNECTIONS, AI_ASYNC_CONCURRENCY, DEDUP_TOP_UP_ATTEMPTS
+)
 
-# Wczytanie zmiennych środowiskowych z pliku .env
-load_dotenv()
+# Klienci HTTP i asyncio są ładowani dopiero przy pierwszym zapytaniu -
+# start CLI nie płaci za ich import (.env wczytuje wyłącznie config.py)
+asyncio = LazyModule("asyncio")
+httpx = LazyModule("httpx")
+requests = LazyModule("requests")
 
 EXPECTED_QUESTION_KEYS = ("question", "a", "b", "c", "d", "correct")
 
@@ -18,27 +35,500 @@ class QuizItem(TypedDict):
     d: str
     correct: Literal['a', 'b', 'c', 'd']
 
+class RepairAttempt(TypedDict):
+    """Metryki jednej próby generowania w trybie naprawy."""
+    topic: str
+    attempt: int
+    requested: int
+    accepted: int
+    rejected: int
+    duplicates: int
+    duration_s: float
+    error: Optional[str]
+
 class AIServiceError(Exception):
     pass
 
 class InvalidModelResponseError(Exception):
     pass
 
+class _RepairRound:
+    """
+    Stan generowania z zapytaniami uzupełniającymi, wspólny dla ścieżki
+    synchronicznej i asynchronicznej - różnią się one tylko wysłaniem zapytania.
+    """
+
+    def __init__(self, generator: "AIGenerator", topic: str, n_questions: int,
+                 exclude: Optional[List[str]] = None):
+        self.generator = generator
+        self.topic = topic
+        self.n_questions = n_questions
+        self.accepted: List[QuizItem] = []
+        self.seen: set = set()
+        self.duplicates: List[str] = list(exclude or [])
+        self.attempt = 0
+        self.needed = n_questions
+        self.started = 0.0
+
+    def next_request(self) -> Tuple[int, List[str]]:
+        """Rozpoczyna próbę; zwraca liczbę brakujących pytań i listę wykluczeń."""
+        self.attempt += 1
+        self.needed = self.n_questions - len(self.accepted)
+        self.started = time.perf_counter()
+        return self.needed, self.generator._exclusions(self.accepted, self.duplicates)
+
+    def finish(self, data: Any, error: Optional[str]) -> bool:
+        """
+        Przyjmuje wynik próby.
+
+        Returns:
+            True, gdy quiz jest kompletny
+
+        Raises:
+            InvalidModelResponseError: Po wyczerpaniu zapytań uzupełniających
+        """
+        self.generator._accept_attempt(
+            self.topic, self.attempt, self.needed, data, error, self.started,
+            self.accepted, self.seen, self.duplicates
+        )
+        if len(self.accepted) == self.n_questions:
+            return True
+        if self.attempt > self.generator.max_repair_attempts:
+            raise InvalidModelResponseError(
+                f"API zwróciło {len(self.accepted)} poprawnych pytań zamiast oczekiwanych {self.n_questions} "
+                f"(prób: {self.attempt})."
+            )
+        return False
+
 class AIGenerator:
     """
     Klasa do generowania quizów za pomocą modelu AI OpenAI.
     """
-    def __init__(self, api_url: str = AI_API_URL, api_key: str = AI_API_KEY):
+    REPAIR_METRICS_HISTORY: int = 200
+
+    def __init__(
+        self,
+        api_url: str = AI_API_URL,
+        api_key: str = AI_API_KEY,
+        chunk_size: Optional[int] = QUIZ_CHUNK_SIZE,
+        max_workers: int = QUIZ_MAX_WORKERS,
+        session: Optional[requests.Session] = None,
+        pool_size: int = AI_HTTP_POOL_SIZE,
+        timeout: float = AI_HTTP_TIMEOUT,
+        async_client: Optional[httpx.AsyncClient] = None,
+        async_max_connections: int = AI_ASYNC_MAX_CONNECTIONS,
+        cache: Optional[QuizCache] = None,
+        repair_attempts: int = 0,
+        resilience: Optional[Resilience] = None,
+        router: Optional[ProviderRouter] = None,
+        dedup_index: Optional[DedupIndex] = None
+    ):
+        """
+        Args:
+            api_url: Adres endpointu Chat Completions
+            api_key: Klucz API
+            chunk_size: Maksymalna liczba pytań w jednym zapytaniu do API
+                        (domyślnie QUIZ_CHUNK_SIZE - odpowiedź na MAX_QUESTIONS
+                        pytań nie zmieściłaby się w max_tokens jednego zapytania).
+                        None wyłącza dzielenie quizu na części.
+            max_workers: Maksymalna liczba równoległych zapytań w trybie części
+            session: Zewnętrzna sesja HTTP (nie jest zamykana przez generator).
+                     None - generator tworzy własną sesję z pulą połączeń.
+            pool_size: Maksymalna liczba utrzymywanych połączeń na host
+            timeout: Timeout pojedynczego zapytania w sekundach
+            async_client: Zewnętrzny klient httpx dla API asynchronicznego
+                          (nie jest zamykany przez generator)
+            async_max_connections: Maksymalna liczba jednoczesnych połączeń
+                                   klienta asynchronicznego
+            cache: Cache odpowiedzi (None - każde wywołanie trafia do API)
+            repair_attempts: Maksymalna liczba zapytań uzupełniających brakujące
+                             lub odrzucone pytania (0 - odpowiedź musi być
+                             kompletna za pierwszym razem)
+            resilience: Ponowienia, bezpiecznik i limiter zapytań (None - każdy
+                        błąd API od razu kończy się AIServiceError)
+            router: Router wielu dostawców (None - zapytania trafiają do api_url).
+                    Z routerem adres, klucz, model i warstwa odporności
+                    pochodzą od wybranego dostawcy.
+            dedup_index: Korpus wydanych pytań (None - bez wykrywania powtórzeń).
+                         Pytania podobne do już wydanych są odrzucane i dobierane
+                         zapytaniem uzupełniającym (co najmniej
+                         DEDUP_TOP_UP_ATTEMPTS prób, nawet przy repair_attempts=0).
+        """
+        if chunk_size is not None and chunk_size < 1:
+            raise ValueError("Rozmiar części musi być liczbą dodatnią.")
+        if max_workers < 1:
+            raise ValueError("Liczba wątków musi być liczbą dodatnią.")
+        if repair_attempts < 0:
+            raise ValueError("Liczba prób naprawy nie może być ujemna.")
+        if pool_size < 1 or async_max_connections < 1:
+            raise ValueError("Rozmiar puli połączeń musi być liczbą dodatnią.")
         self.api_url = api_url
         self.api_key = api_key
+        self.chunk_size = chunk_size
+        self.max_workers = max_workers
+        self.pool_size = pool_size
+        self.timeout = timeout
+        self._session = session
+        self._owns_session = session is None
+        self._session_lock = threading.Lock()
+        self.async_max_connections = async_max_connections
+        self._async_client = async_client
+        self._owns_async_client = async_client is None
+        self._async_client_loop: Optional[asyncio.AbstractEventLoop] = None
+        self.cache = cache
+        self.repair_attempts = repair_attempts
+        self.resilience = resilience
+        self.router = router
+        self.dedup_index = dedup_index
+        # Metryki ostatnich prób naprawy (najstarsze są usuwane)
+        self.repair_metrics: Deque[RepairAttempt] = deque(maxlen=self.REPAIR_METRICS_HISTORY)
+        self._metrics_lock = threading.Lock()
+
+
+    @property
+    def session(self) -> requests.Session:
+        """
+        Sesja HTTP współdzielona przez wszystkie zapytania generatora.
+
+        Tworzona leniwie przy pierwszym użyciu; połączenia keep-alive są
+        ponownie wykorzystywane, więc kolejne quizy nie płacą za TCP+TLS.
+        """
+        if self._session is None:
+            with self._session_lock:
+                if self._session is None:
+                    self._session = self._create_session()
+        return self._session
+
+
+    def _create_session(self) -> requests.Session:
+        session = requests.Session()
+        adapter = requests.adapters.HTTPAdapter(pool_connections=1, pool_maxsize=self.pool_size)
+        session.mount("https://", adapter)
+        session.mount("http://", adapter)
+        session.headers.update({"Connection": "keep-alive"})
+        return session
+
+
+    def close(self) -> None:
+        """Zamyka własną sesję HTTP i zwalnia połączenia z puli."""
+        with self._session_lock:
+            if self._session is not None and self._owns_session:
+                self._session.close()
+                self._session = None
+
+
+    def __enter__(self) -> "AIGenerator":
+        return self
+
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        self.close()
+
+
+    def _get_async_client(self) -> httpx.AsyncClient:
+        """
+        Zwraca klienta httpx z własną pulą połączeń dla bieżącej pętli zdarzeń.
+
+        Połączenia klienta są związane z pętlą, w której powstały, dlatego
+        własny klient jest tworzony ponownie po zmianie pętli (np. kolejne
+        asyncio.run).
+        """
+        loop = asyncio.get_running_loop()
+        if self._async_client is None or (self._owns_async_client and self._async_client_loop is not loop):
+            self._async_client = httpx.AsyncClient(
+                limits=httpx.Limits(
+                    max_connections=self.async_max_connections,
+                    max_keepalive_connections=self.pool_size
+                ),
+                timeout=self.timeout
+            )
+            self._async_client_loop = loop
+        return self._async_client
+
+
+    async def aclose(self) -> None:
+        """Zamyka własnego klienta asynchronicznego i jego połączenia."""
+        if self._async_client is not None and self._owns_async_client:
+            await self._async_client.aclose()
+            self._async_client = None
+            self._async_client_loop = None
+
+
+    async def __aenter__(self) -> "AIGenerator":
+        return self
+
+
+    async def __aexit__(self, exc_type, exc_value, traceback) -> None:
+        await self.aclose()
+        self.close()
 
 
     def generate_quiz(self, topic: str, n_questions: int) -> List[QuizItem]:
         """
         Generuje quiz na zadany temat i liczbę pytań przez API OpenAI.
+
+        Jeśli ustawiono chunk_size, a liczba pytań go przekracza, quiz jest
+        dzielony na części generowane równolegle i scalany w jedną listę.
+        Przy ustawionym cache identyczne zapytania nie trafiają ponownie do API.
+        """
+        self._validate_input(topic, n_questions)
+        cache_key = self._cache_key(topic, n_questions)
+        cached = self._load_cached(cache_key, n_questions)
+        if cached is not None:
+            return cached
+
+        if self.chunk_size is None or n_questions <= self.chunk_size:
+            quiz = self._generate_quiz_api(topic, n_questions)
+        else:
+            quiz = self._generate_quiz_chunked(topic, n_questions)
+        self._store_cached(cache_key, quiz)
+        return quiz
+
+
+    def _cache_key(self, topic: str, n_questions: int) -> Optional[str]:
+        """
+        Klucz cache: skrót payloadu zbudowanego dla znormalizowanego tematu.
+
+        Z routerem części quizu mogą pochodzić od różnych dostawców, więc klucz
+        obejmuje modele wszystkich dostawców routera: wpis jest wspólny tylko
+        dla tej samej konfiguracji, a jej dostawcy są traktowani jako zamienni.
+        """
+        if self.cache is None:
+            return None
+        payload = self._build_payload(normalize_topic(topic), n_questions)
+        if self.router is not None:
+            payload["model"] = sorted(provider.model for provider in self.router.providers)
+        return make_cache_key(payload)
+
+
+    def _load_cached(self, cache_key: Optional[str], n_questions: int) -> Optional[List[QuizItem]]:
+        """
+        Odczytuje quiz z cache i ponownie go waliduje.
+
+        Wpis, który nie przejdzie walidacji, jest usuwany i traktowany jak brak
+        wpisu - uszkodzone dane nigdy nie trafią do Quiz.
+        """
+        if cache_key is None:
+            return None
+        cached = self.cache.get(cache_key)
+        if cached is None:
+            return None
+        try:
+            return self._validate_quiz_data(cached, n_questions)
+        except (InvalidModelResponseError, TypeError):
+            self.cache.invalidate(cache_key)
+            return None
+
+
+    def _store_cached(self, cache_key: Optional[str], quiz: List[QuizItem]) -> None:
+        if cache_key is not None:
+            self.cache.set(cache_key, quiz)
+
+
+    def invalidate_cached(self, topic: str, n_questions: int) -> None:
+        """
+        Usuwa z cache quiz dla tematu i liczby pytań - kolejne wywołanie
+        trafi do API (np. ponowna gra nie powinna powtarzać pytań).
+        """
+        cache_key = self._cache_key(topic, n_questions)
+        if cache_key is not None:
+            self.cache.invalidate(cache_key)
+
+
+    def stream_quiz(self, topic: str, n_questions: int) -> Iterator[QuizItem]:
+        """
+        Generuje quiz strumieniowo - zwraca iterator zwalidowanych pytań.
+
+        Każde pytanie jest zwracane zaraz po domknięciu jego obiektu JSON
+        w strumieniu SSE, więc pierwsze pytanie można pokazać, zanim model
+        wygeneruje pozostałe. Walidacja wejścia odbywa się od razu; błędy
+        API i odpowiedzi są zgłaszane podczas iteracji.
+        """
+        self._validate_input(topic, n_questions)
+        cache_key = self._cache_key(topic, n_questions)
+        cached = self._load_cached(cache_key, n_questions)
+        if cached is not None:
+            return iter(cached)
+        return self._stream_quiz(topic, n_questions, cache_key)
+
+
+    def _stream_quiz(self, topic: str, n_questions: int, cache_key: Optional[str]) -> Iterator[QuizItem]:
+        """
+        Strumieniuje pierwszą część quizu; w trybie części pozostałe części
+        są w tym czasie generowane równolegle i zwracane po niej.
+        """
+        if self.chunk_size is None or n_questions <= self.chunk_size:
+            sizes = [n_questions]
+        else:
+            sizes = self._split_into_chunks(n_questions)
+        first_part = (1, len(sizes)) if len(sizes) > 1 else None
+
+        executor = None
+        futures = []
+        if len(sizes) > 1:
+            executor = ThreadPoolExecutor(max_workers=min(self.max_workers, len(sizes) - 1))
+            futures = [
+                executor.submit(self._generate_quiz_api, topic, size, (index, len(sizes)))
+                for index, size in enumerate(sizes[1:], 2)
+            ]
+
+        quiz: List[QuizItem] = []
+        duplicates: List[str] = []
+        try:
+            for item in self._stream_quiz_api(topic, sizes[0], first_part):
+                if self._is_duplicate(item, duplicates):
+                    continue
+                quiz.append(item)
+                yield item
+            # Pytania odrzucone jako powtórzenia są dobierane osobnym zapytaniem
+            missing = sizes[0] - len(quiz)
+            if missing:
+                exclude = [item["question"] for item in quiz] + duplicates
+                for item in self._generate_with_repair(topic, missing, first_part, exclude):
+                    quiz.append(item)
+                    yield item
+            for future in futures:
+                for item in future.result():
+                    quiz.append(item)
+                    yield item
+        finally:
+            if executor is not None:
+                executor.shutdown(wait=False, cancel_futures=True)
+
+        self._store_cached(cache_key, self._merge_parts([quiz], n_questions))
+
+
+    def _stream_quiz_api(
+        self,
+        topic: str,
+        n_questions: int,
+        part: Optional[Tuple[int, int]] = None
+    ) -> Iterator[QuizItem]:
+        """
+        Odczytuje odpowiedź Chat Completions w trybie stream (server-sent events)
+        i parsuje treść przyrostowo.
+        """
+        payload = self._build_payload(topic, n_questions, part)
+        payload["stream"] = True
+        # Strumień nie jest duplikowany (hedging) - router przechodzi do
+        # kolejnego dostawcy tylko wtedy, gdy otwarcie strumienia się nie uda,
+        # a czas do otrzymania nagłówków zasila statystyki routera
+        if self.router is None:
+            self._check_api_config()
+            response = self._open_stream(payload)
+        else:
+            response = self.router.failover(
+                lambda provider: self._open_stream(payload, provider), (AIServiceError,)
+            )
+
+        parser = IncrementalArrayParser()
+        count = 0
+        try:
+            for line in response.iter_lines(decode_unicode=True):
+                # Zdarzenia SSE mają postać "data: {...}"; puste linie je rozdzielają
+                if not line or not line.startswith("data:"):
+                    continue
+                data = line[len("data:"):].strip()
+                if data == "[DONE]":
+                    break
+                try:
+                    event = json.loads(data)
+                    delta = event.get('choices', [{}])[0].get('delta', {}).get('content') or ''
+                    items = parser.feed(delta)
+                except (ValueError, KeyError, IndexError, AttributeError) as ve:
+                    raise InvalidModelResponseError(f"Nieprawidłowy JSON w strumieniu API: {ve}")
+
+                for item in items:
+                    if not isinstance(item, dict):
+                        raise InvalidModelResponseError("Element odpowiedzi API nie jest obiektem pytania.")
+                    self._validate_quiz_item(item)
+                    count += 1
+                    if count > n_questions:
+                        raise InvalidModelResponseError(f"API zwróciło więcej niż {n_questions} pytań.")
+                    yield item
+
+            try:
+                parser.close()
+            except ValueError as ve:
+                raise InvalidModelResponseError(f"Nieprawidłowy JSON w strumieniu API: {ve}")
+        except requests.exceptions.RequestException as e:
+            raise AIServiceError(f"Błąd komunikacji z API: {e}")
+        finally:
+            response.close()
+
+        if count != n_questions:
+            raise InvalidModelResponseError(f"API zwróciło {count} pytań zamiast oczekiwanych {n_questions}.")
+
+
+    def _open_stream(self, payload: dict, provider: Optional[Provider] = None) -> requests.Response:
+        """
+        Wysyła zapytanie strumieniowe i zwraca odpowiedź po odebraniu nagłówków.
+        """
+        try:
+            response = self._post(payload, stream=True, provider=provider)
+            response.raise_for_status()
+        except ResilienceError as e:
+            raise AIServiceError(str(e))
+        except requests.exceptions.RequestException as e:
+            if hasattr(e, 'response') and e.response is not None:
+                raise AIServiceError(f"Błąd HTTP {e.response.status_code}: {e.response.text}")
+            raise AIServiceError(f"Błąd komunikacji z API: {e}")
+        return response
+
+
+    async def agenerate_quiz(self, topic: str, n_questions: int) -> List[QuizItem]:
+        """
+        Asynchroniczny odpowiednik generate_quiz (ta sama walidacja i wyjątki).
+
+        Wiele generowań może współdzielić jedną pętlę zdarzeń; oczekujące
+        zapytania nie blokują wątków, a jedynie miejsca w puli połączeń.
         """
         self._validate_input(topic, n_questions)
-        return self._generate_quiz_api(topic, n_questions)
+        cache_key = self._cache_key(topic, n_questions)
+        cached = self._load_cached(cache_key, n_questions)
+        if cached is not None:
+            return cached
+
+        if self.chunk_size is None or n_questions <= self.chunk_size:
+            quiz = await self._agenerate_quiz_api(topic, n_questions)
+        else:
+            quiz = await self._agenerate_quiz_chunked(topic, n_questions)
+        self._store_cached(cache_key, quiz)
+        return quiz
+
+
+    async def agenerate_many(
+        self,
+        topics: Iterable[str],
+        n_questions: int,
+        concurrency: int = AI_ASYNC_CONCURRENCY,
+        return_exceptions: bool = False
+    ) -> List[Any]:
+        """
+        Generuje quizy dla wielu tematów jednocześnie, z limitem współbieżności.
+
+        Args:
+            topics: Tematy quizów
+            n_questions: Liczba pytań w każdym quizie
+            concurrency: Maksymalna liczba generowań w toku
+            return_exceptions: True - błędy zwracane w miejscu wyniku danego
+                               tematu; False - pierwszy błąd przerywa całość
+
+        Returns:
+            Lista quizów (lub wyjątków) w kolejności tematów
+        """
+        if concurrency < 1:
+            raise ValueError("Limit współbieżności musi być liczbą dodatnią.")
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def run(topic: str) -> List[QuizItem]:
+            async with semaphore:
+                return await self.agenerate_quiz(topic, n_questions)
+
+        coros = [run(topic) for topic in topics]
+        if return_exceptions:
+            return await asyncio.gather(*coros, return_exceptions=True)
+        return await _gather_or_cancel(coros)
 
 
     def _validate_input(self, topic: str, n_questions: int) -> None:
@@ -48,13 +538,386 @@ class AIGenerator:
             raise ValueError(f"Liczba pytań musi być w zakresie {MIN_QUESTIONS}-{MAX_QUESTIONS}.)")
 
 
-    def _generate_quiz_api(self, topic: str, n_questions: int) -> List[QuizItem]:
+    def _split_into_chunks(self, n_questions: int) -> List[int]:
+        """
+        Dzieli liczbę pytań na możliwie równe części nie większe niż chunk_size.
+
+        Przykład: 25 pytań przy chunk_size=10 -> [9, 8, 8]
+        """
+        n_chunks = -(-n_questions // self.chunk_size)
+        base, extra = divmod(n_questions, n_chunks)
+        return [base + 1 if i < extra else base for i in range(n_chunks)]
+
+
+    def _generate_quiz_chunked(self, topic: str, n_questions: int) -> List[QuizItem]:
+        """
+        Generuje quiz w częściach wysyłanych równolegle przez pulę wątków.
+
+        Czas generowania wyznacza najwolniejsza część, a nie suma wszystkich.
+        Błąd dowolnej części przerywa generowanie całego quizu.
+        """
+        sizes = self._split_into_chunks(n_questions)
+        executor = ThreadPoolExecutor(max_workers=min(self.max_workers, len(sizes)))
+        futures = [
+            executor.submit(self._generate_quiz_api, topic, size, (index, len(sizes)))
+            for index, size in enumerate(sizes, 1)
+        ]
+        try:
+            # Wyniki scalane w kolejności części, niezależnie od kolejności zakończenia
+            parts = [future.result() for future in futures]
+        finally:
+            executor.shutdown(wait=False, cancel_futures=True)
+        return self._merge_parts(parts, n_questions)
+
+
+    async def _agenerate_quiz_chunked(self, topic: str, n_questions: int) -> List[QuizItem]:
+        """
+        Asynchroniczny odpowiednik _generate_quiz_chunked (limit max_workers części naraz).
+        """
+        sizes = self._split_into_chunks(n_questions)
+        semaphore = asyncio.Semaphore(self.max_workers)
+
+        async def run_part(index: int, size: int) -> List[QuizItem]:
+            async with semaphore:
+                return await self._agenerate_quiz_api(topic, size, (index, len(sizes)))
+
+        parts = await _gather_or_cancel([run_part(index, size) for index, size in enumerate(sizes, 1)])
+        return self._merge_parts(parts, n_questions)
+
+
+    def _merge_parts(self, parts: List[List[QuizItem]], n_questions: int) -> List[QuizItem]:
+        quiz: List[QuizItem] = [item for part in parts for item in part]
+        if len(quiz) != n_questions:
+            raise InvalidModelResponseError(f"API zwróciło {len(quiz)} pytań zamiast oczekiwanych {n_questions}.")
+        return quiz
+
+
+    def _generate_quiz_api(
+        self,
+        topic: str,
+        n_questions: int,
+        part: Optional[Tuple[int, int]] = None
+    ) -> List[QuizItem]:
         """
         Generuje pytania quizowe przez OpenAI Chat Completions API.
+
+        Args:
+            topic: Temat quizu
+            n_questions: Liczba pytań w tym zapytaniu
+            part: Numer części i liczba wszystkich części (tryb części)
+        """
+        if self.repair_attempts == 0 and self.dedup_index is None:
+            return self._validate_quiz_data(self._request_quiz_data(topic, n_questions, part), n_questions)
+        return self._generate_with_repair(topic, n_questions, part)
+
+
+    def _request_quiz_data(
+        self,
+        topic: str,
+        n_questions: int,
+        part: Optional[Tuple[int, int]] = None,
+        exclude: Optional[List[str]] = None
+    ) -> Any:
         """
+        Wysyła jedno zapytanie do API i zwraca sparsowaną (niezwalidowaną) treść.
+        """
+        payload = self._build_payload(topic, n_questions, part, exclude)
+        if self.router is None:
+            self._check_api_config()
+            return self._send_quiz_request(payload)
+        return self.router.call(lambda provider: self._send_quiz_request(payload, provider), (AIServiceError,))
+
+
+    def _send_quiz_request(self, payload: dict, provider: Optional[Provider] = None) -> Any:
+        """
+        Wysyła przygotowane zapytanie (do dostawcy lub api_url) i parsuje odpowiedź.
+        """
+        try:
+            response = self._post(payload, provider=provider)
+            response.raise_for_status()
+            
+            try:
+                response_data = response.json()
+            except ValueError as ve:
+                raise InvalidModelResponseError(f"Nieprawidłowy JSON w odpowiedzi API: {ve}")
+            data = self._parse_response_data(response_data)
+                
+        except InvalidModelResponseError:
+            raise
+        except requests.exceptions.RequestException as e:
+            # Obsługuje HTTPError, ConnectionError, Timeout, itp.
+            if hasattr(e, 'response') and e.response is not None:
+                raise AIServiceError(f"Błąd HTTP {e.response.status_code}: {e.response.text}")
+            else:
+                raise AIServiceError(f"Błąd komunikacji z API: {e}")
+        except ResilienceError as e:
+            raise AIServiceError(str(e))
+        except Exception as e:
+            raise AIServiceError(f"Nieoczekiwany błąd: {e}")
+
+        return data
+
+
+    def _post(self, payload: dict, stream: bool = False, provider: Optional[Provider] = None) -> requests.Response:
+        """
+        Wysyła zapytanie przez sesję; z warstwą odporności błędy przejściowe
+        (429/5xx, zerwane połączenia, timeouty) są ponawiane.
+        """
+        extra = {"stream": True} if stream else {}
+        api_url, headers, payload, resilience = self._target(payload, provider)
+
+        def send() -> requests.Response:
+            return self.session.post(
+                api_url, json=payload, headers=headers, timeout=self.timeout, **extra
+            )
+
+        if resilience is None:
+            return send()
+        return resilience.call(
+            send,
+            estimate_tokens(payload),
+            (requests.exceptions.ConnectionError, requests.exceptions.Timeout)
+        )
+
+
+    def _target(
+        self,
+        payload: dict,
+        provider: Optional[Provider]
+    ) -> Tuple[str, dict, dict, Optional[Resilience]]:
+        """
+        Zwraca adres, nagłówki, treść i warstwę odporności dla zapytania.
+        """
+        if provider is None:
+            return self.api_url, self._build_headers(), payload, self.resilience
+        return (
+            provider.api_url,
+            self._build_headers(provider.api_key),
+            dict(payload, model=provider.model),
+            provider.resilience
+        )
+
+
+    @property
+    def max_repair_attempts(self) -> int:
+        """Limit zapytań uzupełniających (z indeksem powtórzeń co najmniej DEDUP_TOP_UP_ATTEMPTS)."""
+        if self.dedup_index is None:
+            return self.repair_attempts
+        return max(self.repair_attempts, DEDUP_TOP_UP_ATTEMPTS)
+
+
+    def _generate_with_repair(
+        self,
+        topic: str,
+        n_questions: int,
+        part: Optional[Tuple[int, int]] = None,
+        exclude: Optional[List[str]] = None
+    ) -> List[QuizItem]:
+        """
+        Generuje pytania, zachowując poprawne pytania z niepełnych odpowiedzi.
+
+        Po każdej próbie brakujące pytania są dobierane osobnym, mniejszym
+        zapytaniem z listą już przyjętych pytań (i odrzuconych powtórzeń)
+        do pominięcia. Liczba zapytań uzupełniających jest ograniczona
+        przez max_repair_attempts.
+
+        Args:
+            exclude: Treści pytań pomijanych już w pierwszym zapytaniu
+        """
+        repair = _RepairRound(self, topic, n_questions, exclude)
+        while True:
+            needed, exclusions = repair.next_request()
+            try:
+                data, error = self._request_quiz_data(topic, needed, part, exclusions), None
+            except InvalidModelResponseError as e:
+                data, error = None, str(e)
+            if repair.finish(data, error):
+                return repair.accepted
+
+
+    def _accept_attempt(
+        self,
+        topic: str,
+        attempt: int,
+        requested: int,
+        data: Any,
+        error: Optional[str],
+        started: float,
+        accepted: List[QuizItem],
+        seen: set,
+        duplicates: List[str]
+    ) -> None:
+        """
+        Przyjmuje poprawne, nowe pytania z jednej próby i zapisuje jej metryki.
+
+        Pytania podobne do wydanych wcześniej (dedup_index) są odrzucane,
+        a ich treści dopisywane do duplicates - trafią do listy wykluczeń
+        kolejnego zapytania.
+        """
+        valid: List[QuizItem] = []
+        rejected = 0
+        repeated = 0
+        for item in data if isinstance(data, list) else []:
+            try:
+                self._validate_quiz_item(item)
+            except (InvalidModelResponseError, TypeError):
+                rejected += 1
+                continue
+            key = " ".join(str(item["question"]).lower().split())
+            if key in seen or len(valid) >= requested:
+                rejected += 1
+                continue
+            seen.add(key)
+            if self._is_duplicate(item, duplicates):
+                rejected += 1
+                repeated += 1
+                continue
+            valid.append(item)
+        accepted.extend(valid)
+
+        if error is None and not isinstance(data, list):
+            error = "Odpowiedź API nie jest listą pytań."
+        metrics: RepairAttempt = {
+            "topic": topic,
+            "attempt": attempt,
+            "requested": requested,
+            "accepted": len(valid),
+            "rejected": rejected,
+            "duplicates": repeated,
+            "duration_s": time.perf_counter() - started,
+            "error": error
+        }
+        with self._metrics_lock:
+            self.repair_metrics.append(metrics)
+
+
+    def _is_duplicate(self, item: QuizItem, duplicates: List[str]) -> bool:
+        """
+        Sprawdza pytanie w dedup_index i dodaje je do korpusu, jeśli jest nowe.
+        Dla powtórzenia dopisuje do duplicates jego treść i pytanie z korpusu.
+        """
+        if self.dedup_index is None:
+            return False
+        match = self.dedup_index.check_and_add(item["question"])
+        if match is None:
+            return False
+        duplicates.append(item["question"])
+        if match != item["question"]:
+            duplicates.append(match)
+        return True
+
+
+    @staticmethod
+    def _exclusions(accepted: List[QuizItem], duplicates: List[str]) -> List[str]:
+        """Lista wykluczeń zapytania: przyjęte pytania i odrzucone powtórzenia."""
+        exclude = [item["question"] for item in accepted]
+        exclude.extend(question for question in dict.fromkeys(duplicates) if question not in exclude)
+        return exclude
+
+
+    async def _agenerate_quiz_api(
+        self,
+        topic: str,
+        n_questions: int,
+        part: Optional[Tuple[int, int]] = None
+    ) -> List[QuizItem]:
+        """
+        Asynchroniczny odpowiednik _generate_quiz_api oparty na httpx.
+        """
+        if self.repair_attempts == 0 and self.dedup_index is None:
+            data = await self._arequest_quiz_data(topic, n_questions, part)
+            return self._validate_quiz_data(data, n_questions)
+
+        repair = _RepairRound(self, topic, n_questions)
+        while True:
+            needed, exclusions = repair.next_request()
+            try:
+                data, error = await self._arequest_quiz_data(topic, needed, part, exclusions), None
+            except InvalidModelResponseError as e:
+                data, error = None, str(e)
+            if repair.finish(data, error):
+                return repair.accepted
+
+    async def _arequest_quiz_data(
+        self,
+        topic: str,
+        n_questions: int,
+        part: Optional[Tuple[int, int]] = None,
+        exclude: Optional[List[str]] = None
+    ) -> Any:
+        """
+        Asynchroniczny odpowiednik _request_quiz_data.
+        """
+        payload = self._build_payload(topic, n_questions, part, exclude)
+        if self.router is None:
+            self._check_api_config()
+            return await self._asend_quiz_request(payload)
+        return await self.router.acall(lambda provider: self._asend_quiz_request(payload, provider), (AIServiceError,))
+
+
+    async def _asend_quiz_request(self, payload: dict, provider: Optional[Provider] = None) -> Any:
+        """
+        Asynchroniczny odpowiednik _send_quiz_request.
+        """
+        client = self._get_async_client()
+        api_url, headers, payload, resilience = self._target(payload, provider)
+
+        def send() -> Awaitable[httpx.Response]:
+            return client.post(api_url, json=payload, headers=headers)
+
+        try:
+            if resilience is None:
+                response = await send()
+            else:
+                response = await resilience.acall(send, estimate_tokens(payload), (httpx.TransportError,))
+            response.raise_for_status()
+
+            try:
+                response_data = response.json()
+            except ValueError as ve:
+                raise InvalidModelResponseError(f"Nieprawidłowy JSON w odpowiedzi API: {ve}")
+            data = self._parse_response_data(response_data)
+
+        except InvalidModelResponseError:
+            raise
+        except httpx.HTTPStatusError as e:
+            raise AIServiceError(f"Błąd HTTP {e.response.status_code}: {e.response.text}")
+        except httpx.HTTPError as e:
+            # Obsługuje ConnectError, TimeoutException, itp.
+            raise AIServiceError(f"Błąd komunikacji z API: {e}")
+        except ResilienceError as e:
+            raise AIServiceError(str(e))
+        except Exception as e:
+            raise AIServiceError(f"Nieoczekiwany błąd: {e}")
+
+        return data
+
+
+    def _check_api_config(self) -> None:
         if not self.api_url or not self.api_key:
             raise AIServiceError("Brak konfiguracji API (url/klucz)")
-        
+
+
+    def _build_headers(self, api_key: Optional[str] = None) -> dict:
+        return {
+            "Authorization": f"Bearer {api_key or self.api_key}",
+            "Content-Type": "application/json"
+        }
+
+
+    def _build_payload(
+        self,
+        topic: str,
+        n_questions: int,
+        part: Optional[Tuple[int, int]] = None,
+        exclude: Optional[List[str]] = None
+    ) -> dict:
+        """
+        Buduje treść zapytania Chat Completions (prompt + parametry modelu).
+
+        Args:
+            exclude: Treści pytań, których model nie może powtórzyć
+        """
         # Prompt dla OpenAI
         prompt = f"""Wygeneruj dokładnie {n_questions} pytań quizowych na temat: {topic}.
 
@@ -79,8 +942,17 @@ Przykład:
     "correct": "b"
   }}
 ]"""
+        if part is not None:
+            prompt += (
+                f"\n\nTo jest część {part[0]} z {part[1]} większego quizu. "
+                "Aby części się nie powtarzały, wybierz mniej oczywiste zagadnienia tematu."
+            )
+        if exclude:
+            prompt += "\n\nNie powtarzaj poniższych pytań (są już w quizie):\n" + "\n".join(
+                f"- {question}" for question in exclude
+            )
         
-        payload = {
+        return {
             "model": OPENAI_MODEL,  # Użycie modelu zdefiniowanego w config.py
             "messages": [
                 {"role": "system", "content": "Jesteś pomocnym asystentem generującym pytania quizowe. Zwracasz TYLKO czysty JSON bez dodatkowego formatowania."},
@@ -89,44 +961,31 @@ Przykład:
             "temperature": 0.7,
             "max_tokens": 2000
         }
-        headers = {
-            "Authorization": f"Bearer {self.api_key}",
-            "Content-Type": "application/json"
-        }
-        
+
+
+    def _parse_response_data(self, response_data: dict) -> Any:
+        """
+        Wyciąga z odpowiedzi Chat Completions treść wiadomości i parsuje ją jako JSON.
+        """
         try:
-            response = requests.post(self.api_url, json=payload, headers=headers, timeout=30)
-            response.raise_for_status()
+            # Wyciągnij content z odpowiedzi OpenAI
+            content = response_data.get('choices', [{}])[0].get('message', {}).get('content', '')
             
-            try:
-                response_data = response.json()
-                # Wyciągnij content z odpowiedzi OpenAI
-                content = response_data.get('choices', [{}])[0].get('message', {}).get('content', '')
-                
-                # Usuń ewentualne formatowanie markdown (```json ... ```)
-                content = content.strip()
-                if content.startswith('```'):
-                    lines = content.split('\n')
-                    content = '\n'.join(lines[1:-1]) if len(lines) > 2 else content
-                    content = content.replace('```json', '').replace('```', '').strip()
-                
-                # Parsuj JSON
-                data = json.loads(content)
-                
-            except (ValueError, KeyError, IndexError, json.JSONDecodeError) as ve:
-                raise InvalidModelResponseError(f"Nieprawidłowy JSON w odpowiedzi API: {ve}")
-                
-        except InvalidModelResponseError:
-            raise
-        except requests.exceptions.RequestException as e:
-            # Obsługuje HTTPError, ConnectionError, Timeout, itp.
-            if hasattr(e, 'response') and e.response is not None:
-                raise AIServiceError(f"Błąd HTTP {e.response.status_code}: {e.response.text}")
-            else:
-                raise AIServiceError(f"Błąd komunikacji z API: {e}")
-        except Exception as e:
-            raise AIServiceError(f"Nieoczekiwany błąd: {e}")
+            # Usuń ewentualne formatowanie markdown (```json ... ```)
+            content = content.strip()
+            if content.startswith('```'):
+                lines = content.split('\n')
+                content = '\n'.join(lines[1:-1]) if len(lines) > 2 else content
+                content = content.replace('```json', '').replace('```', '').strip()
+            
+            # Parsuj JSON
+            return json.loads(content)
+            
+        except (ValueError, KeyError, IndexError, json.JSONDecodeError) as ve:
+            raise InvalidModelResponseError(f"Nieprawidłowy JSON w odpowiedzi API: {ve}")
+
 
+    def _validate_quiz_data(self, data: Any, n_questions: int) -> List[QuizItem]:
         if not isinstance(data, list):
             raise InvalidModelResponseError("Odpowiedź API nie jest listą pytań.")
         if len(data) != n_questions:
@@ -148,5 +1007,39 @@ Przykład:
             if not item[opt]:
                 raise InvalidModelResponseError(f"Odpowiedź '{opt}' nie może być pusta.")
 
-# Szybki alias do użycia w innych modułach
-generate_quiz = AIGenerator().generate_quiz
\ No newline at end of file
+async def _gather_or_cancel(coros: List[Awaitable]) -> List[Any]:
+    """
+    Uruchamia korutyny współbieżnie; przy pierwszym błędzie anuluje pozostałe.
+    """
+    tasks = [asyncio.ensure_future(coro) for coro in coros]
+    try:
+        return await asyncio.gather(*tasks)
+    except BaseException:
+        for task in tasks:
+            task.cancel()
+        raise
+
+
+# Domyślny generator współdzielący jedną pulę połączeń w całym procesie -
+# tworzony przy pierwszym użyciu, a nie przy imporcie modułu
+_default_generator: Optional[AIGenerator] = None
+_default_lock = threading.Lock()
+
+
+def get_default_generator() -> AIGenerator:
+    """Zwraca współdzielony generator, tworząc go przy pierwszym wywołaniu."""
+    global _default_generator
+    with _default_lock:
+        if _default_generator is None:
+            _default_generator = AIGenerator()
+            atexit.register(_default_generator.close)
+        return _default_generator
+
+
+# Szybkie aliasy do użycia w innych modułach
+def generate_quiz(topic: str, n_questions: int) -> List[QuizItem]:
+    return get_default_generator().generate_quiz(topic, n_questions)
+
+
+async def agenerate_quiz(topic: str, n_questions: int) -> List[QuizItem]:
+    return await get_default_generator().agenerate_quiz(topic, n_questions)
\ No newline at end of file
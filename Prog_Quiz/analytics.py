@@ -0,0 +1,237 @@
+"""
+Statystyki zbiorcze wielu ukończonych quizów (kohorty).
+
+CohortAnalytics przyjmuje te same dane co build_report i aktualizuje
+liczniki przyrostowo po każdej sesji - bez przechowywania sesji. Pamięć
+zależy od liczby różnych pytań (stała na pytanie) i od rozdzielczości
+histogramu wyników, a nie od liczby sesji. Percentyle są liczone
+z histogramu wyników procentowych o kroku 0,1 punktu procentowego.
+"""
+
+from typing import Any, Dict, Iterable, List, Optional, Sequence, TextIO
+import csv
+import json
+import threading
+
+from ai_generator import QuizItem
+from result_procesor import GRADE_THRESHOLDS, LOWEST_GRADE, grade_for
+
+
+LETTERS = ("a", "b", "c", "d")
+# Rozdzielczość histogramu wyników: 0,1 punktu procentowego (0-100%)
+SCORE_BINS_PER_PERCENT = 10
+DEFAULT_PERCENTILES = (10, 25, 50, 75, 90, 95, 99)
+
+
+class QuestionStats:
+    """Liczniki jednego pytania (stała pamięć niezależnie od liczby sesji)."""
+    __slots__ = ("attempts", "errors")
+
+    def __init__(self) -> None:
+        self.attempts = 0
+        self.errors = 0
+
+    @property
+    def error_rate(self) -> float:
+        return self.errors / self.attempts if self.attempts else 0.0
+
+
+class CohortAnalytics:
+    """
+    Agreguje wyniki ukończonych quizów: rozkład ocen, najtrudniejsze
+    pytania, preferencje liter odpowiedzi i percentyle wyników.
+
+    Metody są bezpieczne wątkowo - sesje mogą kończyć się równolegle.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self.sessions = 0
+        self.questions_answered = 0
+        self.correct_answers = 0
+        self.grades: Dict[str, int] = {grade: 0 for _, grade in GRADE_THRESHOLDS}
+        self.grades[LOWEST_GRADE] = 0
+        self.questions: Dict[str, QuestionStats] = {}
+        self.chosen_letters: Dict[str, int] = dict.fromkeys(LETTERS, 0)
+        self.correct_letters: Dict[str, int] = dict.fromkeys(LETTERS, 0)
+        self._score_histogram: List[int] = [0] * (100 * SCORE_BINS_PER_PERCENT + 1)
+        self._score_sum = 0.0
+
+    # ===== AKTUALIZACJA =====
+
+    def add_session(
+        self,
+        total: int,
+        correct: int,
+        wrong_items: Iterable[Dict],
+        questions: Optional[Sequence[QuizItem]] = None
+    ) -> None:
+        """
+        Dolicza ukończony quiz.
+
+        Args:
+            total, correct, wrong_items: Jak w build_report
+            questions: Wszystkie pytania quizu (QuizItem, w kolejności
+                       zadawania). Bez nich znane są tylko błędne odpowiedzi,
+                       więc odsetek błędów pytań i preferencje liter
+                       uwzględniają wyłącznie wrong_items.
+
+        Raises:
+            ValueError: Jeśli dane są niespójne (jak w build_report)
+        """
+        if not isinstance(total, int) or total < 0:
+            raise ValueError("Total musi być nieujemną liczbą całkowitą")
+        if not isinstance(correct, int) or not 0 <= correct <= total:
+            raise ValueError("Correct musi być liczbą całkowitą z zakresu 0-total")
+        wrong_items = list(wrong_items)
+        if correct + len(wrong_items) != total:
+            raise ValueError("Suma poprawnych i błędnych odpowiedzi musi być równa total")
+        if questions is not None and len(questions) != total:
+            raise ValueError("Liczba pytań musi być równa total")
+
+        percentage = (correct / total * 100) if total > 0 else 0
+        wrong_by_index = {item["index"]: item for item in wrong_items}
+
+        with self._lock:
+            self.sessions += 1
+            self.questions_answered += total
+            self.correct_answers += correct
+            self.grades[grade_for(percentage)] += 1
+            self._score_histogram[round(percentage * SCORE_BINS_PER_PERCENT)] += 1
+            self._score_sum += percentage
+
+            if questions is None:
+                for item in wrong_items:
+                    self._record_answer(item["question"], item["user"], item["correct"])
+                return
+            for number, question in enumerate(questions, start=1):
+                wrong = wrong_by_index.get(number)
+                chosen = wrong["user"] if wrong is not None else question["correct"]
+                self._record_answer(question["question"], chosen, question["correct"])
+
+    def _record_answer(self, question: str, chosen: str, correct: str) -> None:
+        # Wywoływane z założoną blokadą
+        stats = self.questions.get(question)
+        if stats is None:
+            stats = self.questions[question] = QuestionStats()
+        stats.attempts += 1
+        if chosen != correct:
+            stats.errors += 1
+        if chosen in self.chosen_letters:
+            self.chosen_letters[chosen] += 1
+        if correct in self.correct_letters:
+            self.correct_letters[correct] += 1
+
+    # ===== STATYSTYKI =====
+
+    def grade_distribution(self) -> Dict[str, int]:
+        """Liczba sesji w każdym progu oceny (od najwyższej)."""
+        with self._lock:
+            return dict(self.grades)
+
+    def hardest_questions(self, limit: int = 10, min_attempts: int = 1) -> List[Dict[str, Any]]:
+        """
+        Pytania o najwyższym odsetku błędów (przy równym - więcej błędów).
+
+        Args:
+            limit: Maksymalna liczba pytań
+            min_attempts: Pomija pytania zadane rzadziej (mało wiarygodne)
+        """
+        with self._lock:
+            ranked = sorted(
+                (
+                    (text, stats.attempts, stats.errors, stats.error_rate)
+                    for text, stats in self.questions.items()
+                    if stats.attempts >= min_attempts
+                ),
+                key=lambda row: (-row[3], -row[2], row[0])
+            )
+        return [
+            {"question": text, "attempts": attempts, "errors": errors, "error_rate": rate}
+            for text, attempts, errors, rate in ranked[:limit]
+        ]
+
+    def letter_bias(self) -> Dict[str, Dict[str, float]]:
+        """
+        Preferencje liter: udział wyborów i poprawnych odpowiedzi dla każdej
+        litery oraz ich różnica (bias > 0 - litera wybierana częściej, niż
+        jest poprawna).
+        """
+        with self._lock:
+            chosen_total = sum(self.chosen_letters.values())
+            correct_total = sum(self.correct_letters.values())
+            result = {}
+            for letter in LETTERS:
+                chosen = self.chosen_letters[letter] / chosen_total if chosen_total else 0.0
+                correct = self.correct_letters[letter] / correct_total if correct_total else 0.0
+                result[letter] = {"chosen": chosen, "correct": correct, "bias": chosen - correct}
+            return result
+
+    def percentiles(self, points: Iterable[float] = DEFAULT_PERCENTILES) -> Dict[str, float]:
+        """
+        Percentyle wyników procentowych (metoda najbliższej rangi).
+
+        Returns:
+            Słownik "p50" -> wynik procentowy; puste wartości bez sesji
+        """
+        with self._lock:
+            histogram = list(self._score_histogram)
+            sessions = self.sessions
+        result: Dict[str, float] = {}
+        for point in points:
+            if not 0 < point <= 100:
+                raise ValueError("Percentyl musi być z zakresu (0, 100]")
+            if sessions == 0:
+                continue
+            rank = max(1, -(-point * sessions // 100))
+            seen = 0
+            for bin_index, count in enumerate(histogram):
+                seen += count
+                if seen >= rank:
+                    result[f"p{point:g}"] = bin_index / SCORE_BINS_PER_PERCENT
+                    break
+        return result
+
+    def summary(self) -> Dict[str, Any]:
+        """Wszystkie statystyki w postaci gotowej do serializacji JSON."""
+        with self._lock:
+            sessions = self.sessions
+            answered = self.questions_answered
+            correct = self.correct_answers
+            mean = self._score_sum / sessions if sessions else 0.0
+        return {
+            "sessions": sessions,
+            "questions_answered": answered,
+            "correct_answers": correct,
+            "mean_score": mean,
+            "grades": self.grade_distribution(),
+            "percentiles": self.percentiles(),
+            "letter_bias": self.letter_bias(),
+            "hardest_questions": self.hardest_questions(),
+        }
+
+    # ===== EKSPORT =====
+
+    def to_json(self, indent: Optional[int] = 2) -> str:
+        return json.dumps(self.summary(), ensure_ascii=False, indent=indent)
+
+    def write_csv(self, sink: TextIO, hardest_limit: int = 10) -> None:
+        """
+        Zapisuje statystyki jako CSV w formacie długim:
+        section, key, metric, value (jedna wartość w wierszu).
+        """
+        summary = self.summary()
+        writer = csv.writer(sink)
+        writer.writerow(["section", "key", "metric", "value"])
+        for metric in ("sessions", "questions_answered", "correct_answers", "mean_score"):
+            writer.writerow(["overall", "", metric, summary[metric]])
+        for grade, count in summary["grades"].items():
+            writer.writerow(["grades", grade, "sessions", count])
+        for point, score in summary["percentiles"].items():
+            writer.writerow(["percentiles", point, "score", score])
+        for letter, shares in summary["letter_bias"].items():
+            for metric, value in shares.items():
+                writer.writerow(["letters", letter, metric, value])
+        for row in self.hardest_questions(hardest_limit):
+            for metric in ("attempts", "errors", "error_rate"):
+                writer.writerow(["questions", row["question"], metric, row[metric]])
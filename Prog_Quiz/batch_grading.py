@@ -0,0 +1,167 @@
+"""
+Wsadowe ocenianie arkuszy odpowiedzi (użytkownicy × pytania) przy użyciu NumPy.
+
+Quiz.answer_current ocenia odpowiedzi pojedynczo; przy ponownym ocenianiu
+wyeksportowanych odpowiedzi tysięcy użytkowników cała macierz jest liczona
+w jednym przebiegu. Nieprawidłowe komórki są raportowane osobno, z tymi
+samymi komunikatami co InvalidAnswerError, i liczone jako błędne odpowiedzi.
+"""
+
+from typing import Any, Dict, List, Tuple
+import numpy as np
+
+from quiz_logic import Question, InvalidQuestionError, NO_ANSWER
+
+
+MSG_NOT_INTEGER = "Indeks odpowiedzi musi być liczbą całkowitą"
+
+
+class AnswerKey:
+    """
+    Zwarty klucz odpowiedzi: poprawny indeks, punkty i liczba opcji każdego pytania.
+    """
+
+    def __init__(self, correct: np.ndarray, points: np.ndarray, n_options: np.ndarray):
+        if not (len(correct) == len(points) == len(n_options)) or len(correct) == 0:
+            raise InvalidQuestionError("Klucz odpowiedzi musi zawierać co najmniej jedno pytanie")
+        self.correct = np.asarray(correct, dtype=np.int8)
+        self.points = np.asarray(points, dtype=np.float64)
+        self.n_options = np.asarray(n_options, dtype=np.int16)
+        self.max_score = float(self.points.sum())
+
+    @classmethod
+    def from_questions(cls, questions: List[Question]) -> "AnswerKey":
+        """Buduje klucz z listy pytań (Question.correct_index/points)."""
+        if not all(isinstance(q, Question) for q in questions):
+            raise InvalidQuestionError("Wszystkie elementy muszą być obiektami Question")
+        return cls(
+            np.fromiter((q.correct_index for q in questions), dtype=np.int8, count=len(questions)),
+            np.fromiter((q.points for q in questions), dtype=np.float64, count=len(questions)),
+            np.fromiter((len(q.options) for q in questions), dtype=np.int16, count=len(questions)),
+        )
+
+    def __len__(self) -> int:
+        return len(self.correct)
+
+
+class GradingResult:
+    """
+    Wynik oceniania wsadowego.
+
+    Attributes:
+        scores: Punkty każdego użytkownika (wektor długości users)
+        correct: Macierz poprawności (users × questions)
+        answered: Macierz poprawnych formalnie odpowiedzi (users × questions)
+        correctness_rate: Odsetek poprawnych odpowiedzi na pytanie
+                          (wśród udzielonych, prawidłowych odpowiedzi)
+        distribution: Liczba wyborów każdej opcji (questions × max_options)
+        errors: Nieprawidłowe komórki: (użytkownik, pytanie) -> komunikat
+        max_score: Maksymalna liczba punktów
+    """
+
+    def __init__(
+        self,
+        scores: np.ndarray,
+        correct: np.ndarray,
+        answered: np.ndarray,
+        correctness_rate: np.ndarray,
+        distribution: np.ndarray,
+        errors: Dict[Tuple[int, int], str],
+        max_score: float
+    ):
+        self.scores = scores
+        self.correct = correct
+        self.answered = answered
+        self.correctness_rate = correctness_rate
+        self.distribution = distribution
+        self.errors = errors
+        self.max_score = max_score
+
+    def percentages(self) -> np.ndarray:
+        """Wynik procentowy każdego użytkownika."""
+        return self.scores / self.max_score * 100
+
+
+def _to_matrix(answers: Any) -> Tuple[np.ndarray, np.ndarray, Dict[Tuple[int, int], str]]:
+    """
+    Zamienia arkusz odpowiedzi na macierz int64.
+
+    Zwraca (macierz, maska odpowiedzi całkowitych, błędy typów). Brak
+    odpowiedzi (None) nie jest błędem; wartość niecałkowita jest oznaczana
+    jak w Question.is_correct.
+    """
+    matrix = np.asarray(answers)
+    if matrix.ndim != 2:
+        raise ValueError("Arkusz odpowiedzi musi być macierzą (użytkownicy × pytania)")
+
+    # Szybka ścieżka: eksport z liczbami całkowitymi (bez braków)
+    if np.issubdtype(matrix.dtype, np.integer) or matrix.dtype == np.bool_:
+        return matrix.astype(np.int64, copy=False), np.ones(matrix.shape, dtype=bool), {}
+
+    cells = np.asarray(answers, dtype=object)
+    missing = np.frompyfunc(lambda value: value is None, 1, 1)(cells).astype(bool)
+    is_int = np.frompyfunc(lambda value: isinstance(value, (int, np.integer)), 1, 1)(cells).astype(bool)
+    errors = {
+        (int(user), int(question)): MSG_NOT_INTEGER
+        for user, question in np.argwhere(~is_int & ~missing)
+    }
+    values = np.where(is_int, cells, NO_ANSWER).astype(np.int64)
+    return values, is_int, errors
+
+
+def grade_batch(answers: Any, key: AnswerKey) -> GradingResult:
+    """
+    Ocenia macierz odpowiedzi (użytkownicy × pytania) w jednym przebiegu.
+
+    Args:
+        answers: Macierz indeksów odpowiedzi (ndarray lub lista list);
+                 None oznacza brak odpowiedzi
+        key: Klucz odpowiedzi
+
+    Returns:
+        GradingResult z wynikami, statystykami pytań i błędnymi komórkami
+
+    Raises:
+        ValueError: Jeśli arkusz nie jest macierzą zgodną z kluczem
+    """
+    if not isinstance(key, AnswerKey):
+        raise ValueError("Klucz musi być obiektem AnswerKey")
+    values, typed, errors = _to_matrix(answers)
+    if values.shape[1] != len(key):
+        raise ValueError(
+            f"Arkusz ma {values.shape[1]} kolumn, a klucz {len(key)} pytań"
+        )
+
+    in_range = (values >= 0) & (values < key.n_options)
+    answered = typed & in_range
+
+    for user, question in np.argwhere(typed & ~in_range):
+        errors[(int(user), int(question))] = (
+            f"Indeks odpowiedzi ({values[user, question]}) musi być w zakresie "
+            f"0-{key.n_options[question] - 1}"
+        )
+
+    correct = answered & (values == key.correct)
+    scores = correct @ key.points
+
+    answered_count = answered.sum(axis=0)
+    correctness_rate = np.divide(
+        correct.sum(axis=0), answered_count,
+        out=np.zeros(len(key), dtype=np.float64), where=answered_count > 0
+    )
+
+    # Rozkład odpowiedzi: jeden bincount po spłaszczonych parach (pytanie, opcja)
+    max_options = int(key.n_options.max())
+    question_index = np.broadcast_to(np.arange(len(key)), values.shape)
+    flat = question_index[answered] * max_options + values[answered]
+    distribution = np.bincount(flat, minlength=len(key) * max_options).reshape(len(key), max_options)
+
+    return GradingResult(
+        scores=scores,
+        correct=correct,
+        answered=answered,
+        correctness_rate=correctness_rate,
+        distribution=distribution,
+        errors=errors,
+        max_score=key.max_score,
+    )
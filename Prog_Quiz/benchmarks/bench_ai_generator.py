@@ -0,0 +1,63 @@
+import json
+import re
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from ai_generator import AIGenerator
+from config import MAX_QUESTIONS
+from payloads import make_items, make_response
+
+LARGE = 5000
+
+
+@pytest.fixture
+def generator():
+    with AIGenerator(api_url="http://localhost/v1/chat/completions", api_key="key") as gen:
+        yield gen
+
+
+def test_parse_response_large(bench, generator):
+    response = make_response(LARGE)
+    data = bench(generator._parse_response_data, response)
+    assert len(data) == LARGE
+
+
+def test_parse_response_markdown_large(bench, generator):
+    response = make_response(LARGE, markdown=True)
+    data = bench(generator._parse_response_data, response)
+    assert len(data) == LARGE
+
+
+def test_validate_quiz_large(bench, generator):
+    items = make_items(LARGE)
+    quiz = bench(generator._validate_quiz_data, items, LARGE)
+    assert len(quiz) == LARGE
+
+
+def test_generate_quiz_mocked_http(bench, generator):
+    # Domyślny generator dzieli quiz na części - każda odpowiedź ma tyle
+    # pytań, ile zamówiono w prompcie danej części
+    responses = {}
+
+    def post(url, json, headers, timeout):
+        count = int(re.search(r"dokładnie (\d+) pytań", json["messages"][1]["content"]).group(1))
+        if count not in responses:
+            response = MagicMock()
+            response.status_code = 200
+            response.json.return_value = make_response(count)
+            responses[count] = response
+        return responses[count]
+
+    with patch("ai_generator.requests.Session.post", side_effect=post):
+        quiz = bench(generator.generate_quiz, "Python", MAX_QUESTIONS)
+    assert len(quiz) == MAX_QUESTIONS
+
+
+def test_parse_and_validate_memory(memory, generator):
+    response = make_response(LARGE)
+
+    def parse_and_validate():
+        return generator._validate_quiz_data(generator._parse_response_data(response), LARGE)
+
+    assert len(memory(parse_and_validate)) == LARGE
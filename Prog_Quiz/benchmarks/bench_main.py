@@ -0,0 +1,25 @@
+import pytest
+
+from ai_generator import AIGenerator
+from main import QuizApplication
+from payloads import make_items
+
+LARGE = 5000
+
+
+@pytest.fixture
+def app():
+    generator = AIGenerator(api_url="http://localhost/v1/chat/completions", api_key="key")
+    yield QuizApplication(ai_generator=generator, prefetch=False)
+    generator.close()
+
+
+def test_convert_to_questions(bench, app):
+    items = make_items(LARGE)
+    questions = bench(app._convert_to_questions, items)
+    assert len(questions) == LARGE
+
+
+def test_convert_to_questions_memory(memory, app):
+    items = make_items(LARGE)
+    assert len(memory(app._convert_to_questions, items)) == LARGE
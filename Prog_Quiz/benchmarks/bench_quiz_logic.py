@@ -0,0 +1,36 @@
+import pytest
+
+from quiz_logic import Question, Quiz
+
+LARGE = 5000
+
+
+@pytest.fixture(scope="module")
+def questions():
+    return [
+        Question(f"Pytanie {i}?", ["A", "B", "C", "D"], i % 4, points=1 + i % 3)
+        for i in range(LARGE)
+    ]
+
+
+def _answer_all(questions):
+    quiz = Quiz(questions)
+    quiz.start()
+    for i in range(len(questions)):
+        quiz.answer_current(i % 2)
+    return quiz
+
+
+def test_answer_current_loop(bench, questions):
+    quiz = bench(_answer_all, questions)
+    assert quiz.is_finished()
+
+
+def test_get_summary(bench, questions):
+    quiz = _answer_all(questions)
+    summary = bench(quiz.get_summary)
+    assert len(summary["answers"]) == LARGE
+
+
+def test_answer_current_loop_memory(memory, questions):
+    assert memory(_answer_all, questions).is_finished()
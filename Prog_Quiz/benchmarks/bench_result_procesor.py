@@ -0,0 +1,15 @@
+from payloads import make_wrong_items
+from result_procesor import build_report
+
+WRONG = 5000
+
+
+def test_build_report_many_wrong_items(bench):
+    wrong_items = make_wrong_items(WRONG)
+    report = bench(build_report, total=WRONG * 2, correct=WRONG, wrong_items=wrong_items)
+    assert len(report.splitlines()) > WRONG
+
+
+def test_build_report_memory(memory):
+    wrong_items = make_wrong_items(WRONG)
+    assert memory(build_report, total=WRONG * 2, correct=WRONG, wrong_items=wrong_items)
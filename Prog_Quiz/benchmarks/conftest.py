@@ -0,0 +1,115 @@
+"""
+Wspólna infrastruktura benchmarków: porównanie z zapisanym punktem odniesienia.
+
+Każdy benchmark czasu (fixture bench) i pamięci (fixture memory) jest
+porównywany z wartością w baseline.json. Przekroczenie tolerancji kończy
+test błędem z obiema wartościami, więc regresja jest widoczna od razu.
+
+Czas to mediana z BENCH_ROUNDS rund (domyślnie 15) po rozgrzewce; krótkie
+wywołania są powtarzane w rundzie, aż trwa ona co najmniej BENCH_ROUND_TIME
+sekund (domyślnie 0.05), więc pojedyncze zakłócenia (GC, planista systemu)
+nie przesuwają wyniku. Tolerancje (mnożniki punktu odniesienia) ustawiają
+zmienne środowiskowe BENCH_TIME_TOLERANCE (domyślnie 2.0 - czasy zależą od
+maszyny) oraz BENCH_MEMORY_TOLERANCE (domyślnie 1.25 - alokacje są
+powtarzalne). Nowy punkt odniesienia zapisuje opcja --update-baseline.
+"""
+
+from typing import Any, Callable, Dict
+import json
+import math
+import os
+import sys
+import time
+import tracemalloc
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+BASELINE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baseline.json")
+TIME_TOLERANCE = float(os.getenv("BENCH_TIME_TOLERANCE", "2.0"))
+MEMORY_TOLERANCE = float(os.getenv("BENCH_MEMORY_TOLERANCE", "1.25"))
+ROUNDS = int(os.getenv("BENCH_ROUNDS", "15"))
+ROUND_TIME = float(os.getenv("BENCH_ROUND_TIME", "0.05"))
+
+_measured: Dict[str, Dict[str, float]] = {"time": {}, "memory": {}}
+
+
+def pytest_addoption(parser):
+    parser.addoption(
+        "--update-baseline", action="store_true", default=False,
+        help="Zapisz zmierzone wartości jako nowy punkt odniesienia (benchmarks/baseline.json)"
+    )
+
+
+def _load_baseline() -> Dict[str, Dict[str, float]]:
+    try:
+        with open(BASELINE_PATH, encoding="utf-8") as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {"time": {}, "memory": {}}
+
+
+def _check(config, kind: str, name: str, value: float, tolerance: float, unit: str) -> None:
+    _measured[kind][name] = value
+    if config.getoption("--update-baseline"):
+        return
+    reference = _load_baseline().get(kind, {}).get(name)
+    if reference is None:
+        pytest.fail(f"Brak punktu odniesienia '{kind}/{name}' - uruchom z --update-baseline")
+    if value > reference * tolerance:
+        pytest.fail(
+            f"Regresja {kind} w '{name}': {value:.6g} {unit} > "
+            f"{reference:.6g} {unit} × {tolerance} (punkt odniesienia)"
+        )
+
+
+def _iterations(fn: Callable[..., Any], args: tuple, kwargs: dict) -> int:
+    """Liczba wywołań w rundzie, przy której runda trwa co najmniej ROUND_TIME."""
+    started = time.perf_counter()
+    fn(*args, **kwargs)
+    elapsed = time.perf_counter() - started
+    return max(1, math.ceil(ROUND_TIME / elapsed)) if elapsed > 0 else 1
+
+
+@pytest.fixture
+def bench(request, benchmark) -> Callable[..., Any]:
+    """Uruchamia benchmark czasu i porównuje medianę z punktem odniesienia."""
+    def run(fn: Callable[..., Any], *args, **kwargs) -> Any:
+        result = benchmark.pedantic(
+            fn, args=args, kwargs=kwargs, rounds=ROUNDS,
+            iterations=_iterations(fn, args, kwargs), warmup_rounds=1
+        )
+        # Przy --benchmark-disable statystyki nie są zbierane
+        if benchmark.stats is not None:
+            _check(request.config, "time", request.node.name, benchmark.stats.stats.median, TIME_TOLERANCE, "s")
+        return result
+    return run
+
+
+@pytest.fixture
+def memory(request) -> Callable[..., Any]:
+    """Mierzy szczytową pamięć zaalokowaną przez wywołanie (tracemalloc)."""
+    def run(fn: Callable[..., Any], *args, **kwargs) -> Any:
+        tracemalloc.start()
+        try:
+            result = fn(*args, **kwargs)
+            peak = tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+        _check(request.config, "memory", request.node.name, peak, MEMORY_TOLERANCE, "B")
+        return result
+    return run
+
+
+def pytest_sessionfinish(session, exitstatus):
+    if not session.config.getoption("--update-baseline"):
+        return
+    baseline = _load_baseline()
+    for kind, values in _measured.items():
+        baseline.setdefault(kind, {}).update(
+            {name: int(value) if kind == "memory" else float(f"{value:.4g}") for name, value in values.items()}
+        )
+    with open(BASELINE_PATH, "w", encoding="utf-8") as f:
+        json.dump(baseline, f, indent=2, sort_keys=True)
+        f.write("\n")
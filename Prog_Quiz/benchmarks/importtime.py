@@ -0,0 +1,90 @@
+"""
+Pomiar czasu zimnego startu punktu wejścia (python main.py --help).
+
+Każdy przebieg uruchamia nowy interpreter z -X importtime; raport zawiera
+medianę czasu całego procesu oraz moduły o największym łącznym czasie
+importu (z ostatniego przebiegu). Pozwala wychwycić zależność, która
+zaczęła być ładowana przy starcie zamiast przy pierwszym użyciu.
+
+Uruchomienie (z katalogu Prog_Quiz):
+    python benchmarks/importtime.py --runs 10 --top 15
+"""
+
+from typing import Dict, List, Tuple
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+PROG_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def parse_importtime(stderr: str) -> Tuple[Dict[str, int], int]:
+    """
+    Parsuje wyjście -X importtime.
+
+    Linie mają postać "import time: self | cumulative | nazwa", a wcięcie
+    nazwy oznacza głębokość zagnieżdżenia importu.
+
+    Returns:
+        (łączny czas importu każdego modułu w µs, suma czasów importów
+        najwyższego poziomu w µs)
+    """
+    modules: Dict[str, int] = {}
+    total = 0
+    for line in stderr.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        fields = line[len("import time:"):].split("|")
+        if len(fields) != 3 or not fields[1].strip().isdigit():
+            continue  # nagłówek tabeli
+        name = fields[2].rstrip()
+        modules[name.strip()] = int(fields[1])
+        if len(name) - len(name.lstrip()) == 1:
+            total += int(fields[1])
+    return modules, total
+
+
+def run_once(args: List[str]) -> Tuple[float, Dict[str, int], int]:
+    """Uruchamia main.py w nowym interpreterze; zwraca (czas w s, czasy importu, suma)."""
+    command = [sys.executable, "-X", "importtime", "main.py", *args]
+    start = time.perf_counter()
+    result = subprocess.run(command, cwd=PROG_DIR, capture_output=True, text=True)
+    elapsed = time.perf_counter() - start
+    if result.returncode != 0:
+        raise RuntimeError(f"main.py zakończył się kodem {result.returncode}:\n{result.stderr}")
+    return (elapsed, *parse_importtime(result.stderr))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Czas zimnego startu main.py")
+    parser.add_argument("--runs", type=int, default=10, help="Liczba przebiegów")
+    parser.add_argument("--top", type=int, default=15, help="Liczba najwolniejszych modułów w raporcie")
+    parser.add_argument("--args", default="--help", help="Argumenty przekazywane do main.py")
+    options = parser.parse_args()
+    if options.runs < 1:
+        parser.error("Liczba przebiegów musi być dodatnia")
+
+    # Pierwszy przebieg rozgrzewa pamięć podręczną plików .pyc
+    run_once(options.args.split())
+    timings = []
+    import_totals = []
+    modules: Dict[str, int] = {}
+    for _ in range(options.runs):
+        elapsed, modules, total = run_once(options.args.split())
+        timings.append(elapsed)
+        import_totals.append(total)
+
+    print(f"python main.py {options.args}: {options.runs} przebiegów")
+    print(f"  mediana: {statistics.median(timings) * 1000:.1f} ms"
+          f"  min: {min(timings) * 1000:.1f} ms  max: {max(timings) * 1000:.1f} ms")
+    print(f"  importy (mediana): {statistics.median(import_totals) / 1000:.1f} ms")
+    print(f"\n{'moduł':<40}{'łącznie ms':>12}")
+    for name, cumulative in sorted(modules.items(), key=lambda item: -item[1])[:options.top]:
+        print(f"{name:<40}{cumulative / 1000:>12.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,41 @@
+"""Dane wejściowe benchmarków: duże quizy i odpowiedzi API."""
+
+from typing import Dict, List
+import json
+
+
+def make_items(count: int) -> List[Dict[str, str]]:
+    """Quiz w formacie QuizItem (tak jak zwraca go API)."""
+    return [
+        {
+            "question": f"Pytanie numer {i} o dość typowej długości treści?",
+            "a": f"Pierwsza odpowiedź {i}",
+            "b": f"Druga odpowiedź {i}",
+            "c": f"Trzecia odpowiedź {i}",
+            "d": f"Czwarta odpowiedź {i}",
+            "correct": "abcd"[i % 4],
+        }
+        for i in range(count)
+    ]
+
+
+def make_response(count: int, markdown: bool = False) -> dict:
+    """Odpowiedź Chat Completions z quizem (opcjonalnie w bloku ```json)."""
+    content = json.dumps(make_items(count), ensure_ascii=False)
+    if markdown:
+        content = f"```json\n{content}\n```"
+    return {"choices": [{"message": {"content": content}}]}
+
+
+def make_wrong_items(count: int) -> List[Dict]:
+    """Błędne odpowiedzi w formacie build_report."""
+    return [
+        {
+            "index": i + 1,
+            "user": "a",
+            "correct": "b",
+            "question": f"Pytanie numer {i} o dość typowej długości treści?",
+            "correct_text": f"Druga odpowiedź {i}",
+        }
+        for i in range(count)
+    ]
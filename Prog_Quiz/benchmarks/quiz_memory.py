@@ -0,0 +1,111 @@
+"""
+Pomiar pamięci zajmowanej przez pytania i quizy.
+
+Porównuje obecną reprezentację (sloty, krotka opcji, odpowiedzi w array('b'))
+z poprzednią (obiekty z __dict__, lista opcji, lista odpowiedzi) przy wielu
+jednocześnie żyjących quizach - tak jak po stronie serwera.
+
+Uruchomienie (z katalogu Prog_Quiz):
+    python benchmarks/quiz_memory.py --quizzes 100000
+"""
+
+from typing import Callable, List, Optional
+import argparse
+import gc
+import os
+import sys
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from quiz_logic import Question, Quiz  # noqa: E402
+
+
+class LegacyQuestion:
+    """Poprzednia reprezentacja pytania (bez walidacji - tylko układ danych)."""
+
+    def __init__(self, text: str, options: List[str], correct_index: int, points: int = 1):
+        self.text = text.strip()
+        self.options = [opt.strip() for opt in options]
+        self.correct_index = correct_index
+        self.points = points
+
+
+class LegacyQuiz:
+    """Poprzednia reprezentacja quizu."""
+
+    def __init__(self, questions: List[LegacyQuestion]):
+        self.questions = questions
+        self.current = 0
+        self.score = 0
+        self.answers: List[Optional[int]] = [None] * len(questions)
+
+    def answer_current(self, answer_index: int) -> None:
+        question = self.questions[self.current]
+        self.answers[self.current] = answer_index
+        if answer_index == question.correct_index:
+            self.score += question.points
+        self.current += 1
+
+
+def _measure(build: Callable[[], list]) -> tuple:
+    """Zwraca (zbudowane obiekty, bajty zaalokowane podczas budowy)."""
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    objects = build()
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return objects, after - before
+
+
+def _question_args(i: int) -> tuple:
+    # Teksty są tworzone z góry, aby mierzyć tylko narzut reprezentacji
+    return (f"Pytanie {i}?", [f"Opcja A{i}", f"Opcja B{i}", f"Opcja C{i}", f"Opcja D{i}"], i % 4, 1)
+
+
+def run(n_quizzes: int, questions_per_quiz: int, pool_size: int) -> None:
+    args = [_question_args(i) for i in range(pool_size)]
+
+    print(f"Quizy: {n_quizzes}, pytań w quizie: {questions_per_quiz}, pula pytań: {pool_size}")
+    print(f"{'reprezentacja':<14}{'B/pytanie':>12}{'B/quiz':>12}{'razem MiB':>12}")
+
+    for name, question_cls, quiz_cls in (
+        ("poprzednia", LegacyQuestion, LegacyQuiz),
+        ("obecna", Question, Quiz),
+    ):
+        pool, question_bytes = _measure(lambda: [question_cls(*a) for a in args])
+
+        def build_quizzes() -> list:
+            quizzes = []
+            for q in range(n_quizzes):
+                start = (q * questions_per_quiz) % (pool_size - questions_per_quiz)
+                quiz = quiz_cls(pool[start:start + questions_per_quiz])
+                # Połowa pytań z odpowiedzią - quiz w toku
+                for _ in range(questions_per_quiz // 2):
+                    quiz.answer_current(0)
+                quizzes.append(quiz)
+            return quizzes
+
+        quizzes, quiz_bytes = _measure(build_quizzes)
+        total = question_bytes + quiz_bytes
+        print(
+            f"{name:<14}{question_bytes / pool_size:>12.0f}{quiz_bytes / n_quizzes:>12.0f}"
+            f"{total / 2 ** 20:>12.1f}"
+        )
+        del pool, quizzes
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Pamięć pytań i quizów")
+    parser.add_argument("--quizzes", type=int, default=100_000, help="Liczba żyjących quizów")
+    parser.add_argument("--questions", type=int, default=10, help="Liczba pytań w quizie")
+    parser.add_argument("--pool", type=int, default=100_000, help="Liczba unikalnych pytań")
+    options = parser.parse_args()
+    if options.pool <= options.questions:
+        parser.error("Pula pytań musi być większa niż liczba pytań w quizie")
+    run(options.quizzes, options.questions, options.pool)
+
+
+if __name__ == "__main__":
+    main()
@@ -5,10 +5,102 @@ import os
 load_dotenv()
 
 MIN_QUESTIONS: int = 1
-MAX_QUESTIONS: int = 30
+MAX_QUESTIONS: int = 100
+
+# Generowanie quizu w częściach: maksymalna liczba pytań w jednym zapytaniu
+# oraz maksymalna liczba równoległych zapytań do API
+QUIZ_CHUNK_SIZE: int = 10
+QUIZ_MAX_WORKERS: int = 4
+
+# Liczba zapytań uzupełniających, gdy model zwróci za mało lub niepoprawne pytania
+AI_REPAIR_ATTEMPTS: int = 2
+
+# Odporność na błędy dostawcy AI: ponowienia z wykładniczym opóźnieniem (s),
+# bezpiecznik obwodu (liczba kolejnych błędów i czas do próby ponownej, s)
+# oraz wspólny dla procesu limit zapytań i tokenów na minutę
+AI_MAX_RETRIES: int = 3
+AI_RETRY_BASE_DELAY: float = 0.5
+AI_RETRY_MAX_DELAY: float = 20.0
+AI_CIRCUIT_FAILURE_THRESHOLD: int = 5
+AI_CIRCUIT_RECOVERY_TIMEOUT: float = 30.0
+AI_RATE_LIMIT_RPM: int = int(os.getenv("AI_RATE_LIMIT_RPM", "500"))
+AI_RATE_LIMIT_TPM: int = int(os.getenv("AI_RATE_LIMIT_TPM", "200000"))
+AI_RATE_LIMIT_MAX_WAIT: float = 60.0
+
+# Strumieniowe generowanie quizu: pierwsze pytanie wyświetlane, zanim model
+# wygeneruje pozostałe
+QUIZ_STREAMING: bool = True
+
+# Generowanie kolejnego quizu w tle w trakcie gry - opcja "zagraj ponownie"
+# startuje bez czekania (kosztem dodatkowego zapytania do API na rozgrywkę)
+QUIZ_PREFETCH: bool = os.getenv("QUIZ_PREFETCH", "0") == "1"
+
+# Pula połączeń HTTP do API (liczba połączeń keep-alive na host) i timeout zapytania
+AI_HTTP_POOL_SIZE: int = 10
+AI_HTTP_TIMEOUT: float = 30.0
+
+# API asynchroniczne: limit jednoczesnych połączeń klienta httpx oraz domyślny
+# limit generowań w toku dla AIGenerator.agenerate_many
+AI_ASYNC_MAX_CONNECTIONS: int = 100
+AI_ASYNC_CONCURRENCY: int = 50
+
+# Cache quizów: czas życia wpisu (s), limit wpisów w pamięci oraz opcjonalna
+# warstwa dyskowa (plik SQLite; brak ścieżki wyłącza warstwę dyskową)
+QUIZ_CACHE_TTL: float = 24 * 60 * 60
+QUIZ_CACHE_MAX_ENTRIES: int = 256
+QUIZ_CACHE_DISK_PATH = os.getenv("QUIZ_CACHE_PATH")
+QUIZ_CACHE_DISK_MAX_ENTRIES: int = 5000
+
+# Wykrywanie powtórzonych pytań (QUIZ_DEDUP=1 włącza): próg podobieństwa
+# Jaccarda, długość sygnatury MinHash, liczba pasm LSH i długość rdzenia słowa;
+# opcjonalny plik .npz utrwala korpus wydanych pytań między uruchomieniami
+QUIZ_DEDUP = os.getenv("QUIZ_DEDUP", "0") == "1"
+QUIZ_DEDUP_INDEX_PATH = os.getenv("QUIZ_DEDUP_INDEX_PATH")
+DEDUP_THRESHOLD: float = 0.8
+DEDUP_NUM_PERM: int = 64
+DEDUP_BANDS: int = 16
+DEDUP_STEM_LENGTH: int = 5
+# Zapytania uzupełniające odrzucone duplikaty (gdy AI_REPAIR_ATTEMPTS jest mniejsze)
+DEDUP_TOP_UP_ATTEMPTS: int = 2
 
 AI_API_URL = os.getenv("API_URL")
 AI_API_KEY = os.getenv("API_KEY")
 
 # Dodanie stałej dla wyboru modelu OpenAI
-OPENAI_MODEL = os.getenv("OPENAI_MODEL", "gpt-4.1")
\ No newline at end of file
+OPENAI_MODEL = os.getenv("OPENAI_MODEL", "gpt-4.1")
+
+# Dodatkowy dostawca zgodny z API OpenAI (OpenRouter); ustawienie klucza
+# włącza router wybierający najszybszy zdrowy endpoint
+OPENROUTER_API_URL: str = "https://openrouter.ai/api/v1/chat/completions"
+OPENROUTER_API_KEY = os.getenv("OPENROUTER_API_KEY")
+OPENROUTER_MODEL = os.getenv("OPENROUTER_MODEL", "openai/gpt-4.1")
+
+# Router dostawców: okno statystyk opóźnień, odsetek błędów, powyżej którego
+# dostawca jest niezdrowy (oceniany po min. liczbie próbek), budżet opóźnienia (s),
+# po którym wysyłane jest zapytanie zabezpieczające, oraz liczba wątków routera.
+# Niezdrowy dostawca dostaje zapytanie próbne co AI_ROUTER_RECOVERY_AFTER sekund
+AI_ROUTER_WINDOW: int = 50
+AI_ROUTER_MAX_ERROR_RATE: float = 0.5
+AI_ROUTER_MIN_SAMPLES: int = 5
+AI_ROUTER_RECOVERY_AFTER: float = 30.0
+AI_HEDGE_LATENCY_BUDGET: float = 8.0
+AI_ROUTER_MAX_WORKERS: int = 16
+
+# Bank pytań: plik SQLite (brak ścieżki wyłącza bank), zapas na temat,
+# poniżej którego bank uzupełnia się w tle, wielkość partii uzupełniającej,
+# limit pytań na temat i tematy uzupełniane przy starcie aplikacji
+QUESTION_BANK_PATH = os.getenv("QUESTION_BANK_PATH")
+QUESTION_BANK_MIN_STOCK: int = 40
+QUESTION_BANK_REFILL_BATCH: int = 20
+QUESTION_BANK_MAX_PER_TOPIC: int = 500
+QUESTION_BANK_WARM_TOPICS = [t.strip() for t in os.getenv("QUESTION_BANK_TOPICS", "").split(",") if t.strip()]
+
+# Menedżer sesji wielu graczy: czas bezczynności (s), po którym sesja jest
+# usuwana, limit liczby sesji i szacowanej pamięci (bajty) - po przekroczeniu
+# usuwane są najdawniej używane sesje
+SESSION_IDLE_TIMEOUT: float = 30 * 60
+SESSION_MAX_SESSIONS: int = 100_000
+SESSION_MAX_MEMORY_BYTES: int = 512 * 1024 * 1024
+
+# Trwałość sesji: odstęp (s) między zapisami migawek zmienionych sesji
+SESSION_CHECKPOINT_INTERVAL: float = 1.0
@@ -0,0 +1,396 @@
+"""
+Indeks wykrywający powtórzone i prawie identyczne pytania.
+
+Pytania są porównywane w dwóch krokach:
+1. skrót znormalizowanej treści (wielkość liter, znaki diakrytyczne,
+   interpunkcja i białe znaki nie mają znaczenia) - dokładne powtórzenia w O(1),
+2. MinHash zbioru rdzeni słów (początkowe litery słów, bez słów pytających
+   i spójników) i LSH (podział sygnatury na pasma) - parafrazy różniące się
+   szykiem, odmianą lub słowem pytającym; porównywane są tylko pytania,
+   które trafiły do wspólnego kubełka w którymś paśmie, więc koszt nie
+   rośnie liniowo z korpusem.
+
+Korpus jest zapisywany do pliku .npz z gotowymi, posortowanymi kluczami
+pasm - wczytanie to odczyt tablic bez ponownego liczenia sygnatur.
+Pytania dodane po wczytaniu trafiają do słowników w pamięci i są scalane
+z tablicami przy zapisie.
+"""
+
+from typing import Dict, List, Optional, Tuple
+import hashlib
+import os
+import threading
+import unicodedata
+import zlib
+
+from lazy_import import LazyModule
+from config import (
+    DEDUP_THRESHOLD, DEDUP_NUM_PERM, DEDUP_BANDS, DEDUP_STEM_LENGTH,
+    QUIZ_DEDUP_INDEX_PATH
+)
+
+# NumPy jest potrzebne dopiero przy pierwszym sprawdzeniu pytania
+np = LazyModule("numpy")
+
+FORMAT_VERSION = 1
+# Liczba pierwsza Mersenne'a 2^31 - 1: (a * x + b) mieści się w uint64
+_PRIME = (1 << 31) - 1
+_SEED = 0x5EED
+
+# Słowa pomijane przy porównywaniu treści (po normalizacji)
+STOPWORDS = frozenset({
+    "a", "ale", "co", "czy", "dla", "do", "i", "jak", "jaka", "jaki", "jakie",
+    "jakiego", "jest", "kiedy", "ktora", "ktore", "ktorego", "ktory", "ktorym",
+    "lub", "na", "nie", "o", "od", "oraz", "po", "przez", "sa", "sie", "to",
+    "w", "we", "z", "za", "ze",
+})
+
+
+class DedupIndexError(Exception):
+    """Nieprawidłowe parametry indeksu lub uszkodzony plik indeksu"""
+    pass
+
+
+def normalize_question(text: str) -> str:
+    """
+    Normalizuje treść pytania: małe litery, bez znaków diakrytycznych
+    i interpunkcji, pojedyncze spacje.
+    """
+    decomposed = unicodedata.normalize("NFKD", str(text).lower().replace("ł", "l"))
+    stripped = "".join(
+        char if char.isalnum() else " "
+        for char in decomposed
+        if not unicodedata.combining(char)
+    )
+    return " ".join(stripped.split())
+
+
+def question_tokens(normalized: str, stem_length: int = DEDUP_STEM_LENGTH) -> List[str]:
+    """
+    Rdzenie słów znormalizowanej treści: słowa spoza STOPWORDS obcięte
+    do stem_length liter (prosty odpowiednik stemmingu dla odmiany).
+    """
+    words = normalized.split()
+    tokens = [word[:stem_length] for word in words if word not in STOPWORDS]
+    # Treść złożona wyłącznie ze słów pomijanych porównujemy w całości
+    return tokens or [word[:stem_length] for word in words] or [""]
+
+
+class DedupIndex:
+    """
+    Korpus pytań z wyszukiwaniem duplikatów (skrót + MinHash/LSH).
+
+    Metody są bezpieczne wątkowo; check_and_add sprawdza i dodaje pytanie
+    atomowo, więc równolegle generowane części quizu nie przepuszczą
+    tego samego pytania dwa razy.
+    """
+
+    def __init__(
+        self,
+        threshold: float = DEDUP_THRESHOLD,
+        num_perm: int = DEDUP_NUM_PERM,
+        bands: int = DEDUP_BANDS,
+        stem_length: int = DEDUP_STEM_LENGTH,
+        path: Optional[str] = None
+    ):
+        """
+        Args:
+            threshold: Minimalne szacowane podobieństwo Jaccarda (0-1),
+                       od którego pytanie jest uznawane za duplikat
+            num_perm: Długość sygnatury MinHash
+            bands: Liczba pasm LSH (num_perm musi być jej wielokrotnością);
+                   więcej pasm - więcej kandydatów przy niższym podobieństwie
+            stem_length: Liczba początkowych liter słowa tworzących rdzeń
+            path: Plik .npz korpusu; istniejący jest wczytywany od razu
+        """
+        if not 0 < threshold <= 1:
+            raise DedupIndexError("Próg podobieństwa musi być z zakresu (0, 1]")
+        if bands < 1 or num_perm < 1 or num_perm % bands:
+            raise DedupIndexError("Długość sygnatury musi być wielokrotnością liczby pasm")
+        if stem_length < 1:
+            raise DedupIndexError("Długość rdzenia słowa musi być liczbą dodatnią")
+        self.threshold = threshold
+        self.num_perm = num_perm
+        self.bands = bands
+        self.rows = num_perm // bands
+        self.stem_length = stem_length
+        self.path = path
+        self._lock = threading.RLock()
+        self._params: Optional[Tuple] = None
+
+        self._texts: List[str] = []
+        # Część wczytana z pliku (tablice posortowane według kluczy)
+        self._base_count = 0
+        self._base_signatures = None
+        self._base_band_keys = None
+        self._base_band_ids = None
+        self._base_exact_keys = None
+        self._base_exact_ids = None
+        # Pytania dodane od ostatniego wczytania/zapisu
+        self._signatures: List = []
+        self._exact_keys: List[int] = []
+        self._exact: Dict[int, int] = {}
+        self._buckets: List[Dict[int, List[int]]] = [{} for _ in range(bands)]
+
+        self.lookups = 0
+        self.exact_hits = 0
+        self.near_hits = 0
+        self.candidates = 0
+
+        if path and os.path.exists(path):
+            self.load(path)
+
+    def __len__(self) -> int:
+        return len(self._texts)
+
+    # ===== MINHASH =====
+
+    def _permutations(self):
+        if self._params is None:
+            rng = np.random.default_rng(_SEED)
+            a = rng.integers(1, _PRIME, size=self.num_perm, dtype=np.uint64)
+            b = rng.integers(0, _PRIME, size=self.num_perm, dtype=np.uint64)
+            # Nieparzyste mnożniki łączące wiersze pasma w jeden klucz
+            mix = rng.integers(1, 1 << 62, size=self.rows, dtype=np.uint64) | np.uint64(1)
+            self._params = (a, b, mix)
+        return self._params
+
+    def signature(self, text: str):
+        """Sygnatura MinHash (num_perm wartości uint32) dla treści pytania."""
+        a, b, _ = self._permutations()
+        tokens = question_tokens(normalize_question(text), self.stem_length)
+        hashes = np.fromiter(
+            (zlib.crc32(token.encode("utf-8")) % _PRIME for token in set(tokens)),
+            dtype=np.uint64
+        )
+        permuted = (np.outer(a, hashes) + b[:, None]) % np.uint64(_PRIME)
+        return permuted.min(axis=1).astype(np.uint32)
+
+    def _band_keys(self, signatures):
+        # (n, num_perm) -> (n, bands): kombinacja liniowa wierszy pasma (mod 2^64)
+        _, _, mix = self._permutations()
+        grouped = signatures.reshape(-1, self.bands, self.rows).astype(np.uint64)
+        return (grouped * mix).sum(axis=2, dtype=np.uint64)
+
+    @staticmethod
+    def _exact_key(text: str) -> int:
+        digest = hashlib.blake2b(normalize_question(text).encode("utf-8"), digest_size=8).digest()
+        return int.from_bytes(digest, "little")
+
+    # ===== WYSZUKIWANIE =====
+
+    def find_duplicate(self, text: str) -> Optional[str]:
+        """
+        Zwraca treść pytania z korpusu, którego text jest duplikatem,
+        lub None, jeśli pytanie jest nowe.
+        """
+        with self._lock:
+            match, _, _ = self._lookup(text)
+            return match
+
+    def add(self, text: str) -> bool:
+        """Dodaje pytanie do korpusu; False, jeśli identyczne już w nim jest."""
+        with self._lock:
+            exact_key = self._exact_key(text)
+            if self._find_exact(exact_key) is not None:
+                return False
+            self._insert(text, exact_key, self.signature(text))
+            return True
+
+    def check_and_add(self, text: str) -> Optional[str]:
+        """
+        Atomowo sprawdza pytanie i dodaje je, jeśli jest nowe.
+
+        Returns:
+            Treść pytania, którego text jest duplikatem, lub None (dodano)
+        """
+        with self._lock:
+            match, exact_key, signature = self._lookup(text)
+            if match is None:
+                self._insert(text, exact_key, signature)
+            return match
+
+    def _lookup(self, text: str):
+        # Wywoływane z założoną blokadą
+        self.lookups += 1
+        exact_key = self._exact_key(text)
+        found = self._find_exact(exact_key)
+        if found is not None:
+            self.exact_hits += 1
+            return self._texts[found], exact_key, None
+
+        signature = self.signature(text)
+        keys = self._band_keys(signature)[0]
+        candidates = set()
+        for band, key in enumerate(keys.tolist()):
+            candidates.update(self._buckets[band].get(key, ()))
+            if self._base_count:
+                band_keys = self._base_band_keys[band]
+                lo = int(np.searchsorted(band_keys, np.uint64(key), side="left"))
+                hi = int(np.searchsorted(band_keys, np.uint64(key), side="right"))
+                candidates.update(self._base_band_ids[band][lo:hi].tolist())
+        self.candidates += len(candidates)
+
+        best, best_score = None, self.threshold
+        for candidate in candidates:
+            score = float(np.mean(self._signature_of(candidate) == signature))
+            if score >= best_score:
+                best, best_score = candidate, score
+        if best is None:
+            return None, exact_key, signature
+        self.near_hits += 1
+        return self._texts[best], exact_key, signature
+
+    def _find_exact(self, exact_key: int) -> Optional[int]:
+        found = self._exact.get(exact_key)
+        if found is not None or not self._base_count:
+            return found
+        position = int(np.searchsorted(self._base_exact_keys, np.uint64(exact_key)))
+        if position < self._base_count and int(self._base_exact_keys[position]) == exact_key:
+            return int(self._base_exact_ids[position])
+        return None
+
+    def _signature_of(self, item_id: int):
+        if item_id < self._base_count:
+            return self._base_signatures[item_id]
+        return self._signatures[item_id - self._base_count]
+
+    def _insert(self, text: str, exact_key: int, signature) -> None:
+        if signature is None:
+            signature = self.signature(text)
+        item_id = len(self._texts)
+        self._texts.append(text)
+        self._signatures.append(signature)
+        self._exact_keys.append(exact_key)
+        self._exact[exact_key] = item_id
+        for band, key in enumerate(self._band_keys(signature)[0].tolist()):
+            self._buckets[band].setdefault(key, []).append(item_id)
+
+    # ===== ZAPIS I ODCZYT =====
+
+    def save(self, path: Optional[str] = None) -> None:
+        """
+        Zapisuje korpus atomowo (plik tymczasowy + os.replace) i scala
+        pytania dodane w pamięci z tablicami posortowanymi według kluczy.
+        """
+        path = path or self.path
+        if not path:
+            raise DedupIndexError("Brak ścieżki pliku indeksu")
+        with self._lock:
+            self._compact()
+            texts = "\0".join(text.replace("\0", " ") for text in self._texts).encode("utf-8")
+            directory = os.path.dirname(os.path.abspath(path))
+            os.makedirs(directory, exist_ok=True)
+            tmp_path = path + ".tmp"
+            with open(tmp_path, "wb") as f:
+                np.savez(
+                    f,
+                    meta=np.array(
+                        [FORMAT_VERSION, self.num_perm, self.bands, self.stem_length, len(self._texts)],
+                        dtype=np.int64
+                    ),
+                    signatures=self._base_signatures,
+                    band_keys=self._base_band_keys,
+                    band_ids=self._base_band_ids,
+                    exact_keys=self._base_exact_keys,
+                    exact_ids=self._base_exact_ids,
+                    texts=np.frombuffer(texts, dtype=np.uint8),
+                )
+            os.replace(tmp_path, path)
+
+    def load(self, path: Optional[str] = None) -> None:
+        """
+        Wczytuje korpus z pliku, zastępując bieżący.
+
+        Raises:
+            DedupIndexError: Jeśli plik jest uszkodzony lub zapisany
+                             z innymi parametrami MinHash
+        """
+        path = path or self.path
+        try:
+            with np.load(path) as data:
+                meta = data["meta"].tolist()
+                arrays = {name: data[name] for name in (
+                    "signatures", "band_keys", "band_ids", "exact_keys", "exact_ids", "texts"
+                )}
+        except (OSError, KeyError, ValueError) as e:
+            raise DedupIndexError(f"Nie można wczytać indeksu {path}: {e}")
+
+        version, num_perm, bands, stem_length, count = meta
+        if version != FORMAT_VERSION:
+            raise DedupIndexError(f"Nieobsługiwana wersja indeksu: {version}")
+        if (num_perm, bands, stem_length) != (self.num_perm, self.bands, self.stem_length):
+            raise DedupIndexError("Indeks zapisano z innymi parametrami MinHash - należy go odbudować")
+        texts = arrays["texts"].tobytes().decode("utf-8").split("\0") if count else []
+        if len(texts) != count or arrays["signatures"].shape != (count, num_perm):
+            raise DedupIndexError(f"Uszkodzony indeks {path}")
+
+        with self._lock:
+            self._texts = texts
+            self._base_count = count
+            self._base_signatures = arrays["signatures"]
+            self._base_band_keys = arrays["band_keys"]
+            self._base_band_ids = arrays["band_ids"]
+            self._base_exact_keys = arrays["exact_keys"]
+            self._base_exact_ids = arrays["exact_ids"]
+            self._signatures = []
+            self._exact_keys = []
+            self._exact = {}
+            self._buckets = [{} for _ in range(self.bands)]
+
+    def _compact(self) -> None:
+        # Scala pytania z pamięci z częścią bazową (z założoną blokadą)
+        if self._base_count and not self._signatures:
+            return
+        new_signatures = (
+            np.vstack(self._signatures) if self._signatures
+            else np.empty((0, self.num_perm), dtype=np.uint32)
+        )
+        new_exact = np.array(self._exact_keys, dtype=np.uint64)
+        if self._base_count:
+            signatures = np.vstack([self._base_signatures, new_signatures])
+            old_exact = np.empty(self._base_count, dtype=np.uint64)
+            old_exact[self._base_exact_ids] = self._base_exact_keys
+            exact = np.concatenate([old_exact, new_exact])
+        else:
+            signatures, exact = new_signatures, new_exact
+
+        band_keys = self._band_keys(signatures).T.copy() if len(signatures) else np.empty((self.bands, 0), dtype=np.uint64)
+        band_ids = np.argsort(band_keys, axis=1, kind="stable")
+        exact_ids = np.argsort(exact, kind="stable")
+
+        self._base_count = len(signatures)
+        self._base_signatures = signatures
+        self._base_band_keys = np.take_along_axis(band_keys, band_ids, axis=1)
+        self._base_band_ids = band_ids.astype(np.int64)
+        self._base_exact_keys = exact[exact_ids]
+        self._base_exact_ids = exact_ids.astype(np.int64)
+        self._signatures = []
+        self._exact_keys = []
+        self._exact = {}
+        self._buckets = [{} for _ in range(self.bands)]
+
+    def get_stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "questions": len(self._texts),
+                "lookups": self.lookups,
+                "exact_hits": self.exact_hits,
+                "near_hits": self.near_hits,
+                "candidates": self.candidates,
+            }
+
+
+def create_default_dedup_index() -> DedupIndex:
+    """
+    Tworzy indeks według config.py (trwały tylko przy ustawionej ścieżce).
+
+    Uszkodzony lub niezgodny plik traktujemy jak brak korpusu - indeks
+    zaczyna od zera, a plik zostanie nadpisany przy zapisie.
+    """
+    try:
+        return DedupIndex(path=QUIZ_DEDUP_INDEX_PATH)
+    except DedupIndexError:
+        index = DedupIndex()
+        index.path = QUIZ_DEDUP_INDEX_PATH
+        return index
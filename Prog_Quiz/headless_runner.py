@@ -0,0 +1,486 @@
+"""
+Nieinteraktywne uruchamianie quizów - testy obciążeniowe i regresyjne.
+
+HeadlessUI zastępuje UITextInterface: zamiast input() odpowiada według
+strategii (skryptowej lub losowej) i niczego nie wyświetla. run_load_test
+uruchamia wiele sesji QuizApplication równolegle na lokalnym serwerze
+udającym API Chat Completions (StubAIServer) i raportuje przepustowość
+(sesje/s), opóźnienia etapów (generowanie, konwersja, ocenianie, raport)
+i szczytowe zużycie pamięci procesu.
+
+Uruchomienie (z katalogu Prog_Quiz):
+    python headless_runner.py --sessions 1000 --concurrency 50 --questions 5
+"""
+
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import argparse
+import json
+import random
+import re
+import sys
+import threading
+import time
+
+from ai_generator import AIGenerator
+from main import QuizApplication
+from config import AI_API_KEY
+
+try:
+    import resource
+except ImportError:  # Windows - brak getrusage
+    resource = None
+
+
+# Strategia odpowiada na pytanie: (numer pytania, treść, opcje) -> litera a-d
+AnswerStrategy = Callable[[int, str, Dict[str, str]], str]
+
+STAGES: Tuple[str, ...] = ("generation", "conversion", "grading", "report")
+
+
+# ===== STRATEGIE ODPOWIEDZI =====
+
+def random_strategy(seed: Optional[int] = None) -> AnswerStrategy:
+    """Losowa odpowiedź spośród wyświetlonych opcji (powtarzalna dla danego seed)."""
+    rng = random.Random(seed)
+
+    def answer(index: int, question: str, choices: Dict[str, str]) -> str:
+        return rng.choice(sorted(choices))
+
+    return answer
+
+
+def scripted_strategy(answers: str) -> AnswerStrategy:
+    """
+    Odpowiedzi z podanego ciągu liter (np. "abca"), powtarzanego cyklicznie.
+
+    Raises:
+        ValueError: Jeśli ciąg jest pusty lub zawiera litery spoza a-d
+    """
+    letters = answers.lower()
+    if not letters or set(letters) - set("abcd"):
+        raise ValueError("Skrypt odpowiedzi musi składać się z liter a, b, c, d")
+
+    def answer(index: int, question: str, choices: Dict[str, str]) -> str:
+        return letters[(index - 1) % len(letters)]
+
+    return answer
+
+
+# ===== INTERFEJS BEZ TERMINALA =====
+
+class HeadlessUI:
+    """
+    Interfejs zgodny z UITextInterface, sterowany strategią zamiast input().
+
+    Komunikaty nie są wyświetlane - trafiają do listy messages, a błędy
+    dodatkowo do errors.
+    """
+
+    def __init__(self, topic: str, n_questions: int, strategy: AnswerStrategy, rounds: int = 1):
+        """
+        Args:
+            topic: Temat zwracany przez ask_topic
+            n_questions: Liczba pytań zwracana przez ask_number_of_questions
+            strategy: Strategia wyboru odpowiedzi
+            rounds: Liczba rozgrywek w sesji (kolejne przez ask_play_again)
+        """
+        if rounds < 1:
+            raise ValueError("Liczba rozgrywek musi być liczbą dodatnią")
+        self.topic = topic
+        self.n_questions = n_questions
+        self.strategy = strategy
+        self.rounds = rounds
+        self.rounds_played = 0
+        self.answers: List[str] = []
+        self.correct = 0
+        self.messages: List[Tuple[str, str]] = []
+        self.errors: List[str] = []
+        self.reports: List[str] = []
+        self._question: Tuple[int, str, Dict[str, str]] = (0, "", {})
+
+    def display_welcome(self) -> None:
+        pass
+
+    def ask_topic(self) -> str:
+        return self.topic
+
+    def ask_number_of_questions(self, min_q: int, max_q: int) -> int:
+        if not min_q <= self.n_questions <= max_q:
+            raise ValueError(f"Liczba pytań musi być z zakresu {min_q}-{max_q}")
+        return self.n_questions
+
+    def display_question(self, index: int, question: str, choices: Dict[str, str]) -> None:
+        self._question = (index, question, dict(choices))
+
+    def get_user_choice(self) -> str:
+        choice = self.strategy(*self._question).lower()
+        if choice not in self._question[2]:
+            raise ValueError(f"Strategia zwróciła nieprawidłową odpowiedź: {choice!r}")
+        self.answers.append(choice)
+        return choice
+
+    def show_answer_feedback(
+        self,
+        is_correct: bool,
+        user_choice: str,
+        correct_choice: str,
+        correct_text: str
+    ) -> None:
+        if is_correct:
+            self.correct += 1
+
+    def display_final_report(self, report_text: str) -> None:
+        self.rounds_played += 1
+        self.reports.append(report_text)
+
+    def ask_play_again(self) -> bool:
+        return self.rounds_played < self.rounds
+
+    def show_message(self, message: str, message_type: str = "info") -> None:
+        self.messages.append((message_type, message))
+        if message_type == "error":
+            self.errors.append(message)
+
+
+# ===== POMIAR ETAPÓW =====
+
+class StageTimings:
+    """Czasy etapów rozgrywki zbierane z wielu wątków."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self.samples: Dict[str, List[float]] = {stage: [] for stage in STAGES}
+
+    @contextmanager
+    def measure(self, stage: str) -> Iterator[None]:
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - started
+            with self._lock:
+                self.samples[stage].append(elapsed)
+
+    def summary(self) -> Dict[str, Dict[str, float]]:
+        """Liczba próbek, średnia, p50 i p95 (w sekundach) dla każdego etapu."""
+        with self._lock:
+            return {stage: _describe(values) for stage, values in self.samples.items()}
+
+
+def _describe(values: List[float]) -> Dict[str, float]:
+    if not values:
+        return {"count": 0, "mean": 0.0, "p50": 0.0, "p95": 0.0}
+    ordered = sorted(values)
+    return {
+        "count": len(ordered),
+        "mean": sum(ordered) / len(ordered),
+        "p50": _percentile(ordered, 0.50),
+        "p95": _percentile(ordered, 0.95),
+    }
+
+
+def _percentile(ordered: List[float], fraction: float) -> float:
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+class TimedQuizApplication(QuizApplication):
+    """QuizApplication mierząca czas generowania, konwersji, oceniania i raportu."""
+
+    def __init__(self, timings: StageTimings, **kwargs):
+        super().__init__(**kwargs)
+        self.timings = timings
+
+    def _generate_quiz_data(self, topic, num_questions):
+        with self.timings.measure("generation"):
+            return super()._generate_quiz_data(topic, num_questions)
+
+    def _convert_to_questions(self, quiz_data):
+        with self.timings.measure("conversion"):
+            return super()._convert_to_questions(quiz_data)
+
+    def _run_quiz(self):
+        # Ocenianie odbywa się przy każdej odpowiedzi; HeadlessUI odpowiada
+        # natychmiast, więc czas pętli quizu to czas oceniania (w trybie
+        # strumieniowym także dobierania kolejnych pytań ze strumienia)
+        with self.timings.measure("grading"):
+            super()._run_quiz()
+
+    def _show_final_report(self):
+        with self.timings.measure("report"):
+            super()._show_final_report()
+
+
+def peak_rss_bytes() -> Optional[int]:
+    """Szczytowe zużycie pamięci (RSS) procesu w bajtach; None bez getrusage."""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux raportuje w KiB, macOS w bajtach
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+# ===== LOKALNY SERWER API =====
+
+_PROMPT_PATTERN = re.compile(r"Wygeneruj dokładnie (\d+) pytań quizowych na temat: (.*?)\.\n")
+
+
+class StubAIServer:
+    """
+    Lokalny serwer HTTP udający endpoint Chat Completions.
+
+    Odpowiada poprawnym quizem o liczbie pytań z promptu, również w trybie
+    strumieniowym (server-sent events). Działa w wątku w tle.
+    """
+
+    def __init__(self, latency: float = 0.0, host: str = "127.0.0.1", port: int = 0):
+        """
+        Args:
+            latency: Sztuczne opóźnienie każdej odpowiedzi w sekundach
+            host, port: Adres nasłuchiwania (port 0 - dowolny wolny)
+        """
+        self.latency = latency
+        self.requests = 0
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer((host, port), self._make_handler())
+        self._server.daemon_threads = True
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}/v1/chat/completions"
+
+    def start(self) -> "StubAIServer":
+        self._thread = threading.Thread(target=self._server.serve_forever, name="stub-ai", daemon=True)
+        self._thread.start()
+        return self
+
+    def close(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self) -> "StubAIServer":
+        return self.start()
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        self.close()
+
+    def _count_request(self) -> int:
+        with self._lock:
+            self.requests += 1
+            return self.requests
+
+    def _make_handler(self) -> type:
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def do_POST(self) -> None:
+                length = int(self.headers.get("Content-Length", 0))
+                payload = json.loads(self.rfile.read(length) or b"{}")
+                number = stub._count_request()
+                if stub.latency:
+                    time.sleep(stub.latency)
+                content = json.dumps(_stub_quiz(payload, number), ensure_ascii=False)
+                if payload.get("stream"):
+                    body = _stream_body(content)
+                    content_type = "text/event-stream"
+                else:
+                    body = json.dumps({"choices": [{"message": {"content": content}}]}).encode()
+                    content_type = "application/json"
+                self.send_response(200)
+                self.send_header("Content-Type", content_type)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format: str, *args) -> None:
+                pass
+
+        return Handler
+
+
+def _stub_quiz(payload: dict, number: int) -> List[Dict[str, str]]:
+    prompt = payload.get("messages", [{}])[-1].get("content", "")
+    match = _PROMPT_PATTERN.search(prompt)
+    count, topic = (int(match.group(1)), match.group(2)) if match else (1, "Temat")
+    return [
+        {
+            "question": f"{topic}: pytanie {number}.{i}?",
+            "a": f"Odpowiedź A{i}",
+            "b": f"Odpowiedź B{i}",
+            "c": f"Odpowiedź C{i}",
+            "d": f"Odpowiedź D{i}",
+            "correct": "abcd"[i % 4],
+        }
+        for i in range(1, count + 1)
+    ]
+
+
+def _stream_body(content: str, piece: int = 40) -> bytes:
+    events = [
+        "data: " + json.dumps({"choices": [{"delta": {"content": content[i:i + piece]}}]}) + "\n\n"
+        for i in range(0, len(content), piece)
+    ]
+    events.append("data: [DONE]\n\n")
+    return "".join(events).encode()
+
+
+# ===== TEST OBCIĄŻENIOWY =====
+
+class LoadTestResult:
+    """Wynik testu obciążeniowego."""
+
+    def __init__(
+        self,
+        sessions: int,
+        failed: int,
+        elapsed: float,
+        answers: int,
+        stages: Dict[str, Dict[str, float]],
+        peak_rss: Optional[int],
+        api_requests: int
+    ):
+        self.sessions = sessions
+        self.failed = failed
+        self.elapsed = elapsed
+        self.answers = answers
+        self.stages = stages
+        self.peak_rss = peak_rss
+        self.api_requests = api_requests
+
+    @property
+    def sessions_per_second(self) -> float:
+        completed = self.sessions - self.failed
+        return completed / self.elapsed if self.elapsed > 0 else 0.0
+
+    def format(self) -> str:
+        """Raport tekstowy: przepustowość, opóźnienia etapów i pamięć."""
+        lines = [
+            f"Sesje: {self.sessions} (nieudane: {self.failed}), czas: {self.elapsed:.2f} s",
+            f"Przepustowość: {self.sessions_per_second:.1f} sesji/s, odpowiedzi: {self.answers}, "
+            f"zapytania do API: {self.api_requests}",
+            f"{'etap':<12}{'liczba':>8}{'śr. ms':>10}{'p50 ms':>10}{'p95 ms':>10}",
+        ]
+        for stage, stats in self.stages.items():
+            lines.append(
+                f"{stage:<12}{stats['count']:>8}{stats['mean'] * 1000:>10.2f}"
+                f"{stats['p50'] * 1000:>10.2f}{stats['p95'] * 1000:>10.2f}"
+            )
+        if self.peak_rss is not None:
+            lines.append(f"Szczytowy RSS: {self.peak_rss / 2 ** 20:.1f} MiB")
+        return "\n".join(lines)
+
+
+def run_load_test(
+    sessions: int,
+    concurrency: int,
+    n_questions: int,
+    strategy_factory: Callable[[int], AnswerStrategy],
+    rounds: int = 1,
+    topic: str = "Python",
+    api_url: Optional[str] = None,
+    latency: float = 0.0,
+    stream_questions: bool = False
+) -> LoadTestResult:
+    """
+    Uruchamia sessions sesji quizu, najwyżej concurrency jednocześnie.
+
+    Args:
+        strategy_factory: Tworzy strategię dla sesji o danym numerze
+        api_url: Adres API; None - uruchamiany jest lokalny StubAIServer
+        latency: Opóźnienie odpowiedzi serwera zastępczego (s)
+        stream_questions: Czy pobierać pytania strumieniowo
+    """
+    if sessions < 1 or concurrency < 1:
+        raise ValueError("Liczba sesji i współbieżność muszą być liczbami dodatnimi")
+
+    server = StubAIServer(latency=latency).start() if api_url is None else None
+    # Wspólny generator bez cache i limitera - każda rozgrywka trafia do API
+    generator = AIGenerator(
+        api_url=server.url if server is not None else api_url,
+        api_key=AI_API_KEY if server is None else "headless",
+        pool_size=concurrency
+    )
+    timings = StageTimings()
+
+    def run_session(index: int) -> Tuple[bool, int]:
+        ui = HeadlessUI(topic, n_questions, strategy_factory(index), rounds=rounds)
+        app = TimedQuizApplication(
+            timings, ui=ui, ai_generator=generator, stream_questions=stream_questions, prefetch=False
+        )
+        try:
+            app.run()
+        except SystemExit:
+            return False, len(ui.answers)
+        finally:
+            app.close()
+        ok = not ui.errors and ui.rounds_played == rounds
+        return ok, len(ui.answers)
+
+    started = time.perf_counter()
+    try:
+        with ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="headless") as executor:
+            outcomes = list(executor.map(run_session, range(sessions)))
+    finally:
+        elapsed = time.perf_counter() - started
+        generator.close()
+        if server is not None:
+            server.close()
+
+    return LoadTestResult(
+        sessions=sessions,
+        failed=sum(1 for ok, _ in outcomes if not ok),
+        elapsed=elapsed,
+        answers=sum(answers for _, answers in outcomes),
+        stages=timings.summary(),
+        peak_rss=peak_rss_bytes(),
+        api_requests=server.requests if server is not None else 0,
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Nieinteraktywny test obciążeniowy quizu")
+    parser.add_argument("--sessions", type=int, default=100, help="Liczba sesji")
+    parser.add_argument("--concurrency", type=int, default=10, help="Liczba sesji jednocześnie")
+    parser.add_argument("--questions", type=int, default=5, help="Liczba pytań w quizie")
+    parser.add_argument("--rounds", type=int, default=1, help="Liczba rozgrywek w sesji")
+    parser.add_argument("--topic", default="Python", help="Temat quizu")
+    parser.add_argument("--strategy", choices=("random", "scripted"), default="random",
+                        help="Strategia odpowiedzi")
+    parser.add_argument("--answers", default="abcd", help="Odpowiedzi strategii skryptowej")
+    parser.add_argument("--seed", type=int, default=0, help="Ziarno strategii losowej")
+    parser.add_argument("--api-url", help="Adres API (domyślnie lokalny serwer zastępczy)")
+    parser.add_argument("--latency", type=float, default=0.0, help="Opóźnienie serwera zastępczego (s)")
+    parser.add_argument("--stream", action="store_true", help="Pobieraj pytania strumieniowo")
+    options = parser.parse_args()
+
+    if options.strategy == "scripted":
+        try:
+            script = scripted_strategy(options.answers)
+        except ValueError as e:
+            parser.error(str(e))
+        factory: Callable[[int], AnswerStrategy] = lambda index: script
+    else:
+        factory = lambda index: random_strategy(options.seed + index)
+
+    result = run_load_test(
+        sessions=options.sessions,
+        concurrency=options.concurrency,
+        n_questions=options.questions,
+        strategy_factory=factory,
+        rounds=options.rounds,
+        topic=options.topic,
+        api_url=options.api_url,
+        latency=options.latency,
+        stream_questions=options.stream,
+    )
+    print(result.format())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+"""
+Przyrostowy parser tablicy JSON dla odpowiedzi strumieniowych.
+
+Model zwraca quiz jako tablicę obiektów, ale w trybie strumieniowym treść
+przychodzi w dowolnie pociętych fragmentach. Parser śledzi zagnieżdżenie
+i łańcuchy znaków, więc każdy obiekt najwyższego poziomu tablicy jest
+zwracany zaraz po domknięciu jego nawiasu - bez czekania na resztę.
+"""
+
+from typing import Any, List
+import json
+
+
+class IncrementalArrayParser:
+    """
+    Parser tablicy JSON obiektów zasilany fragmentami tekstu.
+
+    Tekst przed pierwszym '[' (np. znacznik ```json) jest pomijany.
+    Elementy tablicy muszą być obiektami JSON.
+    """
+
+    def __init__(self) -> None:
+        self._started = False
+        self._finished = False
+        self._depth = 0
+        self._in_string = False
+        self._escape = False
+        self._buffer: List[str] = []
+
+    @property
+    def finished(self) -> bool:
+        """Czy tablica została domknięta."""
+        return self._finished
+
+    def feed(self, text: str) -> List[Any]:
+        """
+        Przetwarza kolejny fragment i zwraca obiekty domknięte w tym fragmencie.
+
+        Raises:
+            ValueError: Jeśli strumień nie jest tablicą obiektów JSON
+        """
+        completed: List[Any] = []
+        for char in text:
+            if self._finished:
+                # Tekst po tablicy (np. zamykający ```) jest ignorowany
+                break
+            if not self._started:
+                if char == "[":
+                    self._started = True
+                continue
+
+            if self._depth == 0:
+                if char == "{":
+                    self._depth = 1
+                    self._buffer = [char]
+                elif char == "]":
+                    self._finished = True
+                elif not (char.isspace() or char == ","):
+                    raise ValueError(f"Nieoczekiwany znak '{char}' - element tablicy musi być obiektem")
+                continue
+
+            self._buffer.append(char)
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif char == "\\":
+                    self._escape = True
+                elif char == '"':
+                    self._in_string = False
+            elif char == '"':
+                self._in_string = True
+            elif char in "{[":
+                self._depth += 1
+            elif char in "}]":
+                self._depth -= 1
+                if self._depth == 0:
+                    completed.append(json.loads("".join(self._buffer)))
+                    self._buffer = []
+        return completed
+
+    def close(self) -> None:
+        """
+        Sprawdza, czy strumień zakończył się domkniętą tablicą.
+
+        Raises:
+            ValueError: Jeśli tablica nie została rozpoczęta lub domknięta
+        """
+        if not self._finished:
+            raise ValueError("Strumień zakończył się przed domknięciem tablicy JSON")
@@ -0,0 +1,45 @@
+"""
+Leniwe importowanie ciężkich zależności.
+
+LazyModule zastępuje moduł do czasu pierwszego odwołania do jego atrybutu,
+dzięki czemu samo zaimportowanie np. ai_generator (i start CLI z --help)
+nie ładuje requests, httpx ani asyncio.
+"""
+
+from typing import Any, Optional
+from types import ModuleType
+import importlib
+
+
+class LazyModule:
+    """
+    Pośrednik modułu importowanego przy pierwszym dostępie do atrybutu.
+
+    Użycie:
+        requests = LazyModule("requests")
+        requests.Session()  # dopiero tutaj następuje import
+    """
+
+    def __init__(self, name: str):
+        self.__dict__["_name"] = name
+        self.__dict__["_module"] = None
+
+    def _load(self) -> ModuleType:
+        module: Optional[ModuleType] = self.__dict__["_module"]
+        if module is None:
+            module = importlib.import_module(self.__dict__["_name"])
+            self.__dict__["_module"] = module
+        return module
+
+    def __getattr__(self, attr: str) -> Any:
+        return getattr(self._load(), attr)
+
+    def __setattr__(self, attr: str, value: Any) -> None:
+        setattr(self._load(), attr, value)
+
+    def __delattr__(self, attr: str) -> None:
+        delattr(self._load(), attr)
+
+    def __repr__(self) -> str:
+        state = "załadowany" if self.__dict__["_module"] is not None else "niezaładowany"
+        return f"<LazyModule {self.__dict__['_name']!r} ({state})>"
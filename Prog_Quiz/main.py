@@ -4,33 +4,169 @@ Główny plik aplikacji Quiz AI
 Integruje wszystkie moduły i zapewnia przepływ aplikacji
 """
 
-from typing import List, Dict, Literal
+from typing import Iterator, List, Dict, Literal, Optional, Sequence
+from functools import cached_property
+import argparse
 import sys
 
-from config import MIN_QUESTIONS, MAX_QUESTIONS
+from config import (
+    MIN_QUESTIONS, MAX_QUESTIONS, QUIZ_CHUNK_SIZE, QUIZ_STREAMING, QUIZ_PREFETCH, AI_REPAIR_ATTEMPTS,
+    QUESTION_BANK_PATH, QUESTION_BANK_WARM_TOPICS, QUIZ_DEDUP
+)
 from ui_text import UITextInterface
 from ai_generator import AIGenerator, AIServiceError, InvalidModelResponseError, QuizItem
 from quiz_logic import Question, Quiz, QuizException, InvalidQuestionError, InvalidAnswerError
 from result_procesor import build_report
+from quiz_cache import QuizCache, create_default_cache
+from question_bank import QuestionBank
+from resilience import get_shared_resilience
+from providers import ProviderRouter, create_default_router
+from prefetch import QuizPrefetcher
+from dedup_index import DedupIndex, create_default_dedup_index
 
 
 class QuizApplication:
     """Główna klasa aplikacji Quiz"""
     
-    def __init__(self):
-        self.ui = UITextInterface()
-        self.ai_generator = AIGenerator()
+    def __init__(
+        self,
+        stream_questions: bool = QUIZ_STREAMING,
+        prefetch: bool = QUIZ_PREFETCH,
+        ui: Optional[UITextInterface] = None,
+        ai_generator: Optional[AIGenerator] = None
+    ):
+        """
+        Args:
+            stream_questions: Czy pobierać pytania strumieniowo (domyślnie QUIZ_STREAMING)
+            prefetch: Czy generować w tle quiz na kolejną rozgrywkę (domyślnie QUIZ_PREFETCH)
+            ui: Interfejs użytkownika (domyślnie UITextInterface); dowolny obiekt
+                z tymi samymi metodami, np. headless_runner.HeadlessUI
+            ai_generator: Generator quizów (domyślnie z konfiguracji, z cache
+                          i współdzieloną warstwą odporności). Wstrzyknięty
+                          generator jest używany bez routera, banku pytań
+                          i własnego indeksu powtórzeń; zamyka go wywołujący.
+        """
+        self.ui = ui if ui is not None else UITextInterface()
+        self.prefetch = prefetch
+        # Router, generatory, bank pytań, indeks powtórzeń i prefetcher powstają
+        # przy pierwszym użyciu (wątki i połączenia tylko wtedy, gdy są potrzebne);
+        # przy wstrzykniętym generatorze aplikacja nie tworzy własnych zasobów AI
+        self._injected_generator = ai_generator
+        self._owned_generators: List[AIGenerator] = []
+        self.stream_questions = stream_questions
+        self._question_stream: Optional[Iterator[QuizItem]] = None
         self.quiz = None
         self.quiz_data: List[QuizItem] = []
+        self.rounds_played = 0
         self.results = {
             'correct': 0,
             'wrong': 0,
             'wrong_items': []
         }
     
+    @cached_property
+    def router(self) -> Optional[ProviderRouter]:
+        """Router działa tylko przy co najmniej dwóch skonfigurowanych dostawcach."""
+        if self._injected_generator is not None:
+            return None
+        return create_default_router()
+
+    @cached_property
+    def dedup_index(self) -> Optional[DedupIndex]:
+        """
+        Korpus wydanych pytań (opcjonalny) wspólny dla wszystkich generatorów;
+        cache odpowiedzi podawałby te same pytania ponownie, więc jest wtedy wyłączony.
+        """
+        if self._injected_generator is not None:
+            return self._injected_generator.dedup_index
+        return create_default_dedup_index() if QUIZ_DEDUP else None
+
+    @cached_property
+    def ai_generator(self) -> AIGenerator:
+        """Generator quizów (domyślnie z cache i współdzieloną warstwą odporności)."""
+        if self._injected_generator is not None:
+            return self._injected_generator
+        return self._create_generator(cache=create_default_cache() if self.dedup_index is None else None)
+
+    @cached_property
+    def question_bank(self) -> Optional[QuestionBank]:
+        """Bank pytań (opcjonalny) uzupełnia się własnym generatorem bez cache."""
+        if self._injected_generator is not None or not QUESTION_BANK_PATH:
+            return None
+        return QuestionBank(self._create_generator(), path=QUESTION_BANK_PATH)
+
+    def warm_question_bank(self) -> None:
+        """
+        Zleca w tle uzupełnienie banku pytań dla tematów z konfiguracji
+        (QUESTION_BANK_WARM_TOPICS); bez banku nic nie robi.
+        """
+        if QUESTION_BANK_WARM_TOPICS and self.question_bank is not None:
+            self.question_bank.warm(QUESTION_BANK_WARM_TOPICS)
+
+    @cached_property
+    def prefetcher(self) -> Optional[QuizPrefetcher]:
+        """
+        Kolejny quiz generowany w tle (opcjonalnie) - bez cache, aby
+        ponowna gra nie powtarzała tych samych pytań.
+        """
+        if not self.prefetch:
+            return None
+        if self.question_bank is not None:
+            return QuizPrefetcher(self.question_bank.generate_quiz)
+        if self._injected_generator is not None:
+            return QuizPrefetcher(self._generate_fresh_quiz)
+        return QuizPrefetcher(self._create_generator().generate_quiz)
+
+    def _create_generator(self, cache: Optional[QuizCache] = None) -> AIGenerator:
+        generator = AIGenerator(
+            chunk_size=QUIZ_CHUNK_SIZE,
+            cache=cache,
+            repair_attempts=AI_REPAIR_ATTEMPTS,
+            resilience=get_shared_resilience(),
+            router=self.router,
+            dedup_index=self.dedup_index
+        )
+        self._owned_generators.append(generator)
+        return generator
+
+    def _generate_fresh_quiz(self, topic: str, num_questions: int) -> List[QuizItem]:
+        """Quiz z wstrzykniętego generatora z pominięciem zapisanego w cache."""
+        self._injected_generator.invalidate_cached(topic, num_questions)
+        return self._injected_generator.generate_quiz(topic, num_questions)
+
+    def close(self) -> None:
+        """
+        Zatrzymuje pracę w tle, utrwala korpus pytań i zamyka utworzone
+        zasoby; wstrzyknięty generator zamyka jego właściciel.
+        """
+        built = self.__dict__
+        if built.get("prefetcher") is not None:
+            self.prefetcher.close()
+        # Korpus pytań jest utrwalany, aby kolejne uruchomienie ich nie powtórzyło
+        if built.get("dedup_index") is not None and self.dedup_index.path:
+            self.dedup_index.save()
+        if built.get("question_bank") is not None:
+            self.question_bank.close()
+        for generator in self._owned_generators:
+            generator.close()
+        self._owned_generators.clear()
+        if built.get("router") is not None:
+            self.router.close()
+        for name in ("prefetcher", "dedup_index", "question_bank", "router"):
+            built.pop(name, None)
+
+    def __enter__(self) -> "QuizApplication":
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        self.close()
+
     def run(self):
         """Główna pętla aplikacji"""
         try:
+            # Bank pytań uzupełnia popularne tematy, zanim użytkownik wybierze temat
+            self.warm_question_bank()
+            
             # 1. Ekran powitalny
             self.ui.display_welcome()
             
@@ -40,33 +176,9 @@ class QuizApplication:
             # 3. Wybór liczby pytań
             num_questions = self.ui.ask_number_of_questions(MIN_QUESTIONS, MAX_QUESTIONS)
             
-            # 4. Generowanie pytań przez AI
-            self.ui.show_message("Generowanie pytań... Proszę czekać.", "info")
-            try:
-                self.quiz_data = self.ai_generator.generate_quiz(topic, num_questions)
-            except (AIServiceError, InvalidModelResponseError) as e:
-                self.ui.show_message(f"Błąd generowania pytań: {e}", "error")
-                return
-            except Exception as e:
-                self.ui.show_message(f"Nieoczekiwany błąd: {e}", "error")
-                return
-            
-            # 5. Konwersja do formatu quiz_logic
-            questions = self._convert_to_questions(self.quiz_data)
-            
-            # 6. Utworzenie i uruchomienie quizu
-            try:
-                self.quiz = Quiz(questions)
-                self.quiz.start()
-            except QuizException as e:
-                self.ui.show_message(f"Błąd inicjalizacji quizu: {e}", "error")
-                return
-            
-            # 7. Przeprowadzenie quizu
-            self._run_quiz()
-            
-            # 8. Wyświetlenie raportu końcowego
-            self._show_final_report()
+            # 4-8. Rozgrywki na wybrany temat, dopóki użytkownik chce grać
+            while self._play_round(topic, num_questions) and self.ui.ask_play_again():
+                pass
             
         except KeyboardInterrupt:
             self.ui.show_message("\nAplikacja przerwana przez użytkownika.", "warning")
@@ -75,6 +187,106 @@ class QuizApplication:
             self.ui.show_message(f"Krytyczny błąd aplikacji: {e}", "error")
             sys.exit(1)
     
+    def _play_round(self, topic: str, num_questions: int) -> bool:
+        """
+        Generuje quiz, przeprowadza go i wyświetla raport.
+        
+        Returns:
+            True, jeśli rozgrywka się odbyła; False po błędzie generowania
+        """
+        self._reset_round()
+        
+        # 4. Generowanie pytań przez AI (lub quiz przygotowany w tle)
+        prefetched = self.prefetcher.take(topic, num_questions) if self.prefetcher else None
+        if prefetched is not None:
+            self.quiz_data = prefetched
+        else:
+            self.ui.show_message("Generowanie pytań... Proszę czekać.", "info")
+            try:
+                self.quiz_data = self._generate_quiz_data(topic, num_questions)
+            except (AIServiceError, InvalidModelResponseError) as e:
+                self.ui.show_message(f"Błąd generowania pytań: {e}", "error")
+                return False
+            except Exception as e:
+                self.ui.show_message(f"Nieoczekiwany błąd: {e}", "error")
+                return False
+        
+        # 5. Konwersja do formatu quiz_logic
+        questions = self._convert_to_questions(self.quiz_data)
+        
+        # 6. Utworzenie i uruchomienie quizu
+        try:
+            self.quiz = Quiz(questions)
+            self.quiz.start()
+        except QuizException as e:
+            self.ui.show_message(f"Błąd inicjalizacji quizu: {e}", "error")
+            return False
+        
+        # Następny quiz powstaje w tle, gdy użytkownik odpowiada na pytania
+        if self.prefetcher is not None:
+            self.prefetcher.prefetch(topic, num_questions)
+        
+        # 7. Przeprowadzenie quizu
+        self._run_quiz()
+        
+        # 8. Wyświetlenie raportu końcowego
+        self._show_final_report()
+        self.rounds_played += 1
+        return True
+    
+    def _reset_round(self) -> None:
+        """Czyści stan poprzedniej rozgrywki."""
+        self._question_stream = None
+        self.quiz = None
+        self.quiz_data = []
+        self.results = {
+            'correct': 0,
+            'wrong': 0,
+            'wrong_items': []
+        }
+    
+    def _generate_quiz_data(self, topic: str, num_questions: int) -> List[QuizItem]:
+        """
+        Pobiera pytania z banku, strumieniowo lub jednym zapytaniem do AI.
+
+        W trybie strumieniowym zwraca tylko pierwsze pytanie - kolejne są
+        dobierane w trakcie quizu przez _pull_streamed_question().
+        """
+        if self.question_bank is not None:
+            return self.question_bank.generate_quiz(topic, num_questions)
+        # Ponowna gra nie może dostać z cache quizu z poprzedniej rozgrywki
+        if self.rounds_played:
+            self.ai_generator.invalidate_cached(topic, num_questions)
+        if not self.stream_questions:
+            return self.ai_generator.generate_quiz(topic, num_questions)
+
+        self._question_stream = self.ai_generator.stream_quiz(topic, num_questions)
+        first_item = next(self._question_stream, None)
+        if first_item is None:
+            raise InvalidModelResponseError("API nie zwróciło żadnego pytania.")
+        return [first_item]
+    
+    def _pull_streamed_question(self) -> bool:
+        """
+        Dołącza do quizu kolejne pytanie ze strumienia.
+        
+        Returns:
+            True, jeśli dodano pytanie; False, gdy strumień się zakończył
+        """
+        if self._question_stream is None:
+            return False
+        try:
+            for item in self._question_stream:
+                questions = self._convert_to_questions([item])
+                if questions:
+                    self.quiz_data.append(item)
+                    self.quiz.add_question(questions[0])
+                    return True
+        except (AIServiceError, InvalidModelResponseError) as e:
+            self.ui.show_message(f"Nie udało się pobrać kolejnych pytań: {e}", "warning")
+        self._question_stream = None
+        return False
+    
     def _convert_to_questions(self, quiz_data: List[QuizItem]) -> List[Question]:
         """
         Konwertuje dane z AI (QuizItem) do obiektów Question
@@ -110,7 +322,11 @@ class QuizApplication:
         """Przeprowadza quiz, zadając kolejne pytania"""
         question_num = 1
         
-        while not self.quiz.is_finished():
+        while True:
+            # W trybie strumieniowym quiz rośnie w trakcie gry
+            if self.quiz.is_finished() and not self._pull_streamed_question():
+                break
+            
             current_question = self.quiz.get_current_question()
             if current_question is None:
                 break
@@ -186,10 +402,27 @@ class QuizApplication:
         self.ui.display_final_report(report_text)
 
 
-def main():
+def parse_args(argv: Optional[Sequence[str]] = None) -> argparse.Namespace:
+    """Parsuje argumenty wiersza poleceń (domyślne wartości pochodzą z .env)."""
+    parser = argparse.ArgumentParser(description="Quiz AI - quiz generowany przez model językowy")
+    parser.add_argument(
+        "--no-stream", dest="stream", action="store_false", default=QUIZ_STREAMING,
+        help="Pobierz wszystkie pytania jednym zapytaniem (nadpisuje QUIZ_STREAMING)"
+    )
+    parser.add_argument(
+        "--prefetch", action="store_true", default=QUIZ_PREFETCH,
+        help="Generuj w tle quiz na kolejną rozgrywkę (nadpisuje QUIZ_PREFETCH)"
+    )
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[Sequence[str]] = None):
     """Punkt wejścia aplikacji"""
-    app = QuizApplication()
-    app.run()
+    # Argumenty są parsowane przed utworzeniem klientów HTTP - --help
+    # kończy działanie bez żadnej pracy sieciowej
+    args = parse_args(argv)
+    with QuizApplication(stream_questions=args.stream, prefetch=args.prefetch) as app:
+        app.run()
 
 
 if __name__ == "__main__":
@@ -0,0 +1,124 @@
+"""
+Generowanie kolejnego quizu w tle, zanim użytkownik o niego poprosi.
+
+Gdy użytkownik odpowiada na pytania, QuizPrefetcher generuje następny quiz
+na ten sam temat. Jeśli użytkownik zagra ponownie, quiz jest gotowy od razu;
+jeśli zakończy grę, oczekujące generowanie jest anulowane, a jego wynik
+odrzucany.
+"""
+
+from typing import Callable, Dict, List, Optional, Tuple
+from concurrent.futures import Future, ThreadPoolExecutor
+import threading
+
+from ai_generator import QuizItem
+from quiz_cache import normalize_topic
+
+
+class QuizPrefetcher:
+    """
+    Przechowuje co najwyżej jeden quiz generowany z wyprzedzeniem.
+    """
+
+    def __init__(self, fetch: Callable[[str, int], List[QuizItem]]):
+        """
+        Args:
+            fetch: Funkcja generująca zwalidowany quiz (temat, liczba pytań),
+                   np. AIGenerator.generate_quiz
+        """
+        self._fetch = fetch
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="quiz-prefetch")
+        self._lock = threading.Lock()
+        self._pending: Optional[Tuple[Tuple[str, int], Future]] = None
+        self.requests = 0
+        self.hits = 0
+        self.misses = 0
+        self.errors = 0
+        self.cancelled = 0
+
+    def prefetch(self, topic: str, n_questions: int) -> Future:
+        """
+        Zleca wygenerowanie quizu w tle; poprzednie zlecenie jest anulowane.
+        """
+        key = (normalize_topic(topic), n_questions)
+        with self._lock:
+            self._cancel_pending()
+            future = self._executor.submit(self._fetch, topic, n_questions)
+            self._pending = (key, future)
+        return future
+
+    def take(self, topic: str, n_questions: int, timeout: Optional[float] = None) -> Optional[List[QuizItem]]:
+        """
+        Zwraca quiz wygenerowany z wyprzedzeniem, jeśli pasuje do tematu
+        i liczby pytań; generowanie w toku jest dokończane (najwyżej timeout s).
+
+        Returns:
+            Lista pytań lub None, gdy quizu nie ma - wtedy należy go
+            wygenerować zwykłą ścieżką
+        """
+        key = (normalize_topic(topic), n_questions)
+        with self._lock:
+            self.requests += 1
+            pending, self._pending = self._pending, None
+        if pending is None or pending[0] != key:
+            if pending is not None:
+                self._cancel(pending[1])
+            self._count("misses")
+            return None
+
+        try:
+            quiz = pending[1].result(timeout=timeout)
+        except TimeoutError:
+            self._cancel(pending[1])
+            self._count("misses")
+            return None
+        except Exception:
+            # Błąd generowania w tle (lub anulowanie) - zwykła ścieżka
+            # wygeneruje quiz ponownie i sama zgłosi ewentualny błąd
+            self._count("errors")
+            self._count("misses")
+            return None
+        self._count("hits")
+        return quiz
+
+    def cancel(self) -> None:
+        """Anuluje oczekujące generowanie (np. gdy użytkownik kończy grę)."""
+        with self._lock:
+            self._cancel_pending()
+
+    def _cancel_pending(self) -> None:
+        # Wywoływane z założoną blokadą. Trwającego zapytania HTTP nie da się
+        # przerwać - jego wynik jest po prostu odrzucany
+        if self._pending is not None:
+            self._pending[1].cancel()
+            self._pending = None
+            self.cancelled += 1
+
+    def _cancel(self, future: Future) -> None:
+        future.cancel()
+        self._count("cancelled")
+
+    def _count(self, counter: str) -> None:
+        with self._lock:
+            setattr(self, counter, getattr(self, counter) + 1)
+
+    @property
+    def hit_rate(self) -> float:
+        """Odsetek rozgrywek rozpoczętych quizem wygenerowanym z wyprzedzeniem."""
+        return self.hits / self.requests if self.requests else 0.0
+
+    def get_stats(self) -> Dict[str, float]:
+        with self._lock:
+            return {
+                "requests": self.requests,
+                "hits": self.hits,
+                "misses": self.misses,
+                "errors": self.errors,
+                "cancelled": self.cancelled,
+                "hit_rate": self.hits / self.requests if self.requests else 0.0,
+            }
+
+    def close(self) -> None:
+        """Anuluje oczekujące generowanie i zamyka wątek roboczy."""
+        self.cancel()
+        self._executor.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,377 @@
+"""
+Wielu dostawców AI zgodnych z API OpenAI i wybór najszybszego z nich.
+
+ProviderRouter śledzi dla każdego endpointu kroczące opóźnienia (p50/p95)
+i odsetek błędów, kieruje zapytania do najszybszego zdrowego dostawcy,
+a gdy zapytanie przekroczy budżet opóźnienia - wysyła duplikat do
+kolejnego dostawcy (hedging) i przyjmuje pierwszą odpowiedź. Niezdrowy
+dostawca co recovery_after sekund dostaje zapytanie próbne, więc po awarii
+może wrócić do rankingu.
+"""
+
+from typing import Any, Awaitable, Callable, Deque, Dict, List, Optional, Tuple, Type
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+import threading
+import time
+
+from resilience import RateLimiter, Resilience, get_shared_resilience
+from lazy_import import LazyModule
+from config import (
+    AI_API_URL, AI_API_KEY, OPENAI_MODEL,
+    OPENROUTER_API_URL, OPENROUTER_API_KEY, OPENROUTER_MODEL,
+    AI_ROUTER_WINDOW, AI_ROUTER_MAX_ERROR_RATE, AI_ROUTER_MIN_SAMPLES, AI_ROUTER_RECOVERY_AFTER,
+    AI_HEDGE_LATENCY_BUDGET, AI_ROUTER_MAX_WORKERS
+)
+
+# asyncio jest potrzebne tylko w ścieżce asynchronicznej
+asyncio = LazyModule("asyncio")
+
+
+class Provider:
+    """
+    Endpoint Chat Completions zgodny z API OpenAI.
+
+    Każdy dostawca ma własną warstwę odporności, więc awaria jednego
+    endpointu nie otwiera obwodu pozostałym.
+    """
+
+    def __init__(self, name: str, api_url: str, api_key: str, model: str,
+                 resilience: Optional[Resilience] = None):
+        if not name or not api_url or not api_key or not model:
+            raise ValueError("Dostawca wymaga nazwy, adresu, klucza i modelu")
+        self.name = name
+        self.api_url = api_url
+        self.api_key = api_key
+        self.model = model
+        self.resilience = resilience
+
+    def __repr__(self) -> str:
+        return f"Provider({self.name!r}, model={self.model!r})"
+
+
+class LatencyTracker:
+    """
+    Okno ostatnich wyników dostawcy: opóźnienia udanych zapytań i błędy.
+    """
+
+    def __init__(self, window: int = AI_ROUTER_WINDOW):
+        if window < 1:
+            raise ValueError("Okno statystyk musi być liczbą dodatnią")
+        self._samples: Deque[Tuple[float, bool]] = deque(maxlen=window)
+        self._lock = threading.Lock()
+        self.total = 0
+
+    def record(self, latency: float, ok: bool) -> None:
+        with self._lock:
+            self._samples.append((latency, ok))
+            self.total += 1
+
+    def _percentile(self, fraction: float) -> Optional[float]:
+        with self._lock:
+            latencies = sorted(latency for latency, ok in self._samples if ok)
+        if not latencies:
+            return None
+        index = min(len(latencies) - 1, int(round(fraction * (len(latencies) - 1))))
+        return latencies[index]
+
+    @property
+    def p50(self) -> Optional[float]:
+        return self._percentile(0.5)
+
+    @property
+    def p95(self) -> Optional[float]:
+        return self._percentile(0.95)
+
+    @property
+    def samples(self) -> int:
+        return len(self._samples)
+
+    @property
+    def successes(self) -> int:
+        with self._lock:
+            return sum(1 for _, ok in self._samples if ok)
+
+    def reset(self) -> None:
+        """Czyści okno (np. po udanej próbie niezdrowego dostawcy)."""
+        with self._lock:
+            self._samples.clear()
+
+    @property
+    def error_rate(self) -> float:
+        with self._lock:
+            if not self._samples:
+                return 0.0
+            return sum(1 for _, ok in self._samples if not ok) / len(self._samples)
+
+
+class ProviderRouter:
+    """
+    Wybiera dostawcę dla zapytania i realizuje hedging oraz failover.
+    """
+
+    def __init__(
+        self,
+        providers: List[Provider],
+        hedge_after: Optional[float] = AI_HEDGE_LATENCY_BUDGET,
+        window: int = AI_ROUTER_WINDOW,
+        max_error_rate: float = AI_ROUTER_MAX_ERROR_RATE,
+        min_samples: int = AI_ROUTER_MIN_SAMPLES,
+        max_workers: int = AI_ROUTER_MAX_WORKERS,
+        recovery_after: float = AI_ROUTER_RECOVERY_AFTER,
+        clock: Callable[[], float] = time.monotonic
+    ):
+        """
+        Args:
+            providers: Lista dostawców (kolejność rozstrzyga remisy)
+            hedge_after: Budżet opóźnienia (s), po którym wysyłany jest
+                         duplikat do kolejnego dostawcy; None wyłącza hedging
+            window: Liczba ostatnich zapytań branych do statystyk
+            max_error_rate: Odsetek błędów, powyżej którego dostawca jest niezdrowy
+            min_samples: Minimalna liczba próbek do oceny zdrowia dostawcy
+            max_workers: Liczba wątków wykonujących zapytania synchroniczne
+            recovery_after: Czas (s), po którym niezdrowy dostawca dostaje
+                            jedno zapytanie próbne; sukces czyści jego okno
+            clock: Źródło czasu (do testów)
+        """
+        if not providers:
+            raise ValueError("Router wymaga co najmniej jednego dostawcy")
+        if len({provider.name for provider in providers}) != len(providers):
+            raise ValueError("Nazwy dostawców muszą być unikalne")
+        self.providers = list(providers)
+        self.hedge_after = hedge_after
+        self.max_error_rate = max_error_rate
+        self.min_samples = min_samples
+        self.recovery_after = recovery_after
+        self._clock = clock
+        # Czas, od którego niezdrowy dostawca może dostać zapytanie próbne
+        self._next_probe: Dict[str, float] = {}
+        self.trackers: Dict[str, LatencyTracker] = {
+            provider.name: LatencyTracker(window) for provider in providers
+        }
+        self.hedged = 0
+        self.failovers = 0
+        self.probes = 0
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="provider")
+        self._lock = threading.Lock()
+
+    def is_healthy(self, provider: Provider) -> bool:
+        tracker = self.trackers[provider.name]
+        return tracker.samples < self.min_samples or tracker.error_rate <= self.max_error_rate
+
+    def rank(self) -> List[Provider]:
+        """
+        Zwraca dostawców od najlepszego:
+        - niezdrowi, którym minął recovery_after - jedno zapytanie próbne,
+        - zdrowi bez pomiarów (sprawdzani w pierwszej kolejności),
+        - zdrowi według p50,
+        - zdrowi z samymi błędami w oknie (za mało próbek, by ich wykluczyć),
+        - pozostali niezdrowi według odsetka błędów.
+        """
+        now = self._clock()
+        probes = set()
+        with self._lock:
+            for provider in self.providers:
+                if self.is_healthy(provider):
+                    self._next_probe.pop(provider.name, None)
+                    continue
+                probe_at = self._next_probe.setdefault(provider.name, now + self.recovery_after)
+                if now >= probe_at:
+                    # Kolejna próba dopiero po następnym okresie - naraz trwa najwyżej jedna
+                    self._next_probe[provider.name] = now + self.recovery_after
+                    self.probes += 1
+                    probes.add(provider.name)
+
+        def key(indexed: Tuple[int, Provider]) -> Tuple:
+            index, provider = indexed
+            tracker = self.trackers[provider.name]
+            if provider.name in probes:
+                return (0, 0.0, index)
+            if not self.is_healthy(provider):
+                return (4, tracker.error_rate, index)
+            if not tracker.samples:
+                return (1, 0.0, index)
+            p50 = tracker.p50
+            if p50 is None:
+                return (3, tracker.samples, index)
+            return (2, p50, index)
+
+        return [provider for _, provider in sorted(enumerate(self.providers), key=key)]
+
+    def record(self, provider: Provider, latency: float, ok: bool) -> None:
+        """Zapisuje wynik zapytania wykonanego poza routerem."""
+        tracker = self.trackers[provider.name]
+        if ok and not self.is_healthy(provider):
+            # Udana próba: dawne błędy nie blokują powrotu dostawcy do rankingu
+            tracker.reset()
+        tracker.record(latency, ok)
+
+    def _record(self, provider: Provider, started: float, error: Optional[BaseException],
+                failover_on: Tuple[Type[BaseException], ...]) -> None:
+        # Błąd spoza failover_on (np. zła treść od modelu) nie świadczy o awarii endpointu
+        ok = error is None or not isinstance(error, failover_on)
+        self.record(provider, time.perf_counter() - started, ok)
+
+    def _count(self, counter: str) -> None:
+        with self._lock:
+            setattr(self, counter, getattr(self, counter) + 1)
+
+    def call(self, fn: Callable[[Provider], Any],
+             failover_on: Tuple[Type[BaseException], ...] = (Exception,)) -> Any:
+        """
+        Wykonuje fn(provider) u najlepszego dostawcy.
+
+        Po przekroczeniu hedge_after wysyła jeden duplikat do kolejnego
+        dostawcy i zwraca pierwszy udany wynik. Błędy z failover_on powodują
+        przejście do kolejnego dostawcy; pozostałe wyjątki są przekazywane dalej.
+        """
+        remaining = self.rank()
+        pending: Dict[Future, Provider] = {}
+        hedges_left = 1
+
+        def submit(provider: Provider) -> None:
+            started = time.perf_counter()
+            future = self._executor.submit(fn, provider)
+
+            def on_done(done: Future) -> None:
+                if not done.cancelled():
+                    self._record(provider, started, done.exception(), failover_on)
+
+            future.add_done_callback(on_done)
+            pending[future] = provider
+
+        submit(remaining.pop(0))
+        last_error: Optional[BaseException] = None
+        while pending:
+            can_hedge = hedges_left > 0 and remaining and self.hedge_after is not None
+            done, _ = wait(list(pending), timeout=self.hedge_after if can_hedge else None,
+                           return_when=FIRST_COMPLETED)
+            if not done:
+                # Przekroczony budżet opóźnienia - zapytanie zabezpieczające
+                hedges_left -= 1
+                self._count("hedged")
+                submit(remaining.pop(0))
+                continue
+            for future in done:
+                pending.pop(future)
+                try:
+                    return future.result()
+                except failover_on as e:
+                    last_error = e
+            if not pending and remaining:
+                self._count("failovers")
+                submit(remaining.pop(0))
+        raise last_error
+
+    def failover(self, fn: Callable[[Provider], Any],
+                 failover_on: Tuple[Type[BaseException], ...] = (Exception,)) -> Any:
+        """
+        Wykonuje fn(provider) kolejno u dostawców według rank(), bez hedgingu.
+
+        Służy do otwierania strumieni: duplikat strumienia zajmowałby
+        połączenie i limit drugiego dostawcy do końca odpowiedzi, więc
+        kolejny dostawca dostaje zapytanie dopiero po błędzie poprzedniego.
+        """
+        last_error: Optional[BaseException] = None
+        for index, provider in enumerate(self.rank()):
+            if index:
+                self._count("failovers")
+            started = time.perf_counter()
+            try:
+                result = fn(provider)
+            except failover_on as e:
+                self._record(provider, started, e, failover_on)
+                last_error = e
+                continue
+            except Exception as e:
+                self._record(provider, started, e, failover_on)
+                raise
+            self._record(provider, started, None, failover_on)
+            return result
+        raise last_error
+
+    async def acall(self, fn: Callable[[Provider], Awaitable[Any]],
+                    failover_on: Tuple[Type[BaseException], ...] = (Exception,)) -> Any:
+        """
+        Asynchroniczny odpowiednik call(); przegrane zapytania są anulowane.
+        """
+        remaining = self.rank()
+        pending: Dict[asyncio.Future, Provider] = {}
+        hedges_left = 1
+
+        def submit(provider: Provider) -> None:
+            started = time.perf_counter()
+            task = asyncio.ensure_future(fn(provider))
+
+            def on_done(done: asyncio.Future) -> None:
+                if not done.cancelled():
+                    self._record(provider, started, done.exception(), failover_on)
+
+            task.add_done_callback(on_done)
+            pending[task] = provider
+
+        submit(remaining.pop(0))
+        last_error: Optional[BaseException] = None
+        try:
+            while pending:
+                can_hedge = hedges_left > 0 and remaining and self.hedge_after is not None
+                done, _ = await asyncio.wait(list(pending), timeout=self.hedge_after if can_hedge else None,
+                                             return_when=asyncio.FIRST_COMPLETED)
+                if not done:
+                    hedges_left -= 1
+                    self._count("hedged")
+                    submit(remaining.pop(0))
+                    continue
+                for task in done:
+                    pending.pop(task)
+                    try:
+                        return task.result()
+                    except failover_on as e:
+                        last_error = e
+                if not pending and remaining:
+                    self._count("failovers")
+                    submit(remaining.pop(0))
+            raise last_error
+        finally:
+            for task in pending:
+                task.cancel()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Zwraca statystyki dostawców oraz liczniki hedgingu i failoveru."""
+        return {
+            "providers": {
+                provider.name: {
+                    "p50": self.trackers[provider.name].p50,
+                    "p95": self.trackers[provider.name].p95,
+                    "error_rate": self.trackers[provider.name].error_rate,
+                    "requests": self.trackers[provider.name].total,
+                    "healthy": self.is_healthy(provider),
+                }
+                for provider in self.providers
+            },
+            "hedged": self.hedged,
+            "failovers": self.failovers,
+            "probes": self.probes,
+        }
+
+    def close(self) -> None:
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+
+def configured_providers() -> List[Provider]:
+    """Zwraca dostawców skonfigurowanych w .env (główne API i OpenRouter)."""
+    providers = []
+    if AI_API_URL and AI_API_KEY:
+        providers.append(Provider("primary", AI_API_URL, AI_API_KEY, OPENAI_MODEL, get_shared_resilience()))
+    if OPENROUTER_API_KEY:
+        providers.append(Provider(
+            "openrouter", OPENROUTER_API_URL, OPENROUTER_API_KEY, OPENROUTER_MODEL,
+            Resilience(limiter=RateLimiter())
+        ))
+    return providers
+
+
+def create_default_router() -> Optional[ProviderRouter]:
+    """Tworzy router, jeśli skonfigurowano co najmniej dwóch dostawców."""
+    providers = configured_providers()
+    return ProviderRouter(providers) if len(providers) > 1 else None
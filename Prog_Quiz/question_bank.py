@@ -0,0 +1,226 @@
+"""
+Bank gotowych pytań quizowych.
+
+Bank przechowuje zwalidowane pytania (QuizItem) osobno dla każdego
+znormalizowanego tematu i uzupełnia je w tle przez AIGenerator. Sesje dla
+tematów z wystarczającym zapasem są obsługiwane losowaniem z indeksu, bez
+czekania na API; do generatora trafiają tylko tematy z za małym zapasem.
+"""
+
+from typing import Dict, Iterable, List, Optional, Set
+from concurrent.futures import Future, ThreadPoolExecutor, wait
+import json
+import random
+import sqlite3
+import threading
+
+from ai_generator import AIGenerator, AIServiceError, InvalidModelResponseError, QuizItem
+from config import (
+    QUESTION_BANK_MIN_STOCK, QUESTION_BANK_REFILL_BATCH, QUESTION_BANK_MAX_PER_TOPIC
+)
+from quiz_cache import normalize_topic
+
+
+def normalize_question(text: str) -> str:
+    """Klucz deduplikacji pytania: małe litery i pojedyncze spacje."""
+    return " ".join(text.lower().split())
+
+
+class QuestionBank:
+    """
+    Lokalny magazyn pytań z uzupełnianiem w tle i losowaniem z indeksu.
+
+    Generator przekazany do banku nie powinien mieć cache - uzupełnianie
+    wymaga nowych pytań, a nie powtórzenia ostatniej odpowiedzi.
+    """
+
+    def __init__(
+        self,
+        generator: AIGenerator,
+        path: Optional[str] = None,
+        min_stock: int = QUESTION_BANK_MIN_STOCK,
+        refill_batch: int = QUESTION_BANK_REFILL_BATCH,
+        max_per_topic: int = QUESTION_BANK_MAX_PER_TOPIC,
+        rng: Optional[random.Random] = None
+    ):
+        """
+        Args:
+            generator: Generator używany do uzupełniania i jako rezerwa
+            path: Plik SQLite z pytaniami (None - bank tylko w pamięci)
+            min_stock: Zapas, poniżej którego temat jest uzupełniany w tle
+            refill_batch: Liczba pytań w jednym zapytaniu uzupełniającym
+            max_per_topic: Maksymalna liczba pytań przechowywanych na temat
+            rng: Generator liczb losowych (dla powtarzalności w testach)
+        """
+        if min_stock < 1 or refill_batch < 1 or max_per_topic < min_stock:
+            raise ValueError("Niepoprawna konfiguracja banku pytań")
+        self.generator = generator
+        self.min_stock = min_stock
+        self.refill_batch = refill_batch
+        self.max_per_topic = max_per_topic
+        self._rng = rng if rng is not None else random.Random()
+        self._items: Dict[str, List[QuizItem]] = {}
+        self._seen: Dict[str, Set[str]] = {}
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="question-bank")
+        self._pending: Dict[str, Future] = {}
+        self.served_from_bank = 0
+        self.fallbacks = 0
+        self.refill_errors = 0
+
+        self._conn: Optional[sqlite3.Connection] = None
+        if path:
+            self._conn = sqlite3.connect(path, check_same_thread=False)
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS questions ("
+                " topic TEXT NOT NULL,"
+                " question_key TEXT NOT NULL,"
+                " item TEXT NOT NULL,"
+                " PRIMARY KEY (topic, question_key))"
+            )
+            self._conn.commit()
+            self._load()
+
+    def _load(self) -> None:
+        """Wczytuje pytania z dysku do indeksu, pomijając niepoprawne wpisy."""
+        for topic, item_json in self._conn.execute("SELECT topic, item FROM questions"):
+            try:
+                item = json.loads(item_json)
+                self.generator._validate_quiz_item(item)
+            except (ValueError, TypeError, InvalidModelResponseError):
+                continue
+            self._add_to_index(topic, item)
+
+    def _add_to_index(self, topic: str, item: QuizItem) -> bool:
+        key = normalize_question(item["question"])
+        seen = self._seen.setdefault(topic, set())
+        items = self._items.setdefault(topic, [])
+        if key in seen or len(items) >= self.max_per_topic:
+            return False
+        seen.add(key)
+        items.append(item)
+        return True
+
+    def add_items(self, topic: str, items: Iterable[QuizItem]) -> int:
+        """
+        Dodaje pytania do banku (z walidacją i deduplikacją po treści pytania).
+
+        Returns:
+            Liczba faktycznie dodanych pytań
+        """
+        topic = normalize_topic(topic)
+        added: List[QuizItem] = []
+        with self._lock:
+            for item in items:
+                try:
+                    self.generator._validate_quiz_item(item)
+                except (TypeError, InvalidModelResponseError):
+                    continue
+                if self._add_to_index(topic, dict(item)):
+                    added.append(item)
+            if self._conn is not None and added:
+                self._conn.executemany(
+                    "INSERT OR IGNORE INTO questions (topic, question_key, item) VALUES (?, ?, ?)",
+                    [(topic, normalize_question(item["question"]), json.dumps(item, ensure_ascii=False))
+                     for item in added]
+                )
+                self._conn.commit()
+        return len(added)
+
+    def stock(self, topic: str) -> int:
+        """Zwraca liczbę pytań w banku dla tematu."""
+        with self._lock:
+            return len(self._items.get(normalize_topic(topic), ()))
+
+    def generate_quiz(self, topic: str, n_questions: int) -> List[QuizItem]:
+        """
+        Zwraca quiz wylosowany z banku, a przy zbyt małym zapasie - z generatora.
+
+        Interfejs zgodny z AIGenerator.generate_quiz. Po każdym wywołaniu temat
+        z zapasem poniżej min_stock jest uzupełniany w tle.
+        """
+        self.generator._validate_input(topic, n_questions)
+        key = normalize_topic(topic)
+        with self._lock:
+            items = self._items.get(key, [])
+            if len(items) >= n_questions:
+                # random.sample wybiera n pozycji z indeksu bez kopiowania pytań
+                quiz = [dict(item) for item in self._rng.sample(items, n_questions)]
+                self.served_from_bank += 1
+            else:
+                quiz = None
+
+        if quiz is None:
+            self.fallbacks += 1
+            quiz = self.generator.generate_quiz(topic, n_questions)
+            self.add_items(topic, quiz)
+        self.ensure_stock(topic)
+        return quiz
+
+    def ensure_stock(self, topic: str) -> Optional[Future]:
+        """
+        Planuje uzupełnienie tematu w tle, jeśli zapas jest poniżej min_stock.
+
+        Returns:
+            Future zadania uzupełniania lub None, jeśli nie jest potrzebne
+        """
+        key = normalize_topic(topic)
+        with self._lock:
+            if len(self._items.get(key, ())) >= self.min_stock:
+                return None
+            pending = self._pending.get(key)
+            if pending is not None and not pending.done():
+                return pending
+            future = self._executor.submit(self._refill, topic)
+            self._pending[key] = future
+            return future
+
+    def warm(self, topics: Iterable[str]) -> List[Future]:
+        """Planuje uzupełnienie w tle dla listy popularnych tematów."""
+        futures = [self.ensure_stock(topic) for topic in topics]
+        return [future for future in futures if future is not None]
+
+    def _refill(self, topic: str) -> int:
+        """
+        Dobiera pytania do min_stock; kończy, gdy kolejna partia nic nie wnosi.
+        """
+        total_added = 0
+        max_rounds = -(-self.min_stock // self.refill_batch) + 1
+        for _ in range(max_rounds):
+            missing = self.min_stock - self.stock(topic)
+            if missing <= 0:
+                break
+            try:
+                batch = self.generator.generate_quiz(topic, self.refill_batch)
+            except (AIServiceError, InvalidModelResponseError, ValueError):
+                self.refill_errors += 1
+                break
+            added = self.add_items(topic, batch)
+            total_added += added
+            if added == 0:
+                break
+        return total_added
+
+    def wait_for_refills(self, timeout: Optional[float] = None) -> None:
+        """Czeka na zakończenie zaplanowanych uzupełnień."""
+        with self._lock:
+            futures = list(self._pending.values())
+        wait(futures, timeout=timeout)
+
+    def get_stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "topics": len(self._items),
+                "questions": sum(len(items) for items in self._items.values()),
+                "served_from_bank": self.served_from_bank,
+                "fallbacks": self.fallbacks,
+                "refill_errors": self.refill_errors,
+            }
+
+    def close(self) -> None:
+        """Anuluje oczekujące uzupełnienia i zamyka plik banku."""
+        self._executor.shutdown(wait=False, cancel_futures=True)
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
@@ -0,0 +1,280 @@
+"""
+Cache odpowiedzi generatora quizów adresowany treścią zapytania.
+
+Klucz to skrót SHA-256 znormalizowanego payloadu Chat Completions, więc
+identyczne zapytania (temat, liczba pytań, model, temperatura) trafiają
+w ten sam wpis. Cache składa się z warstwy w pamięci (LRU) i opcjonalnej
+warstwy dyskowej (SQLite); obie mają TTL i limit liczby wpisów.
+"""
+
+from typing import Any, Dict, List, Optional
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+
+from config import (
+    QUIZ_CACHE_TTL, QUIZ_CACHE_MAX_ENTRIES, QUIZ_CACHE_DISK_PATH, QUIZ_CACHE_DISK_MAX_ENTRIES
+)
+
+
+def normalize_topic(topic: str) -> str:
+    """Normalizuje temat: małe litery, pojedyncze spacje, bez spacji na brzegach."""
+    return " ".join(topic.lower().split())
+
+
+def make_cache_key(payload: Dict[str, Any]) -> str:
+    """
+    Zwraca skrót SHA-256 payloadu zapytania (niezależny od kolejności kluczy).
+    """
+    canonical = json.dumps(payload, sort_keys=True, ensure_ascii=False, separators=(",", ":"))
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+class CacheTier(ABC):
+    """
+    Bazowa klasa warstwy cache. Wartości to listy pytań (dane JSON).
+
+    Warstwa bez którejkolwiek z metod nie da się utworzyć (TypeError).
+    """
+
+    @abstractmethod
+    def get(self, key: str) -> Optional[List[dict]]:
+        ...
+
+    @abstractmethod
+    def set(self, key: str, value: List[dict]) -> None:
+        ...
+
+    @abstractmethod
+    def delete(self, key: str) -> None:
+        ...
+
+    @abstractmethod
+    def clear(self) -> None:
+        ...
+
+    @abstractmethod
+    def __len__(self) -> int:
+        ...
+
+
+class MemoryCacheTier(CacheTier):
+    """
+    Warstwa w pamięci z polityką LRU i czasem życia wpisów.
+    """
+
+    def __init__(self, max_entries: int = QUIZ_CACHE_MAX_ENTRIES, ttl: float = QUIZ_CACHE_TTL):
+        if max_entries < 1:
+            raise ValueError("Limit wpisów cache musi być liczbą dodatnią")
+        if ttl <= 0:
+            raise ValueError("TTL cache musi być liczbą dodatnią")
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.evictions = 0
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[List[dict]]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if expires_at <= time.time():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: List[dict]) -> None:
+        with self._lock:
+            self._entries[key] = (time.time() + self.ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class SQLiteCacheTier(CacheTier):
+    """
+    Trwała warstwa w pliku SQLite. Przy przekroczeniu limitu usuwane są
+    wpisy najdawniej odczytane.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        max_entries: int = QUIZ_CACHE_DISK_MAX_ENTRIES,
+        ttl: float = QUIZ_CACHE_TTL
+    ):
+        if max_entries < 1:
+            raise ValueError("Limit wpisów cache musi być liczbą dodatnią")
+        if ttl <= 0:
+            raise ValueError("TTL cache musi być liczbą dodatnią")
+        self.path = path
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.evictions = 0
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS quiz_cache ("
+            " key TEXT PRIMARY KEY,"
+            " value TEXT NOT NULL,"
+            " expires_at REAL NOT NULL,"
+            " accessed_at REAL NOT NULL)"
+        )
+        self._conn.commit()
+
+    def get(self, key: str) -> Optional[List[dict]]:
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value, expires_at FROM quiz_cache WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            value, expires_at = row
+            if expires_at <= now:
+                self._conn.execute("DELETE FROM quiz_cache WHERE key = ?", (key,))
+                self._conn.commit()
+                return None
+            try:
+                data = json.loads(value)
+            except ValueError:
+                # Uszkodzony wpis traktujemy jak brak wpisu
+                self._conn.execute("DELETE FROM quiz_cache WHERE key = ?", (key,))
+                self._conn.commit()
+                return None
+            self._conn.execute("UPDATE quiz_cache SET accessed_at = ? WHERE key = ?", (now, key))
+            self._conn.commit()
+            return data
+
+    def set(self, key: str, value: List[dict]) -> None:
+        now = time.time()
+        encoded = json.dumps(value, ensure_ascii=False)
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO quiz_cache (key, value, expires_at, accessed_at) VALUES (?, ?, ?, ?)",
+                (key, encoded, now + self.ttl, now)
+            )
+            self._conn.execute("DELETE FROM quiz_cache WHERE expires_at <= ?", (now,))
+            overflow = self._conn.execute("SELECT COUNT(*) FROM quiz_cache").fetchone()[0] - self.max_entries
+            if overflow > 0:
+                self._conn.execute(
+                    "DELETE FROM quiz_cache WHERE key IN "
+                    "(SELECT key FROM quiz_cache ORDER BY accessed_at ASC LIMIT ?)",
+                    (overflow,)
+                )
+                self.evictions += overflow
+            self._conn.commit()
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM quiz_cache WHERE key = ?", (key,))
+            self._conn.commit()
+
+    def clear(self) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM quiz_cache")
+            self._conn.commit()
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM quiz_cache").fetchone()[0]
+
+
+class QuizCache:
+    """
+    Dwuwarstwowy cache quizów: pamięć (LRU) + opcjonalnie dysk.
+
+    Odczyt z dysku promuje wpis do pamięci. Cache nie waliduje danych -
+    robi to AIGenerator przy każdym odczycie, a wpisy odrzucone przez
+    walidację usuwa metodą invalidate().
+    """
+
+    def __init__(self, memory: Optional[MemoryCacheTier] = None, disk: Optional[CacheTier] = None):
+        self.memory = memory if memory is not None else MemoryCacheTier()
+        self.disk = disk
+        self.hits = 0
+        self.misses = 0
+        self.disk_hits = 0
+        self.invalidations = 0
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[List[dict]]:
+        """Zwraca kopię zapisanej listy pytań lub None."""
+        value = self.memory.get(key)
+        if value is None and self.disk is not None:
+            value = self.disk.get(key)
+            if value is not None:
+                self.memory.set(key, value)
+                with self._lock:
+                    self.disk_hits += 1
+        with self._lock:
+            if value is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+        # Kopia chroni wpis przed modyfikacją przez wywołującego
+        return [dict(item) if isinstance(item, dict) else item for item in value]
+
+    def set(self, key: str, value: List[dict]) -> None:
+        stored = [dict(item) for item in value]
+        self.memory.set(key, stored)
+        if self.disk is not None:
+            self.disk.set(key, stored)
+
+    def invalidate(self, key: str) -> None:
+        """Usuwa wpis ze wszystkich warstw (np. po nieudanej walidacji)."""
+        self.memory.delete(key)
+        if self.disk is not None:
+            self.disk.delete(key)
+        with self._lock:
+            self.invalidations += 1
+
+    def clear(self) -> None:
+        self.memory.clear()
+        if self.disk is not None:
+            self.disk.clear()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Zwraca liczniki trafień, chybień i rozmiary warstw."""
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "disk_hits": self.disk_hits,
+            "invalidations": self.invalidations,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "memory_entries": len(self.memory),
+            "memory_evictions": self.memory.evictions,
+            "disk_entries": len(self.disk) if self.disk is not None else 0,
+        }
+
+
+def create_default_cache() -> QuizCache:
+    """
+    Tworzy cache według config.py (warstwa dyskowa tylko przy ustawionej ścieżce).
+    """
+    disk = SQLiteCacheTier(QUIZ_CACHE_DISK_PATH) if QUIZ_CACHE_DISK_PATH else None
+    return QuizCache(memory=MemoryCacheTier(), disk=disk)
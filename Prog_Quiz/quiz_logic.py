@@ -1,7 +1,10 @@
 # Moduł logiki quizu zgodny z założeniami agentów
 # Autor: Ready_4AI
 
-from typing import List, Dict, Optional
+from array import array
+from collections.abc import Sequence
+from typing import Iterable, List, Dict, Optional, Tuple
+import sys
 
 
 # Własne wyjątki dla lepszej obsługi błędów
@@ -30,7 +33,17 @@ class EmptyQuizError(QuizException):
     pass
 
 
+# Odpowiedzi są przechowywane w array('b'): -1 oznacza brak odpowiedzi,
+# więc indeks opcji musi mieścić się w bajcie ze znakiem
+NO_ANSWER = -1
+MAX_OPTIONS = 127
+
+
 class Question:
+    # Sloty i krotka opcji zamiast __dict__ i listy - serwer trzyma w pamięci
+    # wiele quizów jednocześnie
+    __slots__ = ("text", "options", "correct_index", "points")
+
     def __init__(self, text: str, options: List[str], correct_index: int, points: int = 1):
         # Walidacja danych wejściowych
         if not isinstance(text, str) or not text.strip():
@@ -39,6 +52,9 @@ class Question:
         if not isinstance(options, list) or len(options) < 2:
             raise InvalidQuestionError("Pytanie musi mieć co najmniej 2 opcje odpowiedzi")
         
+        if len(options) > MAX_OPTIONS:
+            raise InvalidQuestionError(f"Pytanie może mieć najwyżej {MAX_OPTIONS} opcji odpowiedzi")
+        
         if not all(isinstance(opt, str) and opt.strip() for opt in options):
             raise InvalidQuestionError("Wszystkie opcje muszą być niepustymi stringami")
         
@@ -51,10 +67,24 @@ class Question:
             raise InvalidQuestionError("Punkty muszą być liczbą dodatnią")
         
         self.text = text.strip()
-        self.options = [opt.strip() for opt in options]
+        # Krotka - opcji nie da się zmienić z zewnątrz, a odczyt nie kopiuje danych
+        self.options: Tuple[str, ...] = tuple(opt.strip() for opt in options)
         self.correct_index = correct_index
         self.points = points
 
+    @classmethod
+    def restore(cls, text: str, options: Iterable[str], correct_index: int, points: float = 1) -> "Question":
+        """
+        Tworzy pytanie bez walidacji - dla danych już sprawdzonych przez
+        konstruktor, np. odczytanych z migawki quizu.
+        """
+        question = cls.__new__(cls)
+        question.text = text
+        question.options = tuple(options)
+        question.correct_index = correct_index
+        question.points = points
+        return question
+
     def is_correct(self, answer_index: int) -> bool:
         if not isinstance(answer_index, int):
             raise InvalidAnswerError("Indeks odpowiedzi musi być liczbą całkowitą")
@@ -66,7 +96,57 @@ class Question:
         
         return answer_index == self.correct_index
 
+class AnswersView(Sequence):
+    """
+    Odpowiedzi quizu tylko do odczytu (None - brak odpowiedzi) bez kopiowania
+    tablicy bajtów; porównuje się z listą jak dawna lista odpowiedzi.
+    """
+
+    __slots__ = ("_quiz",)
+
+    def __init__(self, quiz: "Quiz"):
+        self._quiz = quiz
+
+    def __len__(self) -> int:
+        return len(self._quiz._answers)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        answer = self._quiz._answers[index]
+        return None if answer == NO_ANSWER else answer
+
+    def __iter__(self):
+        return (None if answer == NO_ANSWER else answer for answer in self._quiz._answers)
+
+    def __eq__(self, other) -> bool:
+        if isinstance(other, Sequence) and not isinstance(other, str):
+            return list(self) == list(other)
+        return NotImplemented
+
+    __hash__ = None
+
+    def __repr__(self) -> str:
+        return f"AnswersView({list(self)!r})"
+
+    @property
+    def itemsize(self) -> int:
+        """Rozmiar jednej odpowiedzi w bajtach."""
+        return self._quiz._answers.itemsize
+
+    @property
+    def nbytes(self) -> int:
+        """Pamięć tablicy odpowiedzi w bajtach (sys.getsizeof)."""
+        return sys.getsizeof(self._quiz._answers)
+
+    def tobytes(self) -> bytes:
+        """Odpowiedzi jako bajty (-1 - brak odpowiedzi), np. do migawki."""
+        return self._quiz._answers.tobytes()
+
+
 class Quiz:
+    __slots__ = ("_questions", "_texts", "current", "score", "max_score", "_answers")
+
     def __init__(self, questions: List[Question]):
         # Walidacja listy pytań
         if not isinstance(questions, list):
@@ -78,19 +158,57 @@ class Quiz:
         if not all(isinstance(q, Question) for q in questions):
             raise InvalidQuestionError("Wszystkie elementy muszą być obiektami Question")
         
-        self.questions = questions
+        # Krotka: pytania zmienia wyłącznie add_question, więc max_score jest zawsze aktualne
+        self._questions = tuple(questions)
+        self._texts = None
         self.current = 0
         self.score = 0
-        self.answers: List[Optional[int]] = [None] * len(questions)
+        # Suma punktów aktualizowana przy dodawaniu pytań, a nie przy każdym podsumowaniu
+        self.max_score = sum(q.points for q in questions)
+        self._answers = array('b', [NO_ANSWER]) * len(questions)
+
+    @classmethod
+    def restore(cls, questions: List[Question], current: int, score: float, answers: array) -> "Quiz":
+        """
+        Odtwarza zapisany stan quizu bez ponownej walidacji pytań
+        (np. z migawki). answers: array('b') z NO_ANSWER dla braku odpowiedzi.
+        """
+        quiz = cls.__new__(cls)
+        quiz._questions = tuple(questions)
+        quiz._texts = None
+        quiz.current = current
+        quiz.score = score
+        quiz.max_score = sum(q.points for q in questions)
+        quiz._answers = answers
+        return quiz
+
+    @property
+    def questions(self) -> Tuple[Question, ...]:
+        """Pytania quizu (krotka - nowe pytania dołącza add_question)."""
+        return self._questions
+
+    @property
+    def answers(self) -> AnswersView:
+        """Odpowiedzi użytkownika (None - brak odpowiedzi na pytanie), tylko do odczytu."""
+        return AnswersView(self)
+
+    def add_question(self, question: Question) -> None:
+        """Dołącza pytanie na koniec quizu (np. dostarczone strumieniowo)."""
+        if not isinstance(question, Question):
+            raise InvalidQuestionError("Wszystkie elementy muszą być obiektami Question")
+        self._questions += (question,)
+        self._texts = None
+        self.max_score += question.points
+        self._answers.append(NO_ANSWER)
 
     def start(self):
         self.current = 0
         self.score = 0
-        self.answers = [None] * len(self.questions)
+        self._answers = array('b', [NO_ANSWER]) * len(self._questions)
 
     def get_current_question(self) -> Optional[Question]:
-        if self.current < len(self.questions):
-            return self.questions[self.current]
+        if self.current < len(self._questions):
+            return self._questions[self.current]
         return None
 
     def answer_current(self, answer_index: int):
@@ -104,7 +222,7 @@ class Quiz:
         # Walidacja odpowiedzi delegowana do Question.is_correct()
         try:
             is_correct = question.is_correct(answer_index)
-            self.answers[self.current] = answer_index
+            self._answers[self.current] = answer_index
             if is_correct:
                 self.score += question.points
             self.current += 1
@@ -113,12 +231,18 @@ class Quiz:
             raise  # Przepuszczamy wyjątek walidacji odpowiedzi
 
     def is_finished(self) -> bool:
-        return self.current >= len(self.questions)
+        return self.current >= len(self._questions)
 
     def get_summary(self) -> Dict[str, any]:
+        """
+        Podsumowanie quizu bez kopiowania stanu: answers to widok odpowiedzi,
+        questions - krotka treści pytań budowana raz (do zmiany listy pytań).
+        """
+        if self._texts is None:
+            self._texts = tuple(q.text for q in self._questions)
         return {
             "score": self.score,
-            "max_score": sum(q.points for q in self.questions),
+            "max_score": self.max_score,
             "answers": self.answers,
-            "questions": [q.text for q in self.questions]
+            "questions": self._texts
         }
\ No newline at end of file
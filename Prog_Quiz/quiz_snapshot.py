@@ -0,0 +1,383 @@
+"""
+Trwały stan sesji quizu: binarne migawki, dziennik zdarzeń i checkpointer.
+
+Migawka quizu to zwarty zapis struct z nagłówkiem wersji. Każda zmiana
+sesji (utworzenie, odpowiedź, dołączone pytanie, zamknięcie) jest dopisywana
+do dziennika append-only, a wątek w tle okresowo zapisuje migawki zmienionych
+sesji do SQLite i usuwa dzienniki, które migawki już obejmują.
+Odtworzenie stanu = migawki + odtworzenie dziennika.
+
+Ścieżka odpowiedzi tylko dopisuje krótki rekord do bufora dziennika;
+serializacja i zapis migawek odbywają się w wątku checkpointera.
+"""
+
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+import glob
+import os
+import sqlite3
+import struct
+import threading
+import zlib
+from array import array
+
+from quiz_logic import Question, Quiz
+from config import SESSION_CHECKPOINT_INTERVAL
+
+
+SNAPSHOT_MAGIC = b"QZSN"
+JOURNAL_MAGIC = b"QZJN"
+FORMAT_VERSION = 1
+
+_HEADER = struct.Struct("<4sB")
+_QUIZ = struct.Struct("<IdI")          # current, score, liczba pytań
+_QUESTION = struct.Struct("<dBB")      # punkty, poprawny indeks, liczba opcji
+_TEXT_LEN = struct.Struct("<I")
+_OPTION_LEN = struct.Struct("<H")
+_FRAME = struct.Struct("<I")           # długość rekordu / CRC32
+_RECORD = struct.Struct("<BH")         # typ zdarzenia, długość id sesji
+_ANSWER = struct.Struct("<Ib")         # indeks pytania, odpowiedź
+
+EVENT_CREATE = 1
+EVENT_ANSWER = 2
+EVENT_QUESTION = 3
+EVENT_CLOSE = 4
+
+
+class SnapshotError(ValueError):
+    """Nieprawidłowa lub nieobsługiwana migawka"""
+    pass
+
+
+def _number(value: float) -> Any:
+    # Punkty są zapisywane jako double; całkowite wracają jako int
+    return int(value) if float(value).is_integer() else value
+
+
+# ===== MIGAWKI =====
+
+def _pack_question(question: Question, out: List[bytes]) -> None:
+    options = question.options
+    out.append(_QUESTION.pack(question.points, question.correct_index, len(options)))
+    text = question.text.encode("utf-8")
+    out.append(_TEXT_LEN.pack(len(text)))
+    out.append(text)
+    for option in options:
+        encoded = option.encode("utf-8")
+        out.append(_OPTION_LEN.pack(len(encoded)))
+        out.append(encoded)
+
+
+def _unpack_question(data: bytes, offset: int) -> Tuple[Question, int]:
+    points, correct_index, n_options = _QUESTION.unpack_from(data, offset)
+    offset += _QUESTION.size
+    (text_len,) = _TEXT_LEN.unpack_from(data, offset)
+    offset += _TEXT_LEN.size
+    text = data[offset:offset + text_len].decode("utf-8")
+    offset += text_len
+    options = []
+    for _ in range(n_options):
+        (option_len,) = _OPTION_LEN.unpack_from(data, offset)
+        offset += _OPTION_LEN.size
+        options.append(data[offset:offset + option_len].decode("utf-8"))
+        offset += option_len
+    return Question.restore(text, options, correct_index, _number(points)), offset
+
+
+def pack_question(question: Question) -> bytes:
+    """Serializuje pojedyncze pytanie (bez nagłówka)."""
+    out: List[bytes] = []
+    _pack_question(question, out)
+    return b"".join(out)
+
+
+def dump_quiz(quiz: Quiz) -> bytes:
+    """Serializuje stan quizu (pytania, postęp, wynik, odpowiedzi) z nagłówkiem wersji."""
+    out = [
+        _HEADER.pack(SNAPSHOT_MAGIC, FORMAT_VERSION),
+        _QUIZ.pack(quiz.current, quiz.score, len(quiz.questions)),
+    ]
+    for question in quiz.questions:
+        _pack_question(question, out)
+    out.append(quiz.answers.tobytes())
+    return b"".join(out)
+
+
+def load_quiz(data: bytes) -> Quiz:
+    """
+    Odtwarza quiz z migawki.
+
+    Raises:
+        SnapshotError: Jeśli dane nie są migawką w obsługiwanej wersji
+    """
+    try:
+        magic, version = _HEADER.unpack_from(data, 0)
+        if magic != SNAPSHOT_MAGIC:
+            raise SnapshotError("Dane nie są migawką quizu")
+        if version != FORMAT_VERSION:
+            raise SnapshotError(f"Nieobsługiwana wersja migawki: {version}")
+        current, score, n_questions = _QUIZ.unpack_from(data, _HEADER.size)
+        offset = _HEADER.size + _QUIZ.size
+        questions = []
+        for _ in range(n_questions):
+            question, offset = _unpack_question(data, offset)
+            questions.append(question)
+        answers = array('b')
+        answers.frombytes(data[offset:offset + n_questions])
+    except (struct.error, UnicodeDecodeError) as e:
+        raise SnapshotError(f"Uszkodzona migawka: {e}")
+    if len(answers) != n_questions or current > n_questions:
+        raise SnapshotError("Uszkodzona migawka: niespójna liczba odpowiedzi")
+
+    if not questions:
+        raise SnapshotError("Uszkodzona migawka: quiz bez pytań")
+    return Quiz.restore(questions, current, _number(score), answers)
+
+
+# ===== DZIENNIK =====
+
+def _encode_record(event: int, session_id: str, body: bytes = b"") -> bytes:
+    sid = session_id.encode("utf-8")
+    record = _RECORD.pack(event, len(sid)) + sid + body
+    return _FRAME.pack(len(record)) + record + _FRAME.pack(zlib.crc32(record))
+
+
+def read_journal(path: str) -> Iterator[Tuple[int, str, bytes]]:
+    """
+    Zwraca rekordy dziennika (typ, id sesji, treść).
+
+    Czytanie kończy się na pierwszym niepełnym lub uszkodzonym rekordzie -
+    tak wygląda dziennik przerwany w trakcie zapisu.
+    """
+    with open(path, "rb") as journal:
+        data = journal.read()
+    if len(data) < _HEADER.size:
+        return
+    magic, version = _HEADER.unpack_from(data, 0)
+    if magic != JOURNAL_MAGIC or version != FORMAT_VERSION:
+        raise SnapshotError(f"Nieobsługiwany dziennik: {path}")
+    offset = _HEADER.size
+    while offset + _FRAME.size <= len(data):
+        (length,) = _FRAME.unpack_from(data, offset)
+        end = offset + _FRAME.size + length
+        if end + _FRAME.size > len(data):
+            return
+        record = data[offset + _FRAME.size:end]
+        (crc,) = _FRAME.unpack_from(data, end)
+        if crc != zlib.crc32(record):
+            return
+        event, sid_len = _RECORD.unpack_from(record, 0)
+        sid = record[_RECORD.size:_RECORD.size + sid_len].decode("utf-8")
+        yield event, sid, record[_RECORD.size + sid_len:]
+        offset = end + _FRAME.size
+
+
+class SessionStore:
+    """
+    Migawki sesji w SQLite i dziennik zdarzeń append-only w jednym katalogu.
+
+    Sesje są przekazywane jako obiekty z atrybutami `quiz` i `lock`
+    (np. session_manager.QuizSession) - checkpointer odczytuje stan
+    quizu pod blokadą sesji.
+    """
+
+    def __init__(self, directory: str, checkpoint_interval: float = SESSION_CHECKPOINT_INTERVAL,
+                 fsync: bool = False):
+        """
+        Args:
+            directory: Katalog na plik migawek i dzienniki
+            checkpoint_interval: Odstęp (s) między checkpointami w tle
+            fsync: Czy wymuszać zapis dziennika na dysk po każdym rekordzie
+        """
+        if checkpoint_interval <= 0:
+            raise ValueError("Odstęp checkpointów musi być liczbą dodatnią")
+        os.makedirs(directory, exist_ok=True)
+        self.directory = directory
+        self.checkpoint_interval = checkpoint_interval
+        self.fsync = fsync
+        self._lock = threading.Lock()
+        self._db_lock = threading.Lock()
+        # Checkpointy muszą być sekwencyjne - dziennik jest usuwany dopiero
+        # po zatwierdzeniu migawek, które go obejmują
+        self._checkpoint_lock = threading.Lock()
+        self._conn = sqlite3.connect(os.path.join(directory, "snapshots.db"), check_same_thread=False)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS snapshots (session_id TEXT PRIMARY KEY, data BLOB NOT NULL)"
+        )
+        self._conn.commit()
+        self._dirty: Dict[str, Any] = {}
+        self._closed: set = set()
+        self._journal_seq = max(self._journal_sequences(), default=0) + 1
+        self._journal = self._open_journal(self._journal_seq)
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self.checkpoints = 0
+        self.snapshots_written = 0
+
+    # ===== DZIENNIK =====
+
+    def _journal_path(self, seq: int) -> str:
+        return os.path.join(self.directory, f"journal-{seq:08d}.log")
+
+    def _journal_sequences(self) -> List[int]:
+        paths = glob.glob(os.path.join(self.directory, "journal-*.log"))
+        return sorted(int(os.path.basename(path)[8:16]) for path in paths)
+
+    def _open_journal(self, seq: int):
+        journal = open(self._journal_path(seq), "ab")
+        if journal.tell() == 0:
+            journal.write(_HEADER.pack(JOURNAL_MAGIC, FORMAT_VERSION))
+            journal.flush()
+        return journal
+
+    def _append(self, event: int, session: Any, session_id: str, body: bytes = b"") -> None:
+        record = _encode_record(event, session_id, body)
+        with self._lock:
+            self._journal.write(record)
+            self._journal.flush()
+            if self.fsync:
+                os.fsync(self._journal.fileno())
+            if event == EVENT_CLOSE:
+                self._dirty.pop(session_id, None)
+                self._closed.add(session_id)
+            elif event == EVENT_CREATE:
+                self._dirty[session_id] = session
+                self._closed.discard(session_id)
+            elif session_id not in self._closed:
+                # Spóźniony zapis po zamknięciu nie może przywrócić sesji
+                self._dirty[session_id] = session
+
+    def record_created(self, session_id: str, session: Any) -> None:
+        """Zapisuje pełny stan nowej sesji (przed udostępnieniem jej graczowi)."""
+        self._append(EVENT_CREATE, session, session_id, dump_quiz(session.quiz))
+
+    def record_answer(self, session_id: str, session: Any, question_index: int, answer_index: int) -> None:
+        """Dopisuje odpowiedź; wywoływane pod blokadą sesji po Quiz.answer_current."""
+        self._append(EVENT_ANSWER, session, session_id, _ANSWER.pack(question_index, answer_index))
+
+    def record_question(self, session_id: str, session: Any, position: int, question: Question) -> None:
+        """Dopisuje pytanie dołączone do quizu sesji na pozycji position."""
+        self._append(EVENT_QUESTION, session, session_id, _TEXT_LEN.pack(position) + pack_question(question))
+
+    def record_closed(self, session_id: str) -> None:
+        """Oznacza sesję jako zamkniętą - nie zostanie odtworzona."""
+        self._append(EVENT_CLOSE, None, session_id)
+
+    def mark_dirty(self, session_id: str, session: Any) -> None:
+        """Zleca zapis migawki sesji przy najbliższym checkpoincie."""
+        with self._lock:
+            self._dirty[session_id] = session
+
+    # ===== CHECKPOINT =====
+
+    def checkpoint(self) -> int:
+        """
+        Zapisuje migawki zmienionych sesji i usuwa objęte nimi dzienniki.
+
+        Dziennik jest rotowany przed odczytem stanu sesji, więc każde
+        zdarzenie ze starego dziennika jest już zawarte w migawce.
+
+        Returns:
+            Liczba zapisanych migawek
+        """
+        with self._checkpoint_lock:
+            return self._checkpoint()
+
+    def _checkpoint(self) -> int:
+        with self._lock:
+            dirty, self._dirty = self._dirty, {}
+            closed, self._closed = self._closed, set()
+            old_journal = self._journal
+            self._journal_seq += 1
+            self._journal = self._open_journal(self._journal_seq)
+            current_seq = self._journal_seq
+        old_journal.close()
+
+        rows = []
+        for session_id, session in dirty.items():
+            with session.lock:
+                rows.append((session_id, dump_quiz(session.quiz)))
+
+        with self._db_lock:
+            with self._conn:
+                self._conn.executemany(
+                    "INSERT OR REPLACE INTO snapshots (session_id, data) VALUES (?, ?)", rows
+                )
+                self._conn.executemany(
+                    "DELETE FROM snapshots WHERE session_id = ?", [(sid,) for sid in closed]
+                )
+        for seq in self._journal_sequences():
+            if seq < current_seq:
+                os.remove(self._journal_path(seq))
+
+        self.checkpoints += 1
+        self.snapshots_written += len(rows)
+        return len(rows)
+
+    def start(self) -> None:
+        """Uruchamia checkpointer w wątku w tle."""
+        if self._thread is not None:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="quiz-checkpointer", daemon=True)
+        self._thread.start()
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.checkpoint_interval):
+            self.checkpoint()
+
+    def close(self) -> None:
+        """Zatrzymuje checkpointer, wykonuje ostatni checkpoint i zamyka pliki."""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        self.checkpoint()
+        with self._lock:
+            self._journal.close()
+        with self._db_lock:
+            self._conn.close()
+
+    # ===== ODTWARZANIE =====
+
+    def restore(self) -> Dict[str, Quiz]:
+        """
+        Odtwarza quizy sesji: migawki z SQLite, a następnie zdarzenia z dzienników.
+
+        Odpowiedzi i pytania już zawarte w migawce (według indeksu pytania)
+        są pomijane, więc odtwarzanie jest idempotentne.
+        """
+        with self._db_lock:
+            rows = self._conn.execute("SELECT session_id, data FROM snapshots").fetchall()
+        quizzes = {session_id: load_quiz(data) for session_id, data in rows}
+
+        with self._lock:
+            self._journal.flush()
+        for seq in self._journal_sequences():
+            for event, session_id, body in read_journal(self._journal_path(seq)):
+                if event == EVENT_CREATE:
+                    quizzes[session_id] = load_quiz(body)
+                elif event == EVENT_CLOSE:
+                    quizzes.pop(session_id, None)
+                elif session_id not in quizzes:
+                    continue
+                elif event == EVENT_ANSWER:
+                    question_index, answer_index = _ANSWER.unpack(body)
+                    quiz = quizzes[session_id]
+                    if question_index == quiz.current:
+                        quiz.answer_current(answer_index)
+                elif event == EVENT_QUESTION:
+                    quiz = quizzes[session_id]
+                    (position,) = _TEXT_LEN.unpack_from(body, 0)
+                    if position == len(quiz.questions):
+                        question, _ = _unpack_question(body, _TEXT_LEN.size)
+                        quiz.add_question(question)
+        return quizzes
+
+    def get_stats(self) -> Dict[str, int]:
+        with self._lock:
+            pending = len(self._dirty)
+        return {
+            "checkpoints": self.checkpoints,
+            "snapshots_written": self.snapshots_written,
+            "pending": pending,
+        }
@@ -0,0 +1,416 @@
+"""
+Warstwa odporności na błędy dostawcy AI.
+
+- RetryPolicy: ponawianie z wykładniczym opóźnieniem i losowym rozrzutem
+  (jitter), z uwzględnieniem nagłówka Retry-After
+- CircuitBreaker: po serii błędów przestaje wysyłać zapytania i zgłasza
+  błąd natychmiast, dopóki dostawca nie wróci
+- TokenBucket / RateLimiter: limit zapytań (RPM) i tokenów (TPM) na minutę
+  wspólny dla całego procesu
+"""
+
+from typing import Awaitable, Callable, FrozenSet, Optional, Tuple, Type
+import json
+import random
+import threading
+import time
+
+from lazy_import import LazyModule
+from config import (
+    AI_MAX_RETRIES, AI_RETRY_BASE_DELAY, AI_RETRY_MAX_DELAY,
+    AI_CIRCUIT_FAILURE_THRESHOLD, AI_CIRCUIT_RECOVERY_TIMEOUT,
+    AI_RATE_LIMIT_RPM, AI_RATE_LIMIT_TPM, AI_RATE_LIMIT_MAX_WAIT
+)
+
+# asyncio jest potrzebne tylko w ścieżce asynchronicznej, a email.utils
+# tylko do parsowania nagłówka Retry-After w formacie daty
+asyncio = LazyModule("asyncio")
+email_utils = LazyModule("email.utils")
+
+
+class ResilienceError(Exception):
+    """Bazowy wyjątek warstwy odporności"""
+    pass
+
+
+class CircuitOpenError(ResilienceError):
+    """Obwód otwarty - dostawca uznany za niedostępny"""
+    pass
+
+
+class RateLimitExceededError(ResilienceError):
+    """Limit zapytań nie zwolnił się w dopuszczalnym czasie"""
+    pass
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """
+    Zamienia nagłówek Retry-After (sekundy lub data HTTP) na liczbę sekund.
+    """
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, email_utils.parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+def estimate_tokens(payload: dict) -> int:
+    """Szacuje zużycie tokenów zapytania: ~4 znaki na token + limit odpowiedzi."""
+    prompt_chars = len(json.dumps(payload.get("messages", []), ensure_ascii=False))
+    return prompt_chars // 4 + int(payload.get("max_tokens", 0))
+
+
+class RetryPolicy:
+    """
+    Polityka ponawiania: pełny jitter w przedziale [0, base * 2^próba],
+    ograniczony przez max_delay. Retry-After ma pierwszeństwo.
+    """
+
+    RETRY_STATUSES: FrozenSet[int] = frozenset({429, 500, 502, 503, 504})
+
+    def __init__(
+        self,
+        max_retries: int = AI_MAX_RETRIES,
+        base_delay: float = AI_RETRY_BASE_DELAY,
+        max_delay: float = AI_RETRY_MAX_DELAY,
+        rng: Optional[random.Random] = None
+    ):
+        if max_retries < 0:
+            raise ValueError("Liczba ponowień nie może być ujemna")
+        if base_delay < 0 or max_delay < base_delay:
+            raise ValueError("Niepoprawne opóźnienia ponowień")
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self._rng = rng if rng is not None else random.Random()
+
+    def compute_delay(self, attempt: int, retry_after: Optional[str] = None) -> float:
+        """
+        Zwraca opóźnienie przed ponowieniem numer attempt (liczone od 0).
+        """
+        server_delay = parse_retry_after(retry_after)
+        if server_delay is not None:
+            return min(server_delay, self.max_delay)
+        return self._rng.uniform(0, min(self.max_delay, self.base_delay * (2 ** attempt)))
+
+
+class CircuitBreaker:
+    """
+    Bezpiecznik obwodu: closed -> open po failure_threshold kolejnych
+    błędach; po recovery_timeout przepuszcza jedno zapytanie próbne
+    (half_open), którego wynik zamyka lub ponownie otwiera obwód.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(
+        self,
+        failure_threshold: int = AI_CIRCUIT_FAILURE_THRESHOLD,
+        recovery_timeout: float = AI_CIRCUIT_RECOVERY_TIMEOUT,
+        clock: Callable[[], float] = time.monotonic
+    ):
+        if failure_threshold < 1 or recovery_timeout <= 0:
+            raise ValueError("Niepoprawna konfiguracja bezpiecznika")
+        self.failure_threshold = failure_threshold
+        self.recovery_timeout = recovery_timeout
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._state = self.CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._probe_in_flight = False
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            if self._state == self.OPEN and self._clock() - self._opened_at >= self.recovery_timeout:
+                return self.HALF_OPEN
+            return self._state
+
+    def allow_request(self) -> bool:
+        """Czy zapytanie może zostać wysłane (w half_open - tylko jedno naraz)."""
+        with self._lock:
+            if self._state == self.CLOSED:
+                return True
+            if self._state == self.OPEN:
+                if self._clock() - self._opened_at < self.recovery_timeout:
+                    return False
+                self._state = self.HALF_OPEN
+                self._probe_in_flight = False
+            if self._probe_in_flight:
+                return False
+            self._probe_in_flight = True
+            return True
+
+    def record_success(self) -> None:
+        with self._lock:
+            self._state = self.CLOSED
+            self._failures = 0
+            self._probe_in_flight = False
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self._failures += 1
+            if self._state == self.HALF_OPEN or self._failures >= self.failure_threshold:
+                self._state = self.OPEN
+                self._opened_at = self._clock()
+                self._probe_in_flight = False
+
+    def release_probe(self) -> None:
+        """
+        Zwalnia zapytanie próbne, które nie dotarło do dostawcy lub zostało
+        anulowane - bez zmiany stanu, kolejne zapytanie może być próbą.
+        """
+        with self._lock:
+            self._probe_in_flight = False
+
+
+class TokenBucket:
+    """
+    Wiadro tokenów uzupełniane w stałym tempie rate_per_minute.
+    """
+
+    def __init__(self, rate_per_minute: float, capacity: Optional[float] = None,
+                 clock: Callable[[], float] = time.monotonic):
+        if rate_per_minute <= 0:
+            raise ValueError("Limit na minutę musi być liczbą dodatnią")
+        self.rate = rate_per_minute / 60.0
+        self.capacity = capacity if capacity is not None else rate_per_minute
+        self._clock = clock
+        self._tokens = self.capacity
+        self._updated = clock()
+        self._lock = threading.Lock()
+
+    def try_acquire(self, amount: float = 1) -> float:
+        """
+        Pobiera amount tokenów, jeśli są dostępne.
+
+        Returns:
+            0.0 po pobraniu tokenów, w przeciwnym razie czas oczekiwania (s)
+        """
+        amount = min(amount, self.capacity)
+        with self._lock:
+            now = self._clock()
+            self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            if self._tokens >= amount:
+                self._tokens -= amount
+                return 0.0
+            return (amount - self._tokens) / self.rate
+
+    def refund(self, amount: float = 1) -> None:
+        """Zwraca wcześniej pobrane tokeny."""
+        with self._lock:
+            self._tokens = min(self.capacity, self._tokens + amount)
+
+
+class RateLimiter:
+    """
+    Łączny limit zapytań na minutę (RPM) i tokenów na minutę (TPM).
+    """
+
+    def __init__(
+        self,
+        rpm: float = AI_RATE_LIMIT_RPM,
+        tpm: float = AI_RATE_LIMIT_TPM,
+        max_wait: float = AI_RATE_LIMIT_MAX_WAIT
+    ):
+        self.requests = TokenBucket(rpm)
+        self.tokens = TokenBucket(tpm)
+        self.max_wait = max_wait
+
+    def _try_acquire(self, tokens: int) -> float:
+        wait = self.requests.try_acquire(1)
+        if wait > 0:
+            return wait
+        wait = self.tokens.try_acquire(tokens)
+        if wait > 0:
+            # Zwrot pobranego zapytania - spróbujemy ponownie w całości
+            self.requests.refund(1)
+        return wait
+
+    def acquire(self, tokens: int, sleep: Callable[[float], None] = time.sleep) -> None:
+        waited = 0.0
+        while True:
+            wait = self._try_acquire(tokens)
+            if wait == 0:
+                return
+            if waited + wait > self.max_wait:
+                raise RateLimitExceededError(
+                    f"Przekroczono limit zapytań do API (oczekiwanie > {self.max_wait:.0f} s)"
+                )
+            sleep(wait)
+            waited += wait
+
+    async def aacquire(self, tokens: int) -> None:
+        waited = 0.0
+        while True:
+            wait = self._try_acquire(tokens)
+            if wait == 0:
+                return
+            if waited + wait > self.max_wait:
+                raise RateLimitExceededError(
+                    f"Przekroczono limit zapytań do API (oczekiwanie > {self.max_wait:.0f} s)"
+                )
+            await asyncio.sleep(wait)
+            waited += wait
+
+
+class Resilience:
+    """
+    Łączy politykę ponowień, bezpiecznik i limiter wokół pojedynczego
+    wysłania zapytania. Odpowiedź z kodem spoza RETRY_STATUSES jest
+    zwracana bez zmian - jej obsługa należy do wywołującego.
+    """
+
+    def __init__(
+        self,
+        policy: Optional[RetryPolicy] = None,
+        breaker: Optional[CircuitBreaker] = None,
+        limiter: Optional[RateLimiter] = None,
+        sleep: Callable[[float], None] = time.sleep
+    ):
+        self.policy = policy if policy is not None else RetryPolicy()
+        self.breaker = breaker if breaker is not None else CircuitBreaker()
+        self.limiter = limiter
+        self._sleep = sleep
+        self.retries = 0
+        self._lock = threading.Lock()
+
+    def _before_attempt(self) -> None:
+        if not self.breaker.allow_request():
+            raise CircuitOpenError("Dostawca AI jest chwilowo niedostępny (obwód otwarty)")
+
+    def _acquire(self, tokens: int) -> None:
+        if self.limiter is None:
+            return
+        try:
+            self.limiter.acquire(tokens, self._sleep)
+        except BaseException:
+            # Zapytanie nie zostało wysłane - zajęte zapytanie próbne jest zwalniane
+            self.breaker.release_probe()
+            raise
+
+    async def _aacquire(self, tokens: int) -> None:
+        if self.limiter is None:
+            return
+        try:
+            await self.limiter.aacquire(tokens)
+        except BaseException:
+            self.breaker.release_probe()
+            raise
+
+    def _count_retry(self) -> None:
+        with self._lock:
+            self.retries += 1
+
+    def _is_provider_failure(self, status_code: int) -> bool:
+        # 429 oznacza przeciążenie limitu, a nie awarię - nie otwiera obwodu
+        return status_code >= 500
+
+    def call(self, send: Callable[[], object], tokens: int = 0,
+             retry_on: Tuple[Type[BaseException], ...] = ()):
+        """
+        Wysyła zapytanie przez send(), ponawiając błędy przejściowe.
+
+        Args:
+            send: Funkcja wysyłająca zapytanie i zwracająca odpowiedź HTTP
+            tokens: Szacowana liczba tokenów zapytania (limit TPM)
+            retry_on: Wyjątki transportu traktowane jako przejściowe
+        """
+        for attempt in range(self.policy.max_retries + 1):
+            last = attempt == self.policy.max_retries
+            self._before_attempt()
+            self._acquire(tokens)
+            try:
+                response = send()
+            except retry_on:
+                self.breaker.record_failure()
+                if last:
+                    raise
+                self._count_retry()
+                self._sleep(self.policy.compute_delay(attempt))
+                continue
+            except Exception:
+                # Błąd nieprzejściowy też zwalnia zapytanie próbne bezpiecznika
+                self.breaker.record_failure()
+                raise
+            except BaseException:
+                # Anulowanie (np. przegrane zapytanie hedgingu) lub przerwanie
+                # nie świadczy o awarii dostawcy
+                self.breaker.release_probe()
+                raise
+
+            status = response.status_code
+            if status not in self.policy.RETRY_STATUSES:
+                self.breaker.record_success()
+                return response
+            if self._is_provider_failure(status):
+                self.breaker.record_failure()
+            else:
+                self.breaker.record_success()
+            if last:
+                return response
+            self._count_retry()
+            delay = self.policy.compute_delay(attempt, response.headers.get("Retry-After"))
+            response.close()
+            self._sleep(delay)
+
+    async def acall(self, send: Callable[[], Awaitable[object]], tokens: int = 0,
+                    retry_on: Tuple[Type[BaseException], ...] = ()):
+        """Asynchroniczny odpowiednik call() (oczekiwanie bez blokowania pętli)."""
+        for attempt in range(self.policy.max_retries + 1):
+            last = attempt == self.policy.max_retries
+            self._before_attempt()
+            await self._aacquire(tokens)
+            try:
+                response = await send()
+            except retry_on:
+                self.breaker.record_failure()
+                if last:
+                    raise
+                self._count_retry()
+                await asyncio.sleep(self.policy.compute_delay(attempt))
+                continue
+            except Exception:
+                self.breaker.record_failure()
+                raise
+            except BaseException:
+                self.breaker.release_probe()
+                raise
+
+            status = response.status_code
+            if status not in self.policy.RETRY_STATUSES:
+                self.breaker.record_success()
+                return response
+            if self._is_provider_failure(status):
+                self.breaker.record_failure()
+            else:
+                self.breaker.record_success()
+            if last:
+                return response
+            self._count_retry()
+            await asyncio.sleep(self.policy.compute_delay(attempt, response.headers.get("Retry-After")))
+
+
+_shared_resilience: Optional[Resilience] = None
+_shared_lock = threading.Lock()
+
+
+def get_shared_resilience() -> Resilience:
+    """
+    Zwraca wspólną dla procesu warstwę odporności (jeden bezpiecznik i jeden
+    limiter dla wszystkich generatorów), skonfigurowaną według config.py.
+    """
+    global _shared_resilience
+    with _shared_lock:
+        if _shared_resilience is None:
+            _shared_resilience = Resilience(limiter=RateLimiter())
+        return _shared_resilience
@@ -1,4 +1,30 @@
-from typing import List, Dict
+from typing import Dict, Iterable, Iterator, List, Protocol, Tuple
+
+
+# Progi oceny: minimalny wynik procentowy i etykieta (od najwyższego)
+GRADE_THRESHOLDS: List[Tuple[float, str]] = [
+    (90, "🏆 DOSKONALE!"),
+    (75, "🎉 BARDZO DOBRZE!"),
+    (60, "👍 DOBRZE!"),
+    (50, "📚 ŚREDNIO - POTRZEBA WIĘCEJ NAUKI"),
+]
+LOWEST_GRADE: str = "💪 NIE PODDAWAJ SIĘ - ĆWICZ DALEJ!"
+
+# Liczba fragmentów raportu (np. błędnych odpowiedzi) łączonych w jeden zapis
+WRITE_BATCH_CHUNKS: int = 64
+
+
+class TextSink(Protocol):
+    """Dowolny obiekt z metodą write(str) - plik, sys.stdout, io.StringIO."""
+    def write(self, text: str) -> int: ...
+
+
+def grade_for(percentage: float) -> str:
+    """Zwraca ocenę słowną dla wyniku procentowego."""
+    for threshold, grade in GRADE_THRESHOLDS:
+        if percentage >= threshold:
+            return grade
+    return LOWEST_GRADE
 
 
 def build_report(total: int, correct: int, wrong_items: List[Dict]) -> str:
@@ -22,6 +48,39 @@ def build_report(total: int, correct: int, wrong_items: List[Dict]) -> str:
     Raises:
         ValueError: Jeśli parametry są nieprawidłowe
     """
+    # Walidacja wejścia (liczby sprawdza iter_report_chunks)
+    if isinstance(total, int) and isinstance(correct, int) and not isinstance(wrong_items, list):
+        raise ValueError("Wrong_items musi być listą")
+    
+    chunks = iter_report_chunks(total, correct, wrong_items)
+    
+    # Walidacja spójności danych przed budowaniem raportu
+    if correct + len(wrong_items) != total:
+        raise ValueError("Suma poprawnych i błędnych odpowiedzi musi być równa total")
+    
+    return "".join(chunks)
+
+
+def iter_report_chunks(total: int, correct: int, wrong_items: Iterable[Dict]) -> Iterator[str]:
+    """
+    Zwraca raport fragmentami tekstu generowanymi na bieżąco.
+    
+    Połączenie fragmentów ("".join) daje dokładnie tekst build_report;
+    każda błędna odpowiedź to jeden fragment. Liczba błędnych odpowiedzi
+    w statystykach wynika z total - correct, więc wrong_items może być
+    dowolnym iterowalnym źródłem (np. generatorem odczytującym eksport) -
+    elementy są formatowane po jednym, a pamięć nie rośnie z ich liczbą.
+    Spójność jest sprawdzana w trakcie: nadmiarowy element przerywa raport
+    od razu, brakujące - po ostatnim elemencie.
+    
+    Args:
+        total, correct, wrong_items: Jak w build_report
+    
+    Raises:
+        ValueError: Jeśli parametry są nieprawidłowe (od razu) lub liczba
+                    błędnych odpowiedzi nie zgadza się z total - correct
+                    (podczas iteracji)
+    """
     # Walidacja wejścia
     if not isinstance(total, int) or total < 0:
         raise ValueError("Total musi być nieujemną liczbą całkowitą")
@@ -32,58 +91,73 @@ def build_report(total: int, correct: int, wrong_items: List[Dict]) -> str:
     if correct > total:
         raise ValueError("Liczba poprawnych nie może być większa niż total")
     
-    if not isinstance(wrong_items, list):
-        raise ValueError("Wrong_items musi być listą")
+    if isinstance(wrong_items, (str, bytes, dict)) or not isinstance(wrong_items, Iterable):
+        raise ValueError("Wrong_items musi być listą lub innym iterowalnym źródłem")
     
-    # Obliczenia
-    wrong = len(wrong_items)
+    return _report_chunks(total, correct, wrong_items)
+
+
+def _report_chunks(total: int, correct: int, wrong_items: Iterable[Dict]) -> Iterator[str]:
+    wrong = total - correct
+    percentage = (correct / total * 100) if total > 0 else 0
     
-    # Walidacja spójności danych
-    if correct + wrong != total:
+    # Nagłówek statystyk i ocena
+    yield (
+        "\n  📊 Statystyki:"
+        f"\n     • Wszystkie pytania: {total}"
+        f"\n     • Poprawne: {correct}"
+        f"\n     • Błędne: {wrong}"
+        f"\n     • Wynik procentowy: {percentage:.1f}%"
+        f"\n\n  🎯 Ocena: {grade_for(percentage)}"
+    )
+    
+    # Lista błędów - jeden fragment na odpowiedź
+    if wrong:
+        yield "\n\n  ❌ Błędne odpowiedzi:"
+    count = 0
+    for item in wrong_items:
+        count += 1
+        if count > wrong:
+            raise ValueError("Suma poprawnych i błędnych odpowiedzi musi być równa total")
+        yield (
+            f"\n\n     Pytanie {item['index']}: {item['question']}"
+            f"\n     • Twoja odpowiedź: {item['user'].upper()}"
+            f"\n     • Poprawna odpowiedź: {item['correct'].upper()} - {item['correct_text']}"
+        )
+    
+    if count != wrong:
         raise ValueError("Suma poprawnych i błędnych odpowiedzi musi być równa total")
     
-    percentage = (correct / total * 100) if total > 0 else 0
+    if not wrong:
+        yield "\n\n  🌟 Gratulacje! Wszystkie odpowiedzi były poprawne!"
+    yield "\n"
+
+
+def write_report(sink: TextSink, total: int, correct: int, wrong_items: Iterable[Dict]) -> int:
+    """
+    Zapisuje raport do strumienia tekstowego (plik, gniazdo, stdout).
+    
+    Treść jest identyczna z build_report, ale fragmenty trafiają do sink
+    partiami po WRITE_BATCH_CHUNKS, w miarę jak wrong_items są produkowane.
     
-    # Budowanie raportu
-    report_lines = []
-    
-    # Nagłówek statystyk
-    report_lines.append("")
-    report_lines.append("  📊 Statystyki:")
-    report_lines.append(f"     • Wszystkie pytania: {total}")
-    report_lines.append(f"     • Poprawne: {correct}")
-    report_lines.append(f"     • Błędne: {wrong}")
-    report_lines.append(f"     • Wynik procentowy: {percentage:.1f}%")
-    
-    # Ocena
-    if percentage >= 90:
-        grade = "🏆 DOSKONALE!"
-    elif percentage >= 75:
-        grade = "🎉 BARDZO DOBRZE!"
-    elif percentage >= 60:
-        grade = "👍 DOBRZE!"
-    elif percentage >= 50:
-        grade = "📚 ŚREDNIO - POTRZEBA WIĘCEJ NAUKI"
-    else:
-        grade = "💪 NIE PODDAWAJ SIĘ - ĆWICZ DALEJ!"
-    
-    report_lines.append("")
-    report_lines.append(f"  🎯 Ocena: {grade}")
-    
-    # Lista błędów
-    if wrong_items:
-        report_lines.append("")
-        report_lines.append("  ❌ Błędne odpowiedzi:")
-        
-        for item in wrong_items:
-            report_lines.append("")
-            report_lines.append(f"     Pytanie {item['index']}: {item['question']}")
-            report_lines.append(f"     • Twoja odpowiedź: {item['user'].upper()}")
-            report_lines.append(f"     • Poprawna odpowiedź: {item['correct'].upper()} - {item['correct_text']}")
-    else:
-        report_lines.append("")
-        report_lines.append("  🌟 Gratulacje! Wszystkie odpowiedzi były poprawne!")
-    
-    report_lines.append("")
-    
-    return "\n".join(report_lines)
+    Returns:
+        Liczba zapisanych znaków
+    
+    Raises:
+        ValueError: Jak iter_report_chunks; błąd spójności ujawniony po
+                    zapisaniu części raportu przerywa zapis
+    """
+    written = 0
+    batch: List[str] = []
+    for chunk in iter_report_chunks(total, correct, wrong_items):
+        batch.append(chunk)
+        if len(batch) >= WRITE_BATCH_CHUNKS:
+            text = "".join(batch)
+            sink.write(text)
+            written += len(text)
+            batch.clear()
+    if batch:
+        text = "".join(batch)
+        sink.write(text)
+        written += len(text)
+    return written
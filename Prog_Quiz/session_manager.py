@@ -0,0 +1,306 @@
+"""
+Menedżer wielu równoległych sesji quizu w jednym procesie.
+
+Sesje są przechowywane w OrderedDict według ostatniego użycia: wyszukiwanie
+jest O(1), a najdawniej używana sesja jest zawsze na początku, więc zarówno
+wygaszanie bezczynnych sesji, jak i usuwanie LRU po przekroczeniu limitu
+liczby sesji lub pamięci nie wymaga przeglądania całej kolekcji.
+"""
+
+from typing import Any, Callable, Dict, List, Optional
+from collections import OrderedDict
+import sys
+import threading
+import time
+import uuid
+
+from quiz_logic import Question, Quiz, QuizException
+from quiz_snapshot import SessionStore
+from config import SESSION_IDLE_TIMEOUT, SESSION_MAX_SESSIONS, SESSION_MAX_MEMORY_BYTES
+
+
+class SessionNotFoundError(QuizException):
+    """Brak sesji o podanym identyfikatorze (zamknięta, wygasła lub usunięta)"""
+    pass
+
+
+def estimate_question_size(question: Question) -> int:
+    """Szacuje pamięć pytania w bajtach (obiekt, tekst i opcje)."""
+    return (
+        sys.getsizeof(question)
+        + sys.getsizeof(question.text)
+        + sys.getsizeof(question.options)
+        + sum(sys.getsizeof(option) for option in question.options)
+    )
+
+
+def estimate_quiz_size(quiz: Quiz) -> int:
+    """
+    Szacuje pamięć quizu w bajtach.
+
+    Pytania współdzielone między quizami są liczone w każdym z nich,
+    więc wynik jest górnym oszacowaniem.
+    """
+    return (
+        sys.getsizeof(quiz)
+        + sys.getsizeof(quiz.questions)
+        + quiz.answers.nbytes
+        + sum(estimate_question_size(question) for question in quiz.questions)
+    )
+
+
+class QuizSession:
+    """Quiz jednego gracza z blokadą chroniącą jego stan."""
+    __slots__ = ("session_id", "quiz", "lock", "last_access", "size", "finished")
+
+    def __init__(self, session_id: str, quiz: Quiz, now: float):
+        self.session_id = session_id
+        self.quiz = quiz
+        self.lock = threading.Lock()
+        self.last_access = now
+        self.size = estimate_quiz_size(quiz)
+        self.finished = quiz.is_finished()
+
+
+class SessionManager:
+    """
+    Przechowuje sesje quizu według identyfikatora z limitem pamięci,
+    wygaszaniem bezczynnych sesji i polityką LRU.
+    """
+
+    def __init__(
+        self,
+        idle_timeout: Optional[float] = SESSION_IDLE_TIMEOUT,
+        max_sessions: int = SESSION_MAX_SESSIONS,
+        max_memory_bytes: int = SESSION_MAX_MEMORY_BYTES,
+        clock: Callable[[], float] = time.monotonic,
+        store: Optional[SessionStore] = None
+    ):
+        """
+        Args:
+            idle_timeout: Czas bezczynności (s), po którym sesja wygasa
+                          (None - sesje nie wygasają)
+            max_sessions: Maksymalna liczba żyjących sesji
+            max_memory_bytes: Limit szacowanej pamięci wszystkich sesji
+            clock: Źródło czasu (do testów)
+            store: Trwały zapis sesji (dziennik i migawki); None - sesje
+                   istnieją tylko w pamięci procesu
+        """
+        if idle_timeout is not None and idle_timeout <= 0:
+            raise ValueError("Czas bezczynności musi być liczbą dodatnią")
+        if max_sessions < 1 or max_memory_bytes < 1:
+            raise ValueError("Limity sesji muszą być liczbami dodatnimi")
+        self.idle_timeout = idle_timeout
+        self.max_sessions = max_sessions
+        self.max_memory_bytes = max_memory_bytes
+        self._clock = clock
+        self.store = store
+        self._sessions: "OrderedDict[str, QuizSession]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.memory_bytes = 0
+        self.created = 0
+        self.finished = 0
+        self.evicted_idle = 0
+        self.evicted_lru = 0
+
+    def __len__(self) -> int:
+        return len(self._sessions)
+
+    def __contains__(self, session_id: str) -> bool:
+        with self._lock:
+            self._expire_idle(self._clock())
+            return session_id in self._sessions
+
+    # ===== CYKL ŻYCIA SESJI =====
+
+    def create(self, questions: List[Question], session_id: Optional[str] = None) -> str:
+        """
+        Tworzy i rozpoczyna quiz dla nowej sesji.
+
+        Returns:
+            Identyfikator sesji
+
+        Raises:
+            ValueError: Jeśli sesja o podanym identyfikatorze już istnieje
+                        lub quiz przekracza limit pamięci
+        """
+        quiz = Quiz(questions)
+        quiz.start()
+        session_id = session_id or uuid.uuid4().hex
+        self._insert(session_id, quiz, new=True)
+        return session_id
+
+    def _insert(self, session_id: str, quiz: Quiz, new: bool) -> QuizSession:
+        now = self._clock()
+        session = QuizSession(session_id, quiz, now)
+        if session.size > self.max_memory_bytes:
+            raise ValueError("Quiz przekracza limit pamięci sesji")
+
+        with self._lock:
+            self._expire_idle(now)
+            if session_id in self._sessions:
+                raise ValueError(f"Sesja {session_id} już istnieje")
+            if new:
+                if self.store is not None:
+                    self.store.record_created(session_id, session)
+                self.created += 1
+            self._sessions[session_id] = session
+            self.memory_bytes += session.size
+            self._evict_over_limit(keep=session_id)
+        return session
+
+    def restore(self) -> int:
+        """
+        Wczytuje sesje zapisane w store (migawki i dziennik) i zleca
+        zapis ich migawek, aby stare dzienniki mogły zostać usunięte.
+
+        Returns:
+            Liczba odtworzonych sesji
+        """
+        if self.store is None:
+            raise ValueError("Menedżer sesji nie ma skonfigurowanego zapisu")
+        restored = self.store.restore()
+        for session_id, quiz in restored.items():
+            session = self._insert(session_id, quiz, new=False)
+            self.store.mark_dirty(session_id, session)
+        self.store.checkpoint()
+        return len(restored)
+
+    def get(self, session_id: str) -> Quiz:
+        """Zwraca quiz sesji i odnotowuje jej użycie."""
+        return self._touch(session_id).quiz
+
+    def close(self, session_id: str) -> Dict[str, Any]:
+        """Usuwa sesję i zwraca podsumowanie jej quizu."""
+        with self._lock:
+            session = self._sessions.pop(session_id, None)
+            if session is None:
+                raise SessionNotFoundError(f"Brak sesji {session_id}")
+            self.memory_bytes -= session.size
+            if self.store is not None:
+                self.store.record_closed(session_id)
+        with session.lock:
+            return session.quiz.get_summary()
+
+    # ===== OPERACJE NA QUIZIE =====
+
+    def answer_current(self, session_id: str, answer_index: int) -> bool:
+        """
+        Zapisuje odpowiedź na bieżące pytanie sesji.
+
+        Odpowiedzi w jednej sesji są serializowane jej blokadą; różne sesje
+        nie blokują się nawzajem.
+
+        Returns:
+            True, jeśli odpowiedź była poprawna
+
+        Raises:
+            SessionNotFoundError: Jeśli sesja nie istnieje
+            InvalidAnswerError, QuizStateError: Jak Quiz.answer_current
+        """
+        session = self._touch(session_id)
+        with session.lock:
+            self._ensure_live(session_id, session)
+            question = session.quiz.get_current_question()
+            session.quiz.answer_current(answer_index)
+            is_correct = question.is_correct(answer_index)
+            if self.store is not None:
+                with self._lock:
+                    if self._sessions.get(session_id) is session:
+                        self.store.record_answer(session_id, session, session.quiz.current - 1, answer_index)
+            just_finished = not session.finished and session.quiz.is_finished()
+            if just_finished:
+                session.finished = True
+        if just_finished:
+            with self._lock:
+                self.finished += 1
+        return is_correct
+
+    def add_question(self, session_id: str, question: Question) -> None:
+        """Dołącza pytanie do quizu sesji (np. dostarczone strumieniowo)."""
+        session = self._touch(session_id)
+        with session.lock:
+            self._ensure_live(session_id, session)
+            session.quiz.add_question(question)
+            session.finished = False
+            if self.store is not None:
+                with self._lock:
+                    if self._sessions.get(session_id) is session:
+                        self.store.record_question(session_id, session, len(session.quiz.questions) - 1, question)
+            growth = estimate_question_size(question) + session.quiz.answers.itemsize
+        with self._lock:
+            if self._sessions.get(session_id) is session:
+                session.size += growth
+                self.memory_bytes += growth
+                self._evict_over_limit(keep=session_id)
+
+    def _ensure_live(self, session_id: str, session: QuizSession) -> None:
+        # Między _touch a blokadą sesji inny wątek mógł ją zamknąć lub usunąć.
+        # Zapis do store jest sprawdzany ponownie pod blokadą menedżera, aby
+        # zamknięta sesja nie wróciła po checkpoincie
+        with self._lock:
+            if self._sessions.get(session_id) is not session:
+                raise SessionNotFoundError(f"Brak sesji {session_id}")
+
+    # ===== USUWANIE SESJI =====
+
+    def evict_idle(self) -> int:
+        """Usuwa wszystkie bezczynne sesje i zwraca ich liczbę."""
+        with self._lock:
+            return self._expire_idle(self._clock())
+
+    def _touch(self, session_id: str) -> QuizSession:
+        now = self._clock()
+        with self._lock:
+            self._expire_idle(now)
+            session = self._sessions.get(session_id)
+            if session is None:
+                raise SessionNotFoundError(f"Brak sesji {session_id}")
+            session.last_access = now
+            self._sessions.move_to_end(session_id)
+            return session
+
+    def _expire_idle(self, now: float) -> int:
+        # Wywoływane z założoną blokadą; sesje są uporządkowane według
+        # ostatniego użycia, więc wystarczy sprawdzać początek kolejki
+        if self.idle_timeout is None:
+            return 0
+        expired = 0
+        while self._sessions:
+            session = next(iter(self._sessions.values()))
+            if now - session.last_access < self.idle_timeout:
+                break
+            self._remove_oldest()
+            self.evicted_idle += 1
+            expired += 1
+        return expired
+
+    def _evict_over_limit(self, keep: str) -> None:
+        # Wywoływane z założoną blokadą; nigdy nie usuwa właśnie używanej sesji
+        while (
+            len(self._sessions) > self.max_sessions or self.memory_bytes > self.max_memory_bytes
+        ) and len(self._sessions) > 1:
+            if next(iter(self._sessions)) == keep:
+                self._sessions.move_to_end(keep)
+            self._remove_oldest()
+            self.evicted_lru += 1
+
+    def _remove_oldest(self) -> None:
+        session_id, session = self._sessions.popitem(last=False)
+        self.memory_bytes -= session.size
+        # Usunięta sesja nie jest odtwarzana po restarcie
+        if self.store is not None:
+            self.store.record_closed(session_id)
+
+    def get_stats(self) -> Dict[str, int]:
+        """Zwraca liczniki sesji: żyjące, usunięte, ukończone i pamięć."""
+        with self._lock:
+            return {
+                "live": len(self._sessions),
+                "created": self.created,
+                "finished": self.finished,
+                "evicted": self.evicted_idle + self.evicted_lru,
+                "evicted_idle": self.evicted_idle,
+                "evicted_lru": self.evicted_lru,
+                "memory_bytes": self.memory_bytes,
+            }
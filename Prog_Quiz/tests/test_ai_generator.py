@@ -2,8 +2,8 @@ from unittest.mock import MagicMock, patch
 import pytest
 import requests
 
-from ai_generator import AIServiceError, InvalidModelResponseError, QuizItem, generate_quiz
-from config import MAX_QUESTIONS, MIN_QUESTIONS
+from ai_generator import AIGenerator, AIServiceError, InvalidModelResponseError, QuizItem, generate_quiz
+from config import MAX_QUESTIONS, MIN_QUESTIONS, QUIZ_CHUNK_SIZE
 
 
 # --- Fixtures ---
@@ -64,7 +64,7 @@ def test_generate_quiz_below_min_question(n_questions: int):
         generate_quiz("Python", n_questions)
 
 
-@pytest.mark.parametrize("n_questions", [MAX_QUESTIONS + 1, MAX_QUESTIONS + 10, 100])
+@pytest.mark.parametrize("n_questions", [MAX_QUESTIONS + 1, MAX_QUESTIONS + 10, MAX_QUESTIONS * 2])
 def test_generate_quiz_above_max_questions(n_questions: int):
     """Test: liczba pytań powyżej MAX_QUESTIONS powinna wywołać wyjątek"""
     with pytest.raises((ValueError, AIServiceError, InvalidModelResponseError)):
@@ -72,8 +72,8 @@ def test_generate_quiz_above_max_questions(n_questions: int):
 
 
 # --- Testy prawidłowego działania ---
-@patch('ai_generator.requests')  # Użycie requst do komunikacji z API
-def test_generate_quiz_valid_input(mock_requests, valid_quiz_response: list):
+@patch('ai_generator.requests.Session.post')  # Komunikacja z API przez współdzieloną sesję requests
+def test_generate_quiz_valid_input(mock_post, valid_quiz_response: list):
     """Test: prawidłowe wejście powinno zwrócić poprawną listę QuizItem"""
     # Mockowanie odpowiedzi z AI w formacie OpenAI Chat Completions
     import json
@@ -88,7 +88,7 @@ def test_generate_quiz_valid_input(mock_requests, valid_quiz_response: list):
             }
         ]
     }
-    mock_requests.post.return_value = mock_response
+    mock_post.return_value = mock_response
 
     result = generate_quiz("Python", 3)
         
@@ -112,31 +112,21 @@ def test_generate_quiz_valid_input(mock_requests, valid_quiz_response: list):
 
 
 @pytest.mark.parametrize("n_questions", [MIN_QUESTIONS, MIN_QUESTIONS + 5, MAX_QUESTIONS - 5, MAX_QUESTIONS])
-@patch('ai_generator.requests')
-def test_generate_quiz_boundary_questions(mock_requests, valid_quiz_item: QuizItem, n_questions: int):
+@patch('ai_generator.requests.Session.post')
+def test_generate_quiz_boundary_questions(mock_post, n_questions: int):
     """Test: Liczba pytań na granicach zakresu powinna działać poprawnie"""
-    # Mock odpowiedzi z odpowiednią liczbą pytań w formacie OpenAI
-    import json
-    mock_response = MagicMock()
-    mock_response.status_code = 200
-    mock_response.json.return_value = {
-        'choices': [
-            {
-                'message': {
-                    'content': json.dumps([valid_quiz_item] * n_questions)
-                }
-            }
-        ]
-    }
-    mock_requests.post.return_value = mock_response
+    mock_post.side_effect = lambda url, json, headers, timeout: _chunk_response(json)
 
     result = generate_quiz("Python", n_questions)
 
     assert len(result) == n_questions
+    # Domyślny generator dzieli duży quiz na części po QUIZ_CHUNK_SIZE pytań
+    assert mock_post.call_count == -(-n_questions // QUIZ_CHUNK_SIZE)
+
 
 # --- Testy walidacji odpowiedzi AI ---
-@patch('ai_generator.requests')
-def test_generate_quiz_missing_question_key(mock_requests):
+@patch('ai_generator.requests.Session.post')
+def test_generate_quiz_missing_question_key(mock_post):
     """Test: brak klucza 'question' w odpowiedzi powinien wywołać InvalidModelResponseError"""
     import json
     mock_response = MagicMock()
@@ -156,14 +146,14 @@ def test_generate_quiz_missing_question_key(mock_requests):
             }
         ]
     }
-    mock_requests.post.return_value = mock_response
+    mock_post.return_value = mock_response
     
     with pytest.raises(InvalidModelResponseError):
         generate_quiz("Python", 1)
 
 
-@patch('ai_generator.requests')
-def test_generate_quiz_missing_choices(mock_requests):
+@patch('ai_generator.requests.Session.post')
+def test_generate_quiz_missing_choices(mock_post):
     """Test: brak opcji odpowiedzi powinien wywołać InvalidModelResponseError"""
     import json
     mock_response = MagicMock()
@@ -183,15 +173,15 @@ def test_generate_quiz_missing_choices(mock_requests):
             }
         ]
     }
-    mock_requests.post.return_value = mock_response
+    mock_post.return_value = mock_response
     
     with pytest.raises(InvalidModelResponseError):
         generate_quiz("Python", 1)
 
 
 @pytest.mark.parametrize("invalid_correct", ["e", "f", "x", "1", "", "ab"])
-@patch('ai_generator.requests')
-def test_generate_quiz_invalid_correct_value(mock_requests, invalid_correct):
+@patch('ai_generator.requests.Session.post')
+def test_generate_quiz_invalid_correct_value(mock_post, invalid_correct):
     """Test: nieprawidłowa wartość 'correct' powinna wywołać InvalidModelResponseError"""
     import json
     mock_response = MagicMock()
@@ -212,14 +202,14 @@ def test_generate_quiz_invalid_correct_value(mock_requests, invalid_correct):
             }
         ]
     }
-    mock_requests.post.return_value = mock_response
+    mock_post.return_value = mock_response
     
     with pytest.raises(InvalidModelResponseError):
         generate_quiz("Python", 1)
 
 
-@patch('ai_generator.requests')
-def test_generate_quiz_wrong_number_of_questions(mock_requests, valid_quiz_item):
+@patch('ai_generator.requests.Session.post')
+def test_generate_quiz_wrong_number_of_questions(mock_post, valid_quiz_item):
     """Test: AI zwraca nieprawidłową liczbę pytań"""
     import json
     mock_response = MagicMock()
@@ -234,38 +224,36 @@ def test_generate_quiz_wrong_number_of_questions(mock_requests, valid_quiz_item)
             }
         ]
     }
-    mock_requests.post.return_value = mock_response
+    mock_post.return_value = mock_response
     
     with pytest.raises(InvalidModelResponseError):
         generate_quiz("Python", 5)
 
 
 # --- Testy obsługi błędów komunikacji ---
-@patch('ai_generator.requests')
-def test_generate_quiz_api_connection_error(mock_requests):
+@patch('ai_generator.requests.Session.post')
+def test_generate_quiz_api_connection_error(mock_post):
     """Test: błąd połączenia z API powinien wywołać AIServiceError"""
     from requests.exceptions import ConnectionError as RequestsConnectionError
-    mock_requests.post.side_effect = RequestsConnectionError("Network error")
-    mock_requests.exceptions = requests.exceptions
+    mock_post.side_effect = RequestsConnectionError("Network error")
     
     with pytest.raises(AIServiceError):
         generate_quiz("Python", 5)
 
 
-@patch('ai_generator.requests')
-def test_generate_quiz_api_timeout(mock_requests):
+@patch('ai_generator.requests.Session.post')
+def test_generate_quiz_api_timeout(mock_post):
     """Test: timeout API powinien wywołać AIServiceError"""
     from requests.exceptions import Timeout
-    mock_requests.post.side_effect = Timeout("Request timeout")
-    mock_requests.exceptions = requests.exceptions
+    mock_post.side_effect = Timeout("Request timeout")
     
     with pytest.raises(AIServiceError):
         generate_quiz("Python", 5)
 
 
 @pytest.mark.parametrize("status_code", [400, 401, 403, 404, 500, 502, 503])
-@patch('ai_generator.requests')
-def test_generate_quiz_api_error_status_codes(mock_requests, status_code):
+@patch('ai_generator.requests.Session.post')
+def test_generate_quiz_api_error_status_codes(mock_post, status_code):
     """Test: błędne kody statusu HTTP powinny wywołać AIServiceError"""
     from requests.exceptions import HTTPError
     mock_response = MagicMock()
@@ -274,27 +262,26 @@ def test_generate_quiz_api_error_status_codes(mock_requests, status_code):
     http_error = HTTPError(f"HTTP {status_code}")
     http_error.response = mock_response
     mock_response.raise_for_status.side_effect = http_error
-    mock_requests.post.return_value = mock_response
-    mock_requests.exceptions = requests.exceptions
+    mock_post.return_value = mock_response
     
     with pytest.raises(AIServiceError):
         generate_quiz("Python", 5)
 
 
-@patch('ai_generator.requests')
-def test_generate_quiz_invalid_json_response(mock_requests):
+@patch('ai_generator.requests.Session.post')
+def test_generate_quiz_invalid_json_response(mock_post):
     """Test: nieprawidłowy JSON w odpowiedzi powinien wywołać InvalidModelResponseError"""
     mock_response = MagicMock()
     mock_response.status_code = 200
     mock_response.json.side_effect = ValueError("Invalid JSON")
-    mock_requests.post.return_value = mock_response
+    mock_post.return_value = mock_response
     
     with pytest.raises(InvalidModelResponseError):
         generate_quiz("Python", 5)
 
 
-@patch('ai_generator.requests')
-def test_generate_quiz_non_list_response(mock_requests):
+@patch('ai_generator.requests.Session.post')
+def test_generate_quiz_non_list_response(mock_post):
     """Test: odpowiedź nie będąca listą powinna wywołać InvalidModelResponseError"""
     import json
     mock_response = MagicMock()
@@ -308,7 +295,7 @@ def test_generate_quiz_non_list_response(mock_requests):
             }
         ]
     }
-    mock_requests.post.return_value = mock_response
+    mock_post.return_value = mock_response
     
     with pytest.raises(InvalidModelResponseError):
         generate_quiz("Python", 5)
@@ -316,8 +303,8 @@ def test_generate_quiz_non_list_response(mock_requests):
 
 # --- Testy walidacji wszystkich kluczy ---
 @pytest.mark.parametrize("missing_key", ["a", "b", "c", "d", "correct"])
-@patch('ai_generator.requests')
-def test_generate_quiz_missing_required_keys(mock_requests, missing_key):
+@patch('ai_generator.requests.Session.post')
+def test_generate_quiz_missing_required_keys(mock_post, missing_key):
     """Test: brak wymaganego klucza powinien wywołać InvalidModelResponseError"""
     import json
     quiz_item = {
@@ -342,15 +329,15 @@ def test_generate_quiz_missing_required_keys(mock_requests, missing_key):
             }
         ]
     }
-    mock_requests.post.return_value = mock_response
+    mock_post.return_value = mock_response
     
     with pytest.raises(InvalidModelResponseError):
         generate_quiz("Python", 1)
 
 
 # --- Testy poprawności formatowania danych ---
-@patch('ai_generator.requests')
-def test_generate_quiz_all_correct_values_valid(mock_requests):
+@patch('ai_generator.requests.Session.post')
+def test_generate_quiz_all_correct_values_valid(mock_post):
     """Test: wszystkie prawidłowe wartości 'correct' (a, b, c, d) powinny być akceptowane"""
     import json
     valid_items = [
@@ -376,7 +363,7 @@ def test_generate_quiz_all_correct_values_valid(mock_requests):
             }
         ]
     }
-    mock_requests.post.return_value = mock_response
+    mock_post.return_value = mock_response
     
     result = generate_quiz("Python", 4)
     
@@ -387,6 +374,548 @@ def test_generate_quiz_all_correct_values_valid(mock_requests):
     assert result[3]["correct"] == "d"
 
 
+# --- Testy generowania w częściach ---
+def _chunk_response(payload: dict) -> MagicMock:
+    """Buduje odpowiedź API z liczbą pytań odczytaną z promptu."""
+    import json
+    import re
+    prompt = payload['messages'][1]['content']
+    count = int(re.search(r"dokładnie (\d+) pytań", prompt).group(1))
+    items = [
+        {"question": f"Pytanie {i}?", "a": "A", "b": "B", "c": "C", "d": "D", "correct": "a"}
+        for i in range(count)
+    ]
+    mock_response = MagicMock()
+    mock_response.status_code = 200
+    mock_response.json.return_value = {'choices': [{'message': {'content': json.dumps(items)}}]}
+    return mock_response
+
+
+@pytest.mark.parametrize("n_questions, chunk_size, expected", [
+    (25, 10, [9, 8, 8]),
+    (20, 10, [10, 10]),
+    (11, 10, [6, 5]),
+    (3, 1, [1, 1, 1]),
+])
+def test_split_into_chunks(n_questions, chunk_size, expected):
+    """Test: pytania dzielone są na możliwie równe części nie większe niż chunk_size"""
+    generator = AIGenerator(api_url="http://test", api_key="key", chunk_size=chunk_size)
+    assert generator._split_into_chunks(n_questions) == expected
+
+
+@pytest.mark.parametrize("chunk_size, max_workers", [(0, 2), (5, 0)])
+def test_generator_invalid_chunk_config(chunk_size, max_workers):
+    """Test: niepoprawna konfiguracja części powinna wywołać ValueError"""
+    with pytest.raises(ValueError):
+        AIGenerator(api_url="http://test", api_key="key", chunk_size=chunk_size, max_workers=max_workers)
+
+
+@patch('ai_generator.requests.Session.post')
+def test_generate_quiz_chunked_merges_parts(mock_post):
+    """Test: quiz większy niż chunk_size jest składany z kilku zapytań"""
+    mock_post.side_effect = lambda url, json, headers, timeout: _chunk_response(json)
+    generator = AIGenerator(api_url="http://test", api_key="key", chunk_size=10, max_workers=3)
+
+    result = generator.generate_quiz("Python", 25)
+
+    assert len(result) == 25
+    assert mock_post.call_count == 3
+    prompts = [call.kwargs['json']['messages'][1]['content'] for call in mock_post.call_args_list]
+    assert all("większego quizu" in prompt for prompt in prompts)
+
+
+@patch('ai_generator.requests.Session.post')
+def test_generate_quiz_below_chunk_size_single_request(mock_post):
+    """Test: quiz nie większy niż chunk_size wysyła jedno zapytanie"""
+    mock_post.side_effect = lambda url, json, headers, timeout: _chunk_response(json)
+    generator = AIGenerator(api_url="http://test", api_key="key", chunk_size=10)
+
+    result = generator.generate_quiz("Python", 10)
+
+    assert len(result) == 10
+    assert mock_post.call_count == 1
+
+
+@patch('ai_generator.requests.Session.post')
+def test_generate_quiz_chunked_part_failure(mock_post):
+    """Test: błąd jednej części przerywa generowanie całego quizu"""
+    from requests.exceptions import Timeout
+    calls = []
+
+    def post(url, json, headers, timeout):
+        calls.append(json)
+        if len(calls) == 2:
+            raise Timeout("Request timeout")
+        return _chunk_response(json)
+
+    mock_post.side_effect = post
+    generator = AIGenerator(api_url="http://test", api_key="key", chunk_size=5, max_workers=1)
+
+    with pytest.raises(AIServiceError):
+        generator.generate_quiz("Python", 15)
+
+
+# --- Testy puli połączeń HTTP ---
+def test_session_is_reused_between_requests():
+    """Test: generator używa tej samej sesji dla kolejnych zapytań"""
+    generator = AIGenerator(api_url="http://test", api_key="key")
+    with patch.object(requests.Session, 'post', side_effect=lambda url, json, headers, timeout: _chunk_response(json)):
+        generator.generate_quiz("Python", 2)
+        first_session = generator.session
+        generator.generate_quiz("Python", 2)
+    assert generator.session is first_session
+    generator.close()
+
+
+def test_session_pool_size_configured():
+    """Test: adapter sesji ma pulę połączeń o zadanym rozmiarze"""
+    with AIGenerator(api_url="http://test", api_key="key", pool_size=7) as generator:
+        adapter = generator.session.get_adapter("https://example.com")
+        assert adapter._pool_maxsize == 7
+        assert generator.session.headers["Connection"] == "keep-alive"
+
+
+def test_context_manager_closes_own_session():
+    """Test: wyjście z bloku with zamyka sesję należącą do generatora"""
+    with patch.object(requests.Session, 'close') as mock_close:
+        with AIGenerator(api_url="http://test", api_key="key") as generator:
+            generator.session
+    mock_close.assert_called_once()
+    assert generator._session is None
+
+
+def test_external_session_not_closed():
+    """Test: sesja przekazana z zewnątrz nie jest zamykana przez generator"""
+    external = MagicMock(spec=requests.Session)
+    generator = AIGenerator(api_url="http://test", api_key="key", session=external)
+    generator.close()
+    assert generator.session is external
+    external.close.assert_not_called()
+
+
+def test_invalid_pool_size():
+    """Test: niepoprawny rozmiar puli powinien wywołać ValueError"""
+    with pytest.raises(ValueError):
+        AIGenerator(api_url="http://test", api_key="key", pool_size=0)
+
+
+# --- Testy API asynchronicznego ---
+def _async_generator(handler, **kwargs) -> AIGenerator:
+    """Tworzy generator z klientem httpx obsługiwanym przez lokalny handler."""
+    import httpx
+    client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    return AIGenerator(api_url="http://test", api_key="key", async_client=client, **kwargs)
+
+
+def _async_quiz_handler(request):
+    """Handler httpx zwracający tyle pytań, ile zażądano w prompcie."""
+    import httpx
+    import json
+    payload = json.loads(request.content)
+    mock_response = _chunk_response(payload)
+    return httpx.Response(200, json=mock_response.json.return_value)
+
+
+def test_agenerate_quiz_valid_input():
+    """Test: agenerate_quiz zwraca zwalidowaną listę QuizItem"""
+    import asyncio
+    generator = _async_generator(_async_quiz_handler)
+
+    result = asyncio.run(generator.agenerate_quiz("Python", 3))
+
+    assert len(result) == 3
+    assert all(item["correct"] in ["a", "b", "c", "d"] for item in result)
+
+
+@pytest.mark.parametrize("topic, n_questions", [("", 5), ("   ", 5), ("Python", MIN_QUESTIONS - 1), ("Python", MAX_QUESTIONS + 1)])
+def test_agenerate_quiz_invalid_input(topic, n_questions):
+    """Test: agenerate_quiz stosuje tę samą walidację wejścia"""
+    import asyncio
+    generator = _async_generator(_async_quiz_handler)
+    with pytest.raises(ValueError):
+        asyncio.run(generator.agenerate_quiz(topic, n_questions))
+
+
+@pytest.mark.parametrize("status_code", [400, 401, 500, 503])
+def test_agenerate_quiz_error_status_codes(status_code):
+    """Test: błędne kody statusu HTTP powinny wywołać AIServiceError"""
+    import asyncio
+    import httpx
+    generator = _async_generator(lambda request: httpx.Response(status_code, text=f"Error {status_code}"))
+    with pytest.raises(AIServiceError, match=str(status_code)):
+        asyncio.run(generator.agenerate_quiz("Python", 2))
+
+
+def test_agenerate_quiz_connection_error():
+    """Test: błąd połączenia powinien wywołać AIServiceError"""
+    import asyncio
+    import httpx
+
+    def handler(request):
+        raise httpx.ConnectError("Network error")
+
+    generator = _async_generator(handler)
+    with pytest.raises(AIServiceError):
+        asyncio.run(generator.agenerate_quiz("Python", 2))
+
+
+def test_agenerate_quiz_invalid_items():
+    """Test: odpowiedź z błędnym pytaniem powinna wywołać InvalidModelResponseError"""
+    import asyncio
+    import httpx
+    import json
+    content = json.dumps([{"question": "Test?", "a": "A", "b": "B", "c": "C", "d": "D", "correct": "x"}])
+    generator = _async_generator(
+        lambda request: httpx.Response(200, json={'choices': [{'message': {'content': content}}]})
+    )
+    with pytest.raises(InvalidModelResponseError):
+        asyncio.run(generator.agenerate_quiz("Python", 1))
+
+
+def test_agenerate_quiz_chunked():
+    """Test: asynchroniczny tryb części składa quiz z kilku zapytań"""
+    import asyncio
+    calls = []
+
+    def handler(request):
+        calls.append(request)
+        return _async_quiz_handler(request)
+
+    generator = _async_generator(handler, chunk_size=10)
+    result = asyncio.run(generator.agenerate_quiz("Python", 25))
+
+    assert len(result) == 25
+    assert len(calls) == 3
+
+
+def test_agenerate_many_respects_concurrency():
+    """Test: agenerate_many nie przekracza limitu generowań w toku"""
+    import asyncio
+    import httpx
+    import json
+    state = {"in_flight": 0, "peak": 0}
+
+    async def handler(request):
+        state["in_flight"] += 1
+        state["peak"] = max(state["peak"], state["in_flight"])
+        await asyncio.sleep(0.01)
+        state["in_flight"] -= 1
+        mock_response = _chunk_response(json.loads(request.content))
+        return httpx.Response(200, json=mock_response.json.return_value)
+
+    generator = _async_generator(handler)
+    topics = [f"Temat {i}" for i in range(20)]
+
+    results = asyncio.run(generator.agenerate_many(topics, 2, concurrency=4))
+
+    assert len(results) == 20
+    assert all(len(quiz) == 2 for quiz in results)
+    assert state["peak"] == 4
+
+
+def test_agenerate_many_return_exceptions():
+    """Test: return_exceptions=True zwraca błędy w miejscu wyników"""
+    import asyncio
+    import httpx
+    import json
+
+    def handler(request):
+        if "Zły" in json.loads(request.content)['messages'][1]['content']:
+            return httpx.Response(500, text="Error")
+        return _async_quiz_handler(request)
+
+    generator = _async_generator(handler)
+    results = asyncio.run(generator.agenerate_many(["Python", "Zły", "Historia"], 1, return_exceptions=True))
+
+    assert len(results[0]) == 1
+    assert isinstance(results[1], AIServiceError)
+    assert len(results[2]) == 1
+    with pytest.raises(AIServiceError):
+        asyncio.run(generator.agenerate_many(["Python", "Zły"], 1))
+
+
+def test_agenerate_many_invalid_concurrency():
+    """Test: niepoprawny limit współbieżności powinien wywołać ValueError"""
+    import asyncio
+    generator = _async_generator(_async_quiz_handler)
+    with pytest.raises(ValueError):
+        asyncio.run(generator.agenerate_many(["Python"], 1, concurrency=0))
+
+
+def test_async_client_recreated_for_new_event_loop():
+    """Test: własny klient asynchroniczny jest tworzony dla każdej nowej pętli zdarzeń"""
+    import asyncio
+
+    async def get_client(generator):
+        return generator._get_async_client()
+
+    generator = AIGenerator(api_url="http://test", api_key="key")
+    first = asyncio.run(get_client(generator))
+    second = asyncio.run(get_client(generator))
+    assert first is not second
+    asyncio.run(generator.aclose())
+    assert generator._async_client is None
+
+
+# --- Testy generowania strumieniowego ---
+def _sse_response(content: str, piece_size: int = 5) -> MagicMock:
+    """Buduje odpowiedź strumieniową SSE dzielącą treść na małe fragmenty."""
+    import json
+    lines = []
+    for i in range(0, len(content), piece_size):
+        event = {'choices': [{'delta': {'content': content[i:i + piece_size]}}]}
+        lines.extend([f"data: {json.dumps(event)}", ""])
+    lines.append("data: [DONE]")
+    mock_response = MagicMock()
+    mock_response.iter_lines.return_value = iter(lines)
+    return mock_response
+
+
+@patch('ai_generator.requests.Session.post')
+def test_stream_quiz_yields_items_incrementally(mock_post, valid_quiz_response: list):
+    """Test: stream_quiz zwraca pytania, zanim strumień się zakończy"""
+    import json
+    mock_response = _sse_response(json.dumps(valid_quiz_response))
+    mock_post.return_value = mock_response
+
+    stream = AIGenerator(api_url="http://test", api_key="key").stream_quiz("Python", 3)
+    first = next(stream)
+
+    assert first == valid_quiz_response[0]
+    # Strumień nie został jeszcze w całości odczytany
+    assert next(mock_response.iter_lines.return_value, None) is not None
+    assert mock_post.call_args.kwargs['stream'] is True
+    assert mock_post.call_args.kwargs['json']['stream'] is True
+
+
+@patch('ai_generator.requests.Session.post')
+def test_stream_quiz_full_result(mock_post, valid_quiz_response: list):
+    """Test: pełna iteracja zwraca wszystkie pytania i zamyka odpowiedź"""
+    import json
+    mock_post.return_value = _sse_response("```json\n" + json.dumps(valid_quiz_response) + "\n```")
+
+    result = list(AIGenerator(api_url="http://test", api_key="key").stream_quiz("Python", 3))
+
+    assert result == valid_quiz_response
+    mock_post.return_value.close.assert_called_once()
+
+
+def test_stream_quiz_validates_input_eagerly():
+    """Test: walidacja wejścia odbywa się przed rozpoczęciem iteracji"""
+    with pytest.raises(ValueError):
+        AIGenerator(api_url="http://test", api_key="key").stream_quiz("", 3)
+
+
+@patch('ai_generator.requests.Session.post')
+def test_stream_quiz_wrong_number_of_questions(mock_post, valid_quiz_item: QuizItem):
+    """Test: za mało pytań w strumieniu powinno wywołać InvalidModelResponseError"""
+    import json
+    mock_post.return_value = _sse_response(json.dumps([valid_quiz_item] * 2))
+
+    stream = AIGenerator(api_url="http://test", api_key="key").stream_quiz("Python", 3)
+    with pytest.raises(InvalidModelResponseError):
+        list(stream)
+
+
+@patch('ai_generator.requests.Session.post')
+def test_stream_quiz_invalid_item(mock_post):
+    """Test: niepoprawne pytanie w strumieniu powinno wywołać InvalidModelResponseError"""
+    import json
+    mock_post.return_value = _sse_response(json.dumps([{"question": "Test?", "a": "A", "correct": "a"}]))
+
+    with pytest.raises(InvalidModelResponseError):
+        list(AIGenerator(api_url="http://test", api_key="key").stream_quiz("Python", 1))
+
+
+@patch('ai_generator.requests.Session.post')
+def test_stream_quiz_truncated_stream(mock_post, valid_quiz_item: QuizItem):
+    """Test: urwany strumień powinien wywołać InvalidModelResponseError"""
+    import json
+    mock_post.return_value = _sse_response(json.dumps([valid_quiz_item])[:-10])
+
+    with pytest.raises(InvalidModelResponseError):
+        list(AIGenerator(api_url="http://test", api_key="key").stream_quiz("Python", 1))
+
+
+@patch('ai_generator.requests.Session.post')
+def test_stream_quiz_http_error(mock_post):
+    """Test: błąd HTTP przy otwarciu strumienia powinien wywołać AIServiceError"""
+    from requests.exceptions import HTTPError
+    mock_response = MagicMock()
+    mock_response.status_code = 503
+    http_error = HTTPError("HTTP 503")
+    http_error.response = mock_response
+    mock_response.raise_for_status.side_effect = http_error
+    mock_post.return_value = mock_response
+
+    with pytest.raises(AIServiceError):
+        list(AIGenerator(api_url="http://test", api_key="key").stream_quiz("Python", 1))
+
+
+@patch('ai_generator.requests.Session.post')
+def test_stream_quiz_chunked_streams_first_part(mock_post):
+    """Test: w trybie części pierwsza część jest strumieniowana, pozostałe generowane równolegle"""
+    import json
+
+    def post(url, json, headers, timeout, stream=False):
+        if stream:
+            content = _chunk_response(json).json.return_value['choices'][0]['message']['content']
+            return _sse_response(content)
+        return _chunk_response(json)
+
+    mock_post.side_effect = post
+    generator = AIGenerator(api_url="http://test", api_key="key", chunk_size=5)
+
+    result = list(generator.stream_quiz("Python", 12))
+
+    assert len(result) == 12
+    assert sum(1 for call in mock_post.call_args_list if call.kwargs.get('stream')) == 1
+    assert mock_post.call_count == 3
+
+
+# --- Testy naprawy niepełnych odpowiedzi ---
+def _content_response(items) -> MagicMock:
+    import json
+    mock_response = MagicMock()
+    mock_response.json.return_value = {'choices': [{'message': {'content': json.dumps(items)}}]}
+    return mock_response
+
+
+def _numbered_items(start: int, count: int) -> list:
+    return [
+        {"question": f"Pytanie {i}?", "a": "A", "b": "B", "c": "C", "d": "D", "correct": "a"}
+        for i in range(start, start + count)
+    ]
+
+
+@patch('ai_generator.requests.Session.post')
+def test_repair_tops_up_missing_questions(mock_post):
+    """Test: brakujące pytania są dobierane osobnym zapytaniem z listą wykluczeń"""
+    mock_post.side_effect = [_content_response(_numbered_items(0, 9)), _content_response(_numbered_items(9, 1))]
+    generator = AIGenerator(api_url="http://test", api_key="key", repair_attempts=2)
+
+    result = generator.generate_quiz("Python", 10)
+
+    assert len(result) == 10
+    assert mock_post.call_count == 2
+    follow_up_prompt = mock_post.call_args_list[1].kwargs['json']['messages'][1]['content']
+    assert "dokładnie 1 pytań" in follow_up_prompt
+    assert "- Pytanie 0?" in follow_up_prompt
+    assert [m["accepted"] for m in generator.repair_metrics] == [9, 1]
+    assert [m["requested"] for m in generator.repair_metrics] == [10, 1]
+
+
+@patch('ai_generator.requests.Session.post')
+def test_repair_replaces_invalid_and_duplicate_items(mock_post):
+    """Test: odrzucone (niepoprawne lub powtórzone) pytania są zastępowane nowymi"""
+    first = _numbered_items(0, 2) + [{"question": "Złe?", "a": "", "b": "B", "c": "C", "d": "D", "correct": "a"}]
+    first[1] = dict(first[0])
+    mock_post.side_effect = [_content_response(first), _content_response(_numbered_items(5, 2))]
+    generator = AIGenerator(api_url="http://test", api_key="key", repair_attempts=1)
+
+    result = generator.generate_quiz("Python", 3)
+
+    assert [item["question"] for item in result] == ["Pytanie 0?", "Pytanie 5?", "Pytanie 6?"]
+    assert generator.repair_metrics[0]["rejected"] == 2
+
+
+@patch('ai_generator.requests.Session.post')
+def test_repair_survives_unparseable_attempt(mock_post):
+    """Test: nieczytelna odpowiedź zużywa próbę, ale nie przerywa generowania"""
+    broken = MagicMock()
+    broken.json.return_value = {'choices': [{'message': {'content': 'to nie JSON'}}]}
+    mock_post.side_effect = [broken, _content_response(_numbered_items(0, 2))]
+    generator = AIGenerator(api_url="http://test", api_key="key", repair_attempts=1)
+
+    assert len(generator.generate_quiz("Python", 2)) == 2
+    assert generator.repair_metrics[0]["error"] is not None
+
+
+@patch('ai_generator.requests.Session.post')
+def test_repair_attempts_are_bounded(mock_post):
+    """Test: po wyczerpaniu prób zgłaszany jest InvalidModelResponseError"""
+    mock_post.side_effect = lambda url, json, headers, timeout: _content_response(_numbered_items(0, 1))
+    generator = AIGenerator(api_url="http://test", api_key="key", repair_attempts=2)
+
+    with pytest.raises(InvalidModelResponseError):
+        generator.generate_quiz("Python", 3)
+    assert mock_post.call_count == 3
+
+
+def test_repair_async_tops_up_missing_questions():
+    """Test: tryb naprawy działa również w agenerate_quiz"""
+    import asyncio
+    import httpx
+    responses = iter([_numbered_items(0, 2), _numbered_items(2, 1)])
+
+    def handler(request):
+        import json
+        content = json.dumps(next(responses))
+        return httpx.Response(200, json={'choices': [{'message': {'content': content}}]})
+
+    generator = _async_generator(handler, repair_attempts=1)
+    assert len(asyncio.run(generator.agenerate_quiz("Python", 3))) == 3
+
+
+def test_repair_invalid_attempts_config():
+    """Test: ujemna liczba prób naprawy powinna wywołać ValueError"""
+    with pytest.raises(ValueError):
+        AIGenerator(api_url="http://test", api_key="key", repair_attempts=-1)
+
+
+# --- Testy wykrywania powtórzonych pytań ---
+@patch('ai_generator.requests.Session.post')
+def test_dedup_rejected_duplicates_trigger_top_up(mock_post):
+    """Test: pytanie wydane wcześniej jest odrzucane i dobierane z listą wykluczeń"""
+    from dedup_index import DedupIndex
+    index = DedupIndex()
+    index.add("Pytanie 0?")
+    mock_post.side_effect = [_content_response(_numbered_items(0, 3)), _content_response(_numbered_items(3, 1))]
+    generator = AIGenerator(api_url="http://test", api_key="key", dedup_index=index)
+
+    result = generator.generate_quiz("Python", 3)
+
+    assert [item["question"] for item in result] == ["Pytanie 1?", "Pytanie 2?", "Pytanie 3?"]
+    follow_up_prompt = mock_post.call_args_list[1].kwargs['json']['messages'][1]['content']
+    assert "dokładnie 1 pytań" in follow_up_prompt
+    assert "- Pytanie 0?" in follow_up_prompt
+    assert generator.repair_metrics[0]["duplicates"] == 1
+    # Przyjęte pytania trafiają do korpusu - kolejny quiz ich nie powtórzy
+    assert index.find_duplicate("pytanie 3") == "Pytanie 3?"
+
+
+@patch('ai_generator.requests.Session.post')
+def test_dedup_without_index_keeps_single_request(mock_post):
+    """Test: bez indeksu i trybu naprawy odpowiedź jest walidowana w całości"""
+    mock_post.return_value = _content_response(_numbered_items(0, 2))
+    generator = AIGenerator(api_url="http://test", api_key="key")
+
+    assert len(generator.generate_quiz("Python", 2)) == 2
+    assert mock_post.call_count == 1
+    assert not generator.repair_metrics
+
+
+@patch('ai_generator.requests.Session.post')
+def test_dedup_stream_tops_up_skipped_duplicates(mock_post):
+    """Test: strumień pomija powtórzone pytanie i dobiera brakujące zapytaniem uzupełniającym"""
+    import json
+    from dedup_index import DedupIndex
+    index = DedupIndex()
+    index.add("Pytanie 1?")
+    mock_post.side_effect = [
+        _sse_response(json.dumps(_numbered_items(0, 3))),
+        _content_response(_numbered_items(5, 1)),
+    ]
+    generator = AIGenerator(api_url="http://test", api_key="key", dedup_index=index)
+
+    result = list(generator.stream_quiz("Python", 3))
+
+    assert [item["question"] for item in result] == ["Pytanie 0?", "Pytanie 2?", "Pytanie 5?"]
+    follow_up_prompt = mock_post.call_args_list[1].kwargs['json']['messages'][1]['content']
+    assert "- Pytanie 1?" in follow_up_prompt
+    assert "- Pytanie 0?" in follow_up_prompt
+
+
 # --- Testy integracyjne (jeśli implementacja jest gotowa) ---
 @pytest.mark.skip(reason="Wymaga implementacji generate_quiz i prawdziwego API")
 def test_generate_quiz_integration_with_real_api():
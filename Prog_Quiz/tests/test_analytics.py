@@ -0,0 +1,154 @@
+import csv
+import io
+import json
+import threading
+
+import pytest
+
+from analytics import CohortAnalytics
+from result_procesor import GRADE_THRESHOLDS, LOWEST_GRADE
+
+
+def _quiz(count, correct_letter="a"):
+    return [
+        {"question": f"Pytanie {i}?", "a": "A", "b": "B", "c": "C", "d": "D", "correct": correct_letter}
+        for i in range(1, count + 1)
+    ]
+
+
+def _wrong(numbers, user="b", correct="a"):
+    return [
+        {"index": n, "user": user, "correct": correct, "question": f"Pytanie {n}?", "correct_text": "A"}
+        for n in numbers
+    ]
+
+
+def test_grade_distribution_uses_report_thresholds():
+    analytics = CohortAnalytics()
+    analytics.add_session(10, 10, [])
+    analytics.add_session(10, 8, _wrong([1, 2]))
+    analytics.add_session(10, 2, _wrong(range(1, 9)))
+
+    grades = analytics.grade_distribution()
+    assert list(grades) == [grade for _, grade in GRADE_THRESHOLDS] + [LOWEST_GRADE]
+    assert grades[GRADE_THRESHOLDS[0][1]] == 1
+    assert grades[GRADE_THRESHOLDS[1][1]] == 1
+    assert grades[LOWEST_GRADE] == 1
+
+
+def test_hardest_questions_by_error_rate():
+    analytics = CohortAnalytics()
+    quiz = _quiz(3)
+    analytics.add_session(3, 1, _wrong([2, 3]), questions=quiz)
+    analytics.add_session(3, 2, _wrong([3]), questions=quiz)
+
+    hardest = analytics.hardest_questions(limit=2)
+    assert [row["question"] for row in hardest] == ["Pytanie 3?", "Pytanie 2?"]
+    assert hardest[0] == {"question": "Pytanie 3?", "attempts": 2, "errors": 2, "error_rate": 1.0}
+    assert hardest[1]["error_rate"] == 0.5
+
+
+def test_hardest_questions_min_attempts():
+    analytics = CohortAnalytics()
+    analytics.add_session(1, 0, _wrong([1]), questions=_quiz(1))
+    assert analytics.hardest_questions(min_attempts=2) == []
+
+
+def test_letter_bias():
+    analytics = CohortAnalytics()
+    # 4 pytania z poprawną odpowiedzią "a"; użytkownik dwa razy wybrał "b"
+    analytics.add_session(4, 2, _wrong([1, 2], user="b"), questions=_quiz(4))
+
+    bias = analytics.letter_bias()
+    assert bias["a"] == {"chosen": 0.5, "correct": 1.0, "bias": -0.5}
+    assert bias["b"] == {"chosen": 0.5, "correct": 0.0, "bias": 0.5}
+    assert bias["c"]["chosen"] == 0.0
+
+
+def test_percentiles_nearest_rank():
+    analytics = CohortAnalytics()
+    for correct in range(0, 11):
+        analytics.add_session(10, correct, _wrong(range(1, 11 - correct)))
+
+    percentiles = analytics.percentiles([10, 50, 100])
+    # 11 sesji: p10 to 2. wynik (ranga ceil(1.1)), p50 - 6.
+    assert percentiles == {"p10": 10.0, "p50": 50.0, "p100": 100.0}
+
+
+def test_percentiles_resolution_and_validation():
+    analytics = CohortAnalytics()
+    analytics.add_session(3, 2, _wrong([1]))
+    assert analytics.percentiles([50]) == {"p50": 66.7}
+    with pytest.raises(ValueError):
+        analytics.percentiles([0])
+
+
+def test_empty_analytics_summary():
+    summary = CohortAnalytics().summary()
+    assert summary["sessions"] == 0
+    assert summary["percentiles"] == {}
+    assert summary["hardest_questions"] == []
+
+
+@pytest.mark.parametrize("args", [
+    (5, 3, _wrong([1])),          # niespójne sumy
+    (5, 6, []),                   # correct > total
+    (-1, 0, []),                  # ujemny total
+])
+def test_add_session_rejects_inconsistent_data(args):
+    with pytest.raises(ValueError):
+        CohortAnalytics().add_session(*args)
+
+
+def test_add_session_rejects_question_count_mismatch():
+    with pytest.raises(ValueError):
+        CohortAnalytics().add_session(2, 2, [], questions=_quiz(3))
+
+
+def test_memory_does_not_grow_with_sessions():
+    analytics = CohortAnalytics()
+    quiz = _quiz(5)
+    for _ in range(1000):
+        analytics.add_session(5, 4, _wrong([5]), questions=quiz)
+    assert analytics.sessions == 1000
+    assert len(analytics.questions) == 5
+    assert analytics.questions["Pytanie 5?"].errors == 1000
+
+
+def test_concurrent_sessions():
+    analytics = CohortAnalytics()
+    quiz = _quiz(4)
+
+    def worker():
+        for _ in range(200):
+            analytics.add_session(4, 3, _wrong([1]), questions=quiz)
+
+    threads = [threading.Thread(target=worker) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert analytics.sessions == 800
+    assert analytics.questions["Pytanie 1?"].errors == 800
+
+
+def test_json_export():
+    analytics = CohortAnalytics()
+    analytics.add_session(2, 1, _wrong([2]), questions=_quiz(2))
+    data = json.loads(analytics.to_json())
+    assert data["sessions"] == 1
+    assert data["mean_score"] == 50.0
+    assert data["hardest_questions"][0]["question"] == "Pytanie 2?"
+
+
+def test_csv_export():
+    analytics = CohortAnalytics()
+    analytics.add_session(2, 1, _wrong([2]), questions=_quiz(2))
+    sink = io.StringIO()
+    analytics.write_csv(sink)
+
+    rows = list(csv.reader(io.StringIO(sink.getvalue())))
+    assert rows[0] == ["section", "key", "metric", "value"]
+    assert ["overall", "", "sessions", "1"] in rows
+    assert ["questions", "Pytanie 2?", "error_rate", "1.0"] in rows
+    assert ["percentiles", "p50", "score", "50.0"] in rows
@@ -0,0 +1,104 @@
+import numpy as np
+import pytest
+
+from batch_grading import AnswerKey, grade_batch
+from quiz_logic import Question, Quiz, InvalidAnswerError, InvalidQuestionError
+
+
+@pytest.fixture
+def questions():
+    return [
+        Question("Q1", ["A", "B", "C"], 0, points=1),
+        Question("Q2", ["A", "B"], 1, points=2),
+        Question("Q3", ["A", "B", "C", "D"], 3, points=5),
+    ]
+
+
+# ===== KLUCZ ODPOWIEDZI =====
+
+def test_answer_key_from_questions(questions):
+    key = AnswerKey.from_questions(questions)
+    assert key.correct.tolist() == [0, 1, 3]
+    assert key.points.tolist() == [1, 2, 5]
+    assert key.n_options.tolist() == [3, 2, 4]
+    assert key.max_score == 8
+    assert len(key) == 3
+
+
+def test_answer_key_invalid():
+    with pytest.raises(InvalidQuestionError):
+        AnswerKey.from_questions([])
+    with pytest.raises(InvalidQuestionError):
+        AnswerKey.from_questions(["nie pytanie"])
+
+
+# ===== OCENIANIE =====
+
+def test_grade_batch_scores_match_quiz(questions):
+    """Wyniki wsadowe są zgodne z ocenianiem pojedynczym przez Quiz"""
+    rng = np.random.default_rng(0)
+    sheet = np.column_stack([rng.integers(0, len(q.options), size=50) for q in questions])
+
+    result = grade_batch(sheet, AnswerKey.from_questions(questions))
+
+    for user, row in enumerate(sheet):
+        quiz = Quiz(list(questions))
+        quiz.start()
+        for answer in row:
+            quiz.answer_current(int(answer))
+        assert result.scores[user] == quiz.score
+    assert result.errors == {}
+
+
+def test_grade_batch_statistics(questions):
+    sheet = np.array([
+        [0, 1, 3],
+        [1, 1, 3],
+        [0, 0, 2],
+        [2, 1, 3],
+    ])
+    result = grade_batch(sheet, AnswerKey.from_questions(questions))
+
+    assert result.scores.tolist() == [8, 7, 1, 7]
+    assert result.percentages()[0] == 100
+    assert result.correctness_rate.tolist() == [0.5, 0.75, 0.75]
+    assert result.distribution.tolist() == [
+        [2, 1, 1, 0],
+        [1, 3, 0, 0],
+        [0, 0, 1, 3],
+    ]
+
+
+def test_grade_batch_reports_invalid_cells(questions):
+    """Komórki błędne mają te same komunikaty co InvalidAnswerError"""
+    sheet = [
+        [0, 2, 3],        # Q2 ma tylko 2 opcje
+        [-1, 1, None],    # indeks ujemny, brak odpowiedzi
+        ["1", 1.0, 3],    # wartości niecałkowite
+    ]
+    result = grade_batch(sheet, AnswerKey.from_questions(questions))
+
+    expected = {}
+    for (user, question), value in {(0, 1): 2, (1, 0): -1, (2, 0): "1", (2, 1): 1.0}.items():
+        with pytest.raises(InvalidAnswerError) as error:
+            questions[question].is_correct(value)
+        expected[(user, question)] = str(error.value)
+    assert result.errors == expected
+
+    # Błędne komórki i braki są liczone jako niepoprawne i pomijane w statystykach
+    assert result.scores.tolist() == [6, 2, 5]
+    assert not result.answered[1, 2]
+    assert result.distribution[1].tolist() == [0, 1, 0, 0]
+    assert result.correctness_rate[1] == 1.0
+
+
+def test_grade_batch_question_without_answers(questions):
+    result = grade_batch([[None, 1, 3]], AnswerKey.from_questions(questions))
+    assert result.correctness_rate[0] == 0
+    assert result.errors == {}
+
+
+@pytest.mark.parametrize("sheet", [[0, 1, 3], [[0, 1]]])
+def test_grade_batch_shape_mismatch(questions, sheet):
+    with pytest.raises(ValueError):
+        grade_batch(sheet, AnswerKey.from_questions(questions))
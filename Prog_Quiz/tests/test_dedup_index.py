@@ -0,0 +1,131 @@
+import threading
+
+import pytest
+
+from dedup_index import DedupIndex, DedupIndexError, normalize_question, question_tokens
+
+
+def test_normalize_question_ignores_case_accents_and_punctuation():
+    assert normalize_question("  Jaka jest STOLICA Polski?! ") == "jaka jest stolica polski"
+    assert normalize_question("Żółć, łódź") == "zolc lodz"
+
+
+def test_question_tokens_drop_stopwords_and_stem_words():
+    assert question_tokens("jaka jest stolica polski") == ["stoli", "polsk"]
+    # Treść z samych słów pomijanych nie daje pustego zbioru
+    assert question_tokens("co to jest") == ["co", "to", "jest"]
+
+
+def test_exact_duplicate_after_normalization():
+    index = DedupIndex()
+    assert index.check_and_add("Jaka jest stolica Polski?") is None
+
+    assert index.find_duplicate("jaka jest  stolica polski") == "Jaka jest stolica Polski?"
+    assert index.get_stats()["exact_hits"] == 1
+
+
+@pytest.mark.parametrize("paraphrase", [
+    "Co jest stolicą Polski?",
+    "Stolica Polski - jaka to jest?",
+])
+def test_near_duplicate_paraphrase_is_detected(paraphrase):
+    index = DedupIndex()
+    index.add("Jaka jest stolica Polski?")
+
+    assert index.find_duplicate(paraphrase) == "Jaka jest stolica Polski?"
+
+
+def test_distinct_questions_are_not_duplicates():
+    index = DedupIndex()
+    index.add("Jaka jest stolica Polski?")
+    index.add("Który typ danych w Pythonie jest niemutowalny?")
+
+    assert index.find_duplicate("Jaka jest stolica Francji?") is None
+    assert index.find_duplicate("Jaka metoda listy dodaje element na końcu?") is None
+
+
+def test_check_and_add_is_atomic_across_threads():
+    index = DedupIndex()
+    results = []
+    barrier = threading.Barrier(8)
+
+    def worker():
+        barrier.wait()
+        results.append(index.check_and_add("Co zwraca funkcja len()?"))
+
+    threads = [threading.Thread(target=worker) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert results.count(None) == 1
+    assert len(index) == 1
+
+
+def test_lookup_compares_only_lsh_candidates():
+    index = DedupIndex()
+    for i in range(500):
+        index.add(f"Pytanie numer {i} o temacie t{i} i pojęciu p{i}?")
+
+    index.find_duplicate("Zupełnie inne zagadnienie dotyczące kompilatorów?")
+
+    # Porównania dotyczą kubełków LSH, a nie całego korpusu
+    assert index.get_stats()["candidates"] < 50
+
+
+def test_save_and_load_round_trip(tmp_path):
+    path = str(tmp_path / "dedup.npz")
+    index = DedupIndex(path=path)
+    index.add("Jaka jest stolica Polski?")
+    index.add("Który typ danych w Pythonie jest niemutowalny?")
+    index.save()
+
+    loaded = DedupIndex(path=path)
+
+    assert len(loaded) == 2
+    assert loaded.find_duplicate("Co jest stolicą Polski?") == "Jaka jest stolica Polski?"
+    assert loaded.find_duplicate("który typ danych w pythonie jest niemutowalny") is not None
+    assert loaded.find_duplicate("Jaka jest stolica Francji?") is None
+
+
+def test_questions_added_after_load_are_merged_on_save(tmp_path):
+    path = str(tmp_path / "dedup.npz")
+    index = DedupIndex(path=path)
+    index.add("Jaka jest stolica Polski?")
+    index.save()
+
+    loaded = DedupIndex(path=path)
+    assert loaded.check_and_add("Jaka metoda listy dodaje element na końcu?") is None
+    assert loaded.check_and_add("Jaka jest stolica Polski?") is not None
+    loaded.save()
+
+    reloaded = DedupIndex(path=path)
+    assert len(reloaded) == 2
+    assert reloaded.find_duplicate("Która metoda listy dodaje element na końcu?") is not None
+    assert reloaded.find_duplicate("Jaka jest stolica Polski?") is not None
+
+
+def test_load_rejects_different_parameters(tmp_path):
+    path = str(tmp_path / "dedup.npz")
+    index = DedupIndex(path=path)
+    index.add("Jaka jest stolica Polski?")
+    index.save()
+
+    with pytest.raises(DedupIndexError):
+        DedupIndex(num_perm=32, bands=8, path=path)
+
+
+def test_load_rejects_corrupted_file(tmp_path):
+    path = tmp_path / "dedup.npz"
+    path.write_bytes(b"to nie jest plik npz")
+
+    with pytest.raises(DedupIndexError):
+        DedupIndex(path=str(path))
+
+
+def test_invalid_parameters_raise():
+    with pytest.raises(DedupIndexError):
+        DedupIndex(threshold=0)
+    with pytest.raises(DedupIndexError):
+        DedupIndex(num_perm=60, bands=16)
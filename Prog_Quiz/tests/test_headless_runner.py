@@ -0,0 +1,169 @@
+from unittest.mock import Mock, patch
+
+import pytest
+import requests
+
+from ai_generator import AIGenerator
+from headless_runner import (
+    HeadlessUI, StageTimings, StubAIServer, STAGES,
+    random_strategy, run_load_test, scripted_strategy
+)
+from main import QuizApplication
+from quiz_cache import QuizCache
+
+CHOICES = {"a": "A", "b": "B", "c": "C", "d": "D"}
+
+
+def test_scripted_strategy_cycles_answers():
+    strategy = scripted_strategy("AbC")
+    assert [strategy(i, "?", CHOICES) for i in range(1, 6)] == ["a", "b", "c", "a", "b"]
+
+
+@pytest.mark.parametrize("answers", ["", "abx"])
+def test_scripted_strategy_rejects_invalid_script(answers):
+    with pytest.raises(ValueError):
+        scripted_strategy(answers)
+
+
+def test_random_strategy_is_reproducible_for_seed():
+    first, second = random_strategy(7), random_strategy(7)
+    answers = [first(i, "?", CHOICES) for i in range(20)]
+    assert answers == [second(i, "?", CHOICES) for i in range(20)]
+    assert set(answers) <= set(CHOICES)
+
+
+def test_headless_ui_rejects_answer_outside_displayed_choices():
+    ui = HeadlessUI("Python", 1, scripted_strategy("c"))
+    ui.display_question(1, "?", {"a": "A", "b": "B"})
+    with pytest.raises(ValueError):
+        ui.get_user_choice()
+
+
+def test_headless_ui_plays_requested_rounds():
+    ui = HeadlessUI("Python", 1, scripted_strategy("a"), rounds=2)
+    ui.display_final_report("raport")
+    assert ui.ask_play_again() is True
+    ui.display_final_report("raport")
+    assert ui.ask_play_again() is False
+
+
+def test_stage_timings_summary():
+    timings = StageTimings()
+    for _ in range(3):
+        with timings.measure("report"):
+            pass
+    summary = timings.summary()
+    assert set(summary) == set(STAGES)
+    assert summary["report"]["count"] == 3
+    assert summary["generation"]["count"] == 0
+
+
+def test_stub_server_returns_requested_number_of_questions():
+    with StubAIServer() as server:
+        payload = {"messages": [{"role": "user", "content": "Wygeneruj dokładnie 3 pytań quizowych na temat: Git.\n"}]}
+        response = requests.post(server.url, json=payload, timeout=5)
+    assert response.status_code == 200
+    assert response.json()["choices"][0]["message"]["content"].count('"question"') == 3
+    assert server.requests == 1
+
+
+@pytest.mark.parametrize("stream", [False, True])
+def test_run_load_test_against_stub_server(stream):
+    result = run_load_test(
+        sessions=6, concurrency=3, n_questions=4,
+        strategy_factory=lambda index: scripted_strategy("abcd"),
+        rounds=2, stream_questions=stream
+    )
+    assert result.failed == 0
+    assert result.answers == 6 * 2 * 4
+    assert result.api_requests == 12
+    assert result.stages["generation"]["count"] == 12
+    assert result.stages["report"]["count"] == 12
+    assert result.sessions_per_second > 0
+    assert "sesji/s" in result.format()
+
+
+def test_run_load_test_counts_failed_sessions():
+    # Brak serwera pod adresem - każda rozgrywka kończy się błędem generowania
+    result = run_load_test(
+        sessions=2, concurrency=2, n_questions=1,
+        strategy_factory=lambda index: random_strategy(index),
+        api_url="http://127.0.0.1:9/v1/chat/completions"
+    )
+    assert result.failed == 2
+    assert result.answers == 0
+
+
+@pytest.mark.parametrize("stream", [False, True])
+def test_play_again_does_not_reuse_cached_quiz(stream):
+    with StubAIServer() as server:
+        generator = AIGenerator(api_url=server.url, api_key="headless", cache=QuizCache())
+        ui = HeadlessUI("Python", 2, scripted_strategy("a"), rounds=2)
+        app = QuizApplication(ui=ui, ai_generator=generator, stream_questions=stream, prefetch=False)
+        app.run()
+        generator.close()
+
+    assert ui.rounds_played == 2
+    # Druga rozgrywka trafia do API zamiast do cache
+    assert server.requests == 2
+
+
+def test_injected_generator_skips_default_resources(monkeypatch):
+    import main
+    factory = Mock()
+    monkeypatch.setattr(main, "create_default_router", factory)
+    monkeypatch.setattr(main, "QUESTION_BANK_PATH", "bank.sqlite")
+    generator = AIGenerator(api_url="http://localhost", api_key="key")
+
+    with QuizApplication(ui=HeadlessUI("Python", 1, scripted_strategy("a")), ai_generator=generator) as app:
+        assert app.ai_generator is generator
+        assert app.router is None
+        assert app.question_bank is None
+    factory.assert_not_called()
+    generator.close()
+
+
+def test_run_warms_question_bank_before_first_prompt(monkeypatch, tmp_path):
+    import main
+    events = Mock()
+    monkeypatch.setattr(main, "QuestionBank", events.QuestionBank)
+    monkeypatch.setattr(main, "QUESTION_BANK_PATH", str(tmp_path / "bank.sqlite"))
+    monkeypatch.setattr(main, "QUESTION_BANK_WARM_TOPICS", ["Python", "Historia"])
+    monkeypatch.setattr(main, "create_default_router", Mock(return_value=None))
+    monkeypatch.setattr(main, "QUIZ_DEDUP", False)
+    app = QuizApplication(ui=events.ui, prefetch=False)
+    # Bank powstaje dopiero przy uruchomieniu aplikacji
+    events.QuestionBank.assert_not_called()
+
+    with patch.object(app, "_play_round", return_value=False):
+        app.run()
+    app.close()
+
+    calls = [name for name, _, _ in events.mock_calls]
+    assert calls.index("QuestionBank().warm") < calls.index("ui.ask_topic")
+    events.QuestionBank.return_value.warm.assert_called_once_with(["Python", "Historia"])
+    events.QuestionBank.return_value.close.assert_called_once()
+
+
+def test_close_releases_lazily_created_resources(monkeypatch):
+    import main
+    router = Mock()
+    factory = Mock(return_value=router)
+    monkeypatch.setattr(main, "create_default_router", factory)
+    monkeypatch.setattr(main, "QUIZ_DEDUP", False)
+    monkeypatch.setattr(main, "QUESTION_BANK_PATH", "")
+    app = QuizApplication(ui=HeadlessUI("Python", 1, scripted_strategy("a")), prefetch=True)
+    # Nic nie powstaje przed pierwszym użyciem
+    factory.assert_not_called()
+
+    generator = app.ai_generator
+    prefetcher = app.prefetcher
+    assert generator.router is router
+    with patch.object(AIGenerator, "close") as close_generator, patch.object(prefetcher, "close") as close_prefetcher:
+        app.close()
+
+    close_prefetcher.assert_called_once()
+    # Generator główny i generator prefetchera
+    assert close_generator.call_count == 2
+    router.close.assert_called_once()
+    factory.assert_called_once()
@@ -0,0 +1,62 @@
+import json
+import pytest
+
+from json_stream import IncrementalArrayParser
+
+
+ITEMS = [
+    {"question": "Co wypisze print(\"[}\")?", "a": "[}", "b": "{", "c": "]", "d": "Błąd", "correct": "a"},
+    {"question": "Ile to 2+2?", "a": "3", "b": "4", "c": "5", "d": "6", "correct": "b"},
+    {"question": "Zagnieżdżone?", "a": "A", "b": "B", "c": "C", "d": "D", "correct": "c", "meta": {"tags": ["x"]}},
+]
+
+
+def _feed_in_pieces(parser, text, size):
+    results = []
+    for i in range(0, len(text), size):
+        results.extend(parser.feed(text[i:i + size]))
+    return results
+
+
+@pytest.mark.parametrize("piece_size", [1, 3, 7, 1000])
+def test_parser_yields_objects_for_any_split(piece_size):
+    """Test: obiekty są odtwarzane niezależnie od podziału strumienia"""
+    parser = IncrementalArrayParser()
+    results = _feed_in_pieces(parser, json.dumps(ITEMS, ensure_ascii=False), piece_size)
+    parser.close()
+    assert results == ITEMS
+    assert parser.finished
+
+
+def test_parser_yields_object_as_soon_as_it_closes():
+    """Test: obiekt jest zwracany zaraz po domknięciu nawiasu, przed końcem tablicy"""
+    parser = IncrementalArrayParser()
+    text = json.dumps(ITEMS[1:])
+    first_end = text.index("}") + 1
+    assert parser.feed(text[:first_end - 1]) == []
+    assert parser.feed(text[first_end - 1:first_end]) == [ITEMS[1]]
+    assert not parser.finished
+
+
+def test_parser_skips_markdown_fences():
+    """Test: znaczniki ```json przed i po tablicy są pomijane"""
+    parser = IncrementalArrayParser()
+    results = parser.feed("```json\n" + json.dumps(ITEMS[:1]) + "\n```")
+    parser.close()
+    assert results == ITEMS[:1]
+
+
+def test_parser_rejects_non_object_elements():
+    """Test: elementy niebędące obiektami powodują ValueError"""
+    parser = IncrementalArrayParser()
+    with pytest.raises(ValueError):
+        parser.feed('[1, 2]')
+
+
+@pytest.mark.parametrize("text", ["", "brak tablicy", '[{"question": "Urwane'])
+def test_parser_close_unfinished_stream(text):
+    """Test: niedomknięta tablica jest zgłaszana przy close()"""
+    parser = IncrementalArrayParser()
+    parser.feed(text)
+    with pytest.raises(ValueError):
+        parser.close()
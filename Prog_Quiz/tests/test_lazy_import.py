@@ -0,0 +1,65 @@
+import os
+import subprocess
+import sys
+
+import pytest
+
+import ai_generator
+from lazy_import import LazyModule
+
+PROG_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def test_lazy_module_imports_on_first_attribute_access():
+    module = LazyModule("colorsys")
+    assert "niezaładowany" in repr(module)
+
+    assert module.rgb_to_hsv(1.0, 0.0, 0.0) == (0.0, 1.0, 1.0)
+    assert "niezaładowany" not in repr(module)
+
+
+def test_lazy_module_missing_module_raises_on_use():
+    module = LazyModule("nie_ma_takiego_modulu")
+
+    with pytest.raises(ModuleNotFoundError):
+        module.anything
+
+
+def test_lazy_module_setattr_reaches_real_module():
+    module = LazyModule("colorsys")
+    module._lazy_marker = 1
+    try:
+        assert sys.modules["colorsys"]._lazy_marker == 1
+    finally:
+        del module._lazy_marker
+
+
+def test_default_generator_is_created_once():
+    generator = ai_generator.get_default_generator()
+    assert ai_generator.get_default_generator() is generator
+
+
+def test_entry_point_does_not_import_http_clients():
+    code = (
+        "import sys, main, ai_generator\n"
+        "heavy = [m for m in ('requests', 'httpx', 'asyncio') if m in sys.modules]\n"
+        "print(','.join(heavy))\n"
+        "print(ai_generator._default_generator is None)\n"
+    )
+    env = dict(os.environ, API_URL="http://localhost", API_KEY="key")
+    result = subprocess.run(
+        [sys.executable, "-c", code], cwd=PROG_DIR, env=env, capture_output=True, text=True, check=True
+    )
+    heavy, no_default = result.stdout.splitlines()
+    assert heavy == ""
+    assert no_default == "True"
+
+
+def test_help_exits_without_starting_quiz():
+    env = dict(os.environ, API_URL="http://localhost", API_KEY="key")
+    result = subprocess.run(
+        [sys.executable, "main.py", "--help"], cwd=PROG_DIR, env=env,
+        capture_output=True, text=True, stdin=subprocess.DEVNULL, timeout=30
+    )
+    assert result.returncode == 0
+    assert "--no-stream" in result.stdout
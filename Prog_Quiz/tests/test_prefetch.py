@@ -0,0 +1,102 @@
+import threading
+
+from ai_generator import AIServiceError
+from prefetch import QuizPrefetcher
+
+
+def _items(topic: str, count: int) -> list:
+    return [
+        {"question": f"{topic} {i}?", "a": "A", "b": "B", "c": "C", "d": "D", "correct": "a"}
+        for i in range(count)
+    ]
+
+
+def test_take_returns_prefetched_quiz():
+    calls = []
+
+    def fetch(topic, n):
+        calls.append((topic, n))
+        return _items(topic, n)
+
+    prefetcher = QuizPrefetcher(fetch)
+    prefetcher.prefetch("Python", 3).result()
+
+    assert prefetcher.take(" python ", 3) == _items("Python", 3)
+    assert calls == [("Python", 3)]
+    assert prefetcher.hit_rate == 1.0
+    # Quiz jest wydawany tylko raz
+    assert prefetcher.take("Python", 3) is None
+    assert prefetcher.get_stats()["hit_rate"] == 0.5
+    prefetcher.close()
+
+
+def test_take_waits_for_generation_in_progress():
+    release = threading.Event()
+
+    def fetch(topic, n):
+        release.wait(2)
+        return _items(topic, n)
+
+    prefetcher = QuizPrefetcher(fetch)
+    prefetcher.prefetch("Python", 2)
+    release.set()
+    assert prefetcher.take("Python", 2) == _items("Python", 2)
+    prefetcher.close()
+
+
+def test_take_misses_on_different_request():
+    prefetcher = QuizPrefetcher(_items)
+    prefetcher.prefetch("Python", 3).result()
+
+    assert prefetcher.take("Python", 5) is None
+    assert prefetcher.take("Historia", 3) is None
+    stats = prefetcher.get_stats()
+    assert stats["misses"] == 2
+    assert stats["hit_rate"] == 0
+    prefetcher.close()
+
+
+def test_take_falls_back_on_generation_error():
+    def fetch(topic, n):
+        raise AIServiceError("Błąd API")
+
+    prefetcher = QuizPrefetcher(fetch)
+    prefetcher.prefetch("Python", 3)
+
+    assert prefetcher.take("Python", 3) is None
+    assert prefetcher.get_stats()["errors"] == 1
+    prefetcher.close()
+
+
+def test_take_timeout_discards_slow_generation():
+    release = threading.Event()
+    prefetcher = QuizPrefetcher(lambda topic, n: release.wait(2) and _items(topic, n))
+    prefetcher.prefetch("Python", 3)
+
+    assert prefetcher.take("Python", 3, timeout=0.01) is None
+    release.set()
+    prefetcher.close()
+
+
+def test_cancel_drops_queued_generation():
+    release = threading.Event()
+    started = threading.Event()
+    calls = []
+
+    def fetch(topic, n):
+        calls.append(topic)
+        started.set()
+        release.wait(2)
+        return _items(topic, n)
+
+    prefetcher = QuizPrefetcher(fetch)
+    prefetcher.prefetch("Pierwszy", 1)
+    started.wait(2)
+    queued = prefetcher.prefetch("Drugi", 1)   # anuluje pierwszy, czeka w kolejce
+    prefetcher.cancel()
+    release.set()
+    prefetcher.close()
+
+    assert queued.cancelled()
+    assert "Drugi" not in calls
+    assert prefetcher.get_stats()["cancelled"] == 2
@@ -0,0 +1,301 @@
+import asyncio
+import json
+import threading
+import time
+from unittest.mock import Mock, patch
+
+import pytest
+
+from ai_generator import AIGenerator, AIServiceError, InvalidModelResponseError
+from providers import LatencyTracker, Provider, ProviderRouter
+from resilience import CircuitBreaker, Resilience, RetryPolicy
+
+
+QUIZ_ITEMS = [{"question": "Ile to 2+2?", "a": "3", "b": "4", "c": "5", "d": "6", "correct": "b"}]
+
+
+def _providers(*names):
+    return [Provider(name, f"http://{name}/v1/chat/completions", f"key-{name}", f"model-{name}") for name in names]
+
+
+def _ok_response(items=QUIZ_ITEMS):
+    response = Mock()
+    response.raise_for_status.return_value = None
+    response.json.return_value = {'choices': [{'message': {'content': json.dumps(items)}}]}
+    return response
+
+
+# ===== STATYSTYKI OPÓŹNIEŃ =====
+
+def test_latency_tracker_percentiles_and_error_rate():
+    tracker = LatencyTracker(window=100)
+    for latency in range(1, 101):
+        tracker.record(latency / 100, ok=True)
+    assert tracker.p50 == pytest.approx(0.51, abs=0.01)
+    assert tracker.p95 == pytest.approx(0.95, abs=0.01)
+    assert tracker.error_rate == 0
+
+    tracker.record(5.0, ok=False)
+    assert tracker.error_rate == pytest.approx(0.01)
+    # Nieudane zapytania nie wpływają na percentyle
+    assert tracker.p95 < 1.0
+
+
+def test_latency_tracker_window_is_rolling():
+    tracker = LatencyTracker(window=3)
+    for _ in range(3):
+        tracker.record(0.1, ok=False)
+    for _ in range(3):
+        tracker.record(0.2, ok=True)
+    assert tracker.error_rate == 0
+    assert tracker.total == 6
+
+
+def test_provider_requires_configuration():
+    with pytest.raises(ValueError):
+        Provider("x", "http://x", "", "model")
+
+
+# ===== WYBÓR DOSTAWCY =====
+
+def test_rank_prefers_fastest_healthy_provider():
+    router = ProviderRouter(_providers("slow", "fast", "broken"), min_samples=2)
+    for _ in range(3):
+        router.record(router.providers[0], 0.9, ok=True)
+        router.record(router.providers[1], 0.1, ok=True)
+        router.record(router.providers[2], 0.01, ok=False)
+
+    assert [provider.name for provider in router.rank()] == ["fast", "slow", "broken"]
+    assert router.get_stats()["providers"]["broken"]["healthy"] is False
+    router.close()
+
+
+def test_rank_explores_unmeasured_provider_first():
+    router = ProviderRouter(_providers("known", "new"))
+    router.record(router.providers[0], 0.2, ok=True)
+    assert router.rank()[0].name == "new"
+    router.close()
+
+
+def test_rank_puts_failing_unproven_provider_after_measured_ones():
+    router = ProviderRouter(_providers("failing", "known", "new"), min_samples=5)
+    router.record(router.providers[0], 0.01, ok=False)
+    router.record(router.providers[0], 0.01, ok=False)
+    router.record(router.providers[1], 0.3, ok=True)
+
+    # Same błędy (poniżej min_samples) nie oznaczają szybkiego dostawcy
+    assert [provider.name for provider in router.rank()] == ["new", "known", "failing"]
+    router.close()
+
+
+def test_unhealthy_provider_is_probed_after_recovery_period():
+    now = [0.0]
+    router = ProviderRouter(_providers("broken", "backup"), min_samples=2, recovery_after=30.0,
+                            clock=lambda: now[0])
+    broken, backup = router.providers
+    for _ in range(3):
+        router.record(broken, 0.1, ok=False)
+        router.record(backup, 0.5, ok=True)
+    assert [provider.name for provider in router.rank()] == ["backup", "broken"]
+
+    now[0] = 29.0
+    assert router.rank()[0] is backup
+    now[0] = 30.0
+    # Jedno zapytanie próbne na okres - kolejne wywołania znów omijają dostawcę
+    assert router.rank()[0] is broken
+    assert router.rank()[0] is backup
+    assert router.get_stats()["probes"] == 1
+
+    # Nieudana próba: następna dopiero po kolejnym okresie
+    router.record(broken, 0.1, ok=False)
+    now[0] = 59.0
+    assert router.rank()[0] is backup
+    now[0] = 60.0
+    assert router.rank()[0] is broken
+
+    # Udana próba czyści okno błędów - dostawca wraca do rankingu według p50
+    router.record(broken, 0.05, ok=True)
+    assert router.is_healthy(broken)
+    assert [provider.name for provider in router.rank()] == ["broken", "backup"]
+    router.close()
+
+
+def test_call_fails_over_to_next_provider():
+    router = ProviderRouter(_providers("a", "b"), hedge_after=None)
+
+    def fn(provider):
+        if provider.name == "a":
+            raise AIServiceError("down")
+        return provider.name
+
+    assert router.call(fn, (AIServiceError,)) == "b"
+    assert router.failovers == 1
+    assert router.trackers["a"].error_rate == 1.0
+    router.close()
+
+
+def test_call_raises_last_error_when_all_providers_fail():
+    router = ProviderRouter(_providers("a", "b"), hedge_after=None)
+    with pytest.raises(AIServiceError, match="b"):
+        router.call(lambda provider: (_ for _ in ()).throw(AIServiceError(provider.name)), (AIServiceError,))
+    router.close()
+
+
+def test_call_does_not_fail_over_on_other_errors():
+    router = ProviderRouter(_providers("a", "b"), hedge_after=None)
+    calls = []
+
+    def fn(provider):
+        calls.append(provider.name)
+        raise InvalidModelResponseError("zła treść")
+
+    with pytest.raises(InvalidModelResponseError):
+        router.call(fn, (AIServiceError,))
+    assert calls == ["a"]
+    # Zła treść nie oznacza awarii endpointu
+    assert router.trackers["a"].error_rate == 0
+    router.close()
+
+
+def test_call_hedges_slow_primary():
+    router = ProviderRouter(_providers("slow", "fast"), hedge_after=0.02)
+    release = threading.Event()
+
+    def fn(provider):
+        if provider.name == "slow":
+            release.wait(2)
+            return "slow"
+        return "fast"
+
+    started = time.perf_counter()
+    assert router.call(fn) == "fast"
+    assert time.perf_counter() - started < 1
+    assert router.hedged == 1
+    release.set()
+    router.close()
+
+
+def test_acall_hedges_and_cancels_loser():
+    router = ProviderRouter(_providers("slow", "fast"), hedge_after=0.02)
+    cancelled = []
+
+    async def fn(provider):
+        if provider.name == "slow":
+            try:
+                await asyncio.sleep(2)
+            except asyncio.CancelledError:
+                cancelled.append(provider.name)
+                raise
+        return provider.name
+
+    async def run():
+        result = await router.acall(fn)
+        await asyncio.sleep(0)
+        return result
+
+    assert asyncio.run(run()) == "fast"
+    assert cancelled == ["slow"]
+    assert router.hedged == 1
+    router.close()
+
+
+def test_won_hedge_keeps_loser_breaker_closed():
+    providers = [
+        Provider(name, f"http://{name}", "key", "model",
+                 Resilience(policy=RetryPolicy(max_retries=0), breaker=CircuitBreaker(failure_threshold=1)))
+        for name in ("slow", "fast")
+    ]
+    router = ProviderRouter(providers, hedge_after=0.02)
+
+    async def fn(provider):
+        async def send():
+            if provider.name == "slow":
+                await asyncio.sleep(2)
+            return Mock(status_code=200)
+        await provider.resilience.acall(send)
+        return provider.name
+
+    async def run():
+        result = await router.acall(fn)
+        await asyncio.sleep(0)
+        return result
+
+    for _ in range(3):
+        assert asyncio.run(run()) == "fast"
+    # Anulowane zapytanie hedgingu nie jest awarią dostawcy
+    assert providers[0].resilience.breaker.state == CircuitBreaker.CLOSED
+    assert router.trackers["slow"].error_rate == 0
+    router.close()
+
+
+def test_failover_tries_providers_in_rank_order():
+    router = ProviderRouter(_providers("a", "b", "c"), hedge_after=None)
+    calls = []
+
+    def fn(provider):
+        calls.append(provider.name)
+        if provider.name != "c":
+            raise AIServiceError("down")
+        return "c"
+
+    assert router.failover(fn, (AIServiceError,)) == "c"
+    assert calls == ["a", "b", "c"]
+    assert router.failovers == 2
+    assert router.trackers["a"].error_rate == 1.0
+    router.close()
+
+
+# ===== INTEGRACJA Z GENERATOREM =====
+
+def test_generator_routes_to_provider_url_key_and_model():
+    router = ProviderRouter(_providers("a", "b"), hedge_after=None)
+    generator = AIGenerator(api_url=None, api_key=None, router=router)
+
+    with patch("ai_generator.requests.Session.post", return_value=_ok_response()) as mock_post:
+        assert generator.generate_quiz("Python", 1) == QUIZ_ITEMS
+
+    call = mock_post.call_args
+    assert call.args[0] == "http://a/v1/chat/completions"
+    assert call.kwargs["headers"]["Authorization"] == "Bearer key-a"
+    assert call.kwargs["json"]["model"] == "model-a"
+    generator.close()
+    router.close()
+
+
+def test_generator_fails_over_on_http_error():
+    import requests
+    router = ProviderRouter(_providers("a", "b"), hedge_after=None)
+    generator = AIGenerator(router=router)
+
+    def post(url, json, headers, timeout):
+        if url.startswith("http://a"):
+            raise requests.exceptions.ConnectionError("reset")
+        return _ok_response()
+
+    with patch("ai_generator.requests.Session.post", side_effect=post):
+        assert generator.generate_quiz("Python", 1) == QUIZ_ITEMS
+    assert router.get_stats()["providers"]["a"]["error_rate"] == 1.0
+    generator.close()
+    router.close()
+
+
+def test_stream_fails_over_when_opening_stream_fails():
+    import requests
+    router = ProviderRouter(_providers("a", "b"), hedge_after=None)
+    generator = AIGenerator(router=router)
+    stream_response = Mock()
+    stream_response.raise_for_status.return_value = None
+    event = {'choices': [{'delta': {'content': json.dumps(QUIZ_ITEMS)}}]}
+    stream_response.iter_lines.return_value = iter([f"data: {json.dumps(event)}", "data: [DONE]"])
+
+    def post(url, json, headers, timeout, stream):
+        if url.startswith("http://a"):
+            raise requests.exceptions.ConnectionError("reset")
+        return stream_response
+
+    with patch("ai_generator.requests.Session.post", side_effect=post):
+        assert list(generator.stream_quiz("Python", 1)) == QUIZ_ITEMS
+    assert router.failovers == 1
+    assert router.get_stats()["providers"]["a"]["error_rate"] == 1.0
+    generator.close()
+    router.close()
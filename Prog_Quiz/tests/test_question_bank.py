@@ -0,0 +1,163 @@
+import random
+import pytest
+from unittest.mock import patch
+
+from ai_generator import AIGenerator, AIServiceError
+from config import MAX_QUESTIONS
+from question_bank import QuestionBank, normalize_question
+
+
+def _items(prefix: str, count: int, start: int = 0) -> list:
+    return [
+        {"question": f"{prefix} {i}?", "a": "A", "b": "B", "c": "C", "d": "D", "correct": "b"}
+        for i in range(start, start + count)
+    ]
+
+
+@pytest.fixture
+def generator():
+    return AIGenerator(api_url="http://test", api_key="key")
+
+
+@pytest.fixture
+def counter_generator(generator):
+    """Generator zwracający za każdym razem nowe, unikalne pytania."""
+    state = {"next": 0}
+
+    def fake_generate(topic, n_questions):
+        items = _items(topic, n_questions, state["next"])
+        state["next"] += n_questions
+        return items
+
+    with patch.object(generator, "generate_quiz", side_effect=fake_generate) as mock_generate:
+        yield generator, mock_generate
+
+
+def _bank(generator, **kwargs) -> QuestionBank:
+    params = {"min_stock": 10, "refill_batch": 5, "max_per_topic": 50, "rng": random.Random(0)}
+    params.update(kwargs)
+    return QuestionBank(generator, **params)
+
+
+# ===== DODAWANIE I DEDUPLIKACJA =====
+
+def test_normalize_question():
+    assert normalize_question("  Ile to  2+2? ") == normalize_question("ile to 2+2?")
+
+
+def test_add_items_deduplicates_by_question_text(generator):
+    bank = _bank(generator)
+    assert bank.add_items("Python", _items("Pytanie", 3)) == 3
+    duplicates = [dict(item, question=item["question"].upper()) for item in _items("Pytanie", 3)]
+    assert bank.add_items(" python ", duplicates) == 0
+    assert bank.stock("PYTHON") == 3
+    bank.close()
+
+
+def test_add_items_skips_invalid_items(generator):
+    bank = _bank(generator)
+    invalid = {"question": "Złe?", "a": "", "b": "B", "c": "C", "d": "D", "correct": "a"}
+    assert bank.add_items("Python", [invalid, "nie słownik"] + _items("Ok", 1)) == 1
+    bank.close()
+
+
+def test_add_items_respects_max_per_topic(generator):
+    bank = _bank(generator, min_stock=5, max_per_topic=5)
+    assert bank.add_items("Python", _items("Pytanie", 8)) == 5
+    bank.close()
+
+
+# ===== LOSOWANIE I REZERWA =====
+
+def test_generate_quiz_samples_from_stocked_bank(counter_generator):
+    generator, mock_generate = counter_generator
+    bank = _bank(generator)
+    bank.add_items("Python", _items("Pytanie", 20))
+
+    quiz = bank.generate_quiz("Python", 5)
+
+    assert len(quiz) == 5
+    assert len({item["question"] for item in quiz}) == 5
+    mock_generate.assert_not_called()
+    assert bank.get_stats()["served_from_bank"] == 1
+    bank.close()
+
+
+def test_generate_quiz_falls_back_when_under_stocked(counter_generator):
+    generator, mock_generate = counter_generator
+    bank = _bank(generator)
+
+    quiz = bank.generate_quiz("Historia", 3)
+    bank.wait_for_refills()
+
+    assert len(quiz) == 3
+    assert bank.get_stats()["fallbacks"] == 1
+    assert mock_generate.call_args_list[0].args == ("Historia", 3)
+    # Po rezerwie bank uzupełnia się w tle do min_stock
+    assert bank.stock("Historia") >= 10
+    bank.close()
+
+
+def test_generate_quiz_validates_input(generator):
+    bank = _bank(generator)
+    with pytest.raises(ValueError):
+        bank.generate_quiz("", 5)
+    with pytest.raises(ValueError):
+        bank.generate_quiz("Python", MAX_QUESTIONS + 1)
+    bank.close()
+
+
+# ===== UZUPEŁNIANIE W TLE =====
+
+def test_warm_fills_topics_in_background(counter_generator):
+    generator, _ = counter_generator
+    bank = _bank(generator)
+
+    futures = bank.warm(["Python", "Historia"])
+    bank.wait_for_refills()
+
+    assert len(futures) == 2
+    assert bank.stock("Python") == 10
+    assert bank.stock("Historia") == 10
+    assert bank.warm(["Python"]) == []
+    bank.close()
+
+
+def test_refill_stops_when_batch_adds_nothing(generator):
+    bank = _bank(generator)
+    with patch.object(generator, "generate_quiz", return_value=_items("Stałe", 5)) as mock_generate:
+        bank.ensure_stock("Python").result()
+    assert bank.stock("Python") == 5
+    assert mock_generate.call_count == 2
+    bank.close()
+
+
+def test_refill_counts_errors(generator):
+    bank = _bank(generator)
+    with patch.object(generator, "generate_quiz", side_effect=AIServiceError("Błąd")):
+        assert bank.ensure_stock("Python").result() == 0
+    assert bank.get_stats()["refill_errors"] == 1
+    bank.close()
+
+
+# ===== TRWAŁOŚĆ =====
+
+def test_bank_persists_to_sqlite(tmp_path, generator):
+    path = str(tmp_path / "bank.db")
+    bank = _bank(generator, path=path)
+    bank.add_items("Python", _items("Pytanie", 4))
+    bank.close()
+
+    reopened = _bank(generator, path=path)
+    assert reopened.stock("python") == 4
+    reopened.close()
+
+
+@pytest.mark.parametrize("kwargs", [
+    {"min_stock": 0},
+    {"refill_batch": 0},
+    {"min_stock": 20, "max_per_topic": 10},
+])
+def test_bank_invalid_config(generator, kwargs):
+    with pytest.raises(ValueError):
+        _bank(generator, **kwargs)
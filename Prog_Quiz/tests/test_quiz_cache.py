@@ -0,0 +1,242 @@
+import pytest
+from unittest.mock import patch
+
+import quiz_cache
+from quiz_cache import (
+    CacheTier, MemoryCacheTier, SQLiteCacheTier, QuizCache, make_cache_key, normalize_topic
+)
+from ai_generator import AIGenerator
+from providers import Provider, ProviderRouter
+
+
+@pytest.fixture
+def quiz_items() -> list:
+    return [
+        {"question": "Pytanie 1?", "a": "A", "b": "B", "c": "C", "d": "D", "correct": "a"},
+        {"question": "Pytanie 2?", "a": "A", "b": "B", "c": "C", "d": "D", "correct": "d"},
+    ]
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """Sterowalny zegar dla testów TTL."""
+    now = {"value": 1000.0}
+    monkeypatch.setattr(quiz_cache.time, "time", lambda: now["value"])
+    return now
+
+
+# ===== KLUCZ CACHE =====
+
+def test_normalize_topic():
+    assert normalize_topic("  Historia   Polski ") == "historia polski"
+    assert normalize_topic("PYTHON") == normalize_topic("python")
+
+
+def test_make_cache_key_independent_of_key_order():
+    assert make_cache_key({"a": 1, "b": 2}) == make_cache_key({"b": 2, "a": 1})
+    assert make_cache_key({"a": 1}) != make_cache_key({"a": 2})
+
+
+def test_generator_cache_key_normalizes_topic():
+    generator = AIGenerator(api_url="http://test", api_key="key", cache=QuizCache())
+    assert generator._cache_key("Python", 5) == generator._cache_key("  python ", 5)
+    assert generator._cache_key("Python", 5) != generator._cache_key("Python", 6)
+    assert generator._cache_key("Python", 5) != generator._cache_key("Historia", 5)
+
+
+def test_generator_cache_key_includes_router_models():
+    def router(*models):
+        return ProviderRouter([
+            Provider(f"p{i}", f"http://p{i}", "key", model) for i, model in enumerate(models)
+        ])
+
+    plain = AIGenerator(api_url="http://test", api_key="key", cache=QuizCache())
+    routed = AIGenerator(api_url=None, api_key=None, cache=QuizCache(), router=router("model-a", "model-b"))
+    swapped = AIGenerator(api_url=None, api_key=None, cache=QuizCache(), router=router("model-b", "model-a"))
+    other = AIGenerator(api_url=None, api_key=None, cache=QuizCache(), router=router("model-a", "model-c"))
+
+    assert routed._cache_key("Python", 5) != plain._cache_key("Python", 5)
+    assert routed._cache_key("Python", 5) == swapped._cache_key("Python", 5)
+    assert routed._cache_key("Python", 5) != other._cache_key("Python", 5)
+    for generator in (plain, routed, swapped, other):
+        if generator.router is not None:
+            generator.router.close()
+        generator.close()
+
+
+def test_incomplete_cache_tier_cannot_be_created():
+    class NoDelete(CacheTier):
+        def get(self, key):
+            return None
+
+        def set(self, key, value):
+            pass
+
+        def clear(self):
+            pass
+
+        def __len__(self):
+            return 0
+
+    with pytest.raises(TypeError, match="delete"):
+        NoDelete()
+    with pytest.raises(TypeError):
+        CacheTier()
+
+
+# ===== WARSTWA PAMIĘCI =====
+
+def test_memory_tier_lru_eviction(quiz_items):
+    tier = MemoryCacheTier(max_entries=2)
+    tier.set("k1", quiz_items)
+    tier.set("k2", quiz_items)
+    tier.get("k1")  # k1 staje się najświeższy
+    tier.set("k3", quiz_items)
+
+    assert tier.get("k1") is not None
+    assert tier.get("k2") is None
+    assert tier.get("k3") is not None
+    assert tier.evictions == 1
+
+
+def test_memory_tier_ttl_expiry(quiz_items, clock):
+    tier = MemoryCacheTier(ttl=10)
+    tier.set("k", quiz_items)
+    clock["value"] += 9
+    assert tier.get("k") is not None
+    clock["value"] += 2
+    assert tier.get("k") is None
+    assert len(tier) == 0
+
+
+@pytest.mark.parametrize("max_entries, ttl", [(0, 10), (5, 0)])
+def test_memory_tier_invalid_config(max_entries, ttl):
+    with pytest.raises(ValueError):
+        MemoryCacheTier(max_entries=max_entries, ttl=ttl)
+
+
+# ===== WARSTWA DYSKOWA =====
+
+def test_sqlite_tier_persists_between_instances(tmp_path, quiz_items):
+    path = str(tmp_path / "cache.db")
+    tier = SQLiteCacheTier(path)
+    tier.set("k", quiz_items)
+    tier.close()
+
+    reopened = SQLiteCacheTier(path)
+    assert reopened.get("k") == quiz_items
+    reopened.close()
+
+
+def test_sqlite_tier_evicts_least_recently_accessed(tmp_path, quiz_items, clock):
+    tier = SQLiteCacheTier(str(tmp_path / "cache.db"), max_entries=2)
+    tier.set("k1", quiz_items)
+    clock["value"] += 1
+    tier.set("k2", quiz_items)
+    clock["value"] += 1
+    tier.get("k1")
+    clock["value"] += 1
+    tier.set("k3", quiz_items)
+
+    assert len(tier) == 2
+    assert tier.get("k2") is None
+    assert tier.get("k1") is not None
+    assert tier.evictions == 1
+
+
+def test_sqlite_tier_ttl_and_corrupt_entry(tmp_path, quiz_items, clock):
+    tier = SQLiteCacheTier(str(tmp_path / "cache.db"), ttl=10)
+    tier.set("k", quiz_items)
+    clock["value"] += 11
+    assert tier.get("k") is None
+
+    tier.set("bad", quiz_items)
+    tier._conn.execute("UPDATE quiz_cache SET value = 'not json' WHERE key = 'bad'")
+    assert tier.get("bad") is None
+    assert len(tier) == 0
+
+
+# ===== QUIZCACHE =====
+
+def test_quiz_cache_counters(quiz_items):
+    cache = QuizCache()
+    assert cache.get("k") is None
+    cache.set("k", quiz_items)
+    assert cache.get("k") == quiz_items
+
+    stats = cache.get_stats()
+    assert stats["hits"] == 1
+    assert stats["misses"] == 1
+    assert stats["hit_rate"] == 0.5
+    assert stats["memory_entries"] == 1
+
+
+def test_quiz_cache_returns_copies(quiz_items):
+    cache = QuizCache()
+    cache.set("k", quiz_items)
+    first = cache.get("k")
+    first[0]["question"] = "Zmienione?"
+    assert cache.get("k")[0]["question"] == "Pytanie 1?"
+
+
+def test_quiz_cache_disk_hit_promotes_to_memory(tmp_path, quiz_items):
+    disk = SQLiteCacheTier(str(tmp_path / "cache.db"))
+    disk.set("k", quiz_items)
+    cache = QuizCache(disk=disk)
+
+    assert cache.get("k") == quiz_items
+    assert cache.get_stats()["disk_hits"] == 1
+    assert cache.memory.get("k") is not None
+
+
+def test_quiz_cache_invalidate(tmp_path, quiz_items):
+    cache = QuizCache(disk=SQLiteCacheTier(str(tmp_path / "cache.db")))
+    cache.set("k", quiz_items)
+    cache.invalidate("k")
+    assert cache.get("k") is None
+    assert cache.get_stats()["invalidations"] == 1
+
+
+# ===== INTEGRACJA Z AIGENERATOR =====
+
+def _api_response(items):
+    import json
+    from unittest.mock import MagicMock
+    mock_response = MagicMock()
+    mock_response.json.return_value = {'choices': [{'message': {'content': json.dumps(items)}}]}
+    return mock_response
+
+
+def test_generator_uses_cache_for_identical_requests(quiz_items):
+    cache = QuizCache()
+    generator = AIGenerator(api_url="http://test", api_key="key", cache=cache)
+    with patch('ai_generator.requests.Session.post', return_value=_api_response(quiz_items)) as mock_post:
+        first = generator.generate_quiz("Python", 2)
+        second = generator.generate_quiz(" python", 2)
+
+    assert first == second == quiz_items
+    assert mock_post.call_count == 1
+    assert cache.get_stats()["hits"] == 1
+
+
+def test_generator_revalidates_corrupt_cache_entry(quiz_items):
+    cache = QuizCache()
+    generator = AIGenerator(api_url="http://test", api_key="key", cache=cache)
+    key = generator._cache_key("Python", 2)
+    cache.set(key, [{"question": "Zepsute?", "a": "", "b": "B", "c": "C", "d": "D", "correct": "a"}] * 2)
+
+    with patch('ai_generator.requests.Session.post', return_value=_api_response(quiz_items)) as mock_post:
+        result = generator.generate_quiz("Python", 2)
+
+    assert result == quiz_items
+    assert mock_post.call_count == 1
+    assert cache.get_stats()["invalidations"] == 1
+
+
+def test_generator_async_uses_cache(quiz_items):
+    import asyncio
+    cache = QuizCache()
+    generator = AIGenerator(api_url="http://test", api_key="key", cache=cache)
+    cache.set(generator._cache_key("Python", 2), quiz_items)
+
+    assert asyncio.run(generator.agenerate_quiz("Python", 2)) == quiz_items
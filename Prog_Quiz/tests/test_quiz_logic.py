@@ -1,6 +1,9 @@
+from array import array
+from unittest.mock import patch
+
 import pytest
 from quiz_logic import (
-    Question, Quiz,
+    Question, Quiz, AnswersView, NO_ANSWER,
     QuizException, InvalidQuestionError, InvalidAnswerError,
     QuizStateError, EmptyQuizError
 )
@@ -20,7 +23,7 @@ def test_question_valid_creation():
     """Test tworzenia poprawnego pytania z różnymi konfiguracjami"""
     q1 = Question("Test?", ["A", "B"], 0)
     assert q1.text == "Test?"
-    assert q1.options == ["A", "B"]
+    assert q1.options == ("A", "B")
     assert q1.correct_index == 0
     assert q1.points == 1
     
@@ -232,6 +235,27 @@ def test_quiz_get_current_question_at_end():
     assert quiz.get_current_question() is None
 
 
+def test_quiz_add_question_extends_finished_quiz():
+    """Test dołączania pytań w trakcie quizu (tryb strumieniowy)"""
+    quiz = Quiz([Question("Pierwsze?", ["A", "B"], 0)])
+    quiz.start()
+    quiz.answer_current(0)
+    assert quiz.is_finished()
+    
+    quiz.add_question(Question("Drugie?", ["A", "B"], 1, points=2))
+    assert not quiz.is_finished()
+    assert quiz.get_current_question().text == "Drugie?"
+    quiz.answer_current(1)
+    
+    summary = quiz.get_summary()
+    assert summary["score"] == 3
+    assert summary["max_score"] == 3
+    assert summary["answers"] == [0, 1]
+    
+    with pytest.raises(InvalidQuestionError):
+        quiz.add_question("Nie pytanie")
+
+
 # ===== TESTY INTEGRACYJNE =====
 
 def test_full_quiz_scenario():
@@ -303,3 +327,112 @@ def test_large_quiz():
     assert quiz.score == 100
     summary = quiz.get_summary()
     assert len(summary["answers"]) == 100
+
+
+# ===== TESTY REPREZENTACJI W PAMIĘCI =====
+
+def test_question_and_quiz_use_slots():
+    """Test braku __dict__ w pytaniach i quizach"""
+    q = Question("Test?", ["A", "B"], 0)
+    quiz = Quiz([q])
+    assert not hasattr(q, "__dict__")
+    assert not hasattr(quiz, "__dict__")
+    with pytest.raises(AttributeError):
+        q.extra = 1
+
+
+def test_question_options_are_read_only_without_copying():
+    """Test, że opcje są krotką zwracaną bez kopiowania"""
+    q = Question("Test?", [" A ", "B"], 0)
+    assert q.options is q.options
+    with pytest.raises(AttributeError):
+        q.options.append("C")
+    assert q.options == ("A", "B")
+
+
+def test_question_restore_skips_validation():
+    """Test zaufanego konstruktora dla danych już zwalidowanych"""
+    q = Question.restore("Test?", ["A", "B"], 1, points=2)
+    assert (q.text, q.options, q.correct_index, q.points) == ("Test?", ("A", "B"), 1, 2)
+    with patch.object(Question, "__init__", side_effect=AssertionError):
+        Question.restore("Test?", ("A", "B"), 0)
+
+
+def test_quiz_answers_is_read_only_view():
+    """Test widoku odpowiedzi: bez kopii, tylko do odczytu, zgodny z listą"""
+    quiz = Quiz([Question("Q1", ["A", "B"], 0), Question("Q2", ["A", "B"], 1)])
+    quiz.start()
+    answers = quiz.answers
+    quiz.answer_current(1)
+
+    # Widok odzwierciedla bieżący stan quizu
+    assert answers == [1, None]
+    assert answers[0] == 1 and answers[-1] is None
+    assert answers[:1] == [1]
+    assert len(answers) == 2
+    with pytest.raises(TypeError):
+        answers[0] = 0
+    assert answers.tobytes() == bytes([1, 255])
+
+
+def test_quiz_summary_does_not_copy_state():
+    """Test podsumowania: widok odpowiedzi i treści pytań budowane raz"""
+    quiz = Quiz([Question("Q1", ["A", "B"], 0), Question("Q2", ["A", "B"], 1)])
+    quiz.start()
+    quiz.answer_current(0)
+
+    first = quiz.get_summary()
+    second = quiz.get_summary()
+    assert isinstance(first["answers"], AnswersView)
+    assert first["answers"] == [0, None]
+    assert first["questions"] is second["questions"] == ("Q1", "Q2")
+
+    quiz.add_question(Question("Q3", ["A", "B"], 0, points=2))
+    summary = quiz.get_summary()
+    assert summary["questions"] == ("Q1", "Q2", "Q3")
+    assert summary["max_score"] == 4
+
+
+def test_quiz_questions_are_read_only():
+    """Test, że max_score nie może się rozjechać z listą pytań"""
+    questions = [Question("Q1", ["A", "B"], 0)]
+    quiz = Quiz(questions)
+    questions.append(Question("Q2", ["A", "B"], 0))
+
+    assert quiz.questions == (questions[0],)
+    with pytest.raises(AttributeError):
+        quiz.questions.append(questions[1])
+    with pytest.raises(AttributeError):
+        quiz.questions = questions
+    assert quiz.max_score == 1
+
+
+def test_quiz_restore_keeps_state_without_validation():
+    """Test odtworzenia stanu quizu zaufanym konstruktorem"""
+    questions = [Question("Q1", ["A", "B"], 0, points=2), Question("Q2", ["A", "B"], 1, points=3)]
+    quiz = Quiz.restore(questions, 1, 2, array("b", [0, NO_ANSWER]))
+
+    assert (quiz.current, quiz.score, quiz.max_score) == (1, 2, 5)
+    assert quiz.answers == [0, None]
+    quiz.answer_current(1)
+    assert quiz.score == 5 and quiz.is_finished()
+
+
+def test_question_too_many_options():
+    """Test limitu opcji wynikającego z zapisu odpowiedzi w bajcie"""
+    with pytest.raises(InvalidQuestionError, match="najwyżej 127"):
+        Question("Test?", [f"O{i}" for i in range(128)], 0)
+    assert Question("Test?", [f"O{i}" for i in range(127)], 126).is_correct(126)
+
+
+def test_quiz_max_score_tracked_incrementally():
+    """Test bieżącej sumy punktów i zapisu odpowiedzi w tablicy bajtów"""
+    quiz = Quiz([Question("Q1", ["A", "B"], 0, points=2)])
+    assert quiz.max_score == 2
+    quiz.add_question(Question("Q2", ["A", "B"], 1, points=3))
+    assert quiz.max_score == 5
+    
+    quiz.start()
+    quiz.answer_current(1)
+    assert quiz.answers == [1, None]
+    assert quiz._answers.typecode == "b"
@@ -0,0 +1,196 @@
+import os
+import time
+
+import pytest
+
+from quiz_logic import Question, Quiz
+from quiz_snapshot import (
+    SessionStore, SnapshotError, dump_quiz, load_quiz, read_journal, FORMAT_VERSION
+)
+from session_manager import SessionManager, SessionNotFoundError
+
+
+def _questions(count: int = 3) -> list:
+    return [
+        Question(f"Pytanie {i} – zażółć gęślą jaźń?", ["A", "B", "C", "D"], i % 4, points=i + 1)
+        for i in range(count)
+    ]
+
+
+def _state(quiz: Quiz) -> tuple:
+    return (
+        quiz.current, quiz.score, quiz.answers, quiz.max_score,
+        [(q.text, q.options, q.correct_index, q.points) for q in quiz.questions],
+    )
+
+
+# ===== MIGAWKI =====
+
+def test_dump_and_load_roundtrip():
+    quiz = Quiz(_questions())
+    quiz.start()
+    quiz.answer_current(0)
+    quiz.answer_current(0)
+
+    restored = load_quiz(dump_quiz(quiz))
+
+    assert _state(restored) == _state(quiz)
+    restored.answer_current(2)
+    assert restored.is_finished()
+
+
+def test_snapshot_is_compact():
+    quiz = Quiz(_questions(10))
+    text_bytes = sum(len(q.text.encode()) + sum(len(o) for o in q.options) for q in quiz.questions)
+    # Nagłówek i liczniki (21 B) oraz 23 B narzutu na pytanie (4 opcje i odpowiedź)
+    assert len(dump_quiz(quiz)) == text_bytes + 21 + 10 * 23
+
+
+def test_load_rejects_bad_header_and_version():
+    data = dump_quiz(Quiz(_questions(1)))
+    with pytest.raises(SnapshotError):
+        load_quiz(b"XXXX" + data[4:])
+    with pytest.raises(SnapshotError, match="wersja"):
+        load_quiz(data[:4] + bytes([FORMAT_VERSION + 1]) + data[5:])
+    with pytest.raises(SnapshotError):
+        load_quiz(data[:-5])
+
+
+# ===== DZIENNIK I ODTWARZANIE =====
+
+def test_restore_from_journal_without_checkpoint(tmp_path):
+    store = SessionStore(str(tmp_path))
+    manager = SessionManager(store=store)
+    first = manager.create(_questions(), session_id="s1")
+    second = manager.create(_questions(), session_id="s2")
+    manager.answer_current(first, 0)
+    manager.answer_current(first, 1)
+    manager.add_question(second, Question("Dodatkowe?", ["A", "B"], 1))
+    manager.close(second)
+    expected = _state(manager.get(first))
+    # Symulacja awarii: brak checkpointu i zamknięcia store
+
+    restored = SessionStore(str(tmp_path)).restore()
+
+    assert set(restored) == {"s1"}
+    assert _state(restored["s1"]) == expected
+
+
+def test_restore_snapshot_plus_journal(tmp_path):
+    store = SessionStore(str(tmp_path))
+    manager = SessionManager(store=store)
+    session_id = manager.create(_questions(), session_id="s1")
+    manager.answer_current(session_id, 0)
+    assert store.checkpoint() == 1
+    manager.answer_current(session_id, 1)
+    manager.add_question(session_id, Question("Dodatkowe?", ["A", "B"], 1, points=2))
+    expected = _state(manager.get(session_id))
+
+    restored = SessionStore(str(tmp_path)).restore()
+
+    assert _state(restored["s1"]) == expected
+
+
+def test_checkpoint_removes_covered_journals(tmp_path):
+    store = SessionStore(str(tmp_path))
+    manager = SessionManager(store=store)
+    session_id = manager.create(_questions())
+    manager.answer_current(session_id, 0)
+    store.checkpoint()
+
+    journals = [name for name in os.listdir(tmp_path) if name.startswith("journal-")]
+    assert len(journals) == 1
+    assert list(read_journal(os.path.join(tmp_path, journals[0]))) == []
+    store.close()
+
+
+def test_replay_is_idempotent_when_snapshot_is_newer(tmp_path):
+    """Zdarzenia z dziennika już zawarte w migawce nie są stosowane ponownie"""
+    store = SessionStore(str(tmp_path))
+    manager = SessionManager(store=store)
+    session_id = manager.create(_questions(), session_id="s1")
+    manager.answer_current(session_id, 0)
+    manager.add_question(session_id, Question("Dodatkowe?", ["A", "B"], 1))
+    # Migawka bez usuwania dziennika (jak przy awarii w trakcie checkpointu)
+    with store._conn:
+        store._conn.execute("INSERT INTO snapshots VALUES (?, ?)", ("s1", dump_quiz(manager.get(session_id))))
+    expected = _state(manager.get(session_id))
+
+    restored = SessionStore(str(tmp_path)).restore()
+
+    assert _state(restored["s1"]) == expected
+
+
+def test_torn_journal_tail_is_ignored(tmp_path):
+    store = SessionStore(str(tmp_path))
+    manager = SessionManager(store=store)
+    session_id = manager.create(_questions(), session_id="s1")
+    manager.answer_current(session_id, 0)
+    journal_path = store._journal_path(store._journal_seq)
+    with open(journal_path, "ab") as journal:
+        journal.write(b"\x20\x00\x00\x00\x02urwany")
+
+    restored = SessionStore(str(tmp_path)).restore()
+
+    assert restored["s1"].answers == [0, None, None]
+
+
+def test_manager_restore_and_background_checkpointer(tmp_path):
+    store = SessionStore(str(tmp_path), checkpoint_interval=0.01)
+    manager = SessionManager(store=store)
+    ids = [manager.create(_questions()) for _ in range(50)]
+    for session_id in ids:
+        manager.answer_current(session_id, 0)
+    store.start()
+    deadline = time.monotonic() + 2
+    while store.get_stats()["snapshots_written"] < 50 and time.monotonic() < deadline:
+        time.sleep(0.01)
+    store.close()
+    assert store.get_stats()["snapshots_written"] >= 50
+
+    reopened = SessionManager(store=SessionStore(str(tmp_path)))
+    assert reopened.restore() == 50
+    assert reopened.get(ids[0]).answers == [0, None, None]
+    reopened.store.close()
+
+
+def test_evicted_sessions_are_not_restored(tmp_path):
+    store = SessionStore(str(tmp_path))
+    manager = SessionManager(max_sessions=1, store=store)
+    manager.create(_questions(), session_id="stara")
+    manager.create(_questions(), session_id="nowa")
+
+    assert set(SessionStore(str(tmp_path)).restore()) == {"nowa"}
+
+
+def test_late_record_does_not_revive_closed_session(tmp_path):
+    store = SessionStore(str(tmp_path))
+    manager = SessionManager(store=store)
+    session_id = manager.create(_questions(), session_id="s1")
+    session = manager._sessions[session_id]
+    manager.close(session_id)
+    # Zapis spóźniony względem zamknięcia (wyścig wątków)
+    store.record_answer(session_id, session, 0, 0)
+    store.checkpoint()
+
+    assert SessionStore(str(tmp_path)).restore() == {}
+
+
+def test_answer_racing_with_close_is_rejected(tmp_path, monkeypatch):
+    store = SessionStore(str(tmp_path))
+    manager = SessionManager(store=store)
+    session_id = manager.create(_questions(), session_id="s1")
+    touch = manager._touch
+
+    def touch_then_close(sid):
+        # Zamknięcie w oknie między _touch a blokadą sesji
+        session = touch(sid)
+        manager.close(sid)
+        return session
+
+    monkeypatch.setattr(manager, "_touch", touch_then_close)
+    with pytest.raises(SessionNotFoundError):
+        manager.answer_current(session_id, 0)
+    store.checkpoint()
+
+    assert SessionStore(str(tmp_path)).restore() == {}
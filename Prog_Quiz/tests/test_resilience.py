@@ -0,0 +1,315 @@
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+import requests
+
+from ai_generator import AIGenerator, AIServiceError
+from resilience import (
+    CircuitBreaker, CircuitOpenError, RateLimiter, RateLimitExceededError,
+    Resilience, RetryPolicy, TokenBucket, estimate_tokens, parse_retry_after
+)
+
+
+QUIZ_ITEMS = [{"question": "Ile to 2+2?", "a": "3", "b": "4", "c": "5", "d": "6", "correct": "b"}]
+OK_BODY = json.dumps({'choices': [{'message': {'content': json.dumps(QUIZ_ITEMS)}}]})
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def stub_server():
+    """Lokalny serwer HTTP odtwarzający zaplanowane odpowiedzi (status, nagłówki, treść)."""
+    script = []
+    received = []
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_POST(self):
+            length = int(self.headers.get("Content-Length", 0))
+            received.append(self.rfile.read(length))
+            status, headers, body = script.pop(0) if script else (200, {}, OK_BODY)
+            payload = body.encode("utf-8")
+            self.send_response(status)
+            for name, value in headers.items():
+                self.send_header(name, value)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(payload)))
+            self.end_headers()
+            self.wfile.write(payload)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    thread = threading.Thread(target=server.serve_forever, kwargs={"poll_interval": 0.01}, daemon=True)
+    thread.start()
+    server.url = f"http://127.0.0.1:{server.server_address[1]}/v1/chat/completions"
+    server.script = script
+    server.received = received
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def _resilience(sleeps, max_retries=3, breaker=None, limiter=None):
+    return Resilience(
+        policy=RetryPolicy(max_retries=max_retries, base_delay=0.1, max_delay=5.0),
+        breaker=breaker if breaker is not None else CircuitBreaker(failure_threshold=10),
+        limiter=limiter,
+        sleep=sleeps.append
+    )
+
+
+# ===== RETRY-AFTER I OPÓŹNIENIA =====
+
+@pytest.mark.parametrize("value, expected", [("3", 3.0), ("0", 0.0), ("-5", 0.0), (None, None), ("", None), ("jutro", None)])
+def test_parse_retry_after_seconds(value, expected):
+    assert parse_retry_after(value) == expected
+
+
+def test_parse_retry_after_http_date():
+    from email.utils import formatdate
+    import time
+    delay = parse_retry_after(formatdate(time.time() + 30, usegmt=True))
+    assert 25 <= delay <= 31
+
+
+def test_retry_policy_exponential_jitter_bounds():
+    import random
+    policy = RetryPolicy(max_retries=5, base_delay=1.0, max_delay=10.0, rng=random.Random(1))
+    for attempt in range(6):
+        for _ in range(20):
+            assert 0 <= policy.compute_delay(attempt) <= min(10.0, 2 ** attempt)
+
+
+def test_retry_policy_honors_retry_after_capped():
+    policy = RetryPolicy(max_retries=3, base_delay=0.1, max_delay=5.0)
+    assert policy.compute_delay(0, "2") == 2.0
+    assert policy.compute_delay(0, "120") == 5.0
+
+
+def test_estimate_tokens():
+    payload = {"messages": [{"role": "user", "content": "x" * 400}], "max_tokens": 2000}
+    assert 2100 <= estimate_tokens(payload) <= 2120
+
+
+# ===== BEZPIECZNIK =====
+
+def test_circuit_breaker_opens_and_recovers():
+    clock = FakeClock()
+    breaker = CircuitBreaker(failure_threshold=2, recovery_timeout=10, clock=clock)
+    breaker.record_failure()
+    assert breaker.allow_request()
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.OPEN
+    assert not breaker.allow_request()
+
+    clock.now = 10
+    assert breaker.allow_request()          # zapytanie próbne
+    assert not breaker.allow_request()      # tylko jedno naraz
+    breaker.record_success()
+    assert breaker.state == CircuitBreaker.CLOSED
+
+
+def test_circuit_breaker_failed_probe_reopens():
+    clock = FakeClock()
+    breaker = CircuitBreaker(failure_threshold=1, recovery_timeout=10, clock=clock)
+    breaker.record_failure()
+    clock.now = 10
+    assert breaker.allow_request()
+    breaker.record_failure()
+    assert not breaker.allow_request()
+
+
+# ===== LIMITER =====
+
+def test_token_bucket_refill():
+    clock = FakeClock()
+    bucket = TokenBucket(rate_per_minute=60, capacity=2, clock=clock)
+    assert bucket.try_acquire() == 0
+    assert bucket.try_acquire() == 0
+    assert bucket.try_acquire() == pytest.approx(1.0)
+    clock.now = 1.0
+    assert bucket.try_acquire() == 0
+
+
+def test_rate_limiter_waits_then_raises():
+    limiter = RateLimiter(rpm=60, tpm=100000, max_wait=1.5)
+    limiter.requests = TokenBucket(60, capacity=1, clock=FakeClock())
+    sleeps = []
+    limiter.acquire(10, sleeps.append)
+    with pytest.raises(RateLimitExceededError):
+        limiter.acquire(10, sleeps.append)
+    assert sleeps == [pytest.approx(1.0)]
+
+
+def test_rate_limiter_token_budget():
+    limiter = RateLimiter(rpm=1000, tpm=100, max_wait=0)
+    limiter.acquire(80)
+    with pytest.raises(RateLimitExceededError):
+        limiter.acquire(80)
+
+
+# ===== INTEGRACJA Z LOKALNYM SERWEREM =====
+
+def test_generator_retries_503_then_succeeds(stub_server):
+    stub_server.script.extend([(503, {}, "busy"), (503, {}, "busy")])
+    sleeps = []
+    generator = AIGenerator(api_url=stub_server.url, api_key="key", resilience=_resilience(sleeps))
+
+    assert generator.generate_quiz("Python", 1) == QUIZ_ITEMS
+    assert len(stub_server.received) == 3
+    assert len(sleeps) == 2
+    generator.close()
+
+
+def test_generator_honors_retry_after_on_429(stub_server):
+    stub_server.script.append((429, {"Retry-After": "2"}, "slow down"))
+    sleeps = []
+    resilience = _resilience(sleeps)
+    generator = AIGenerator(api_url=stub_server.url, api_key="key", resilience=resilience)
+
+    generator.generate_quiz("Python", 1)
+
+    assert sleeps == [2.0]
+    assert resilience.retries == 1
+    generator.close()
+
+
+def test_generator_gives_up_after_max_retries(stub_server):
+    stub_server.script.extend([(500, {}, "error")] * 3)
+    sleeps = []
+    generator = AIGenerator(api_url=stub_server.url, api_key="key", resilience=_resilience(sleeps, max_retries=2))
+
+    with pytest.raises(AIServiceError, match="500"):
+        generator.generate_quiz("Python", 1)
+    assert len(stub_server.received) == 3
+    generator.close()
+
+
+def test_generator_does_not_retry_client_errors(stub_server):
+    stub_server.script.append((401, {}, "unauthorized"))
+    sleeps = []
+    generator = AIGenerator(api_url=stub_server.url, api_key="key", resilience=_resilience(sleeps))
+
+    with pytest.raises(AIServiceError, match="401"):
+        generator.generate_quiz("Python", 1)
+    assert len(stub_server.received) == 1
+    assert sleeps == []
+    generator.close()
+
+
+def test_shared_breaker_fails_fast_while_provider_down(stub_server):
+    stub_server.script.extend([(503, {}, "down")] * 2)
+    breaker = CircuitBreaker(failure_threshold=2, recovery_timeout=60)
+    sleeps = []
+    first = AIGenerator(api_url=stub_server.url, api_key="key", resilience=_resilience(sleeps, 1, breaker))
+    second = AIGenerator(api_url=stub_server.url, api_key="key", resilience=_resilience(sleeps, 1, breaker))
+
+    with pytest.raises(AIServiceError):
+        first.generate_quiz("Python", 1)
+    with pytest.raises(AIServiceError, match="obwód otwarty"):
+        second.generate_quiz("Python", 1)
+    assert len(stub_server.received) == 2
+    first.close()
+    second.close()
+
+
+def test_retries_connection_errors():
+    sleeps = []
+    resilience = _resilience(sleeps, max_retries=2)
+    calls = []
+
+    def send():
+        calls.append(1)
+        if len(calls) < 3:
+            raise requests.exceptions.ConnectionError("reset")
+        return type("Response", (), {"status_code": 200, "headers": {}})()
+
+    response = resilience.call(send, retry_on=(requests.exceptions.ConnectionError,))
+    assert response.status_code == 200
+    assert len(sleeps) == 2
+
+
+def test_async_generator_retries(stub_server):
+    import asyncio
+    stub_server.script.append((502, {}, "bad gateway"))
+    generator = AIGenerator(
+        api_url=stub_server.url, api_key="key",
+        resilience=Resilience(policy=RetryPolicy(max_retries=2, base_delay=0.0, max_delay=0.0))
+    )
+
+    async def run():
+        async with generator:
+            return await generator.agenerate_quiz("Python", 1)
+
+    assert asyncio.run(run()) == QUIZ_ITEMS
+    assert len(stub_server.received) == 2
+
+
+def test_breaker_open_error_type():
+    breaker = CircuitBreaker(failure_threshold=1, recovery_timeout=60)
+    breaker.record_failure()
+    with pytest.raises(CircuitOpenError):
+        _resilience([], breaker=breaker).call(lambda: None)
+
+
+def test_cancelled_calls_do_not_open_breaker():
+    import asyncio
+    breaker = CircuitBreaker(failure_threshold=2, recovery_timeout=60)
+    resilience = _resilience([], breaker=breaker)
+
+    async def send():
+        await asyncio.sleep(10)
+
+    async def run():
+        for _ in range(2):
+            task = asyncio.ensure_future(resilience.acall(send))
+            await asyncio.sleep(0)
+            task.cancel()
+            with pytest.raises(asyncio.CancelledError):
+                await task
+
+    asyncio.run(run())
+    assert breaker.state == CircuitBreaker.CLOSED
+    assert breaker.allow_request()
+
+
+def test_cancelled_probe_is_released():
+    clock = FakeClock()
+    breaker = CircuitBreaker(failure_threshold=1, recovery_timeout=10, clock=clock)
+    breaker.record_failure()
+    clock.now = 10
+
+    def send():
+        raise KeyboardInterrupt
+
+    with pytest.raises(KeyboardInterrupt):
+        _resilience([], breaker=breaker).call(send)
+    assert breaker.state == CircuitBreaker.HALF_OPEN
+    assert breaker.allow_request()
+
+
+def test_rate_limit_error_releases_half_open_probe():
+    clock = FakeClock()
+    breaker = CircuitBreaker(failure_threshold=1, recovery_timeout=10, clock=clock)
+    breaker.record_failure()
+    clock.now = 10
+    limiter = RateLimiter(rpm=1000, tpm=100, max_wait=0)
+    limiter.acquire(80)
+    resilience = _resilience([], breaker=breaker, limiter=limiter)
+
+    with pytest.raises(RateLimitExceededError):
+        resilience.call(lambda: None, tokens=80)
+
+    # Zapytanie próbne nie zostało wysłane - kolejne może nim być
+    assert breaker.allow_request()
+    breaker.record_success()
+    assert breaker.state == CircuitBreaker.CLOSED
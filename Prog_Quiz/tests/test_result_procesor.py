@@ -1,5 +1,8 @@
+import io
+import tracemalloc
+
 import pytest
-from result_procesor import build_report
+from result_procesor import WRITE_BATCH_CHUNKS, build_report, grade_for, iter_report_chunks, write_report
 
 
 # ===== TESTY PODSTAWOWEJ FUNKCJONALNOŚCI =====
@@ -324,3 +327,108 @@ def test_build_report_large_number_of_wrong_answers():
     # Sprawdź, czy wszystkie pytania są w raporcie
     for i in range(1, 51):
         assert f"Pytanie {i}" in report or f"Pytanie numer {i}" in report
+
+
+# ===== TESTY RAPORTU STRUMIENIOWEGO =====
+
+def _wrong_items(count):
+    return [
+        {
+            "index": i + 1,
+            "user": "a",
+            "correct": "b",
+            "question": f"Pytanie numer {i + 1}?",
+            "correct_text": f"Poprawna odpowiedź {i + 1}"
+        }
+        for i in range(count)
+    ]
+
+
+@pytest.mark.parametrize("total,correct", [(0, 0), (5, 5), (5, 2), (600, 0)])
+def test_write_report_matches_build_report(total, correct):
+    wrong_items = _wrong_items(total - correct)
+    sink = io.StringIO()
+
+    written = write_report(sink, total, correct, iter(wrong_items))
+
+    expected = build_report(total=total, correct=correct, wrong_items=wrong_items)
+    assert sink.getvalue() == expected
+    assert written == len(expected)
+
+
+def test_iter_report_chunks_consumes_items_lazily():
+    consumed = []
+
+    def produce():
+        for item in _wrong_items(3):
+            consumed.append(item["index"])
+            yield item
+
+    chunks = iter_report_chunks(3, 0, produce())
+    for chunk in chunks:
+        if "Pytanie 1:" in chunk:
+            break
+    assert consumed == [1]
+
+
+def test_write_report_writes_in_batches():
+    class CountingSink(io.StringIO):
+        writes = 0
+        def write(self, text):
+            self.writes += 1
+            return super().write(text)
+
+    sink = CountingSink()
+    write_report(sink, 1000, 0, _wrong_items(1000))
+    # Nagłówek, tytuł listy błędów, 1000 odpowiedzi i stopka
+    chunks = 1000 + 3
+    assert sink.writes == -(-chunks // WRITE_BATCH_CHUNKS)
+
+
+def test_iter_report_chunks_too_many_items_fails_immediately():
+    chunks = iter_report_chunks(2, 1, iter(_wrong_items(5)))
+    with pytest.raises(ValueError, match="równa total"):
+        list(chunks)
+
+
+def test_write_report_missing_items_fails_at_end():
+    sink = io.StringIO()
+    with pytest.raises(ValueError, match="równa total"):
+        write_report(sink, 4, 0, iter(_wrong_items(2)))
+
+
+def test_iter_report_chunks_invalid_arguments_fail_before_iteration():
+    with pytest.raises(ValueError, match="Total"):
+        iter_report_chunks(-1, 0, [])
+    with pytest.raises(ValueError, match="iterowalnym"):
+        iter_report_chunks(1, 0, 42)
+
+
+@pytest.mark.parametrize("percentage,expected", [
+    (100, "DOSKONALE"), (90, "DOSKONALE"), (89.9, "BARDZO DOBRZE"), (75, "BARDZO DOBRZE"),
+    (60, "DOBRZE"), (50, "ŚREDNIO"), (49.9, "NIE PODDAWAJ SIĘ"), (0, "NIE PODDAWAJ SIĘ"),
+])
+def test_grade_for_thresholds(percentage, expected):
+    assert expected in grade_for(percentage)
+
+
+def test_write_report_memory_stays_flat():
+    def produce(count):
+        for i in range(count):
+            yield {"index": i + 1, "user": "a", "correct": "b",
+                   "question": f"Pytanie {i}?", "correct_text": f"Odpowiedź {i}"}
+
+    class NullSink:
+        def write(self, text):
+            return len(text)
+
+    def peak(count):
+        tracemalloc.start()
+        try:
+            write_report(NullSink(), count, 0, produce(count))
+            return tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+
+    # Dziesięciokrotnie więcej błędnych odpowiedzi - szczyt pamięci bez zmian
+    assert peak(20_000) < peak(2_000) * 2
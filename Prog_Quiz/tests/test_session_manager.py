@@ -0,0 +1,160 @@
+import threading
+
+import pytest
+
+from quiz_logic import Question, Quiz, InvalidAnswerError, QuizStateError
+from session_manager import SessionManager, SessionNotFoundError, estimate_quiz_size
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def _questions(count: int = 2) -> list:
+    return [Question(f"Pytanie {i}?", ["A", "B", "C", "D"], i % 4) for i in range(count)]
+
+
+@pytest.fixture
+def clock():
+    return FakeClock()
+
+
+# ===== CYKL ŻYCIA =====
+
+def test_create_answer_and_close(clock):
+    manager = SessionManager(clock=clock)
+    session_id = manager.create(_questions(2))
+
+    assert manager.answer_current(session_id, 0) is True
+    assert manager.answer_current(session_id, 0) is False
+    assert manager.get(session_id).is_finished()
+
+    summary = manager.close(session_id)
+    assert summary["score"] == 1
+    assert summary["answers"] == [0, 0]
+    assert session_id not in manager
+    assert manager.get_stats()["finished"] == 1
+    assert manager.get_stats()["memory_bytes"] == 0
+
+
+def test_unknown_session(clock):
+    manager = SessionManager(clock=clock)
+    with pytest.raises(SessionNotFoundError):
+        manager.get("brak")
+    with pytest.raises(SessionNotFoundError):
+        manager.close("brak")
+
+
+def test_duplicate_session_id(clock):
+    manager = SessionManager(clock=clock)
+    manager.create(_questions(), session_id="s1")
+    with pytest.raises(ValueError):
+        manager.create(_questions(), session_id="s1")
+
+
+def test_answer_errors_propagate(clock):
+    manager = SessionManager(clock=clock)
+    session_id = manager.create(_questions(1))
+    with pytest.raises(InvalidAnswerError):
+        manager.answer_current(session_id, 9)
+    manager.answer_current(session_id, 0)
+    with pytest.raises(QuizStateError):
+        manager.answer_current(session_id, 0)
+    assert manager.get_stats()["finished"] == 1
+
+
+# ===== WYGASZANIE I LRU =====
+
+def test_idle_sessions_expire(clock):
+    manager = SessionManager(idle_timeout=10, clock=clock)
+    old = manager.create(_questions())
+    clock.now = 5
+    fresh = manager.create(_questions())
+    clock.now = 12
+
+    assert old not in manager
+    assert fresh in manager
+    with pytest.raises(SessionNotFoundError):
+        manager.answer_current(old, 0)
+    assert manager.get_stats()["evicted_idle"] == 1
+
+
+def test_access_keeps_session_alive(clock):
+    manager = SessionManager(idle_timeout=10, clock=clock)
+    session_id = manager.create(_questions())
+    for step in range(1, 4):
+        clock.now = step * 8
+        manager.get(session_id)
+    assert manager.evict_idle() == 0
+
+
+def test_lru_eviction_by_session_count(clock):
+    manager = SessionManager(max_sessions=2, clock=clock)
+    first = manager.create(_questions())
+    second = manager.create(_questions())
+    manager.get(first)
+    third = manager.create(_questions())
+
+    assert first in manager and third in manager
+    assert second not in manager
+    assert manager.get_stats()["evicted_lru"] == 1
+
+
+def test_lru_eviction_by_memory(clock):
+    size = estimate_quiz_size(Quiz(_questions()))
+    manager = SessionManager(max_memory_bytes=size * 3, clock=clock)
+    ids = [manager.create(_questions()) for _ in range(5)]
+
+    stats = manager.get_stats()
+    assert stats["live"] == 3
+    assert stats["evicted"] == 2
+    assert stats["memory_bytes"] <= size * 3
+    assert ids[-1] in manager and ids[0] not in manager
+
+
+def test_add_question_updates_memory(clock):
+    manager = SessionManager(clock=clock)
+    session_id = manager.create(_questions(1))
+    before = manager.get_stats()["memory_bytes"]
+    manager.answer_current(session_id, 0)
+    manager.add_question(session_id, Question("Nowe?", ["A", "B"], 1))
+
+    assert manager.get_stats()["memory_bytes"] > before
+    assert not manager.get(session_id).is_finished()
+
+
+@pytest.mark.parametrize("kwargs", [{"idle_timeout": 0}, {"max_sessions": 0}, {"max_memory_bytes": 0}])
+def test_invalid_limits(kwargs):
+    with pytest.raises(ValueError):
+        SessionManager(**kwargs)
+
+
+# ===== WSPÓŁBIEŻNOŚĆ =====
+
+def test_concurrent_answers_are_serialized_per_session():
+    manager = SessionManager()
+    session_id = manager.create([Question(f"Q{i}", ["A", "B"], 0) for i in range(400)])
+    errors = []
+
+    def worker():
+        for _ in range(100):
+            try:
+                manager.answer_current(session_id, 0)
+            except QuizStateError as e:
+                errors.append(e)
+
+    threads = [threading.Thread(target=worker) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    quiz = manager.get(session_id)
+    assert errors == []
+    assert quiz.score == 400
+    assert quiz.is_finished()
+    assert manager.get_stats()["finished"] == 1
@@ -1,7 +1,8 @@
 import pytest
 import builtins
+import io
 import os
-from ui_text import UITextInterface
+from ui_text import TerminalRenderer, UITextInterface
 from config import MIN_QUESTIONS, MAX_QUESTIONS
 
 class DummyScreen:
@@ -14,12 +15,66 @@ class DummyScreen:
 def ui():
     return UITextInterface()
 
+class FakeTerminal(io.StringIO):
+    """Strumień udający terminal, zliczający zapisy."""
+    def __init__(self, tty=True):
+        super().__init__()
+        self.tty = tty
+        self.writes = 0
+    def isatty(self):
+        return self.tty
+    def write(self, text):
+        self.writes += 1
+        return super().write(text)
+
 # --- Testy czyszczenia ekranu ---
-def test_clear_screen(monkeypatch, ui):
-    called = {}
-    monkeypatch.setattr(os, "system", lambda cmd: called.setdefault("system", cmd))
+def test_clear_screen(monkeypatch):
+    monkeypatch.setattr(os, "system", lambda cmd: pytest.fail("os.system nie powinno być wywołane"))
+    monkeypatch.setattr(os, "name", "posix")
+    monkeypatch.delenv("TERM", raising=False)
+    terminal = FakeTerminal()
+    ui = UITextInterface(TerminalRenderer(terminal))
+    ui._clear_screen()
+    assert terminal.getvalue() == TerminalRenderer.CLEAR_SEQUENCE
+
+def test_clear_screen_skipped_when_not_tty(capsys, ui):
     ui._clear_screen()
-    assert called["system"] in ["cls", "clear"]
+    assert capsys.readouterr().out == ""
+
+def test_clear_screen_skipped_for_dumb_terminal(monkeypatch):
+    monkeypatch.setenv("TERM", "dumb")
+    terminal = FakeTerminal()
+    UITextInterface(TerminalRenderer(terminal))._clear_screen()
+    assert terminal.getvalue() == ""
+
+def test_screen_rendered_in_single_write(monkeypatch):
+    monkeypatch.delenv("TERM", raising=False)
+    terminal = FakeTerminal()
+    ui = UITextInterface(TerminalRenderer(terminal))
+    ui.display_question(2, "Co to jest?", {"a": "X", "b": "Y", "c": "Z", "d": "W"})
+    assert terminal.writes == 1
+    frame = terminal.getvalue()
+    assert frame.startswith(TerminalRenderer.CLEAR_SEQUENCE)
+    assert frame[len(TerminalRenderer.CLEAR_SEQUENCE):] == "\n".join([
+        "=" * 80,
+        "  PYTANIE 2",
+        "=" * 80,
+        "  ℹ️  Zaznacz poprawną odpowiedź (A, B, C lub D)",
+        "-" * 80,
+        "",
+        "  Co to jest?\n",
+        "  Opcje:",
+        "    A) X",
+        "    B) Y",
+        "    C) Z",
+        "    D) W",
+        "",
+    ]) + "\n"
+
+def test_renderer_clear_can_be_forced_off():
+    terminal = FakeTerminal()
+    TerminalRenderer(terminal, clear=False).render(["linia"], clear=True)
+    assert terminal.getvalue() == "linia\n"
 
 # --- Testy nagłówka ---
 def test_print_header(capsys, ui):
@@ -152,6 +207,13 @@ def test_display_final_report(monkeypatch, capsys, ui):
     assert "RAPORT WYNIKÓW" in out
     assert "Wynik: 5/5" in out
 
+# --- Testy ponownej gry ---
+@pytest.mark.parametrize("inputs, expected", [(["t"], True), (["N"], False), (["x", "T"], True)])
+def test_ask_play_again(monkeypatch, capsys, ui, inputs, expected):
+    answers = iter(inputs)
+    monkeypatch.setattr(builtins, "input", lambda _: next(answers))
+    assert ui.ask_play_again() is expected
+
 # --- Testy komunikatów ---
 def test_show_message_info(capsys, ui):
     ui.show_message("To jest info", "info")
@@ -1,5 +1,70 @@
 import os
-from typing import Dict, Literal
+import sys
+from typing import Dict, List, Literal, Optional, TextIO
+
+
+class TerminalRenderer:
+    """
+    Wyświetla całe ekrany jednym zapisem do strumienia wyjścia.
+
+    Ekran jest czyszczony sekwencjami ANSI zamiast uruchamiania procesu
+    cls/clear; gdy wyjście nie jest terminalem (potok, plik, testy),
+    czyszczenie jest pomijane, a treść ekranu pozostaje bez zmian.
+    """
+    
+    # Kursor na początek, wyczyszczenie ekranu i bufora przewijania
+    CLEAR_SEQUENCE: str = "\x1b[H\x1b[2J\x1b[3J"
+    
+    def __init__(self, stream: Optional[TextIO] = None, clear: Optional[bool] = None) -> None:
+        """
+        Args:
+            stream: Strumień wyjścia (domyślnie bieżący sys.stdout)
+            clear: Czy czyścić ekran; None - tylko gdy wyjście jest terminalem
+        """
+        self._stream = stream
+        self._clear = clear
+        self._vt_enabled = False
+    
+    @property
+    def stream(self) -> TextIO:
+        # sys.stdout jest odczytywany przy każdym zapisie - może zostać
+        # podmieniony (przekierowanie, przechwytywanie w testach)
+        return self._stream if self._stream is not None else sys.stdout
+    
+    def clears_screen(self) -> bool:
+        """Czy renderer czyści ekran przed wyświetleniem nowego."""
+        if self._clear is not None:
+            return self._clear
+        stream = self.stream
+        isatty = getattr(stream, "isatty", None)
+        return bool(isatty and isatty()) and os.environ.get("TERM") != "dumb"
+    
+    def _enable_vt(self) -> None:
+        # Konsola Windows interpretuje sekwencje ANSI dopiero po włączeniu
+        # trybu VT - puste polecenie systemowe robi to jednorazowo
+        if os.name == 'nt' and not self._vt_enabled:
+            os.system('')
+        self._vt_enabled = True
+    
+    def render(self, lines: List[str], clear: bool = False) -> None:
+        """
+        Wyświetla linie jednym zapisem, opcjonalnie czyszcząc najpierw ekran.
+        
+        Args:
+            lines: Linie ekranu (bez znaków nowej linii)
+            clear: Czy wyczyścić ekran przed wyświetleniem
+        """
+        frame = "".join(line + "\n" for line in lines)
+        if clear and self.clears_screen():
+            self._enable_vt()
+            frame = self.CLEAR_SEQUENCE + frame
+        stream = self.stream
+        stream.write(frame)
+        stream.flush()
+    
+    def clear(self) -> None:
+        """Czyści ekran (bez efektu, gdy wyjście nie jest terminalem)."""
+        self.render([], clear=True)
 
 
 class UITextInterface:
@@ -13,13 +78,47 @@ class UITextInterface:
     HEADER_CHAR: str = "="
     SUBHEADER_CHAR: str = "-"
     
-    def __init__(self) -> None:
-        """Inicjalizuje interfejs użytkownika."""
+    def __init__(self, renderer: Optional[TerminalRenderer] = None) -> None:
+        """
+        Inicjalizuje interfejs użytkownika.
+        
+        Args:
+            renderer: Backend wyświetlania ekranów (domyślnie TerminalRenderer
+                      na sys.stdout)
+        """
         self._current_stage: str = "init"
+        self.renderer = renderer or TerminalRenderer()
     
     def _clear_screen(self) -> None:
-        """Czyści ekran konsoli (Windows lub Unix)."""
-        os.system('cls' if os.name == 'nt' else 'clear')
+        """Czyści ekran konsoli sekwencjami ANSI (tylko w terminalu)."""
+        self.renderer.clear()
+    
+    def _header_lines(self, title: str, info_text: str = "") -> List[str]:
+        """
+        Buduje linie nagłówka z tytułem i tekstem informacyjnym.
+        
+        Args:
+            title: Tytuł nagłówka
+            info_text: Dodatkowy tekst informacyjny
+        """
+        lines = [
+            self.HEADER_CHAR * self.SCREEN_WIDTH,
+            f"  {title.upper()}",
+            self.HEADER_CHAR * self.SCREEN_WIDTH,
+        ]
+        if info_text:
+            lines.append(f"  ℹ️  {info_text}")
+            lines.append(self.SUBHEADER_CHAR * self.SCREEN_WIDTH)
+        lines.append("")
+        return lines
+    
+    def _footer_lines(self) -> List[str]:
+        """Buduje linie stopki."""
+        return ["", self.HEADER_CHAR * self.SCREEN_WIDTH]
+    
+    def _render_screen(self, title: str, info_text: str, body: List[str]) -> None:
+        """Czyści ekran i wyświetla nagłówek z treścią jednym zapisem."""
+        self.renderer.render(self._header_lines(title, info_text) + body, clear=True)
     
     def _print_header(self, title: str, info_text: str = "") -> None:
         """
@@ -29,20 +128,11 @@ class UITextInterface:
             title: Tytuł nagłówka
             info_text: Dodatkowy tekst informacyjny
         """
-        self._clear_screen()
-        print(self.HEADER_CHAR * self.SCREEN_WIDTH)
-        print(f"  {title.upper()}")
-        print(self.HEADER_CHAR * self.SCREEN_WIDTH)
-        
-        if info_text:
-            print(f"  ℹ️  {info_text}")
-            print(self.SUBHEADER_CHAR * self.SCREEN_WIDTH)
-        print()
+        self._render_screen(title, info_text, [])
     
     def _print_footer(self) -> None:
         """Wyświetla stopkę."""
-        print()
-        print(self.HEADER_CHAR * self.SCREEN_WIDTH)
+        self.renderer.render(self._footer_lines())
     
     def _get_valid_input(
         self,
@@ -77,10 +167,6 @@ class UITextInterface:
     def display_welcome(self) -> None:
         """Wyświetla ekran powitania."""
         self._current_stage = "welcome"
-        self._print_header(
-            "Witaj w Quiz AI",
-            "Interaktywny system pytań z wykorzystaniem sztucznej inteligencji"
-        )
         
         welcome_message = """
         📚 Funkcjonalności:
@@ -91,8 +177,11 @@ class UITextInterface:
         🎯 Jak zacząć:
            Naciśnij ENTER aby przejść dalej...
         """
-        print(welcome_message)
-        self._print_footer()
+        self._render_screen(
+            "Witaj w Quiz AI",
+            "Interaktywny system pytań z wykorzystaniem sztucznej inteligencji",
+            [welcome_message] + self._footer_lines()
+        )
         
         input("  ➜ ")
     
@@ -104,21 +193,19 @@ class UITextInterface:
             Temat wybrany przez użytkownika
         """
         self._current_stage = "topic_selection"
-        self._print_header(
+        self._render_screen(
             "Wybór Tematu",
-            "Podaj temat, z którego chcesz odpowiadać na pytania"
+            "Podaj temat, z którego chcesz odpowiadać na pytania",
+            ["  Przykłady tematów: Python, Historia, Biologia, Matematyka...\n"]
         )
         
-        print("  Przykłady tematów: Python, Historia, Biologia, Matematyka...\n")
-        
         topic = self._get_valid_input(
             "  ➜ Temat: ",
             validation_fn=lambda x: len(x) > 0,
             error_msg="Temat nie może być pusty."
         )
         
-        print(f"\n  ✓ Wybrany temat: '{topic}'")
-        self._print_footer()
+        self.renderer.render([f"\n  ✓ Wybrany temat: '{topic}'"] + self._footer_lines())
         input("  Naciśnij ENTER aby kontynuować...")
         
         return topic
@@ -135,9 +222,10 @@ class UITextInterface:
             Liczba pytań wybrana przez użytkownika
         """
         self._current_stage = "question_count"
-        self._print_header(
+        self._render_screen(
             "Liczba Pytań",
-            f"Wybierz liczbę pytań z zakresu {min_q}-{max_q}"
+            f"Wybierz liczbę pytań z zakresu {min_q}-{max_q}",
+            []
         )
         
         def validate_count(value: str) -> bool:
@@ -155,8 +243,7 @@ class UITextInterface:
             error_msg=error_msg
         ))
         
-        print(f"\n  ✓ Liczba pytań: {num_questions}")
-        self._print_footer()
+        self.renderer.render([f"\n  ✓ Liczba pytań: {num_questions}"] + self._footer_lines())
         input("  Naciśnij ENTER aby przystąpić do quizu...")
         
         return num_questions
@@ -176,20 +263,19 @@ class UITextInterface:
             choices: Słownik opcji (klucze: 'a', 'b', 'c', 'd')
         """
         self._current_stage = f"question_{index}"
-        self._print_header(
-            f"Pytanie {index}",
-            f"Zaznacz poprawną odpowiedź (A, B, C lub D)"
-        )
-        
-        print(f"  {question}\n")
-        print("  Opcje:")
+        body = [f"  {question}\n", "  Opcje:"]
         
         option_labels = {'a': 'A', 'b': 'B', 'c': 'C', 'd': 'D'}
         for key in ['a', 'b', 'c', 'd']:
             if key in choices:
-                print(f"    {option_labels[key]}) {choices[key]}")
+                body.append(f"    {option_labels[key]}) {choices[key]}")
         
-        print()
+        body.append("")
+        self._render_screen(
+            f"Pytanie {index}",
+            f"Zaznacz poprawną odpowiedź (A, B, C lub D)",
+            body
+        )
     
     def get_user_choice(self) -> str:
         """
@@ -224,14 +310,15 @@ class UITextInterface:
             correct_choice: Poprawna odpowiedź
             correct_text: Tekst poprawnej odpowiedzi
         """
-        print()
+        lines = [""]
         if is_correct:
-            print(f"  ✅ POPRAWNIE! Twoja odpowiedź '{user_choice.upper()}' jest prawidłowa.")
+            lines.append(f"  ✅ POPRAWNIE! Twoja odpowiedź '{user_choice.upper()}' jest prawidłowa.")
         else:
-            print(f"  ❌ BŁĘDNIE! Wybrałeś '{user_choice.upper()}', prawidłowa to '{correct_choice.upper()}'")
-            print(f"     Poprawna odpowiedź: {correct_text}")
+            lines.append(f"  ❌ BŁĘDNIE! Wybrałeś '{user_choice.upper()}', prawidłowa to '{correct_choice.upper()}'")
+            lines.append(f"     Poprawna odpowiedź: {correct_text}")
         
-        print()
+        lines.append("")
+        self.renderer.render(lines)
         input("  Naciśnij ENTER aby przejść do następnego pytania...")
     
     def display_final_report(self, report_text: str) -> None:
@@ -242,16 +329,28 @@ class UITextInterface:
             report_text: Tekst raportu
         """
         self._current_stage = "final_report"
-        self._print_header(
+        self._render_screen(
             "Raport Wyników",
-            "Podsumowanie Twojego quizu"
+            "Podsumowanie Twojego quizu",
+            [report_text] + self._footer_lines()
         )
         
-        print(report_text)
-        self._print_footer()
-        
         input("  Naciśnij ENTER aby zakończyć...")
     
+    def ask_play_again(self) -> bool:
+        """
+        Pyta użytkownika, czy chce rozwiązać kolejny quiz na ten sam temat.
+        
+        Returns:
+            True, jeśli użytkownik chce zagrać ponownie
+        """
+        answer = self._get_valid_input(
+            "  ➜ Zagrać ponownie na ten sam temat? (t/n): ",
+            validation_fn=lambda x: x.lower() in {'t', 'n'},
+            error_msg="Wpisz T lub N."
+        )
+        return answer.lower() == 't'
+    
     def show_message(self, message: str, message_type: str = "info") -> None:
         """
         Wyświetla komunikat do użytkownika.